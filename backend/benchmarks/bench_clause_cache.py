@@ -0,0 +1,91 @@
+"""
+Benchmark law rule evaluation with and without the clause fingerprint cache.
+
+Contracts drafted from one template share most of their clauses. With the
+clause cache the rules are matched clause by clause and the matches of each
+normalised clause are cached, so a contract that reuses clauses seen before
+only has its novel clauses searched.
+
+The corpus is one generated employment agreement in several variants, each
+renumbered and with a few clauses reworded. "disabled" evaluates every
+contract clause by clause with the cache disabled, as the analyzer does then,
+"cold" is the first variant on an empty cache and "warm" the other variants
+after it. Times include cutting the contract into clauses, but not tokenizing
+it and parsing its sections, which the metadata analysis does for every
+request. The cold run costs a little more than the disabled one, as it also
+fingerprints the clauses and stores their matches.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_clause_cache [--sections 100 500 2000] [--variants 5]
+"""
+
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+from service.ContractAnalyzerService import ContractAnalyzerService
+from utils.clause_cache import ClauseCache, contract_clauses
+from utils.contract_document import ContractDocument
+from utils.contract_sections import SectionTree, parse_sections
+
+CLAUSES = (
+    "Working Time\nThe Employee shall work 8 hours per day and 45 hours per week.",
+    "Overtime\nOvertime work is paid at 1.5 times the hourly rate of pay.",
+    "Annual Leave\nThe Employee is entitled to annual leave of 14 days in each year.",
+    "Remuneration\nThe Employer shall pay a salary of RM 4,500 per month by the seventh day of the month.",
+    "Termination\nEither party may terminate this agreement by giving one month's written notice.",
+    "Confidentiality\nThe Employee shall keep confidential all information of the Employer during and after employment.",
+)
+
+
+def contract(sections: int, variant: int) -> str:
+    """An employment agreement of sections numbered sections; variants reword every 50th section."""
+    parts = ["Employment Agreement between the Employer and the Employee.\n"]
+    for number in range(1, sections + 1):
+        clause = CLAUSES[number % len(CLAUSES)]
+        if variant and number % 50 == variant:
+            clause += f" This clause was revised in variant {variant}."
+        parts.append(f"{number + variant}. {clause} Reference {number}.\n")
+    return "".join(parts)
+
+
+def _evaluate(service: ContractAnalyzerService, document: ContractDocument, tree: SectionTree,
+              cache: ClauseCache) -> None:
+    service.law_rules.evaluate(document.text, "MY", "Employment", text_lower=document.lower,
+                               clauses=contract_clauses(document, tree), cache=cache)
+
+
+def _time(func: Callable[[], object]) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--variants", type=int, default=5)
+    args = parser.parse_args()
+    service = ContractAnalyzerService()
+
+    print(f"{'sections':>9} {'chars':>9} {'disabled ms':>12} {'cold ms':>9} {'warm ms':>9} {'hit rate':>9}")
+    for sections in args.sections:
+        parsed: List[Tuple[ContractDocument, SectionTree]] = []
+        for variant in range(args.variants):
+            document = ContractDocument(contract(sections, variant))
+            parsed.append((document, parse_sections(document)))
+        disabled = ClauseCache(enabled=False)
+        disabled_ms = sum(_time(lambda: _evaluate(service, *pair, disabled)) for pair in parsed) / len(parsed)
+        cache = ClauseCache(max_entries=100000)
+        cold_ms = _time(lambda: _evaluate(service, *parsed[0], cache))
+        warm_ms = sum(_time(lambda: _evaluate(service, *pair, cache)) for pair in parsed[1:]) / max(len(parsed) - 1, 1)
+        hit_rate = cache.stats()["jurisdictions"]["MY"]["hit_rate"]
+        print(
+            f"{sections:>9} {len(parsed[0][0].text):>9} {disabled_ms:>12.2f} {cold_ms:>9.2f} {warm_ms:>9.2f}"
+            f" {hit_rate:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark the text passes of the heuristic analysis before and after ContractDocument.
+
+Before, each analyzer derived its own view of the contract: the metadata
+analysis lowercased, split and counted sentences over the whole text, the
+section filter did the same for every candidate section, and the law rules and
+general contract checks each lowercased the text again. Now one
+ContractDocument is built per request and the analyzers read its lowercased
+text and offset arrays.
+
+"text passes" counts the characters run through lower(), split() and regex
+scans, in multiples of the contract length.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_contract_document [--repeat 5]
+"""
+
+import argparse
+import re
+import time
+from typing import Callable, List, Tuple
+
+from utils.contract_document import ContractDocument
+
+SECTION = (
+    "{number}. Termination of Employment\n"
+    "Either party may terminate this agreement by giving one month's written notice. The Employer may "
+    "terminate without notice for gross misconduct. Upon termination, the Employee shall return all "
+    "property of the Company.\n"
+    "The Employee shall be paid a monthly salary of RM 4,500. Overtime is paid at 1.5 times the rate.\n\n"
+)
+
+
+class PassCounter:
+    """Counts the characters each derivation runs over."""
+
+    def __init__(self):
+        self.chars = 0
+
+    def __call__(self, text: str) -> str:
+        self.chars += len(text)
+        return text
+
+
+def previous_derivations(text: str, sections: List[Tuple[int, int]], count: PassCounter) -> None:
+    """The derivations the analyzers used to make on their own, per request."""
+    # Contract metadata
+    count(text).lower()
+    len([word for word in count(text).split() if len(word) > 2])
+    len(re.findall(r'[.!?]+', count(text)))
+    # Section filter, for every candidate section
+    for start, end in sections:
+        content = text[start:end]
+        len(count(content).split())
+        len(re.findall(r'[.!?]+', count(content)))
+        count(content).lower()
+    # Law rule evaluation and general contract issues
+    count(text).lower()
+    count(text).lower()
+
+
+def document_derivations(text: str, sections: List[Tuple[int, int]], count: PassCounter) -> None:
+    """The same views read from one ContractDocument."""
+    # lower(), split('\n'), str.split per line, the terminator and paragraph scans
+    for _ in range(5):
+        count(text)
+    document = ContractDocument(text)
+    document.long_word_count, document.sentence_count
+    for start, end in sections:
+        document.words_in(start, end)
+        document.sentences_in(start, end)
+        document.lower_span(start, end)
+    document.lower, document.lower
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'chars':>9} {'sections':>9} {'previous ms':>12} {'document ms':>12} {'text passes':>12}")
+    for section_count in (10, 100, 1000):
+        text = "".join(SECTION.format(number=number) for number in range(1, section_count + 1))
+        document = ContractDocument(text)
+        sections = [document.strip_span(start, end) for start, end in document.paragraph_spans()]
+
+        previous, current = PassCounter(), PassCounter()
+        previous_derivations(text, sections, previous)
+        document_derivations(text, sections, current)
+        previous_ms = _time(lambda: previous_derivations(text, sections, PassCounter()), args.repeat)
+        document_ms = _time(lambda: document_derivations(text, sections, PassCounter()), args.repeat)
+        print(
+            f"{len(text):>9} {len(sections):>9} {previous_ms:>12.2f} {document_ms:>12.2f}"
+            f" {previous.chars / len(text):>5.1f} -> {current.chars / len(text):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark JSON extraction from large LLM responses.
+
+Compares the previous regex-based extraction (findall of '{.*?}' candidates,
+line re-scan, brace-count repair) with the single-pass scanner in
+utils/ai_client/json_extract.py on roughly 8k-token responses.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json_extract [--repeat 20]
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Callable, Dict, List
+
+from utils.ai_client.json_extract import (
+    FALLBACK_ANALYSIS,
+    extract_analysis_json,
+    is_complete_analysis_response,
+    is_partial_compliance_issue,
+    normalize_complete_response,
+    wrap_partial_response,
+)
+
+
+def legacy_extract(response_text: str) -> str:
+    """The extraction both clients used before the single-pass scanner."""
+    for match in re.findall(r'\{.*?\}', response_text, re.DOTALL):
+        try:
+            parsed = json.loads(match)
+            if is_complete_analysis_response(parsed):
+                return json.dumps(normalize_complete_response(parsed))
+            elif is_partial_compliance_issue(parsed):
+                return json.dumps(wrap_partial_response(parsed))
+            return match
+        except json.JSONDecodeError:
+            continue
+
+    json_lines: List[str] = []
+    in_json = False
+    brace_count = 0
+    for line in response_text.strip().split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('{') and not in_json:
+            in_json = True
+            brace_count = 1
+            json_lines.append(line)
+        elif in_json:
+            json_lines.append(line)
+            brace_count += stripped.count('{') - stripped.count('}')
+            if brace_count == 0:
+                break
+
+    if json_lines:
+        potential_json = '\n'.join(json_lines)
+        try:
+            json.loads(potential_json)
+            return potential_json
+        except json.JSONDecodeError:
+            repaired = potential_json.strip()
+            repaired += ']' * (repaired.count('[') - repaired.count(']'))
+            repaired += '}' * (repaired.count('{') - repaired.count('}'))
+            try:
+                json.loads(repaired)
+                return repaired
+            except json.JSONDecodeError:
+                pass
+    return json.dumps(FALLBACK_ANALYSIS)
+
+
+def _large_analysis(clauses: int = 120) -> Dict:
+    """An analysis of roughly 8k tokens with many nested clause objects."""
+    return {
+        "summary": "The agreement contains several provisions that conflict with {statutory} requirements. " * 5,
+        "flagged_clauses": [
+            {
+                "clause_text": f"Clause {number}: The Employer may vary the terms {{including pay}} at its sole discretion.",
+                "issue": "Unilateral variation of essential terms without consent or notice.",
+                "severity": ("high", "medium", "low")[number % 3]
+            }
+            for number in range(clauses)
+        ],
+        "compliance_issues": [
+            {
+                "law": f"LAW_{number}",
+                "missing_requirements": [f"Requirement {number}.{item}" for item in range(4)],
+                "recommendations": [f"Recommendation {number}.{item}" for item in range(3)]
+            }
+            for number in range(clauses // 4)
+        ]
+    }
+
+
+def scenarios() -> Dict[str, str]:
+    """Response texts to benchmark, keyed by name."""
+    analysis = json.dumps(_large_analysis(), indent=2)
+    prose = "Below is my analysis of the contract. Placeholders such as {party} were ignored.\n"
+    return {
+        "wrapped_complete": prose + "```json\n" + analysis + "\n```\nLet me know if you need more detail.",
+        "truncated": prose + analysis[: int(len(analysis) * 0.8)],
+        "brace_heavy_prose": ("Note {a} and {b} and {c}. " * 400) + analysis,
+    }
+
+
+def _time(func: Callable[[str], str], text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<20} {'chars':>8} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}  outermost")
+    for name, text in scenarios().items():
+        legacy_ms = _time(legacy_extract, text, args.repeat)
+        scanner_ms = _time(extract_analysis_json, text, args.repeat)
+        result = json.loads(extract_analysis_json(text))
+        legacy_result = json.loads(legacy_extract(text))
+        print(
+            f"{name:<20} {len(text):>8} {legacy_ms:>10.2f} {scanner_ms:>11.2f} {legacy_ms / scanner_ms:>7.1f}x"
+            f"  scanner={len(result.get('flagged_clauses', []))} clauses,"
+            f" legacy={len(legacy_result.get('flagged_clauses', []))} clauses"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark contract metadata keyword classification.
+
+Compares one substring search per indicator phrase (the previous
+`indicator in text_lower` loops) with a single KeywordAutomaton scan, on
+contracts of increasing length and with growing keyword sets. The substring
+loops pass over the text once per phrase that is absent, so their cost grows
+with the number of phrases; the automaton passes over it once.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_keyword_automaton [--repeat 5]
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from utils.contract_keywords import CONTRACT_KEYWORDS
+from utils.keyword_automaton import KeywordAutomaton
+
+CLAUSE = (
+    "The Employee shall be paid a monthly salary of RM 4,500. Either party may terminate this "
+    "agreement by giving one month's written notice. The Employer shall contribute to the EPF. "
+)
+
+
+def substring_passes(keywords: List[str], text_lower: str) -> int:
+    """The previous approach: one `in` test per keyword. Returns keywords found."""
+    return sum(1 for keyword in keywords if keyword in text_lower)
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _with_extra_keywords(extra: int) -> KeywordAutomaton:
+    """The contract automaton plus extra synthetic indicators, as if more contract types were added."""
+    automaton = KeywordAutomaton("bench")
+    for category in CONTRACT_KEYWORDS.categories:
+        automaton.add(category, CONTRACT_KEYWORDS.keywords(category))
+    automaton.add("synthetic", [f"indicator phrase {number}" for number in range(extra)])
+    return automaton
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'chars':>9} {'keywords':>9} {'substring ms':>13} {'automaton ms':>13} {'text passes':>12}")
+    for clauses in (20, 200, 2000):
+        text_lower = (CLAUSE * clauses).lower()
+        for extra in (0, 500, 2000):
+            automaton = _with_extra_keywords(extra)
+            automaton.scan("")  # build outside the timing
+            keywords = sorted({keyword for category in automaton.categories for keyword in automaton.keywords(category)})
+            substring_ms = _time(lambda: substring_passes(keywords, text_lower), args.repeat)
+            automaton_ms = _time(lambda: automaton.scan(text_lower), args.repeat)
+            print(
+                f"{len(text_lower):>9} {len(keywords):>9} {substring_ms:>13.2f} {automaton_ms:>13.2f}"
+                f" {len(keywords):>6} -> 1"
+            )
+
+
+if __name__ == "__main__":
+    main()
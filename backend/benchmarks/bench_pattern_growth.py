@@ -0,0 +1,142 @@
+"""
+Fuzz the analysis regexes for matching time that grows faster than the input.
+
+A rule whose match time doubles with the input is fine; one that quadruples
+(or worse) backtracks over .* chains and can stall a request on a long or
+adversarial contract. For every rule in CONTRACT_PATTERNS and in the law rule
+registry this builds random text from the rule's own literal words (so that
+partial matches abound) at doubling sizes, with and without line breaks and
+with each literal in turn left out (so that the full match fails late), and
+times the rule on it. The growth exponent is log2 of the time ratio between
+the two largest sizes: about 1 is linear, 2 quadratic. Rules above --max-exponent,
+or that ran over the time cap, are flagged and the script exits non-zero.
+
+Install the regex package before running this: with the standard re module a
+runaway match cannot be aborted and the script may hang on the rule it is
+trying to flag.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pattern_growth [--sizes 2000 4000 8000 16000] [--rule ccpa.]
+"""
+
+import argparse
+import logging
+import math
+import random
+import re
+import sys
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from utils.contract_patterns import CONTRACT_PATTERNS
+from utils.law_loader import LawLoader
+from utils.pattern_registry import ABORTABLE, PatternRule
+
+FILLER = (
+    "the employee shall comply with this agreement and the company may provide notice to the other party "
+    "in writing within thirty days subject to applicable law"
+).split()
+
+_LITERAL = re.compile(r'(?<!\\)[A-Za-z]{2,}')
+_ESCAPE = re.compile(r'\\[A-Za-z]')
+
+
+def literals(rule: PatternRule) -> List[str]:
+    """The words of a rule's pattern, in order, without escapes such as \\s."""
+    words = _LITERAL.findall(_ESCAPE.sub(" ", rule.pattern))
+    return list(dict.fromkeys(word.lower() for word in words))
+
+
+def fuzz_inputs(rule: PatternRule, size: int, seed: int) -> Iterator[str]:
+    """Random texts of about size characters built from the rule's literals and filler words."""
+    words = literals(rule) or FILLER
+    pools = [words] + [words[:index] + words[index + 1:] for index in range(len(words))]
+    for pool in pools:
+        pool = (pool or FILLER) + ["30"]
+        for line_words in (0, 12):
+            generator = random.Random(seed)
+            parts, length = [], 0
+            while length < size:
+                word = generator.choice(pool) if generator.random() < 0.7 else generator.choice(FILLER)
+                separator = "\n" if line_words and len(parts) % line_words == line_words - 1 else " "
+                parts.append(word + separator)
+                length += len(word) + 1
+            text = "".join(parts)
+            yield text if rule.flags & re.IGNORECASE else text.lower()
+
+
+def time_rule(rule: PatternRule, text: str, cap: float, repeat: int = 3) -> Tuple[float, bool]:
+    """
+    Seconds to find every match of rule in text (the best of repeat runs when
+    they are quick enough to be noisy), and whether the cap was hit.
+    """
+    best = math.inf
+    for _ in range(repeat):
+        timeouts = rule.timeouts
+        started = time.perf_counter()
+        for _ in rule.finditer(text, budget=cap):
+            pass
+        best = min(best, time.perf_counter() - started)
+        if rule.timeouts > timeouts:
+            return best, True
+        if best > 0.05:
+            break
+    return best, False
+
+
+def growth(rule: PatternRule, sizes: List[int], cap: float, seed: int) -> Tuple[List[float], Optional[float], bool]:
+    """
+    The worst matching time over the fuzz inputs at each size, the growth
+    exponent between the two largest sizes and whether the cap was hit.
+    """
+    times = []
+    for size in sizes:
+        worst, capped = 0.0, False
+        for text in fuzz_inputs(rule, size, seed):
+            seconds, capped = time_rule(rule, text, cap)
+            worst = max(worst, seconds)
+            if capped:
+                break
+        times.append(worst)
+        if capped:
+            return times, None, True
+    # Times below a millisecond are too noisy to compare
+    if times[-2] < 1e-3:
+        return times, None, False
+    return times, math.log(times[-1] / times[-2], sizes[-1] / sizes[-2]), False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 4000, 8000, 16000])
+    parser.add_argument("--cap", type=float, default=2.0, help="seconds one input may take")
+    parser.add_argument("--max-exponent", type=float, default=1.5)
+    parser.add_argument("--rule", default="", help="only rules whose name starts with this")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not ABORTABLE:
+        print("warning: the regex package is not installed, runaway matches cannot be aborted", file=sys.stderr)
+    logging.getLogger("utils.pattern_registry").setLevel(logging.ERROR)
+
+    rules = list(CONTRACT_PATTERNS) + list(LawLoader().get_rule_engine().patterns)
+    flagged = []
+    print(f"{'rule':<48} " + " ".join(f"{size:>9}" for size in args.sizes) + f" {'exponent':>9}")
+    for rule in rules:
+        if not rule.name.startswith(args.rule):
+            continue
+        times, exponent, capped = growth(rule, args.sizes, args.cap, args.seed)
+        cells = [f"{seconds * 1000:>7.2f}ms" for seconds in times] + ["-" * 9] * (len(args.sizes) - len(times))
+        verdict = "capped" if capped else ("-" if exponent is None else f"{exponent:.2f}")
+        if capped or (exponent is not None and exponent > args.max_exponent):
+            flagged.append(rule.name)
+            verdict += " *"
+        print(f"{rule.name:<48} " + " ".join(f"{cell:>9}" for cell in cells) + f" {verdict:>9}")
+
+    print(f"\n{len(flagged)} of {len(rules)} rules grow faster than n^{args.max_exponent}: {', '.join(flagged) or 'none'}")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
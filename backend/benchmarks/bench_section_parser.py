@@ -0,0 +1,131 @@
+"""
+Benchmark section extraction before and after the one-pass section parser.
+
+Before, four multi-line regexes (numbered, lettered, recital and title case
+headings, each also capturing the content under the heading) ran over the
+whole contract one after the other. Now parse_sections() scans the heading
+lines once and nests them into a tree.
+
+The contract is a generated agreement of numbered articles with numbered and
+lettered subsections, recitals and title case schedules, at about 3,000
+characters a page. Times should double with the page count for the parser.
+The previous extractor is quick on it because it stops after the numbered
+headings (and does not see "2.1 Scope" style ones at all); the second table
+shows text with a run of whitespace-only lines, as extracted from some PDFs,
+which the leading newline-and-whitespace of the previous patterns rescans
+from every line of the run.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_section_parser [--pages 50 100 250 500] [--blank-lines 1000 2000 4000]
+"""
+
+import argparse
+import re
+import time
+from typing import Callable
+
+from utils.contract_document import ContractDocument
+from utils.contract_sections import parse_sections
+
+# The section heading patterns of the previous extractor, tried in this order
+PREVIOUS_PATTERNS = [re.compile(pattern, re.MULTILINE | re.DOTALL) for pattern in (
+    r'\n\s*(\d+(?:\.\d+)*)\.\s+([A-Z][^.\n]{5,50}?)\s*\n((?:(?!\n\s*\d+(?:\.\d+)*\.)(?:[^\n]+\n?))*)',
+    r'\n\s*([A-Z])\.\s+([A-Z][^.\n]{5,50}?)\s*\n((?:(?!\n\s*[A-Z]\.)(?:[^\n]+\n?))*)',
+    r'\n\s*(WHEREAS|NOW THEREFORE|WITNESSETH|RECITALS?)\s*[,:]\s*\n((?:[^\n]+\n?)*?)'
+    r'(?=\n\s*(?:WHEREAS|NOW THEREFORE|WITNESSETH|\d+\.|[A-Z]{3,})|$)',
+    r'\n\s*([A-Z][a-z][^.\n]{10,80}?)\s*[:.]?\s*\n((?:[^\n]+\n?){3,}?)(?=\n\s*[A-Z][a-z][^.\n]{10,80}?[:.]?\s*\n|$)',
+)]
+
+RECITALS = (
+    "WHEREAS:\n"
+    "The Company wishes to engage the Provider to perform the services described in this agreement.\n\n"
+    "NOW THEREFORE,\n"
+    "in consideration of the mutual covenants below the parties agree as follows.\n\n"
+)
+
+CLAUSE = (
+    "The Provider shall perform the services with reasonable skill and care and in accordance with "
+    "applicable law. The Company shall pay the fees within thirty days of receiving a valid invoice. "
+    "Either party may terminate this agreement by giving one month's written notice to the other party.\n"
+)
+
+ARTICLE = (
+    "{number}. Obligations of the Parties\n" + CLAUSE + "\n"
+    "{number}.1 Services and Standards\n" + CLAUSE + CLAUSE + "\n"
+    "{number}.1.1 Service Levels\n" + CLAUSE + "\n"
+    "A. Response Times\n" + CLAUSE + "\n"
+    "B. Service Credits\n" + CLAUSE + "\n"
+    "{number}.2 Fees and Payment\n" + CLAUSE + CLAUSE + "\n"
+)
+
+SCHEDULE = "Schedule of Agreed Service Fees\n\n" + CLAUSE * 3 + "\n"
+
+PAGE_CHARS = 3000
+
+PADDED = "Terms of the Agreement\n{padding}The parties agree to the terms below.\n"
+
+
+def contract(pages: int) -> str:
+    """A structured agreement of about pages pages."""
+    parts, length, number = [RECITALS], len(RECITALS), 0
+    while length < pages * PAGE_CHARS:
+        number += 1
+        part = ARTICLE.format(number=number) + (SCHEDULE if number % 10 == 0 else "")
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def previous_extraction(text: str) -> int:
+    """The previous extractor's regex passes, without its per-section filtering."""
+    found = 0
+    for pattern in PREVIOUS_PATTERNS:
+        for match in pattern.finditer(text):
+            match.group(match.re.groups).strip()
+            found += 1
+        if found >= 3:
+            break
+    return found
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--blank-lines", type=int, nargs="+", default=[1000, 2000, 4000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'chars':>9} {'previous ms':>12} {'found':>7} {'parser ms':>10} {'sections':>9} {'depth':>6}")
+    for pages in args.pages:
+        text = contract(pages)
+        document = ContractDocument(text)
+        found = previous_extraction(text)
+        tree = parse_sections(document)
+        previous_ms = _time(lambda: previous_extraction(text), args.repeat)
+        parser_ms = _time(lambda: parse_sections(document), args.repeat)
+        print(
+            f"{pages:>6} {len(text):>9} {previous_ms:>12.2f} {found:>7} {parser_ms:>10.2f}"
+            f" {len(tree):>9} {tree.depth:>6}"
+        )
+
+    print(f"\n{'blank lines':>11} {'previous ms':>12} {'parser ms':>10}")
+    for blank_lines in args.blank_lines:
+        text = PADDED.format(padding=" \n" * blank_lines)
+        document = ContractDocument(text)
+        previous_ms = _time(lambda: previous_extraction(text), 1)
+        parser_ms = _time(lambda: parse_sections(document), args.repeat)
+        print(f"{blank_lines:>11} {previous_ms:>12.2f} {parser_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
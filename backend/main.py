@@ -9,6 +9,9 @@ from routes.contract import router as contract_router
 from routes.regulations import router as regulations_router
 from routes.ai_insights import router as ai_insights_router
 from routes.fintech_compliance import router as fintech_router
+from utils.ai_client import transport as ai_transport
+from utils.ai_client.auth import reset_token_managers
+from utils.deadline import DeadlineMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -42,6 +45,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Request deadlines (X-Request-Timeout header or REQUEST_TIMEOUT_SECONDS) and
+# cancellation of requests whose client has disconnected
+app.add_middleware(DeadlineMiddleware)
 # Include routers
 app.include_router(contract_router)
 app.include_router(regulations_router)
@@ -49,6 +55,12 @@ app.include_router(ai_insights_router)
 app.include_router(fintech_router)
 app.include_router(ai_insights_router)
 
+@app.on_event("shutdown")
+async def close_ai_connections():
+    """Release pooled keep-alive connections and token refresh timers for AI providers."""
+    await ai_transport.close_clients()
+    reset_token_managers()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -6,4 +6,6 @@ from models.ContractAnalysisModel import ContractAnalysisRequest
 class BulkAnalysisRequest(BaseModel):
     contracts: List[ContractAnalysisRequest]
     priority: str = "normal"
-    notification_email: Optional[str] = None
\ No newline at end of file
+    notification_email: Optional[str] = None
+    # Pack short contracts several per AI prompt; None uses the BULK_BATCH_PROMPTS setting
+    batch_prompts: Optional[bool] = None
\ No newline at end of file
@@ -4,3 +4,5 @@ from typing import Optional
 class ContractAnalysisRequest(BaseModel):
     text: str                      
     jurisdiction: Optional[str] = "MY" 
+    use_cache: bool = True  # Set False to force a fresh AI generation
+    preview: bool = False  # Return the heuristic analysis without waiting for the AI (streamed: emit it first)
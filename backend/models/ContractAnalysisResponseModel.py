@@ -1,10 +1,13 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 class ClauseFlag(BaseModel):
     clause_text: str
     issue: Optional[str] = None
     severity: Optional[str] = "low"
+    start: Optional[int] = None   # Character offsets of the flagged text in the analysed
+    end: Optional[int] = None     # (preprocessed) contract, when the analysis located it
+    section: Optional[str] = None # Heading of the section the clause is in, e.g. "2.1 Scope"
 
 class ComplianceFeedback(BaseModel):
     law: str                      # e.g., PDPA, GDPR
@@ -16,3 +19,4 @@ class ContractAnalysisResponse(BaseModel):
     flagged_clauses: List[ClauseFlag]
     compliance_issues: Optional[List[ComplianceFeedback]] = []
     jurisdiction: Optional[str] = "Unknown"
+    metadata: Optional[Dict[str, Any]] = None  # e.g. token budget of the AI prompt
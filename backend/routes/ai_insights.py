@@ -10,7 +10,8 @@ This module provides clean AI endpoints using IBM Granite for:
 import json
 import logging
 import re
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
@@ -42,10 +43,20 @@ class ClauseExplanationResponse(BaseModel):
     recommendations: list[str]
 
 
+# Shared client; built lazily so a missing configuration only fails the AI endpoints
+_ai_client: Optional[WatsonXClient] = None
+_ai_client_lock = threading.Lock()
+
+
 # Dependency injection
 def get_ai_client() -> WatsonXClient:
-    """Get configured AI client."""
-    return WatsonXClient()
+    """Get the configured AI client, reusing it (and its cached IAM token) across requests."""
+    global _ai_client
+    if _ai_client is None:
+        with _ai_client_lock:
+            if _ai_client is None:
+                _ai_client = WatsonXClient()
+    return _ai_client
 
 
 @router.post("/summarize", response_model=DocumentSummaryResponse)
@@ -138,7 +149,7 @@ Focus on realistic, practical business concerns rather than theoretical legal is
             """
         
         # Get AI response
-        summary = ai_client._make_text_request(prompt)
+        summary = await ai_client._make_text_request_async(prompt)
         
         # Clean and process the AI response
         clean_summary = _process_ai_summary_response(summary, request.text, request.summary_type)
@@ -268,7 +279,7 @@ Recommendations:
 Remember: Use simple words, short sentences, and avoid legal jargon completely.
         """
         
-        explanation = ai_client._make_text_request(prompt)
+        explanation = await ai_client._make_text_request_async(prompt)
         
         # Clean the response and extract meaningful content
         logger.debug(f"Raw AI response: {explanation}")
@@ -790,7 +801,9 @@ async def health_check():
     try:
         ai_client = get_ai_client()
         # Simple test prompt
-        test_response = ai_client._make_text_request("Hello, this is a test. Respond with 'OK'.")
+        test_response = await ai_client._make_text_request_async(
+            "Hello, this is a test. Respond with 'OK'.", use_cache=False
+        )
         return {"status": "healthy", "ai_service": "connected"}
     except Exception as e:
         logger.error(f"AI health check failed: {e}")
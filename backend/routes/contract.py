@@ -10,11 +10,13 @@ This module provides comprehensive REST API endpoints for:
 """
 
 import asyncio
+import json
 import logging
 import io
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import ValidationError
 
 # Import our models
@@ -31,6 +33,14 @@ from service.DocumentProcessorService import DocumentProcessorService
 from utils.file_validators import FileValidator
 from utils.text_extractors import TextExtractor
 from utils.ai_client.exceptions import APIError, AuthenticationError, ConfigurationError
+from utils.ai_client.cache import get_response_cache
+from utils.ai_client.circuit_breaker import circuit_breaker_stats
+from utils.ai_client.executor import executor_stats
+from utils.ai_client.rate_limit import rate_limiter_stats
+from utils.ai_client.metrics import metrics
+from utils.clause_cache import get_clause_cache
+from utils.contract_patterns import CONTRACT_PATTERNS
+from utils.deadline import DeadlineExceeded, without_deadline
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -70,6 +80,9 @@ async def analyze_contract(
     - Risk assessment and flagging of problematic clauses
     - Recommendations for compliance improvements
     
+    With preview set, the heuristic analysis is returned at once without waiting
+    for the AI provider.
+    
     Args:
         request: Contract analysis request containing text and jurisdiction
         analyzer: Injected contract analyzer service
@@ -103,6 +116,10 @@ async def analyze_contract(
         logger.error(f"Validation error in contract analysis: {e}")
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     
+    except DeadlineExceeded as e:
+        logger.warning(f"Contract analysis abandoned: {e}")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    
     except (APIError, AuthenticationError, ConfigurationError) as e:
         logger.error(f"AI service error in contract analysis: {e}")
         raise HTTPException(
@@ -118,10 +135,66 @@ async def analyze_contract(
         )
 
 
+@router.post("/analyze/stream")
+async def analyze_contract_stream(
+    request: ContractAnalysisRequest,
+    analyzer: ContractAnalyzerService = Depends(get_contract_analyzer)
+):
+    """
+    Analyze a single contract, streaming findings as they are produced.
+    
+    The response is newline-delimited JSON (application/x-ndjson), one
+    {"event": ..., "data": ...} object per line:
+    - started: jurisdiction, detected contract type and whether the AI answer is streamed
+    - preview: the heuristic ContractAnalysisResponse, if request.preview is set and the AI answer is streamed
+    - summary / flagged_clause / compliance_issue: findings as soon as the model completes them
+    - complete: the full ContractAnalysisResponse, identical in shape to /analyze
+    - error: emitted instead of complete if the analysis fails
+    
+    Streamed findings are provisional; clients should render them immediately
+    and replace them with the complete event's analysis.
+    
+    Args:
+        request: Contract analysis request containing text and jurisdiction
+        analyzer: Injected contract analyzer service
+        
+    Returns:
+        StreamingResponse of NDJSON events
+        
+    Raises:
+        HTTPException: 400 for validation errors
+    """
+    if not request.text or len(request.text.strip()) < 50:
+        raise HTTPException(
+            status_code=400,
+            detail="Contract text must be at least 50 characters long"
+        )
+    
+    logger.info(f"Starting streamed contract analysis for jurisdiction: {request.jurisdiction}")
+    
+    async def events():
+        try:
+            async for event in analyzer.analyze_contract_stream(request):
+                yield json.dumps(jsonable_encoder(event)) + "\n"
+        except Exception as e:
+            logger.error(f"Unexpected error in streamed contract analysis: {e}")
+            yield json.dumps({
+                "event": "error",
+                "data": {"detail": "An unexpected error occurred during contract analysis"}
+            }) + "\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/analyze/file", response_model=ContractAnalysisResponse)
 async def analyze_contract_file(
     file: UploadFile = File(...),
     jurisdiction: str = Form("MY"),
+    use_cache: bool = Form(True),
     processor: DocumentProcessorService = Depends(get_document_processor)
 ):
     """
@@ -133,13 +206,15 @@ async def analyze_contract_file(
     Args:
         file: Uploaded contract file
         jurisdiction: Legal jurisdiction for analysis (default: "MY" for Malaysia)
+        use_cache: Set False to force a fresh AI analysis
         processor: Injected document processor service
         
     Returns:
         ContractAnalysisResponse: Detailed analysis results
         
     Raises:
-        HTTPException: 400 for invalid files, 413 for oversized files, 500 for processing errors
+        HTTPException: 400 for invalid files, 413 for oversized files, 500 for processing errors,
+            504 if the request deadline (X-Request-Timeout) passes before the analysis starts
     """
     try:
         logger.info(f"Processing uploaded file: {file.filename} for jurisdiction: {jurisdiction}")
@@ -162,7 +237,8 @@ async def analyze_contract_file(
         analysis_result = await processor.process_single_document(
             file_content=file_content,
             filename=file.filename,
-            jurisdiction=jurisdiction
+            jurisdiction=jurisdiction,
+            use_cache=use_cache
         )
         
         logger.info(f"File analysis completed for {file.filename}")
@@ -172,6 +248,10 @@ async def analyze_contract_file(
     except HTTPException:
         raise
     
+    except DeadlineExceeded as e:
+        logger.warning(f"File analysis of {file.filename} abandoned: {e}")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    
     except Exception as e:
         logger.error(f"Error processing file {file.filename}: {e}")
         raise HTTPException(
@@ -427,6 +507,11 @@ async def health_check():
         if hasattr(contract_analyzer, 'watsonx_client') and contract_analyzer.watsonx_client is None:
             ai_client_status = "degraded"
         
+        # An open or probing breaker means analyses are served by the heuristic fallback
+        circuit_breakers = circuit_breaker_stats()
+        if any(breaker["state"] != "closed" for breaker in circuit_breakers.values()):
+            ai_client_status = "degraded"
+        
         overall_status = "healthy" if all(
             status == "healthy" 
             for status in [analyzer_status, processor_status]
@@ -441,6 +526,8 @@ async def health_check():
                     "document_processor": processor_status,
                     "ai_client": ai_client_status
                 },
+                "ai_executors": executor_stats(),
+                "circuit_breakers": circuit_breakers,
                 "version": "1.0.0"
             }
         )
@@ -456,7 +543,36 @@ async def health_check():
         )
 
 
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Expose in-process AI client metrics (executor gauges, counters, latency histograms).
+    
+    pattern_rules lists the 20 heuristic analysis regexes with the most
+    cumulative match time, with their call and match counts; law_rules does
+    the same for the statutory checks compiled from the law files.
+    pattern_timeouts lists the rules of either that ran over their time
+    budget, most often first. clause_cache reports the clause fingerprint
+    cache with its hit rate per jurisdiction.
+    
+    Returns:
+        JSON response with a snapshot of all recorded metrics
+    """
+    return JSONResponse(content={
+        "executors": executor_stats(),
+        "response_cache": get_response_cache().stats(),
+        "clause_cache": get_clause_cache().stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "rate_limiters": rate_limiter_stats(),
+        "pattern_rules": CONTRACT_PATTERNS.stats(top=20),
+        "law_rules": contract_analyzer.law_rules.patterns.stats(top=20),
+        "pattern_timeouts": CONTRACT_PATTERNS.timed_out() + contract_analyzer.law_rules.patterns.timed_out(),
+        "metrics": metrics.snapshot()
+    })
+
+
 # Background task function for bulk processing
+@without_deadline
 async def _process_bulk_contracts(
     task_id: str,
     request: BulkAnalysisRequest,
@@ -32,7 +32,7 @@ async def screen_customer_aml(request: AMLScreeningRequest):
     try:
         logger.info(f"AML screening request for: {request.customer_name}")
         service = AMLTransactionService()
-        result = service.screen_customer(request)
+        result = await service.screen_customer(request)
         return result
     except Exception as e:
         logger.error(f"AML screening failed: {e}")
@@ -53,7 +53,7 @@ async def analyze_transaction(transaction: TransactionData):
     try:
         logger.info(f"Transaction analysis request: {transaction.transaction_id}")
         service = AMLTransactionService()
-        result = service.analyze_transaction(transaction)
+        result = await service.analyze_transaction(transaction)
         return result
     except Exception as e:
         logger.error(f"Transaction analysis failed: {e}")
@@ -32,7 +32,7 @@ class AMLTransactionService:
             logger.error(f"Failed to initialize AML service: {e}")
             raise
     
-    def screen_customer(self, request: AMLScreeningRequest) -> AMLScreeningResult:
+    async def screen_customer(self, request: AMLScreeningRequest) -> AMLScreeningResult:
         """
         Perform AML/KYC screening on a customer.
         
@@ -49,7 +49,7 @@ class AMLTransactionService:
             screening_prompt = self._build_screening_prompt(request)
             
             # Get AI analysis
-            ai_response = self.ai_client.generate_text(
+            ai_response = await self.ai_client.generate_text_async(
                 screening_prompt,
                 max_tokens=1500,
                 temperature=0.2
@@ -65,7 +65,7 @@ class AMLTransactionService:
             logger.error(f"AML screening failed: {e}")
             raise
     
-    def analyze_transaction(self, transaction: TransactionData) -> Dict[str, Any]:
+    async def analyze_transaction(self, transaction: TransactionData) -> Dict[str, Any]:
         """
         Analyze a single transaction for suspicious patterns.
         
@@ -104,7 +104,7 @@ Provide:
 
 Format as JSON."""
 
-            ai_response = self.ai_client.generate_text(
+            ai_response = await self.ai_client.generate_text_async(
                 analysis_prompt,
                 max_tokens=800,
                 temperature=0.2
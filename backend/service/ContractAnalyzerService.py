@@ -1,9 +1,11 @@
+import asyncio
+import hashlib
 import json
 import logging
 import os
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Set
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Set
 from dotenv import load_dotenv
 
 env_path = Path(__file__).parent.parent.parent / '.env'
@@ -16,6 +18,20 @@ from utils.law_loader import LawLoader
 from service.RegulatoryEngineService import RegulatoryEngineService
 from utils.ai_client import WatsonXClient, WatsonXConfig, GeminiClient, GeminiConfig
 from utils.ai_client.exceptions import ConfigurationError, APIError, AuthenticationError 
+from utils.ai_client.hedging import hedge_delay, hedged_call
+from utils.ai_client.json_extract import is_complete_analysis_response, normalize_complete_response
+from utils.ai_client.streaming import AnalysisStreamParser
+from utils.ai_client.tokens import TokenBudget, collect_budgets, collecting_budgets, record_budget, sent_budgets
+from utils.contract_keywords import (
+    CONTRACT_FEATURES, CONTRACT_JURISDICTIONS, CONTRACT_KEYWORDS, CONTRACT_TYPE_INDICATORS, INDICATOR_WEIGHTS,
+    SECTION_CONTENT_KEYWORDS, SECTION_TITLE_KEYWORDS
+)
+from utils.clause_cache import Clause, contract_clauses, get_clause_cache, make_clause_key
+from utils.contract_document import ContractDocument, Span
+from utils.contract_patterns import CONTRACT_PATTERNS
+from utils.contract_sections import SectionTree, parse_sections, section_spans
+from utils.deadline import remaining_time
+from utils.law_rules import RuleEvaluation, clause_context, clause_excerpt
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +39,40 @@ class ContractAnalyzerService:
     def __init__(self):
         self.law_loader = LawLoader()
         self.regulatory_engine = RegulatoryEngineService(self.law_loader)
+        self.law_rules = self.law_loader.get_rule_engine()
         self.watsonx_client = None
         self.gemini_client = None
         self.ai_provider = None  # Track which provider is active
         
+        # Long contracts are analysed in section-aligned chunks (map-reduce) instead of
+        # being truncated to their head and tail by the prompt builder
+        self.chunk_max_chars = int(os.getenv("ANALYSIS_CHUNK_CHARS", "7000"))
+        self.chunk_concurrency = int(os.getenv("ANALYSIS_CHUNK_CONCURRENCY", "4"))
+        
+        # Findings of clauses seen in earlier contracts (boilerplate) are reused from the
+        # clause fingerprint cache, so only novel clauses go through the rules and the AI
+        self.clause_cache = get_clause_cache()
+        
+        # Opt-in hedging: when both providers are configured, a Gemini call that has not
+        # answered within its recent latency percentile is also sent to WatsonX
+        self.hedging_enabled = os.getenv("ANALYSIS_HEDGING", "false").lower() in ("1", "true", "yes")
+        self.hedge_percentile = float(os.getenv("ANALYSIS_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_samples = int(os.getenv("ANALYSIS_HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_default_delay = float(os.getenv("ANALYSIS_HEDGE_DELAY", "10"))
+        
+        # Batched bulk analysis: contracts up to batch_max_chars that share a jurisdiction
+        # and contract type are packed into one prompt, at most batch_size per prompt
+        self.batch_max_chars = int(os.getenv("BULK_BATCH_MAX_CHARS", "3000"))
+        self.batch_size = int(os.getenv("BULK_BATCH_SIZE", "5"))
+        
+        # Speculative heuristics: the rule-based analysis runs in a worker thread while the
+        # AI call is in flight, so a fallback or the enhancement of a minimal answer need not wait for it
+        self.speculative_heuristics = os.getenv("ANALYSIS_SPECULATIVE_HEURISTICS", "true").lower() in ("1", "true", "yes")
+        
+        # With less than this many seconds left before the request deadline (see utils.deadline),
+        # answer from heuristics instead of starting an AI call that cannot finish
+        self.min_ai_seconds = float(os.getenv("ANALYSIS_MIN_AI_SECONDS", "5"))
+        
         # Try to initialize Gemini client first (preferred)
         try:
             gemini_config = GeminiConfig.from_environment()
@@ -38,12 +84,12 @@ class ContractAnalyzerService:
         except Exception as e:
             logger.warning(f"Failed to initialize Gemini client: {e}")
         
-        # Fall back to IBM WatsonX if Gemini is not available
-        if not self.gemini_client:
+        # Fall back to IBM WatsonX if Gemini is not available (or add it as the hedge target)
+        if not self.gemini_client or self.hedging_enabled:
             try:
                 config = WatsonXConfig.from_environment()
                 self.watsonx_client = WatsonXClient(config)
-                self.ai_provider = "watsonx"
+                self.ai_provider = self.ai_provider or "watsonx"
                 logger.info("IBM WatsonX Granite client initialized successfully.")
             except ConfigurationError as e:
                 logger.warning(f"Failed to initialize WatsonX client due to configuration: {e}")
@@ -55,66 +101,117 @@ class ContractAnalyzerService:
         # Log the active AI provider
         if self.ai_provider:
             logger.info(f"Active AI Provider: {self.ai_provider.upper()}")
+            if self._hedging_active():
+                logger.info("Hedged requests enabled: GEMINI primary, WATSONX secondary")
         else:
             logger.warning("No AI provider available - will use fallback analysis")
                 
+    @collecting_budgets
     async def analyze_contract(self, request: ContractAnalysisRequest) -> ContractAnalysisResponse:
         """
         Main contract analysis orchestrator with enhanced content-aware analysis.
+        
+        With request.preview set, the heuristic analysis is returned without
+        waiting for the AI provider (metadata["preview"] is True).
         """
         try:
-            # 1. Pre-process and clean the contract text
-            cleaned_contract = self._preprocess_contract_text(request.text)
-            logger.info(f"Contract preprocessing complete. Original length: {len(request.text)}, Cleaned length: {len(cleaned_contract)}")
-            
-            # 2. Analyze contract structure and content type
-            contract_metadata = self._analyze_contract_metadata(cleaned_contract)
-            logger.info(f"Contract analysis: Type={contract_metadata['type']}, Sections={len(contract_metadata['sections'])}, Has_Data_Processing={contract_metadata['has_data_processing']}")
-            
-            # 3. Get the applicable compliance rules from our engine
-            jurisdiction = request.jurisdiction or "MY"
-            compliance_checklist = self.regulatory_engine.get_compliance_checklist(
-                jurisdiction=jurisdiction,
-                contract_type=contract_metadata['type']
-            )
+            # 1-3. Clean the text, detect the contract type and load the applicable rules
+            cleaned_contract, contract_metadata, jurisdiction, compliance_checklist = self._prepare_analysis(request)
+
+            if request.preview:
+                ai_response_text = await self._start_heuristic_analysis(
+                    cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                )
+                return self._build_analysis_response(
+                    ai_response_text, cleaned_contract, contract_metadata, jurisdiction, {"preview": True}
+                )
 
             # 4. Determine which AI service to use
             use_ai = self.ai_provider is not None
-            
-            if use_ai:
+            token_budget = None
+            response_metadata: Dict[str, Any] = {}
+            heuristic = None
+            
+            if use_ai and self._ai_circuit_open():
+                # Provider is failing; answer from heuristics now instead of waiting out its timeout
+                logger.warning(f"{self.ai_provider.upper()} circuit breaker is open - using intelligent fallback analysis")
+                response_metadata["ai_fallback"] = "circuit_open"
+                ai_response_text = self._get_intelligent_mock_analysis(
+                    cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                )
+            elif use_ai and self._ai_budget_exhausted():
+                logger.warning(f"Only {remaining_time():.1f}s left before the request deadline - using intelligent fallback analysis")
+                response_metadata["ai_fallback"] = "deadline"
+                ai_response_text = self._get_intelligent_mock_analysis(
+                    cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                )
+            elif use_ai:
+                if self.speculative_heuristics:
+                    heuristic = self._start_heuristic_analysis(
+                        cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                    )
                 try:
-                    if self.ai_provider == "gemini":
+                    excerpts = self._analysis_excerpts(cleaned_contract, contract_metadata)
+                    clause_plan = None
+                    if len(excerpts) > 1 and self.clause_cache.enabled:
+                        clause_plan = self._plan_clause_analysis(
+                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction,
+                            use_cache=request.use_cache
+                        )
+                        excerpts = clause_plan["excerpts"]
+                    
+                    if clause_plan is not None:
+                        logger.info(f"Contract exceeds {self.chunk_max_chars} characters, using chunked {self.ai_provider.upper()} analysis of its novel clauses")
+                        ai_response_text = await self._get_clause_cached_ai_analysis(
+                            clause_plan, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction,
+                            use_cache=request.use_cache, heuristic=heuristic
+                        )
+                    elif len(excerpts) > 1:
+                        logger.info(f"Contract exceeds {self.chunk_max_chars} characters, using chunked {self.ai_provider.upper()} analysis")
+                        ai_response_text = await self._get_chunked_ai_analysis(
+                            excerpts, compliance_checklist, contract_metadata['type'],
+                            use_cache=request.use_cache
+                        )
+                    elif self.ai_provider == "gemini":
                         logger.info("Using Google Gemini AI for contract analysis")
-                        ai_response_text = self._get_gemini_analysis(
-                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                        ai_response_text = await self._get_gemini_analysis(
+                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction,
+                            use_cache=request.use_cache, heuristic=heuristic
                         )
                         logger.info(f"Gemini AI Response received: {ai_response_text[:200]}...")
                     else:  # watsonx
                         logger.info("Using IBM WatsonX Granite AI for contract analysis")
-                        ai_response_text = self._get_granite_analysis_with_context(
-                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                        ai_response_text = await self._get_granite_analysis_with_context(
+                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction,
+                            use_cache=request.use_cache, heuristic=heuristic
                         )
                         logger.info(f"IBM Granite AI Response received: {ai_response_text[:200]}...")
+                    token_budget = self._describe_token_budget(sent_budgets())
                     
                     # Validate the AI response
                     if self._is_ai_response_minimal(ai_response_text):
                         logger.info(f"{self.ai_provider.upper()} response appears minimal, enhancing with domain expertise")
-                        ai_response_text = self._get_intelligent_mock_analysis(
-                            cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                        ai_response_text = await self._heuristic_analysis(
+                            heuristic, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
                         )
                     else:
                         logger.info(f"{self.ai_provider.upper()} provided comprehensive analysis - using AI response directly")
                         
                 except (APIError, AuthenticationError) as e:
                     logger.error(f"{self.ai_provider.upper()} API error: {e}")
-                    ai_response_text = self._get_intelligent_mock_analysis(
-                        cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                    token_budget = None
+                    ai_response_text = await self._heuristic_analysis(
+                        heuristic, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
                     )
                 except Exception as e:
                     logger.error(f"Unexpected error calling {self.ai_provider.upper()}: {e}")
-                    ai_response_text = self._get_intelligent_mock_analysis(
-                        cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                    token_budget = None
+                    ai_response_text = await self._heuristic_analysis(
+                        heuristic, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
                     )
+                finally:
+                    if heuristic is not None:
+                        heuristic.cancel()  # Unused speculation that has not started yet is dropped
             else:
                 logger.warning("No AI provider available - using intelligent fallback analysis")
                 ai_response_text = self._get_intelligent_mock_analysis(
@@ -122,260 +219,458 @@ class ContractAnalyzerService:
                 )
 
             # 5. Parse and validate the AI's JSON response
-            try:
-                ai_json = json.loads(ai_response_text)
-                ai_json = self._clean_ai_response(ai_json, jurisdiction, cleaned_contract)
-                
-                # Ensure we have meaningful analysis
-                if not ai_json.get("compliance_issues") and not ai_json.get("flagged_clauses"):
-                    logger.info("No issues found, generating comprehensive compliance analysis")
-                    ai_json = self._generate_comprehensive_analysis(
-                        cleaned_contract, contract_metadata, jurisdiction
-                    )
-                
-                # Convert law_id to law for compatibility
-                if "compliance_issues" in ai_json:
-                    for issue in ai_json["compliance_issues"]:
-                        if "law_id" in issue and "law" not in issue:
-                            issue["law"] = issue.pop("law_id")
-                
-                # Ensure required fields
-                ai_json.setdefault("summary", "Analysis complete.")
-                ai_json.setdefault("flagged_clauses", [])
-                ai_json.setdefault("compliance_issues", [])
-                
-                return ContractAnalysisResponse(
-                    summary=ai_json["summary"],
-                    flagged_clauses=[ClauseFlag(**flag) for flag in ai_json["flagged_clauses"]],
-                    compliance_issues=[ComplianceFeedback(**issue) for issue in ai_json["compliance_issues"]],
-                    jurisdiction=jurisdiction
-                )
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse AI JSON response: {ai_response_text}")
-                return ContractAnalysisResponse(
-                    summary="Error: AI response could not be parsed as valid JSON.", 
-                    flagged_clauses=[],
-                    compliance_issues=[],
-                    jurisdiction=jurisdiction
-                )
-            except Exception as e:
-                logger.error(f"Failed to create response model from AI data: {e}")
-                return ContractAnalysisResponse(
-                    summary="Error: Failed to process AI response into structured format.", 
-                    flagged_clauses=[],
-                    compliance_issues=[],
-                    jurisdiction=jurisdiction
-                )
+            return self._build_analysis_response(
+                ai_response_text, cleaned_contract, contract_metadata, jurisdiction,
+                response_metadata, token_budget
+            )
 
         except Exception as e:
             logger.error(f"Contract analysis failed: {str(e)}")
             raise
 
-    def _preprocess_contract_text(self, contract_text: str) -> str:
-        """
-        Enhanced preprocessing to remove formatting artifacts and focus on actual contract content.
-        """
-        # Remove markdown headers and formatting
-        text = re.sub(r'^#{1,6}\s+.*$', '', contract_text, flags=re.MULTILINE)
-        
-        # Remove markdown emphasis
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-        text = re.sub(r'\*(.*?)\*', r'\1', text)
-        
-        # Remove markdown lists that aren't contract content
-        text = re.sub(r'^\s*[-*+]\s+', '', text, flags=re.MULTILINE)
+    async def analyze_contract_stream(self, request: ContractAnalysisRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyse a contract, yielding findings while the AI provider is still generating.
+        
+        Yields {"event", "data"} dictionaries: "started", then "summary",
+        "flagged_clause" and "compliance_issue" events as each finding is parsed
+        from the stream, and finally "complete" with the ContractAnalysisResponse.
+        Streamed findings are provisional; the complete event carries the cleaned
+        and merged analysis (or the heuristic analysis if the provider failed).
+        With request.preview set, a "preview" event carrying the heuristic
+        ContractAnalysisResponse is emitted as soon as it is ready, usually well
+        before the first AI finding.
+        
+        When streaming does not apply (no AI provider, open circuit breaker,
+        hedged requests or too little time left before the request deadline)
+        the regular analysis runs and its findings are emitted before the
+        complete event.
+        """
+        if (self.ai_provider is None or self._hedging_active() or self._ai_circuit_open()
+                or self._ai_budget_exhausted()):
+            response = await self.analyze_contract(request)
+            yield {"event": "started", "data": {"jurisdiction": response.jurisdiction, "streaming": False}}
+            for flag in response.flagged_clauses:
+                yield {"event": "flagged_clause", "data": flag}
+            for issue in response.compliance_issues or []:
+                yield {"event": "compliance_issue", "data": issue}
+            yield {"event": "complete", "data": response}
+            return
+        
+        cleaned_contract, contract_metadata, jurisdiction, compliance_checklist = self._prepare_analysis(request)
+        excerpts = self._analysis_excerpts(cleaned_contract, contract_metadata)
+        response_metadata: Dict[str, Any] = {"streamed": True}
+        yield {"event": "started", "data": {
+            "jurisdiction": jurisdiction,
+            "contract_type": contract_metadata['type'],
+            "provider": self.ai_provider,
+            "chunks": len(excerpts),
+            "streaming": True
+        }}
+        
+        heuristic = None
+        if self.speculative_heuristics or request.preview:
+            heuristic = self._start_heuristic_analysis(
+                cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+            )
         
-        # Remove HTML tags if present
-        text = re.sub(r'<[^>]+>', '', text)
+        try:
+            analyses: List[Optional[str]] = [None] * len(excerpts)
+            budgets: List[Tuple[str, TokenBudget]] = []
+            async for kind, payload in self._stream_excerpt_findings(
+                excerpts, compliance_checklist, contract_metadata['type'], analyses, use_cache=request.use_cache,
+                preview=heuristic if request.preview else None, budgets=budgets
+            ):
+                if kind == "preview":
+                    yield {"event": "preview", "data": self._build_analysis_response(
+                        payload, cleaned_contract, contract_metadata, jurisdiction, {"preview": True}
+                    )}
+                    continue
+                if kind == "summary" and len(excerpts) > 1:
+                    continue  # Chunk summaries are merged into the final one
+                data = self._clean_streamed_finding(kind, payload, jurisdiction, cleaned_contract)
+                if data is not None:
+                    yield {"event": kind, "data": data}
+            
+            if len(excerpts) == 1:
+                ai_response_text = analyses[0]
+            else:
+                chunk_analyses = [json.loads(text) for text in analyses if text is not None]
+                if not chunk_analyses:
+                    raise APIError(f"All {len(excerpts)} contract chunks failed analysis")
+                ai_response_text = json.dumps(self._merge_chunk_analyses(chunk_analyses, len(excerpts)))
+            token_budget = self._describe_token_budget(budgets)
+            
+            if self._is_ai_response_minimal(ai_response_text):
+                logger.info(f"{self.ai_provider.upper()} streamed response appears minimal, enhancing with domain expertise")
+                ai_response_text = await self._heuristic_analysis(
+                    heuristic, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                )
+        except Exception as e:
+            logger.error(f"Streamed {self.ai_provider.upper()} analysis failed: {e}")
+            token_budget = None
+            response_metadata["ai_fallback"] = "stream_failed"
+            ai_response_text = await self._heuristic_analysis(
+                heuristic, cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+            )
+        finally:
+            if heuristic is not None:
+                heuristic.cancel()
         
-        # Remove excessive whitespace but preserve paragraph structure
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        text = re.sub(r'[ \t]+', ' ', text)
+        yield {"event": "complete", "data": self._build_analysis_response(
+            ai_response_text, cleaned_contract, contract_metadata, jurisdiction, response_metadata, token_budget
+        )}
+
+    async def _stream_excerpt_findings(self, excerpts: List[str], compliance_checklist: Dict[str, Any],
+                                       contract_type: str, analyses: List[Optional[str]],
+                                       use_cache: bool = True,
+                                       preview: Optional["asyncio.Future[str]"] = None,
+                                       budgets: Optional[List[Tuple[str, TokenBudget]]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream the analysis of each excerpt (at most chunk_concurrency at a time),
+        yielding parsed (kind, payload) findings as they complete in any excerpt.
+        
+        Each excerpt's complete analysis JSON is stored in analyses at its index;
+        an excerpt whose stream failed is left as None. A single excerpt's failure
+        is raised. If preview is given, its heuristic analysis JSON is yielded as a
+        ("preview", text) event as soon as it resolves. The budget of each prompt
+        sent is appended to budgets when given.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        client = self._active_ai_client()
+        
+        async def stream_excerpt(index: int, excerpt: str) -> None:
+            parser = AnalysisStreamParser()
+            try:
+                async with semaphore:
+                    async for fragment in client.analyze_contract_stream(
+                        excerpt, compliance_checklist, use_cache=use_cache, contract_type=contract_type
+                    ):
+                        for event in parser.feed(fragment):
+                            queue.put_nowait(event)
+                analyses[index] = parser.finish()
+            finally:
+                queue.put_nowait(None)
+        
+        async def relay_preview() -> None:
+            try:
+                # Shielded: the heuristic outlives this relay as the fallback analysis
+                queue.put_nowait(("preview", await asyncio.shield(preview)))
+            finally:
+                queue.put_nowait(None)
+        
+        # Tasks keep the context they were created in, so prompts they send later still go to budgets
+        with collect_budgets(budgets):
+            tasks = [asyncio.ensure_future(stream_excerpt(index, excerpt)) for index, excerpt in enumerate(excerpts)]
+        preview_task = asyncio.ensure_future(relay_preview()) if preview is not None else None
+        try:
+            remaining = len(tasks) + (preview_task is not None)
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                else:
+                    yield event
+            for index, task in enumerate(tasks):
+                if task.exception() is not None:
+                    if len(tasks) == 1:
+                        raise task.exception()
+                    logger.warning(f"Chunk {index + 1}/{len(tasks)} streamed analysis failed: {task.exception()}")
+            if preview_task is not None and preview_task.exception() is not None:
+                logger.warning(f"Heuristic preview failed: {preview_task.exception()}")
+        finally:
+            for task in tasks + ([preview_task] if preview_task is not None else []):
+                if not task.done():
+                    task.cancel()
+
+    def _clean_streamed_finding(self, kind: str, payload: Any, jurisdiction: str, contract_text: str) -> Any:
+        """
+        Apply the response cleaning rules to one streamed finding.
         
-        # Remove common non-contract content patterns
-        non_contract_patterns = [
-            r'(?i)^(contract analysis|legal review|summary|overview):.*$',
-            r'(?i)^(note|disclaimer|warning):.*$',
-            r'(?i)^(created by|generated by|analyzed by):.*$',
+        Returns:
+            ClauseFlag, ComplianceFeedback or summary string, or None if the finding is dropped
+        """
+        try:
+            if kind == "summary":
+                return payload if isinstance(payload, str) else None
+            if kind == "flagged_clause":
+                if not isinstance(payload, dict) or not self._is_substantive_clause(payload.get("clause_text", "")):
+                    return None
+                return ClauseFlag(**payload)
+            if not isinstance(payload, dict):
+                return None
+            issue = dict(payload)
+            if "law_id" in issue and "law" not in issue:
+                issue["law"] = issue.pop("law_id")
+            cleaned = self._clean_ai_response(
+                {"flagged_clauses": [], "compliance_issues": [issue]}, jurisdiction, contract_text
+            )["compliance_issues"]
+            return ComplianceFeedback(**cleaned[0]) if cleaned else None
+        except Exception as e:
+            logger.debug(f"Dropping streamed {kind} that failed validation: {e}")
+            return None
+
+    async def analyze_contract_batch(self, requests: List[ContractAnalysisRequest],
+                                     concurrency: Optional[int] = None) -> List[Any]:
+        """
+        Analyse many contracts, sending short ones to the AI provider several per prompt.
+        
+        Contracts of at most batch_max_chars characters that share a jurisdiction and
+        contract type (and therefore a compliance checklist) are packed into prompts of
+        up to batch_size contracts that fit the model's context window. Each batched
+        answer is split back into per-contract analyses by contract id. Long contracts,
+        contracts left alone in their group, and contracts whose batched answer is
+        missing or unusable are analysed individually with analyze_contract. Without
+        an AI provider, with an open circuit breaker or with hedged requests every
+        contract is analysed individually.
+        
+        Args:
+            requests: Contracts to analyse
+            concurrency: Maximum number of upstream calls in flight (defaults to chunk_concurrency)
+            
+        Returns:
+            One ContractAnalysisResponse per request, in order; a contract whose analysis
+            raised has the exception in its place
+        """
+        results: List[Any] = [None] * len(requests)
+        prepared: Dict[int, Tuple[str, Dict[str, Any], str, Dict[str, Any]]] = {}
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        
+        if self.ai_provider is not None and not self._hedging_active() and not self._ai_circuit_open():
+            for index, request in enumerate(requests):
+                if len(request.text) > self.batch_max_chars:
+                    continue
+                try:
+                    analysis = self._prepare_analysis(request)
+                except Exception as e:
+                    logger.warning(f"Contract {index + 1} could not be prepared for batching: {e}")
+                    continue
+                cleaned_contract, contract_metadata, jurisdiction, _ = analysis
+                if len(self._analysis_excerpts(cleaned_contract, contract_metadata)) != 1:
+                    continue
+                prepared[index] = analysis
+                groups.setdefault((jurisdiction, contract_metadata['type']), []).append(index)
+        
+        batches = [
+            batch for indices in groups.values() for batch in self._pack_batches(indices, prepared)
+            if len(batch) > 1
         ]
+        batched = {index for batch in batches for index in batch}
+        semaphore = asyncio.Semaphore(concurrency or self.chunk_concurrency)
+        logger.info(f"Analysing {len(requests)} contracts: {len(batched)} in {len(batches)} batched prompts, "
+                    f"{len(requests) - len(batched)} individually")
         
-        for pattern in non_contract_patterns:
-            text = re.sub(pattern, '', text, flags=re.MULTILINE)
-        
-        # Clean up and normalize
-        text = text.strip()
+        async def analyse_individually(index: int) -> None:
+            async with semaphore:
+                try:
+                    results[index] = await self.analyze_contract(requests[index])
+                except Exception as e:
+                    results[index] = e
         
-        # If text is too short after cleaning, it might not be a real contract
-        if len(text.strip()) < 100:
-            logger.warning("Contract text appears to be very short after preprocessing")
+        async def analyse_batch(batch: List[int]) -> None:
+            async with semaphore:
+                await self._analyze_prepared_batch(batch, requests, prepared, results)
+            # Contracts the batched answer did not cover are retried on their own
+            await asyncio.gather(*(analyse_individually(index) for index in batch if results[index] is None))
         
-        return text
-    
-    def _analyze_contract_metadata(self, contract_text: str) -> Dict[str, Any]:
+        await asyncio.gather(
+            *(analyse_batch(batch) for batch in batches),
+            *(analyse_individually(index) for index in range(len(requests)) if index not in batched)
+        )
+        return results
+
+    def _pack_batches(self, indices: List[int],
+                      prepared: Dict[int, Tuple[str, Dict[str, Any], str, Dict[str, Any]]]) -> List[List[int]]:
+        """
+        Greedily pack contracts sharing a checklist into batches of at most batch_size
+        whose prompt leaves answer space for every contract in it.
+        """
+        client = self._active_ai_client()
+        batches: List[List[int]] = []
+        current: List[int] = []
+        for index in indices:
+            candidate = current + [index]
+            if current and len(candidate) > self.batch_size:
+                fits = False
+            else:
+                _, contract_metadata, _, compliance_checklist = prepared[index]
+                budget = client.plan_batch_contract_analysis(
+                    [(f"C{number + 1}", prepared[member][0]) for number, member in enumerate(candidate)],
+                    compliance_checklist, contract_metadata['type']
+                )[2]
+                fits = budget.fits_batch(len(candidate))
+            if current and not fits:
+                batches.append(current)
+                candidate = [index]
+            current = candidate
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _analyze_prepared_batch(self, batch: List[int], requests: List[ContractAnalysisRequest],
+                                      prepared: Dict[int, Tuple[str, Dict[str, Any], str, Dict[str, Any]]],
+                                      results: List[Any]) -> None:
         """
-        Analyze contract structure and content to understand what type of contract this is
-        and what specific legal areas it touches.
+        Analyse a batch of prepared contracts with one prompt and store each usable
+        per-contract analysis in results; contracts without one are left as None.
         """
-        text_lower = contract_text.lower()
-        
-        # Detect contract type based on content analysis
-        contract_type = "General"
-        type_indicators = {
-            "Employment": ["employee", "employer", "employment", "salary", "wage", "termination", "workplace", "job duties", "position", "work schedule"],
-            "Service": ["services", "service provider", "client", "deliverables", "scope of work", "performance"],
-            "NDA": ["confidential", "non-disclosure", "proprietary", "trade secret", "confidentiality"],
-            "Rental": ["tenant", "landlord", "rent", "lease", "property", "premises", "rental"],
-            "Sales": ["purchase", "buyer", "seller", "goods", "products", "sale", "delivery"],
-            "Partnership": ["partner", "partnership", "joint venture", "profit sharing", "collaboration"]
-        }
-        
-        max_score = 0
-        for contract_type_candidate, keywords in type_indicators.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > max_score:
-                max_score = score
-                contract_type = contract_type_candidate
-        
-        # Analyze content areas
-        has_data_processing = any(term in text_lower for term in [
-            "personal data", "data processing", "privacy", "information", "data subject", "gdpr", "pdpa"
-        ])
-        
-        has_termination_clauses = any(term in text_lower for term in [
-            "termination", "terminate", "end of contract", "expiry", "cancellation"
-        ])
-        
-        has_payment_terms = any(term in text_lower for term in [
-            "payment", "pay", "salary", "wage", "compensation", "fee", "amount", "money"
-        ])
-        
-        has_liability_clauses = any(term in text_lower for term in [
-            "liable", "liability", "damages", "indemnify", "responsibility", "loss"
-        ])
-        
-        has_ip_clauses = any(term in text_lower for term in [
-            "intellectual property", "copyright", "patent", "trademark", "work product", "invention"
-        ])
-        
-        # Extract meaningful sections
-        sections = self._extract_meaningful_sections(contract_text)
-        
-        # Detect jurisdiction indicators in the text
-        jurisdiction_indicators = {
-            "MY": ["malaysia", "malaysian", "kuala lumpur", "ringgit", "employment act 1955"],
-            "SG": ["singapore", "singaporean", "sgd", "singapore dollar"],
-            "US": ["united states", "usd", "dollar", "state of", "california", "new york"],
-            "EU": ["european union", "gdpr", "euro", "eur"]
-        }
+        client = self._active_ai_client()
+        documents = [(f"C{number + 1}", prepared[index][0]) for number, index in enumerate(batch)]
+        _, contract_metadata, _, compliance_checklist = prepared[batch[0]]
+        try:
+            with collect_budgets() as budgets:
+                response_text = await client.analyze_contract_batch_async(
+                    documents, compliance_checklist,
+                    use_cache=all(requests[index].use_cache for index in batch),
+                    contract_type=contract_metadata['type']
+                )
+            token_budget = self._describe_token_budget(budgets)
+            analyses = self._split_batch_response(response_text)
+        except Exception as e:
+            logger.warning(f"Batched {self.ai_provider.upper()} analysis of {len(batch)} contracts failed: {e}")
+            return
         
-        detected_jurisdictions = []
-        for jurisdiction, indicators in jurisdiction_indicators.items():
-            if any(indicator in text_lower for indicator in indicators):
-                detected_jurisdictions.append(jurisdiction)
+        for (contract_id, _), index in zip(documents, batch):
+            analysis = analyses.get(contract_id)
+            if analysis is None:
+                logger.info(f"Batched answer has no usable analysis for {contract_id}, analysing it individually")
+                continue
+            cleaned_contract, contract_metadata, jurisdiction, compliance_checklist = prepared[index]
+            ai_response_text = json.dumps(analysis)
+            if self._is_ai_response_minimal(ai_response_text):
+                ai_response_text = self._get_intelligent_mock_analysis(
+                    cleaned_contract, contract_metadata, compliance_checklist, jurisdiction
+                )
+            results[index] = self._build_analysis_response(
+                ai_response_text, cleaned_contract, contract_metadata, jurisdiction,
+                {"batch": {"contract_id": contract_id, "size": len(batch)}}, token_budget
+            )
+
+    @staticmethod
+    def _split_batch_response(response_text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-contract analyses of a batched answer, keyed by contract id.
         
-        return {
-            "type": contract_type,
-            "has_data_processing": has_data_processing,
-            "has_termination_clauses": has_termination_clauses,
-            "has_payment_terms": has_payment_terms,
-            "has_liability_clauses": has_liability_clauses,
-            "has_ip_clauses": has_ip_clauses,
-            "sections": sections,
-            "detected_jurisdictions": detected_jurisdictions,
-            "word_count": len(contract_text.split()),
-            "is_substantial": len(contract_text.strip()) > 500  # Flag for substantial contracts
-        }
-    
-    def _extract_meaningful_sections(self, contract_text: str) -> List[Dict[str, str]]:
+        Entries without a contract id or without the analysis structure are skipped.
         """
-        Extract meaningful contract sections, ignoring formatting artifacts.
+        try:
+            entries = json.loads(response_text).get("results")
+        except (AttributeError, TypeError, ValueError):
+            return {}
+        if not isinstance(entries, list):
+            return {}
+        analyses: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            if (isinstance(entry, dict) and isinstance(entry.get("contract_id"), str)
+                    and is_complete_analysis_response(entry)):
+                analysis = normalize_complete_response(entry)
+                del analysis["contract_id"]
+                analyses.setdefault(entry["contract_id"].strip(), analysis)
+        return analyses
+
+    def _prepare_analysis(self, request: ContractAnalysisRequest) -> Tuple[str, Dict[str, Any], str, Dict[str, Any]]:
         """
-        sections = []
+        Steps shared by every analysis mode: clean the text, analyse its structure
+        and load the compliance checklist.
         
-        # Try different section detection patterns
-        section_patterns = [
-            r'\n\s*(\d+)\.\s*([A-Z][^.\n]*[.:]?)\s*\n((?:[^\n]+\n?)*?)(?=\n\s*\d+\.|$)',  # Numbered sections
-            r'\n\s*([A-Z][A-Z\s]{2,}):?\s*\n((?:[^\n]+\n?)*?)(?=\n\s*[A-Z][A-Z\s]{2,}:|$)',  # ALL CAPS headers
-            r'\n\s*([A-Z][^.\n]*):?\s*\n((?:[^\n]+\n?)*?)(?=\n\s*[A-Z][^.\n]*:|$)'  # Title Case headers
-        ]
-        
-        for pattern in section_patterns:
-            matches = re.finditer(pattern, contract_text, re.MULTILINE | re.DOTALL)
-            for match in matches:
-                if len(match.groups()) >= 2:
-                    title = match.group(1).strip() if len(match.groups()) > 1 else f"Section {match.group(1)}"
-                    content = match.group(2).strip() if len(match.groups()) > 2 else match.group(2).strip()
-                    
-                    # Skip sections that are too short or look like formatting artifacts
-                    if len(content) > 50 and not self._is_formatting_artifact(title, content):
-                        sections.append({
-                            "title": title,
-                            "content": content,
-                            "word_count": len(content.split())
-                        })
-            
-            if sections:  # If we found sections with one pattern, use those
-                break
+        Returns:
+            Tuple of (cleaned contract, contract metadata, jurisdiction, compliance checklist)
+        """
+        # 1. Pre-process and clean the contract text
+        cleaned_contract = self._preprocess_contract_text(request.text)
+        logger.info(f"Contract preprocessing complete. Original length: {len(request.text)}, Cleaned length: {len(cleaned_contract)}")
         
-        # Fallback: split by paragraphs if no clear sections found
-        if not sections:
-            paragraphs = re.split(r'\n\s*\n\s*', contract_text)
-            for i, paragraph in enumerate(paragraphs):
-                if len(paragraph.strip()) > 100:  # Only substantial paragraphs
-                    sections.append({
-                        "title": f"Paragraph {i+1}",
-                        "content": paragraph.strip(),
-                        "word_count": len(paragraph.split())
-                    })
+        # 2. Tokenize once, then analyze contract structure and content type
+        contract_metadata = self._analyze_contract_metadata(cleaned_contract, ContractDocument(cleaned_contract))
+        logger.info(f"Contract analysis: Type={contract_metadata['type']}, Sections={len(contract_metadata['sections'])}, Has_Data_Processing={contract_metadata['has_data_processing']}")
         
-        return sections
-    
-    def _is_formatting_artifact(self, title: str, content: str) -> bool:
+        # 3. Get the applicable compliance rules from our engine
+        jurisdiction = request.jurisdiction or "MY"
+        compliance_checklist = self.regulatory_engine.get_compliance_checklist(
+            jurisdiction=jurisdiction,
+            contract_type=contract_metadata['type']
+        )
+        return cleaned_contract, contract_metadata, jurisdiction, compliance_checklist
+
+    def _build_analysis_response(self, ai_response_text: str, cleaned_contract: str,
+                                 contract_metadata: Dict[str, Any], jurisdiction: str,
+                                 response_metadata: Dict[str, Any],
+                                 token_budget: Dict[str, Any] = None) -> ContractAnalysisResponse:
         """
-        Check if a section is likely a formatting artifact rather than actual contract content.
+        Parse, clean and validate the analysis JSON into the response model.
         """
-        title_lower = title.lower()
-        content_lower = content.lower()
-        
-        # Skip common non-contract sections
-        artifact_indicators = [
-            "summary", "analysis", "review", "note", "disclaimer", "generated", 
-            "created", "overview", "introduction", "conclusion", "appendix",
-            "table of contents", "index", "header", "footer"
-        ]
-        
-        if any(indicator in title_lower for indicator in artifact_indicators):
-            return True
-        
-        # Skip sections that are mostly formatting
-        if len(content.strip()) < 20:
-            return True
-        
-        # Skip sections with too many special characters (likely formatting)
-        special_char_ratio = sum(1 for c in content if not c.isalnum() and not c.isspace()) / len(content)
-        if special_char_ratio > 0.3:
-            return True
-        
-        return False
-    
-    def _get_granite_analysis_with_context(self, contract_text: str, metadata: Dict[str, Any], 
-                                         compliance_checklist: Dict[str, Any], jurisdiction: str) -> str:
+        try:
+            ai_json = json.loads(ai_response_text)
+            ai_json = self._clean_ai_response(ai_json, jurisdiction, cleaned_contract)
+            
+            # Ensure we have meaningful analysis
+            if not ai_json.get("compliance_issues") and not ai_json.get("flagged_clauses"):
+                logger.info("No issues found, generating comprehensive compliance analysis")
+                ai_json = self._generate_comprehensive_analysis(
+                    cleaned_contract, contract_metadata, jurisdiction
+                )
+            
+            # Convert law_id to law for compatibility
+            if "compliance_issues" in ai_json:
+                for issue in ai_json["compliance_issues"]:
+                    if "law_id" in issue and "law" not in issue:
+                        issue["law"] = issue.pop("law_id")
+            
+            # Ensure required fields
+            ai_json.setdefault("summary", "Analysis complete.")
+            ai_json.setdefault("flagged_clauses", [])
+            ai_json.setdefault("compliance_issues", [])
+            
+            return ContractAnalysisResponse(
+                summary=ai_json["summary"],
+                flagged_clauses=[ClauseFlag(**flag) for flag in ai_json["flagged_clauses"]],
+                compliance_issues=[ComplianceFeedback(**issue) for issue in ai_json["compliance_issues"]],
+                jurisdiction=jurisdiction,
+                metadata=self._response_metadata(response_metadata, token_budget)
+            )
+            
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse AI JSON response: {ai_response_text}")
+            return ContractAnalysisResponse(
+                summary="Error: AI response could not be parsed as valid JSON.", 
+                flagged_clauses=[],
+                compliance_issues=[],
+                jurisdiction=jurisdiction
+            )
+        except Exception as e:
+            logger.error(f"Failed to create response model from AI data: {e}")
+            return ContractAnalysisResponse(
+                summary="Error: Failed to process AI response into structured format.", 
+                flagged_clauses=[],
+                compliance_issues=[],
+                jurisdiction=jurisdiction
+            )
+
+    async def _get_granite_analysis_with_context(self, contract_text: str, metadata: Dict[str, Any], 
+                                         compliance_checklist: Dict[str, Any], jurisdiction: str,
+                                         use_cache: bool = True,
+                                         heuristic: Optional["asyncio.Future[str]"] = None) -> str:
         """
         Enhanced prompting for IBM Granite with contract context and intelligent analysis.
         Optimized for TechXchange Hackathon submission.
+        
+        heuristic is the speculative rule-based analysis (see _start_heuristic_analysis),
+        used for fallbacks and enhancement instead of analysing the contract again.
         """
         if not self.watsonx_client:
             logger.warning("IBM WatsonX client not available, falling back to intelligent analysis")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
         
         try:
             logger.info("Engaging IBM Granite model for advanced legal analysis")
             
-            # Use the enhanced prompt designed for Granite
-            granite_response = self.watsonx_client.analyze_contract(
+            # Use the enhanced prompt designed for Granite on the pooled async transport
+            granite_response = await self.watsonx_client.analyze_contract_async(
                 contract_text=contract_text,
-                compliance_checklist=compliance_checklist
+                compliance_checklist=compliance_checklist,
+                use_cache=use_cache,
+                contract_type=metadata.get("type")
             )
             
             logger.info(f"IBM Granite analysis completed successfully: {len(granite_response)} characters")
@@ -385,7 +680,8 @@ class ContractAnalyzerService:
                 logger.info("IBM Granite response needs enhancement, combining with domain expertise")
                 # Enhance minimal Granite response with our intelligent analysis
                 enhanced_response = self._enhance_granite_response(
-                    granite_response, contract_text, metadata, jurisdiction
+                    granite_response, contract_text, metadata, jurisdiction,
+                    await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
                 )
                 return enhanced_response
             
@@ -393,27 +689,31 @@ class ContractAnalyzerService:
             
         except (APIError, AuthenticationError) as e:
             logger.error(f"IBM Granite API error: {e}")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
         except Exception as e:
             logger.error(f"Unexpected error with IBM Granite: {e}")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
     
-    def _get_gemini_analysis(self, contract_text: str, metadata: Dict[str, Any], 
-                            compliance_checklist: Dict[str, Any], jurisdiction: str) -> str:
+    async def _get_gemini_analysis(self, contract_text: str, metadata: Dict[str, Any], 
+                                   compliance_checklist: Dict[str, Any], jurisdiction: str,
+                                   use_cache: bool = True,
+                                   heuristic: Optional["asyncio.Future[str]"] = None) -> str:
         """
         Enhanced analysis using Google Gemini AI with contract context and intelligent prompting.
+        
+        heuristic is the speculative rule-based analysis (see _start_heuristic_analysis),
+        used for fallbacks and enhancement instead of analysing the contract again.
         """
         if not self.gemini_client:
             logger.warning("Gemini client not available, falling back to intelligent analysis")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
         
         try:
             logger.info("Engaging Google Gemini model for advanced legal analysis")
             
-            # Use the Gemini client's analyze_contract method
-            gemini_response = self.gemini_client.analyze_contract(
-                contract_text=contract_text,
-                compliance_checklist=compliance_checklist
+            # Run on the bounded Gemini pool so the event loop stays free (hedged to WatsonX if enabled)
+            gemini_response = await self._call_ai_provider(
+                contract_text, compliance_checklist, metadata.get("type"), use_cache
             )
             
             logger.info(f"Gemini analysis completed successfully: {len(gemini_response)} characters")
@@ -423,7 +723,8 @@ class ContractAnalyzerService:
                 logger.info("Gemini response needs enhancement, combining with domain expertise")
                 # Enhance minimal response with our intelligent analysis
                 enhanced_response = self._enhance_ai_response(
-                    gemini_response, contract_text, metadata, jurisdiction
+                    gemini_response, contract_text, metadata, jurisdiction,
+                    await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
                 )
                 return enhanced_response
             
@@ -431,10 +732,433 @@ class ContractAnalyzerService:
             
         except (APIError, AuthenticationError) as e:
             logger.error(f"Gemini API error: {e}")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
         except Exception as e:
             logger.error(f"Unexpected error with Gemini: {e}")
-            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+            return await self._heuristic_analysis(heuristic, contract_text, metadata, compliance_checklist, jurisdiction)
+    
+    async def _get_chunked_ai_analysis(self, excerpts: List[str], compliance_checklist: Dict[str, Any],
+                                       contract_type: str, use_cache: bool = True) -> str:
+        """
+        Map-reduce analysis for contracts too long for a single prompt.
+        
+        Section-aligned excerpts (see _analysis_excerpts) are analysed concurrently
+        (at most chunk_concurrency at a time) and the per-chunk findings are merged,
+        so every clause is seen by the model and latency follows the slowest chunk.
+        """
+        analyses = await self._analyse_excerpts(excerpts, compliance_checklist, contract_type, use_cache)
+        chunk_analyses = [analysis for analysis in analyses if analysis is not None]
+        if not chunk_analyses:
+            raise APIError(f"All {len(excerpts)} contract chunks failed analysis")
+        
+        return json.dumps(self._merge_chunk_analyses(chunk_analyses, len(excerpts)))
+    
+    async def _analyse_excerpts(self, excerpts: List[str], compliance_checklist: Dict[str, Any],
+                                contract_type: str, use_cache: bool = True,
+                                budgets: Optional[List[List[Tuple[str, TokenBudget]]]] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Map step: analyse excerpts concurrently, at most chunk_concurrency at a time.
+        
+        When budgets is given, the (provider, budget) pairs of the prompt that
+        answered each excerpt are stored at its index.
+        
+        Returns:
+            The analysis of each excerpt, or None where it failed
+        """
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+        logger.info(f"Analysing contract in {len(excerpts)} chunks (concurrency {self.chunk_concurrency})")
+        
+        async def analyse_chunk(index: int, excerpt: str) -> Dict[str, Any]:
+            sent: List[Tuple[str, TokenBudget]] = []
+            try:
+                async with semaphore:
+                    with collect_budgets(sent):
+                        response_text = await self._call_ai_provider(excerpt, compliance_checklist, contract_type, use_cache)
+            finally:
+                # A nested collector hides its budgets from the enclosing one
+                for provider, budget in sent:
+                    record_budget(provider, budget)
+            if budgets is not None:
+                budgets[index] = sent
+            return json.loads(response_text)
+        
+        results = await asyncio.gather(
+            *(analyse_chunk(index, excerpt) for index, excerpt in enumerate(excerpts)), return_exceptions=True
+        )
+        
+        analyses: List[Optional[Dict[str, Any]]] = []
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Chunk {index + 1}/{len(excerpts)} analysis failed: {result}")
+            analyses.append(result if isinstance(result, dict) else None)
+        return analyses
+    
+    def _plan_clause_analysis(self, contract_text: str, metadata: Dict[str, Any],
+                              compliance_checklist: Dict[str, Any], jurisdiction: str,
+                              use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Look up the AI findings of every clause of a long contract and pack the novel ones into excerpts.
+        
+        Clauses (see utils.clause_cache) are looked up by fingerprint; the ones
+        that miss are packed into excerpts of at most chunk_max_chars, split
+        like sections when a clause alone is longer. use_cache=False looks
+        nothing up, so every clause is analysed afresh.
+        
+        Findings are keyed on the provider and model, the contract type,
+        jurisdiction and checklist they were found with.
+        
+        Returns:
+            The plan for _get_clause_cached_ai_analysis: the clauses, the scope
+            of their cache keys and their cached findings, the excerpts to
+            analyse and the clauses each excerpt holds
+        """
+        clauses = self._contract_clauses(contract_text, metadata)
+        checklist_digest = hashlib.sha256(
+            json.dumps(compliance_checklist, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+        scope = f"{metadata['type']}:{jurisdiction}:{checklist_digest}"
+        namespace = self._ai_clause_namespace(self.ai_provider, self._active_ai_client().model_id, scope)
+        keys = [make_clause_key(namespace, clause.fingerprint) for clause in clauses]
+        cached = self.clause_cache.get_many(keys, jurisdiction, kind="ai") if use_cache else [None] * len(clauses)
+        novel = [index for index, entry in enumerate(cached) if entry is None]
+        logger.info(f"{len(clauses) - len(novel)} of {len(clauses)} clauses found in the clause cache")
+        
+        max_chars = self.chunk_max_chars
+        chunks: List[Tuple[str, List[int]]] = []
+        for index in novel:
+            clause_text = contract_text[clauses[index].start:clauses[index].end]
+            pieces = [clause_text] if len(clause_text) <= max_chars else self._split_oversized_segment(clause_text, max_chars)
+            for piece in pieces:
+                if chunks and len(chunks[-1][0]) + len(piece) + 2 <= max_chars:
+                    chunks[-1] = (f"{chunks[-1][0]}\n\n{piece}", chunks[-1][1] + [index])
+                else:
+                    chunks.append((piece, [index]))
+        excerpts = [
+            f"[Excerpt {number + 1} of {len(chunks)} from a longer contract]\n{chunk}" if len(chunks) > 1 else chunk
+            for number, (chunk, _) in enumerate(chunks)
+        ]
+        return {
+            "document": self._contract_document(contract_text, metadata),
+            "clauses": clauses,
+            "scope": scope,
+            "cached": cached,
+            "excerpts": excerpts,
+            "excerpt_clauses": [indices for _, indices in chunks]
+        }
+    
+    @staticmethod
+    def _ai_clause_namespace(provider: str, model: str, scope: str) -> str:
+        """Clause cache namespace of AI findings by provider and model within a plan's scope."""
+        return f"ai:{provider}:{model}:{scope}"
+    
+    async def _get_clause_cached_ai_analysis(self, plan: Dict[str, Any], contract_text: str, metadata: Dict[str, Any],
+                                             compliance_checklist: Dict[str, Any], jurisdiction: str,
+                                             use_cache: bool = True,
+                                             heuristic: Optional["asyncio.Future[str]"] = None) -> str:
+        """
+        Map-reduce analysis of a long contract that only sends its novel clauses to the AI provider.
+        
+        The excerpts of the plan (see _plan_clause_analysis) are analysed as in
+        _get_chunked_ai_analysis. Only flagged clauses are cached, each with the
+        clause whose text it quotes, under the provider and model that answered.
+        The clauses of an excerpt with a finding that quotes none of them are
+        not cached, as that finding would be missing from one of them. The
+        summary and compliance issues describe the whole contract, so they come
+        from this request's excerpts, or from the heuristic analysis of the
+        whole contract when every clause was cached.
+        """
+        document, clauses = plan["document"], plan["clauses"]
+        excerpts = plan["excerpts"]
+        budgets: List[List[Tuple[str, TokenBudget]]] = [[] for _ in excerpts]
+        analyses = await self._analyse_excerpts(
+            excerpts, compliance_checklist, metadata['type'], use_cache, budgets=budgets
+        ) if excerpts else []
+        if excerpts and all(analysis is None for analysis in analyses):
+            raise APIError(f"All {len(excerpts)} contract chunks failed analysis")
+        
+        # A clause split over several excerpts is only stored when all of them were answered by one model
+        entries: Dict[int, Tuple[str, List[Dict[str, Any]]]] = {}
+        uncached = set()
+        for indices, analysis, sent in zip(plan["excerpt_clauses"], analyses, budgets):
+            answered_by = {(provider, budget.model) for provider, budget in sent}
+            if analysis is None or len(answered_by) != 1:
+                uncached.update(indices)
+                continue
+            owned = self._attribute_flagged_clauses(analysis, indices, clauses, document)
+            if owned is None:
+                uncached.update(indices)
+                continue
+            namespace = self._ai_clause_namespace(*answered_by.pop(), plan["scope"])
+            for index, flagged in owned.items():
+                key = make_clause_key(namespace, clauses[index].fingerprint)
+                stored_key, stored = entries.setdefault(index, (key, []))
+                if stored_key != key:
+                    uncached.add(index)
+                stored.extend(flagged)
+        self.clause_cache.set_many({
+            key: {"flagged_clauses": flagged} for index, (key, flagged) in entries.items() if index not in uncached
+        })
+        
+        fresh = [analysis for analysis in analyses if analysis is not None]
+        if not fresh:
+            whole = json.loads(await self._heuristic_analysis(
+                heuristic, contract_text, metadata, compliance_checklist, jurisdiction
+            ))
+            fresh = [{"summary": whole.get("summary"), "compliance_issues": whole.get("compliance_issues") or []}]
+        cached = [{"flagged_clauses": entry.get("flagged_clauses") or []} for entry in plan["cached"] if entry is not None]
+        return json.dumps(self._merge_chunk_analyses(fresh + cached, max(len(excerpts), 1)))
+    
+    @staticmethod
+    def _attribute_flagged_clauses(analysis: Dict[str, Any], indices: List[int], clauses: List[Clause],
+                                   document: ContractDocument) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+        """
+        The flagged clauses of an excerpt's analysis by the clause (of indices) whose text each one quotes.
+        
+        Returns:
+            The flagged clauses of each clause, or None if one quotes none of them
+        """
+        owned: Dict[int, List[Dict[str, Any]]] = {index: [] for index in indices}
+        for clause in analysis.get("flagged_clauses") or []:
+            if not isinstance(clause, dict) or not clause.get("clause_text"):
+                continue
+            quoted = " ".join(str(clause["clause_text"]).lower().rstrip(".").split())[:80]
+            owner = next((
+                index for index in indices
+                if quoted and quoted in " ".join(document.lower[clauses[index].start:clauses[index].end].split())
+            ), None)
+            if owner is None:
+                return None
+            owned[owner].append(clause)
+        return owned
+    
+    async def _call_ai_provider(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                                contract_type: str, use_cache: bool = True) -> str:
+        """Send one contract analysis prompt to the active AI provider, hedging when enabled."""
+        if not self._hedging_active():
+            return await self._active_ai_client().analyze_contract_async(
+                contract_text=contract_text,
+                compliance_checklist=compliance_checklist,
+                use_cache=use_cache,
+                contract_type=contract_type
+            )
+        
+        def attempt(client):
+            return lambda: client.analyze_contract_async(
+                contract_text=contract_text,
+                compliance_checklist=compliance_checklist,
+                use_cache=use_cache,
+                contract_type=contract_type
+            )
+        
+        # Skip the hedge while WatsonX's breaker is open; it would only be rejected
+        secondary_breaker = getattr(self.watsonx_client, "breaker", None)
+        secondary = attempt(self.watsonx_client)
+        if secondary_breaker is not None and not secondary_breaker.allow_request():
+            secondary = None
+        
+        delay = hedge_delay(
+            "gemini", self.hedge_percentile, self.hedge_min_samples, self.hedge_default_delay
+        )
+        with collect_budgets() as budgets:
+            response_text, provider = await hedged_call(
+                attempt(self.gemini_client), secondary, delay,
+                accept=self._is_analysis_json, names=("gemini", "watsonx")
+            )
+        # Only the prompt that was answered counts towards the analysis
+        for sent_provider, budget in budgets:
+            if sent_provider == provider:
+                record_budget(sent_provider, budget)
+        logger.info(f"Hedged analysis answered by {provider.upper()}")
+        return response_text
+    
+    def _hedging_active(self) -> bool:
+        """Whether analyses are hedged from Gemini to WatsonX."""
+        return (self.hedging_enabled and self.ai_provider == "gemini"
+                and self.gemini_client is not None and self.watsonx_client is not None)
+    
+    @staticmethod
+    def _is_analysis_json(response_text: str) -> bool:
+        """Whether a provider response is a JSON object (usable as an analysis)."""
+        try:
+            return isinstance(json.loads(response_text), dict)
+        except (TypeError, ValueError):
+            return False
+    
+    def _active_ai_client(self):
+        """The client of the active AI provider (Gemini or WatsonX)."""
+        return self.gemini_client if self.ai_provider == "gemini" else self.watsonx_client
+    
+    def _ai_budget_exhausted(self) -> bool:
+        """Whether too little time is left before the request deadline for an AI call."""
+        remaining = remaining_time()
+        return remaining is not None and remaining < self.min_ai_seconds
+    
+    def _ai_circuit_open(self) -> bool:
+        """Whether the active provider's circuit breaker is currently rejecting calls."""
+        breaker = getattr(self._active_ai_client(), "breaker", None)
+        return breaker is not None and not breaker.allow_request()
+    
+    @staticmethod
+    def _response_metadata(metadata: Dict[str, Any], token_budget: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Analysis metadata for the response, or None when there is nothing to report."""
+        if token_budget:
+            metadata = {**metadata, "token_budget": token_budget}
+        return metadata or None
+    
+    def _analysis_excerpts(self, contract_text: str, metadata: Dict[str, Any]) -> List[str]:
+        """
+        The text sent to the AI provider: the whole contract, or labelled
+        section-aligned excerpts when it is longer than chunk_max_chars.
+        """
+        chunks = self._split_into_analysis_chunks(contract_text, self._section_tree(contract_text, metadata))
+        if len(chunks) == 1:
+            return chunks
+        return [
+            f"[Excerpt {index + 1} of {len(chunks)} from a longer contract]\n{chunk}"
+            for index, chunk in enumerate(chunks)
+        ]
+    
+    @staticmethod
+    def _describe_token_budget(budgets: List[Tuple[str, TokenBudget]]) -> Optional[Dict[str, Any]]:
+        """
+        Token budget of the prompts sent for this analysis, for response metadata.
+        
+        budgets are the (provider, budget) pairs the AI client recorded as it
+        sent each prompt (see collect_budgets); for chunked analysis they are
+        aggregated. None when no prompt was sent.
+        """
+        budgets = [budget for _, budget in budgets]
+        if not budgets:
+            return None
+        if len(budgets) == 1:
+            return budgets[0].to_dict()
+        return {
+            "model": budgets[0].model,
+            "context_window": budgets[0].context_window,
+            "chunks": len(budgets),
+            "prompt_tokens": sum(budget.prompt_tokens for budget in budgets),
+            "max_chunk_prompt_tokens": max(budget.prompt_tokens for budget in budgets),
+            "max_output_tokens": min(budget.max_output_tokens for budget in budgets),
+            "checklist_trim_level": max(budget.checklist_trim_level for budget in budgets),
+            "contract_truncated": any(budget.contract_truncated for budget in budgets)
+        }
+    
+    def _split_into_analysis_chunks(self, contract_text: str, tree: Optional[SectionTree] = None) -> List[str]:
+        """
+        Split a contract into chunks of at most chunk_max_chars, aligned to the section tree.
+        
+        The contract is cut at its top-level headings. A section longer than a
+        chunk is cut again at its subsections, level by level, and only text
+        with no subsection headings left is split on paragraph and then line
+        boundaries. Consecutive pieces are packed together. No text is dropped.
+        """
+        max_chars = self.chunk_max_chars
+        if len(contract_text) <= max_chars:
+            return [contract_text]
+        if tree is None:
+            tree = parse_sections(ContractDocument(contract_text))
+        
+        segments = []
+        for start, end in section_spans(tree, contract_text, max_chars):
+            segment = contract_text[start:end]
+            if len(segment) <= max_chars:
+                segments.append(segment)
+            else:
+                segments.extend(self._split_oversized_segment(segment, max_chars))
+        
+        chunks = []
+        current = ""
+        for segment in segments:
+            if current and len(current) + len(segment) + 2 > max_chars:
+                chunks.append(current)
+                current = segment
+            else:
+                current = f"{current}\n\n{segment}" if current else segment
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
+    @staticmethod
+    def _split_oversized_segment(segment: str, max_chars: int) -> List[str]:
+        """Split a single long section on paragraph, then line, then hard character boundaries."""
+        pieces = [segment]
+        for separator in ("\n\n", "\n"):
+            parts = segment.split(separator)
+            if len(parts) > 1:
+                pieces = []
+                current = ""
+                for part in parts:
+                    if current and len(current) + len(part) + len(separator) > max_chars:
+                        pieces.append(current)
+                        current = part
+                    else:
+                        current = f"{current}{separator}{part}" if current else part
+                if current:
+                    pieces.append(current)
+                break
+        
+        result = []
+        for piece in pieces:
+            if len(piece) > max_chars:
+                result.extend(piece[i:i + max_chars] for i in range(0, len(piece), max_chars))
+            else:
+                result.append(piece)
+        return result
+    
+    def _merge_chunk_analyses(self, chunk_analyses: List[Dict[str, Any]], total_chunks: int) -> Dict[str, Any]:
+        """
+        Reduce step: combine per-chunk analyses into a single response.
+        
+        Flagged clauses are de-duplicated on their normalised text (keeping the highest
+        severity), and compliance issues are merged per law with de-duplicated
+        requirements and recommendations.
+        """
+        severity_rank = {"low": 0, "medium": 1, "high": 2}
+        flagged_by_text: Dict[str, Dict[str, Any]] = {}
+        issues_by_law: Dict[str, Dict[str, Any]] = {}
+        summaries: List[str] = []
+        
+        for analysis in chunk_analyses:
+            summary = analysis.get("summary")
+            if isinstance(summary, str) and summary.strip() and summary.strip() not in summaries:
+                summaries.append(summary.strip())
+            
+            for clause in analysis.get("flagged_clauses") or []:
+                if not isinstance(clause, dict) or not clause.get("clause_text"):
+                    continue
+                key = re.sub(r'\s+', ' ', str(clause["clause_text"])).strip().lower()
+                existing = flagged_by_text.get(key)
+                new_rank = severity_rank.get(str(clause.get("severity", "")).lower(), 0)
+                if existing is None or new_rank > severity_rank.get(str(existing.get("severity", "")).lower(), 0):
+                    flagged_by_text[key] = dict(clause)
+            
+            for issue in analysis.get("compliance_issues") or []:
+                if not isinstance(issue, dict):
+                    continue
+                law = issue.get("law") or issue.get("law_id")
+                if not law:
+                    continue
+                merged = issues_by_law.setdefault(law, {
+                    "law": law, "missing_requirements": [], "recommendations": []
+                })
+                for field in ("missing_requirements", "recommendations"):
+                    for item in issue.get(field) or []:
+                        if item not in merged[field]:
+                            merged[field].append(item)
+        
+        if summaries:
+            summary = summaries[0]
+            if total_chunks > 1:
+                summary += f" (Combined analysis of {total_chunks} contract segments.)"
+        else:
+            summary = "Analysis complete."
+        
+        return {
+            "summary": summary,
+            "flagged_clauses": list(flagged_by_text.values()),
+            "compliance_issues": list(issues_by_law.values())
+        }
     
     def _build_enhanced_granite_prompt(self, contract_text: str, metadata: Dict[str, Any], jurisdiction: str) -> str:
         """
@@ -467,6 +1191,35 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         
         return prompt
     
+    def _start_heuristic_analysis(self, contract_text: str, metadata: Dict[str, Any],
+                                  compliance_checklist: Dict[str, Any], jurisdiction: str) -> "asyncio.Future[str]":
+        """
+        Start the rule-based analysis in a worker thread, to run while the AI call is in flight.
+        
+        The heuristics only read the contract and its metadata, so they can run
+        alongside the provider call and response parsing. Cancelling the future
+        drops the work if it has not started yet.
+        
+        Returns:
+            Future resolving to the heuristic analysis JSON
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(
+            self._get_intelligent_mock_analysis, contract_text, metadata, compliance_checklist, jurisdiction
+        ))
+        # An unused speculation's error must not be reported as never retrieved
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return future
+    
+    async def _heuristic_analysis(self, heuristic: Optional["asyncio.Future[str]"], contract_text: str,
+                                  metadata: Dict[str, Any], compliance_checklist: Dict[str, Any],
+                                  jurisdiction: str) -> str:
+        """
+        The heuristic analysis: the speculative result if one was started, otherwise computed now.
+        """
+        if heuristic is None:
+            return self._get_intelligent_mock_analysis(contract_text, metadata, compliance_checklist, jurisdiction)
+        return await heuristic
+    
     def _get_intelligent_mock_analysis(self, contract_text: str, metadata: Dict[str, Any], 
                                      compliance_checklist: Dict[str, Any], jurisdiction: str) -> str:
         """
@@ -479,9 +1232,12 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         
         logger.info(f"Starting rigorous intelligent analysis for {metadata['type']} contract with {len(metadata['sections'])} sections")
         
+        # Statutory checks declared in the law files, evaluated once for clauses and compliance issues
+        law_findings = self._evaluate_law_rules(contract_text, metadata, jurisdiction)
+        
         # Analyze the entire contract holistically first to identify key areas
         contract_analysis = self._perform_comprehensive_contract_analysis(
-            contract_text, metadata, jurisdiction
+            contract_text, metadata, jurisdiction, law_findings
         )
         
         # Extract unique flagged clauses with strict criteria
@@ -493,7 +1249,7 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         
         # Generate compliance issues based on actual contract content and gaps
         compliance_issues = self._generate_smart_compliance_issues(
-            contract_text, metadata, jurisdiction
+            contract_text, metadata, jurisdiction, law_findings
         )
         
         # Validate and clean compliance issues to prevent malformed data
@@ -502,6 +1258,13 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         # Apply critical analysis - only flag serious violations
         flagged_clauses = self._apply_critical_legal_analysis(flagged_clauses, metadata, jurisdiction)
         
+        # Name the section each located clause was found in
+        tree = self._section_tree(contract_text, metadata)
+        for clause in flagged_clauses:
+            section = tree.section_at(clause["start"]) if clause.get("start") is not None else None
+            if section is not None:
+                clause["section"] = section.label
+        
         # Generate contextual summary
         summary = self._generate_contextual_summary(
             flagged_clauses, compliance_issues, metadata, jurisdiction
@@ -521,8 +1284,10 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         Intelligent section analysis that only flags relevant issues on appropriate content.
         """
         issues = []
+        document = metadata['document']
+        span = (section['start'], section['end'])
         title = section['title'].lower()
-        content = section['content'].lower()
+        content = document.lower_span(*span)
         
         # Only analyze if this is substantial contract content
         if section['word_count'] < 10:
@@ -533,27 +1298,27 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
             if 'termination' in title or 'termination' in content:
                 if 'without notice' in content and 'misconduct' not in content:
                     issues.append({
-                        "clause_text": self._extract_relevant_clause(section['content'], 'without notice'),
+                        "clause_text": self._extract_relevant_clause(document, span, 'without notice'),
                         "issue": f"Termination without notice may not comply with {jurisdiction} employment law minimum notice requirements",
                         "severity": "high"
                     })
                 
                 # Check for inadequate notice periods
-                notice_match = re.search(r'(\d+)\s*(day|week|month)', content)
+                notice_match = CONTRACT_PATTERNS["section.notice_period"].search(content)
                 if notice_match:
                     notice_period = int(notice_match.group(1))
                     period_type = notice_match.group(2)
                     
                     if period_type == 'day' and notice_period < 7:
                         issues.append({
-                            "clause_text": self._extract_relevant_clause(section['content'], notice_match.group(0)),
+                            "clause_text": self._extract_relevant_clause(document, span, notice_match.group(0)),
                             "issue": f"Notice period of {notice_period} days may be insufficient under {jurisdiction} employment standards",
                             "severity": "medium"
                         })
             
             if ('wage' in content or 'salary' in content) and 'overtime' not in content:
                 issues.append({
-                    "clause_text": self._extract_relevant_clause(section['content'], 'wage salary'),
+                    "clause_text": self._extract_relevant_clause(document, span, 'wage salary'),
                     "issue": f"Compensation clause lacks overtime provisions required under {jurisdiction} employment law",
                     "severity": "medium"
                 })
@@ -562,7 +1327,7 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         if metadata['has_data_processing'] and ('data' in content or 'information' in content):
             if 'personal data' in content and 'consent' not in content:
                 issues.append({
-                    "clause_text": self._extract_relevant_clause(section['content'], 'personal data'),
+                    "clause_text": self._extract_relevant_clause(document, span, 'personal data'),
                     "issue": f"Data processing clause lacks explicit consent mechanisms required under {jurisdiction} privacy law",
                     "severity": "high"
                 })
@@ -570,201 +1335,114 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         # Liability analysis
         if 'liability' in content or 'damages' in content:
             # Look for liability caps that might be too low
-            amount_match = re.search(r'(\d+(?:,\d+)*)', content)
+            amount_match = CONTRACT_PATTERNS["section.amount"].search(content)
             if amount_match:
                 amount = int(amount_match.group(1).replace(',', ''))
                 if 'liability' in content and amount < 10000:
                     issues.append({
-                        "clause_text": self._extract_relevant_clause(section['content'], amount_match.group(0)),
+                        "clause_text": self._extract_relevant_clause(document, span, amount_match.group(0)),
                         "issue": f"Liability limitation of {amount} may be insufficient for this type of contract",
                         "severity": "low"
                     })
         
         return issues
     
-    def _extract_relevant_clause(self, section_content: str, search_terms: str) -> str:
+    def _extract_relevant_clause(self, document: ContractDocument, span: Span, search_terms: str) -> str:
         """
-        Extract the most relevant sentence or clause that contains the search terms.
+        Extract the most relevant sentence or clause of document.text[span] that contains the search terms.
         """
-        sentences = re.split(r'[.!?]+', section_content)
+        text = document.text
+        sentences = document.sentence_spans(*span)
+        terms = [term.lower() for term in search_terms.split()]
         
         # Find the sentence containing the search terms
-        for sentence in sentences:
-            if any(term.lower() in sentence.lower() for term in search_terms.split()):
-                clean_sentence = sentence.strip()
+        for start, end in sentences:
+            sentence_lower = document.lower_span(start, end)
+            if any(term in sentence_lower for term in terms):
+                clean_sentence = text[start:end].strip()
                 if len(clean_sentence) > 10:
                     return clean_sentence + "."
         
         # Fallback: return first substantial sentence
-        for sentence in sentences:
-            if len(sentence.strip()) > 20:
-                return sentence.strip() + "."
+        for start, end in sentences:
+            sentence = text[start:end].strip()
+            if len(sentence) > 20:
+                return sentence + "."
         
         # Last resort: return truncated content
-        return section_content[:150] + "..." if len(section_content) > 150 else section_content
+        start, end = span
+        return text[start:start + 150] + "..." if end - start > 150 else text[start:end]
     
     def _generate_smart_compliance_issues(self, contract_text: str, metadata: Dict[str, Any], 
-                                        jurisdiction: str) -> List[Dict[str, Any]]:
+                                        jurisdiction: str, law_findings: Optional[RuleEvaluation] = None) -> List[Dict[str, Any]]:
         """
         Generate critical compliance issues that are specific to the contract type and jurisdiction.
-        Enhanced for IBM Granite compatibility with specific statutory references.
-        Only generates issues for laws that are actually applicable to the contract and jurisdiction.
+        The statutory checks are the compliance_rules declared in the law files (see utils.law_rules),
+        so only laws applicable to the contract type, jurisdiction and content are checked.
         """
-        issues = []
-        text_lower = contract_text.lower()
-        
         logger.info(f"Generating compliance issues for {metadata['type']} contract in {jurisdiction} jurisdiction")
         
-        # Employment contract compliance (ONLY for employment contracts in Malaysia)
-        if metadata['type'] == 'Employment' and jurisdiction == 'MY':
-            requirements = []
-            recommendations = []
-            
-            # Enhanced Employment Act 1955 compliance checks
-            
-            # 1. Termination notice provisions (Section 12)
-            notice_found = re.search(r'(?:notice|termination).*(?:\d+.*(?:week|month|day))', text_lower)
-            if not notice_found:
-                requirements.append("Termination notice provisions do not meet Employment Act 1955 Section 12 minimum requirements")
-                recommendations.append("Add termination clause specifying minimum notice: 2 weeks for <2 years service, 4 weeks for >2 years service")
-            
-            # 2. Working hours limitations (Section 60A)
-            hours_violation = False
-            hours_matches = re.finditer(r'(\d+).*hours?.*(?:per|each).*(?:day|week)', text_lower)
-            for match in hours_matches:
-                hours = int(match.group(1))
-                period = match.group(0)
-                if ('day' in period and hours > 8) or ('week' in period and hours > 48):
-                    hours_violation = True
-                    requirements.append(f"Working hours exceed Employment Act 1955 Section 60A maximum (8 hours/day, 48 hours/week)")
-                    recommendations.append("Adjust working hours to comply with statutory maximums under Section 60A")
-                    break
-            
-            # 3. Overtime compensation (Section 60A)
-            if not re.search(r'overtime.*(?:compensation|payment|rate|1\.5|time.*half)', text_lower):
-                requirements.append("Missing overtime compensation violates Employment Act 1955 Section 60A")
-                recommendations.append("Include overtime payment at minimum 1.5x normal hourly rate as mandated by Section 60A")
-            
-            # 4. Annual leave entitlement (Section 60E)
-            leave_found = re.search(r'annual.*leave.*(\d+).*day|(\d+).*day.*annual.*leave', text_lower)
-            if not leave_found:
-                requirements.append("Missing annual leave entitlement violates Employment Act 1955 Section 60E")
-                recommendations.append("Specify annual leave entitlement: 8 days (<2 years), 12 days (2-5 years), 16 days (>5 years)")
-            elif leave_found:
-                # Check if leave days are sufficient
-                leave_days = int(leave_found.group(1) or leave_found.group(2))
-                if leave_days < 8:
-                    requirements.append(f"Annual leave of {leave_days} days below Employment Act 1955 Section 60E minimum")
-                    recommendations.append("Increase annual leave to statutory minimum of 8 days as required by Section 60E")
-            
-            # 5. Rest days and public holidays (Sections 60C, 60D)
-            if not re.search(r'rest.*day|public.*holiday|gazetted.*holiday', text_lower):
-                requirements.append("Missing rest day and public holiday provisions required under Employment Act 1955 Sections 60C, 60D")
-                recommendations.append("Include provisions for weekly rest days and gazetted public holidays as mandated")
-            
-            # 6. Probation period limits (Section 11)
-            probation_match = re.search(r'probation.*(\d+).*month|(\d+).*month.*probation', text_lower)
-            if probation_match:
-                probation_months = int(probation_match.group(1) or probation_match.group(2))
-                if probation_months > 6:
-                    requirements.append(f"Probation period of {probation_months} months exceeds Employment Act 1955 Section 11 maximum")
-                    recommendations.append("Reduce probation period to maximum 6 months as required by Section 11")
-            
-            # 7. Minimum wage compliance
-            salary_matches = re.finditer(r'salary.*rm\s*(\d+(?:,\d+)*)|rm\s*(\d+(?:,\d+)*).*salary', text_lower)
-            for match in salary_matches:
-                salary_str = (match.group(1) or match.group(2)).replace(',', '')
-                salary_amount = int(salary_str)
-                if salary_amount < 1500:
-                    requirements.append(f"Monthly salary of RM{salary_amount} below minimum wage of RM1,500")
-                    recommendations.append("Adjust salary to meet Minimum Wages Order 2022 requirement of RM1,500")
-                    break
-            
-            # 8. EPF and SOCSO contributions
-            if not re.search(r'epf|employees.*provident.*fund', text_lower):
-                requirements.append("Missing EPF contribution provisions required under EPF Act 1991")
-                recommendations.append("Include EPF contribution clause (11% employee, 12-13% employer)")
-            
-            if not re.search(r'socso|social.*security|employment.*injury', text_lower):
-                requirements.append("Missing SOCSO contribution provisions required under SOCSO Act 1969")
-                recommendations.append("Include SOCSO contribution clause for employment injury and invalidity coverage")
-            
-            if requirements:
-                issues.append({
-                    "law": "EMPLOYMENT_ACT_MY",
-                    "missing_requirements": requirements,
-                    "recommendations": recommendations
-                })
-                logger.info(f"Generated comprehensive Employment Act MY compliance issue with {len(requirements)} requirements")
-        
-        # Data protection compliance (only for contracts that actually process personal data)
-        if metadata['has_data_processing']:
-            # Determine the correct data protection law based on jurisdiction
-            law_mapping = {
-                "MY": "PDPA_MY",
-                "SG": "PDPA_SG", 
-                "EU": "GDPR_EU",
-                "US": "CCPA_US"
-            }
-            
-            law_id = law_mapping.get(jurisdiction)
-            if not law_id:
-                logger.warning(f"No data protection law defined for jurisdiction '{jurisdiction}'")
-                return issues
-            
-            law_name = {
-                "MY": "Personal Data Protection Act 2010", 
-                "SG": "Personal Data Protection Act 2012", 
-                "EU": "GDPR", 
-                "US": "CCPA"
-            }.get(jurisdiction, "privacy law")
-            
-            requirements = []
-            recommendations = []
-            
-            # Critical data protection violations only
-            if not re.search(r'consent.*(?:explicit|written|informed)', text_lower):
-                requirements.append(f"Missing explicit consent mechanisms required under {law_name}")
-                recommendations.append(f"Implement clear, informed consent procedures before collecting personal data")
-            
-            if jurisdiction in ['MY', 'SG'] and not re.search(r'data subject.*rights', text_lower):
-                requirements.append(f"Missing data subject rights provisions required under {law_name}")
-                recommendations.append("Include data subject rights: access, correction, and withdrawal of consent")
-            
-            if jurisdiction == 'EU' and not re.search(r'(?:access|rectification|erasure|portability)', text_lower):
-                requirements.append("Missing GDPR data subject rights (access, rectification, erasure, portability)")
-                recommendations.append("Implement all GDPR data subject rights as mandated by Articles 15-20")
-            
-            if jurisdiction == 'US' and not re.search(r'(?:consumer.*rights|privacy.*rights|opt.*out)', text_lower):
-                # Enhanced CCPA-specific violation detection
-                requirements, recommendations = self._detect_ccpa_violations(contract_text, text_lower)
-                if requirements:
-                    requirements.append("Missing consumer privacy rights disclosure required under CCPA")
-                    recommendations.append("Add consumer privacy notice with opt-out mechanisms for data selling")
-                else:
-                    requirements = ["Missing consumer privacy rights disclosure required under CCPA"]
-                    recommendations = ["Add consumer privacy notice with opt-out mechanisms for data selling"]
-            
-            if requirements:
-                issues.append({
-                    "law": law_id,
-                    "missing_requirements": requirements,
-                    "recommendations": recommendations
-                })
-                logger.info(f"Generated {law_id} compliance issue with {len(requirements)} requirements")
+        if law_findings is None:
+            law_findings = self._evaluate_law_rules(contract_text, metadata, jurisdiction)
+        issues = law_findings.compliance_issues()
         
-        # For US service contracts, check general contract law compliance (not employment law!)
-        if jurisdiction == 'US' and not metadata['has_data_processing'] and metadata['type'] in ['Service', 'General']:
-            # For US service contracts, focus on consumer protection and general contract law
-            # Do NOT apply employment law or foreign privacy laws
-            logger.info(f"US {metadata['type']} contract detected - checking general contract compliance only")
-            
-            # Only generate CCPA issues if there's actual data processing
-            # Don't generate any employment law issues for service contracts
-            
+        for issue in issues:
+            logger.info(f"Generated {issue['law']} compliance issue with {len(issue['missing_requirements'])} requirements")
         logger.info(f"Generated {len(issues)} total compliance issues for {jurisdiction} {metadata['type']} contract")
         return issues
     
+    def _evaluate_law_rules(self, contract_text: str, metadata: Dict[str, Any], jurisdiction: str) -> RuleEvaluation:
+        """
+        Check the contract against the compliance rules of every applicable law.
+        
+        The rules are matched clause by clause, and the findings are the same
+        as searching the contract as a whole (see utils.law_rules) whether the
+        clause cache is enabled or not: it only decides whether the matches of
+        clauses seen before are looked up instead of searched again.
+        """
+        features = [feature for feature in CONTRACT_FEATURES if metadata.get(f"has_{feature}")]
+        return self.law_rules.evaluate(
+            contract_text, jurisdiction, metadata['type'], features, detectors={
+                "ccpa_violations": self._ccpa_violation_findings,
+                "ccpa_clause_violations": self._ccpa_clause_findings
+            }, text_lower=self._contract_document(contract_text, metadata).lower,
+            clauses=self._contract_clauses(contract_text, metadata), cache=self.clause_cache
+        )
+    
+    @staticmethod
+    def _contract_document(contract_text: str, metadata: Dict[str, Any]) -> ContractDocument:
+        """
+        The tokenized contract: the one in metadata when it is of contract_text, otherwise a new one.
+        """
+        document = metadata.get("document")
+        if isinstance(document, ContractDocument) and document.text == contract_text:
+            return document
+        return ContractDocument(contract_text)
+    
+    @classmethod
+    def _section_tree(cls, contract_text: str, metadata: Dict[str, Any]) -> SectionTree:
+        """
+        The section tree of the contract: the one in metadata when it is of contract_text, otherwise a new one.
+        """
+        tree = metadata.get("section_tree")
+        document = metadata.get("document")
+        if isinstance(tree, SectionTree) and isinstance(document, ContractDocument) and document.text == contract_text:
+            return tree
+        return parse_sections(cls._contract_document(contract_text, metadata))
+    
+    @classmethod
+    def _contract_clauses(cls, contract_text: str, metadata: Dict[str, Any]) -> List[Clause]:
+        """
+        The normalised clauses of the contract, cut on first use and kept in metadata["clauses"].
+        """
+        document = metadata.get("document")
+        if not (isinstance(document, ContractDocument) and document.text == contract_text):
+            return contract_clauses(cls._contract_document(contract_text, metadata),
+                                    cls._section_tree(contract_text, metadata))
+        if metadata.get("clauses") is None:
+            metadata["clauses"] = contract_clauses(document, cls._section_tree(contract_text, metadata))
+        return metadata["clauses"]
+    
     def _generate_contextual_summary(self, flagged_clauses: List[Dict], compliance_issues: List[Dict], 
                                    metadata: Dict[str, Any], jurisdiction: str) -> str:
         """
@@ -1000,76 +1678,31 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         logger.info(f"Text preprocessing complete. Removed formatting artifacts. Clean text length: {len(text)}")
         return text
     
-    def _analyze_contract_metadata(self, contract_text: str) -> Dict[str, Any]:
+    def _analyze_contract_metadata(self, contract_text: str, document: Optional[ContractDocument] = None) -> Dict[str, Any]:
         """
         Enhanced contract analysis that focuses ONLY on substantive contract content.
         Ignores formatting artifacts and document metadata.
+        
+        The tokenized contract is kept as metadata["document"], so the analyzers
+        that follow reuse its lowercased text and offsets, and its section tree
+        as metadata["section_tree"].
         """
-        text_lower = contract_text.lower()
+        if document is None:
+            document = ContractDocument(contract_text)
         
-        # Enhanced contract type detection with more sophisticated analysis
+        # One scan finds every type, content area and jurisdiction indicator
+        keywords = CONTRACT_KEYWORDS.scan(document.lower)
+        
+        # Enhanced contract type detection with weighted indicator scores
         contract_type = "General"
-        type_scores = {}
-        
-        type_indicators = {
-            "Employment": {
-                "strong": ["employee", "employer", "employment", "position", "job duties", "workplace", "termination of employment"],
-                "moderate": ["salary", "wage", "work schedule", "benefits", "leave", "resignation"],
-                "weak": ["work", "duties", "responsibilities"]
-            },
-            "Service": {
-                "strong": ["service provider", "client", "deliverables", "scope of work", "statement of work"],
-                "moderate": ["services", "performance", "completion", "milestone"],
-                "weak": ["provide", "deliver", "complete"]
-            },
-            "Privacy": {
-                "strong": ["privacy policy", "privacy notice", "california consumer privacy act", "ccpa", "personal information collection", "privacy rights"],
-                "moderate": ["personal information", "data collection", "consumer rights", "privacy", "california resident"],
-                "weak": ["collect", "information", "data"]
-            },
-            "NDA": {
-                "strong": ["non-disclosure", "confidentiality agreement", "trade secret", "proprietary information"],
-                "moderate": ["confidential", "proprietary", "confidentiality"],
-                "weak": ["information", "disclosure"]
-            },
-            "Rental": {
-                "strong": ["landlord", "tenant", "lease agreement", "rental agreement", "premises"],
-                "moderate": ["rent", "lease", "property", "occupancy"],
-                "weak": ["monthly", "deposit"]
-            },
-            "Sales": {
-                "strong": ["purchase agreement", "sale agreement", "buyer", "seller", "transfer of ownership"],
-                "moderate": ["purchase", "sale", "goods", "products", "delivery"],
-                "weak": ["buy", "sell", "payment"]
-            },
-            "Partnership": {
-                "strong": ["partnership agreement", "joint venture", "business partnership", "profit sharing"],
-                "moderate": ["partner", "partnership", "collaboration", "venture"],
-                "weak": ["together", "joint", "share"]
-            }
+        type_scores = {
+            contract_type_candidate: sum(
+                weight * keywords.distinct(f"type.{contract_type_candidate}.{tier}")
+                for tier, weight in INDICATOR_WEIGHTS.items()
+            )
+            for contract_type_candidate in CONTRACT_TYPE_INDICATORS
         }
         
-        # Calculate weighted scores for each contract type
-        for contract_type_candidate, indicators in type_indicators.items():
-            score = 0
-            
-            # Strong indicators (weight: 3)
-            for indicator in indicators["strong"]:
-                if indicator in text_lower:
-                    score += 3
-            
-            # Moderate indicators (weight: 2)
-            for indicator in indicators["moderate"]:
-                if indicator in text_lower:
-                    score += 2
-            
-            # Weak indicators (weight: 1)
-            for indicator in indicators["weak"]:
-                if indicator in text_lower:
-                    score += 1
-            
-            type_scores[contract_type_candidate] = score
-        
         # Select the type with the highest score (minimum threshold of 3)
         if type_scores:
             best_type = max(type_scores, key=type_scores.get)
@@ -1078,53 +1711,25 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         
         logger.info(f"Contract type analysis: {type_scores} -> Selected: {contract_type}")
         
-        # Enhanced content analysis with better detection including California/CCPA specific content
-        has_data_processing = any(phrase in text_lower for phrase in [
-            "personal data", "data processing", "data protection", "privacy policy",
-            "data subject", "gdpr", "pdpa", "collect information", "process data",
-            "personal information", "california", "ccpa", "consumer rights", "privacy rights",
-            "collect personal", "share data", "sell data", "sale of personal information"
-        ])
-        
-        has_termination_clauses = any(phrase in text_lower for phrase in [
-            "termination", "terminate this", "end of contract", "contract expiry",
-            "cancellation", "breach of contract", "dissolution"
-        ])
-        
-        has_payment_terms = any(phrase in text_lower for phrase in [
-            "payment terms", "payment schedule", "compensation", "remuneration",
-            "salary", "wage", "fee", "amount due", "invoice"
-        ])
-        
-        has_liability_clauses = any(phrase in text_lower for phrase in [
-            "liability", "liable for", "damages", "indemnify", "indemnification",
-            "limitation of liability", "hold harmless", "responsibility for"
-        ])
-        
-        has_ip_clauses = any(phrase in text_lower for phrase in [
-            "intellectual property", "copyright", "patent", "trademark",
-            "work product", "invention", "proprietary rights", "trade secret"
-        ])
-        
-        # Extract meaningful sections with improved filtering
-        sections = self._extract_contract_sections_only(contract_text)
-        
-        # Enhanced jurisdiction detection with CCPA-specific indicators
-        jurisdiction_indicators = {
-            "MY": ["malaysia", "malaysian", "kuala lumpur", "ringgit", "rm ", "employment act 1955", "companies act 2016"],
-            "SG": ["singapore", "singaporean", "sgd", "singapore dollar", "companies act singapore"],
-            "US": ["united states", "usd", "us dollar", "state of california", "state of new york", "delaware", "california", "ccpa", "california consumer privacy act", "california resident"],
-            "EU": ["european union", "gdpr", "euro", "eur", "brussels", "directive 95/46/ec"]
-        }
+        # Content areas, including California/CCPA specific content
+        has_data_processing = keywords.has("feature.data_processing")
+        has_termination_clauses = keywords.has("feature.termination_clauses")
+        has_payment_terms = keywords.has("feature.payment_terms")
+        has_liability_clauses = keywords.has("feature.liability_clauses")
+        has_ip_clauses = keywords.has("feature.ip_clauses")
+        
+        # Parse the section hierarchy once and keep the genuine sections
+        tree = parse_sections(document)
+        sections = self._extract_contract_sections_only(contract_text, document, tree)
         
-        detected_jurisdictions = []
-        for jurisdiction, indicators in jurisdiction_indicators.items():
-            if any(indicator in text_lower for indicator in indicators):
-                detected_jurisdictions.append(jurisdiction)
+        detected_jurisdictions = [
+            jurisdiction for jurisdiction in CONTRACT_JURISDICTIONS
+            if keywords.has(f"jurisdiction.{jurisdiction}")
+        ]
         
         # Calculate actual contract substance metrics
-        word_count = len([word for word in contract_text.split() if len(word) > 2])  # Exclude short words
-        sentence_count = len(re.findall(r'[.!?]+', contract_text))
+        word_count = document.long_word_count  # Exclude short words
+        sentence_count = document.sentence_count
         
         # Determine if this is a substantial contract worth analyzing
         is_substantial = (
@@ -1146,99 +1751,71 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
             "detected_jurisdictions": detected_jurisdictions,
             "word_count": word_count,
             "sentence_count": sentence_count,
-            "is_substantial": is_substantial
+            "is_substantial": is_substantial,
+            "document": document,
+            "section_tree": tree
         }
         
         logger.info(f"Contract metadata analysis complete: {contract_type} contract with {len(sections)} substantive sections")
         return metadata
     
-    def _extract_contract_sections_only(self, contract_text: str) -> List[Dict[str, str]]:
+    def _extract_contract_sections_only(self, contract_text: str,
+                                        document: Optional[ContractDocument] = None,
+                                        tree: Optional[SectionTree] = None) -> List[Dict[str, Any]]:
         """
         Extract ONLY meaningful contract sections, completely ignoring formatting artifacts.
         This is crucial for preventing analysis of document headers and formatting.
+        
+        Sections come from the section tree (see utils/contract_sections.py), in
+        document order, and hold offsets into the contract rather than copies of
+        their text: the section's own text (up to its first subsection) is
+        contract_text[start:end] and its heading line starts at heading_start.
         """
+        if document is None:
+            document = ContractDocument(contract_text)
+        if tree is None:
+            tree = parse_sections(document)
         sections = []
         
-        # Multiple patterns to detect genuine contract sections vs formatting
-        section_patterns = [
-            # Pattern 1: Numbered contract sections (e.g., "1. Definitions", "2.1 Scope")
-            r'\n\s*(\d+(?:\.\d+)*)\.\s+([A-Z][^.\n]{5,50}?)\s*\n((?:(?!\n\s*\d+(?:\.\d+)*\.)(?:[^\n]+\n?))*)',
-            
-            # Pattern 2: Lettered sections (e.g., "A. Terms", "B. Conditions")
-            r'\n\s*([A-Z])\.\s+([A-Z][^.\n]{5,50}?)\s*\n((?:(?!\n\s*[A-Z]\.)(?:[^\n]+\n?))*)',
-            
-            # Pattern 3: Named sections in contracts (e.g., "WHEREAS", "NOW THEREFORE")
-            r'\n\s*(WHEREAS|NOW THEREFORE|WITNESSETH|RECITALS?)\s*[,:]\s*\n((?:[^\n]+\n?)*?)(?=\n\s*(?:WHEREAS|NOW THEREFORE|WITNESSETH|\d+\.|[A-Z]{3,})|$)',
-            
-            # Pattern 4: Title case sections with substantial content
-            r'\n\s*([A-Z][a-z][^.\n]{10,80}?)\s*[:.]?\s*\n((?:[^\n]+\n?){3,}?)(?=\n\s*[A-Z][a-z][^.\n]{10,80}?[:.]?\s*\n|$)'
-        ]
-        
-        for pattern_idx, pattern in enumerate(section_patterns):
-            matches = list(re.finditer(pattern, contract_text, re.MULTILINE | re.DOTALL))
-            
-            for match in matches:
-                groups = match.groups()
-                
-                if len(groups) >= 2:
-                    if len(groups) == 3:
-                        section_id, title, content = groups
-                    else:
-                        title, content = groups
-                        section_id = f"Section {len(sections) + 1}"
-                    
-                    title = title.strip()
-                    content = content.strip()
-                    
-                    # Strict filtering for genuine contract content
-                    if self._is_genuine_contract_section(title, content):
-                        sections.append({
-                            "id": section_id,
-                            "title": title,
-                            "content": content,
-                            "word_count": len(content.split()),
-                            "pattern_used": pattern_idx + 1
-                        })
-            
-            # If we found good sections with one pattern, prioritize those
-            if len(sections) >= 3:
-                break
+        for section in tree:
+            # Strict filtering for genuine contract content
+            span = (section.start, section.end)
+            if self._is_genuine_contract_section(section.title, contract_text[section.start:section.end], document, span):
+                sections.append({
+                    "id": section.id,
+                    "title": section.title,
+                    "kind": section.kind,
+                    "level": section.level,
+                    "parent": section.parent.id if section.parent else None,
+                    "heading_start": section.heading_start,
+                    "start": section.start,
+                    "end": section.end,
+                    "word_count": document.words_in(*span)
+                })
         
         # Fallback for contracts without clear section headers
         if len(sections) < 2:
-            paragraphs = self._extract_meaningful_paragraphs(contract_text)
-            sections.extend(paragraphs)
-        
-        # Sort by appearance order and limit to most substantial sections
-        sections = sorted(sections, key=lambda x: x.get('word_count', 0), reverse=True)[:10]
+            sections.extend(self._paragraph_sections(document))
         
         logger.info(f"Extracted {len(sections)} genuine contract sections for analysis")
         return sections
     
-    def _is_genuine_contract_section(self, title: str, content: str) -> bool:
+    def _is_genuine_contract_section(self, title: str, content: str, document: Optional[ContractDocument] = None,
+                                     span: Optional[Span] = None) -> bool:
         """
         Determine if a section is genuine contract content vs formatting artifact.
         This is the key method to prevent analysis of non-contractual content.
+        When content is document.text[span], its counts are read from the document.
         """
-        title_lower = title.lower()
-        content_lower = content.lower()
-        
         # Immediately reject if title indicates non-contract content
-        non_contract_titles = [
-            "summary", "analysis", "review", "note", "disclaimer", "generated",
-            "created", "overview", "introduction", "conclusion", "appendix",
-            "table of contents", "index", "header", "footer", "document",
-            "title", "subject", "re:", "from:", "to:", "date:", "version",
-            "page", "confidential", "draft", "final", "approved"
-        ]
-        
-        if any(nc_title in title_lower for nc_title in non_contract_titles):
+        if SECTION_TITLE_KEYWORDS.scan(title.lower()).has("non_contract"):
             logger.debug(f"Rejected section '{title}' - contains non-contract title indicator")
             return False
         
         # Reject very short content (likely formatting)
-        if len(content.strip()) < 50:
-            logger.debug(f"Rejected section '{title}' - content too short ({len(content.strip())} chars)")
+        stripped_length = len(content.strip())
+        if stripped_length < 50:
+            logger.debug(f"Rejected section '{title}' - content too short ({stripped_length} chars)")
             return False
         
         # Reject content with too many special characters (formatting artifacts)
@@ -1248,27 +1825,27 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
             return False
         
         # Reject if content is mostly uppercase (likely headers/formatting)
-        upper_ratio = sum(1 for c in content if c.isupper()) / max(len([c for c in content if c.isalpha()]), 1)
+        upper_ratio = sum(map(str.isupper, content)) / max(sum(map(str.isalpha, content)), 1)
         if upper_ratio > 0.7:
             logger.debug(f"Rejected section '{title}' - mostly uppercase ({upper_ratio:.2f})")
             return False
         
         # Require minimum word count and sentence structure
-        word_count = len(content.split())
-        sentence_count = len(re.findall(r'[.!?]+', content))
+        if document is not None and span is not None:
+            word_count = document.words_in(*span)
+            sentence_count = document.sentences_in(*span)
+            content_lower = document.lower_span(*span)
+        else:
+            word_count = len(content.split())
+            sentence_count = len(re.findall(r'[.!?]+', content))
+            content_lower = content.lower()
         
         if word_count < 15 or sentence_count < 1:
             logger.debug(f"Rejected section '{title}' - insufficient content (words: {word_count}, sentences: {sentence_count})")
             return False
         
         # Positive indicators of contract content
-        contract_indicators = [
-            "party", "parties", "agreement", "contract", "shall", "will",
-            "hereby", "whereas", "therefore", "obligations", "rights",
-            "terms", "conditions", "provision", "clause", "section"
-        ]
-        
-        indicator_count = sum(1 for indicator in contract_indicators if indicator in content_lower)
+        indicator_count = SECTION_CONTENT_KEYWORDS.scan(content_lower).distinct("contract")
         if indicator_count < 2:
             logger.debug(f"Rejected section '{title}' - insufficient contract indicators ({indicator_count})")
             return False
@@ -1276,23 +1853,26 @@ Return analysis in JSON format with summary, flagged_clauses, and compliance_iss
         logger.debug(f"Accepted section '{title}' - genuine contract content (words: {word_count}, indicators: {indicator_count})")
         return True
     
-    def _extract_meaningful_paragraphs(self, contract_text: str) -> List[Dict[str, str]]:
+    def _paragraph_sections(self, document: ContractDocument) -> List[Dict[str, Any]]:
         """
-        Extract meaningful paragraphs when no clear sections are found.
+        The meaningful paragraphs of a tokenized contract as sections, by offset.
         """
-        paragraphs = re.split(r'\n\s*\n\s*', contract_text)
         meaningful_paragraphs = []
         
-        for i, paragraph in enumerate(paragraphs):
-            paragraph = paragraph.strip()
+        for i, paragraph_span in enumerate(document.paragraph_spans()):
+            start, end = document.strip_span(*paragraph_span)
             
-            if self._is_genuine_contract_section(f"Paragraph {i+1}", paragraph):
+            if self._is_genuine_contract_section(f"Paragraph {i+1}", document.text[start:end], document, (start, end)):
                 meaningful_paragraphs.append({
                     "id": f"P{i+1}",
                     "title": f"Paragraph {i+1}",
-                    "content": paragraph,
-                    "word_count": len(paragraph.split()),
-                    "pattern_used": 0  # Fallback pattern
+                    "kind": "paragraph",
+                    "level": 1,
+                    "parent": None,
+                    "heading_start": start,
+                    "start": start,
+                    "end": end,
+                    "word_count": document.words_in(start, end)
                 })
         
         return meaningful_paragraphs
@@ -1535,107 +2115,15 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
     
     def _generate_specific_requirements(self, law: str, jurisdiction: str) -> List[str]:
         """
-        Generate specific missing requirements based on the law.
-        Enhanced for comprehensive employment law compliance.
-        """
-        requirements_map = {
-            "EMPLOYMENT_ACT_MY": [
-                "Termination notice provisions do not meet Employment Act 1955 Section 12 minimum requirements (2 weeks for <2 years service, 4 weeks for >2 years service)",
-                "Missing overtime compensation violates Employment Act 1955 Section 60A (minimum 1.5x normal hourly rate required)",
-                "Working hours may exceed Employment Act 1955 Section 60A maximum (8 hours/day, 48 hours/week)",
-                "Annual leave entitlement below Employment Act 1955 Section 60E minimum (8-16 days based on service length)",
-                "Probation period may exceed Employment Act 1955 Section 11 maximum of 6 months",
-                "Missing rest day and public holiday provisions required under Employment Act 1955 Sections 60C, 60D",
-                "Missing EPF contribution provisions required under EPF Act 1991 (11% employee, 12-13% employer)",
-                "Missing SOCSO contribution provisions required under SOCSO Act 1969",
-                "Salary may be below minimum wage requirement of RM1,500 under Minimum Wages Order 2022"
-            ],
-            "PDPA_MY": [
-                "Missing explicit consent mechanisms required under Personal Data Protection Act 2010",
-                "Lacks data subject rights provisions (access, correction, withdrawal) as mandated by PDPA 2010",
-                "Missing purpose limitation clauses required under PDPA 2010 Section 6",
-                "Insufficient data security safeguards as required under PDPA 2010 Section 7"
-            ],
-            "PDPA_SG": [
-                "Missing consent notification requirements under Singapore PDPA 2012",
-                "Lacks data protection officer designation as required by PDPA",
-                "Missing purpose specification and limitation under PDPA 2012"
-            ],
-            "GDPR_EU": [
-                "Missing lawful basis for processing personal data under GDPR Article 6",
-                "Lacks data subject rights implementation as required by GDPR Articles 15-22",
-                "Missing data protection impact assessment requirements under GDPR Article 35",
-                "Insufficient cross-border data transfer safeguards under GDPR Chapter V"
-            ],
-            "CCPA_US": [
-                "Missing Right to Correct personal information under CCPA § 1798.106",
-                "Missing Right to Limit Use of Sensitive Personal Information under CCPA § 1798.121", 
-                "Missing Right of Non-Discrimination under CCPA § 1798.125",
-                "Discriminatory practices for opt-out requests violate CCPA § 1798.125(a)",
-                "Inadequate contact methods - CCPA § 1798.130(a)(1) requires at least 2 methods including toll-free number",
-                "Response time violations - CCPA § 1798.130(a)(2) requires initial response within 45 days",
-                "Prohibited fee structure - CCPA § 1798.130(a)(2) prohibits charging consumers for exercising rights",
-                "Service provider violations - CCPA § 1798.140(ag) restricts service provider data use",
-                "Incomplete Notice at Collection missing CCPA-specific PI categories under § 1798.100(b)",
-                "Missing data sale disclosure and opt-out requirements under CCPA § 1798.115",
-                "Missing consumer privacy rights disclosure under CCPA Section 1798.100",
-                "Lacks opt-out mechanisms as required by California Consumer Privacy Act",
-                "Missing data sale disclosure requirements under CCPA Section 1798.115"
-            ]
-        }
-        
-        return requirements_map.get(law, ["Contract requires legal review for compliance"])
+        Generate specific missing requirements based on the law (its fallback_requirements).
+        """
+        return self.law_rules.fallback_requirements(law) or ["Contract requires legal review for compliance"]
     
     def _generate_specific_recommendations(self, law: str, jurisdiction: str) -> List[str]:
         """
-        Generate specific recommendations based on the law.
-        Enhanced for comprehensive employment law compliance.
-        """
-        recommendations_map = {
-            "EMPLOYMENT_ACT_MY": [
-                "Add termination clause specifying minimum notice periods: 2 weeks for employees with <2 years service, 4 weeks for >2 years service as per Section 12",
-                "Include overtime payment clause requiring minimum 1.5x normal hourly rate as mandated by Section 60A",
-                "Specify working hours limits: maximum 8 hours per day and 48 hours per week as per Section 60A",
-                "Include annual leave entitlement: 8 days (<2 years), 12 days (2-5 years), 16 days (>5 years) as per Section 60E",
-                "Limit probation period to maximum 6 months as required by Section 11",
-                "Add rest day provisions (1 day per week) and gazetted public holiday entitlements as per Sections 60C, 60D",
-                "Include EPF contribution clause: 11% employee contribution, 12-13% employer contribution as per EPF Act 1991",
-                "Add SOCSO contribution clause for employment injury and invalidity coverage as per SOCSO Act 1969",
-                "Ensure monthly salary meets minimum wage of RM1,500 as per Minimum Wages Order 2022"
-            ],
-            "PDPA_MY": [
-                "Implement clear consent procedures with opt-in mechanisms before collecting personal data",
-                "Add comprehensive data subject rights clauses covering access, correction, and withdrawal of consent",
-                "Include purpose limitation clause specifying exact purposes for data collection and processing",
-                "Implement robust data security measures including encryption and access controls"
-            ],
-            "PDPA_SG": [
-                "Include notification requirements before collecting personal data with clear purpose statements",
-                "Designate data protection officer and include contact details",
-                "Implement consent withdrawal mechanisms and data portability procedures"
-            ],
-            "GDPR_EU": [
-                "Establish clear lawful basis for each type of data processing under Article 6",
-                "Implement comprehensive data subject rights response procedures for Articles 15-22",
-                "Conduct data protection impact assessments for high-risk processing",
-                "Implement appropriate safeguards for international data transfers"
-            ],
-            "CCPA_US": [
-                "Implement all required CCPA consumer rights: Right to Know, Delete, Correct, Limit Use of Sensitive PI, and Non-Discrimination",
-                "Provide at least 2 contact methods including toll-free number as required by CCPA § 1798.130(a)(1)",
-                "Ensure initial response within 45 days and total fulfillment within 90 days per CCPA § 1798.130(a)(2)",
-                "Remove all fees for consumer rights requests - CCPA prohibits charging consumers",
-                "Restrict service providers to specific business purposes only - prohibit use for their own purposes",
-                "Include comprehensive Notice at Collection with all CCPA-required PI categories and disclosures",
-                "Implement proper opt-out mechanisms for data selling under CCPA § 1798.115",
-                "Remove discriminatory practices - cannot charge fees or limit services for exercising rights",
-                "Add consumer privacy notice with clear disclosure of data practices under Section 1798.100",
-                "Implement opt-out mechanisms for data selling and sharing under Section 1798.120",
-                "Establish procedures for consumer rights requests under CCPA"
-            ]
-        }
-        
-        return recommendations_map.get(law, ["Consult legal counsel for jurisdiction-specific compliance"])
+        Generate specific recommendations based on the law (its fallback_recommendations).
+        """
+        return self.law_rules.fallback_recommendations(law) or ["Consult legal counsel for jurisdiction-specific compliance"]
     
     def _is_substantive_clause(self, clause_text: str) -> bool:
         """
@@ -1666,277 +2154,27 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         return any(indicator in clause_lower for indicator in legal_indicators)
     
     def _perform_comprehensive_contract_analysis(self, contract_text: str, metadata: Dict[str, Any], 
-                                               jurisdiction: str) -> Dict[str, Any]:
+                                               jurisdiction: str, law_findings: Optional[RuleEvaluation] = None) -> Dict[str, Any]:
         """
         Perform comprehensive contract analysis using IBM Granite-inspired legal reasoning.
-        Enhanced for rigorous employment contract analysis with specific statutory violations.
+        Statutory violations come from the compliance rules of the applicable laws,
+        followed by general contract law issues.
         """
-        flagged_clauses = []
-        text_lower = contract_text.lower()
-        
-        # ENHANCED EMPLOYMENT CONTRACT ANALYSIS (MY jurisdiction specific)
-        if metadata['type'] == 'Employment' and jurisdiction == 'MY':
-            
-            # 1. Comprehensive Termination Analysis (Employment Act 1955, Section 12)
-            self._analyze_termination_provisions(contract_text, text_lower, flagged_clauses)
-            
-            # 2. Working Hours and Overtime Analysis (Employment Act 1955, Section 60A)
-            self._analyze_working_hours_and_overtime(contract_text, text_lower, flagged_clauses)
-            
-            # 3. Annual Leave Analysis (Employment Act 1955, Section 60E)
-            self._analyze_annual_leave_provisions(contract_text, text_lower, flagged_clauses)
-            
-            # 4. Salary and Benefits Analysis (Employment Act 1955, Various Sections)
-            self._analyze_salary_and_benefits(contract_text, text_lower, flagged_clauses)
-            
-            # 5. Probation Period Analysis (Employment Act 1955, Section 11)
-            self._analyze_probation_period(contract_text, text_lower, flagged_clauses)
-            
-            # 6. Rest Day and Public Holiday Analysis (Employment Act 1955, Sections 60C, 60D)
-            self._analyze_rest_days_and_holidays(contract_text, text_lower, flagged_clauses)
-            
-            # 7. EPF and SOCSO Compliance Analysis
-            self._analyze_statutory_contributions(contract_text, text_lower, flagged_clauses)
-        
-        # Data protection analysis (only if contract actually processes personal data)
-        if metadata['has_data_processing']:
-            law_name = f"PDPA_{jurisdiction}" if jurisdiction in ['MY', 'SG'] else f"GDPR_{jurisdiction}" if jurisdiction == 'EU' else f"CCPA_{jurisdiction}"
-            
-            # Enhanced CCPA-specific flagged clause detection
-            if jurisdiction == 'US':
-                self._analyze_ccpa_clause_violations(contract_text, text_lower, flagged_clauses)
-            
-            # 1. Consent mechanisms
-            if not re.search(r'consent.*(?:explicit|written|informed)', text_lower):
-                data_clause = re.search(r'(?:personal.*data|information.*collect).*?(?:\.|$)', contract_text, re.IGNORECASE | re.DOTALL)
-                if data_clause:
-                    context = data_clause.group(0)[:200] + ("..." if len(data_clause.group(0)) > 200 else "")
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Missing explicit consent mechanisms required under {law_name} for personal data processing",
-                        "severity": "high"
-                    })
-            
-            # 2. Data subject rights
-            required_rights = ['access', 'rectification', 'erasure', 'portability'] if jurisdiction == 'EU' else ['access', 'correction', 'withdrawal']
-            missing_rights = [right for right in required_rights if right not in text_lower]
-            
-            if len(missing_rights) > 2:
-                flagged_clauses.append({
-                    "clause_text": "Data processing provisions",
-                    "issue": f"Missing data subject rights ({', '.join(missing_rights)}) required under {law_name}",
-                    "severity": "medium"
-                })
+        if law_findings is None:
+            law_findings = self._evaluate_law_rules(contract_text, metadata, jurisdiction)
+        flagged_clauses = law_findings.flagged_clauses()
         
         # General contract law issues
+        text_lower = self._contract_document(contract_text, metadata).lower
         self._analyze_general_contract_issues(contract_text, text_lower, flagged_clauses)
         
         return {"flagged_clauses": flagged_clauses}
     
-    def _analyze_termination_provisions(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Detailed analysis of termination provisions under Employment Act 1955 Section 12"""
-        
-        # Check for immediate termination without notice (except for misconduct)
-        termination_patterns = [
-            r'terminate.*without.*notice',
-            r'dismiss.*immediately',
-            r'termination.*effective.*immediately',
-            r'end.*employment.*without.*notice'
-        ]
-        
-        for pattern in termination_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-            for match in matches:
-                context = self._extract_clause_context(contract_text, match.start(), match.end())
-                if 'misconduct' not in context.lower() and 'gross negligence' not in context.lower():
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": "Immediate termination without notice violates Employment Act 1955 Section 12 minimum notice requirements (4 weeks for employees with >2 years service, 2 weeks for <2 years)",
-                        "severity": "high"
-                    })
-                    break  # Only flag once per contract
-        
-        # Check for insufficient notice periods
-        notice_patterns = [
-            r'(?:notice|termination).*(?:\d+.*(?:week|month|day))',
-            r'(\d+).*?(day|week|month).*?(?:notice|termination)'
-        ]
-        
-        for pattern in notice_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-            for match in matches:
-                notice_num = int(match.group(1))
-                notice_period = match.group(2).lower()
-                
-                # Convert to days for comparison
-                notice_days = notice_num
-                if notice_period == 'week':
-                    notice_days = notice_num * 7
-                elif notice_period == 'month':
-                    notice_days = notice_num * 30
-                
-                # Employment Act requires minimum 4 weeks (28 days) for >2 years service
-                if notice_days < 14:  # Less than 2 weeks is clearly insufficient
-                    context = self._extract_clause_context(contract_text, match.start(), match.end())
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Notice period of {notice_num} {notice_period}{'s' if notice_num > 1 else ''} may be insufficient under Employment Act 1955 Section 12 (minimum 2-4 weeks required)",
-                        "severity": "medium"
-                    })
-                    break
-    
-    def _analyze_working_hours_and_overtime(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Detailed analysis of working hours and overtime under Employment Act 1955 Section 60A"""
-        
-        # Check for excessive working hours
-        hours_patterns = [
-            r'(\d+).*hours?.*(?:per|each).*(?:day|daily)',
-            r'(\d+).*hours?.*(?:per|each).*(?:week|weekly)',
-            r'working.*hours?.*(\d+).*(?:per|each).*(?:day|week)'
-        ]
-        
-        for pattern in hours_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-            for match in matches:
-                hours = int(match.group(1))
-                period_text = match.group(0).lower()
-                
-                context = self._extract_clause_context(contract_text, match.start(), match.end())
-                
-                if ('day' in period_text or 'daily' in period_text) and hours > 8:
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Working hours of {hours} per day exceeds Employment Act 1955 Section 60A maximum of 8 hours per day",
-                        "severity": "high"
-                    })
-                elif ('week' in period_text or 'weekly' in period_text) and hours > 48:
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Working hours of {hours} per week exceeds Employment Act 1955 Section 60A maximum of 48 hours per week",
-                        "severity": "high"
-                    })
-        
-        # Check for missing overtime compensation
-        if not re.search(r'overtime.*(?:compensation|payment|rate|1\.5|time.*half)', text_lower):
-            # Look for salary/wage sections to attach this issue to
-            wage_section = re.search(r'(?:salary|wage|compensation|remuneration).*?(?:\.|;|$)', contract_text, re.IGNORECASE | re.DOTALL)
-            if wage_section:
-                context = wage_section.group(0)[:200] + ("..." if len(wage_section.group(0)) > 200 else "")
-                flagged_clauses.append({
-                    "clause_text": context,
-                    "issue": "Missing overtime compensation provisions violates Employment Act 1955 Section 60A (minimum 1.5x normal hourly rate required)",
-                    "severity": "high"
-                })
-    
-    def _analyze_annual_leave_provisions(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Detailed analysis of annual leave under Employment Act 1955 Section 60E"""
-        
-        if not re.search(r'annual.*leave|vacation.*day|paid.*leave', text_lower):
-            flagged_clauses.append({
-                "clause_text": "Employment terms and benefits",
-                "issue": "Missing annual leave entitlement violates Employment Act 1955 Section 60E (minimum 8 days for <2 years service, 12 days for 2-5 years, 16 days for >5 years)",
-                "severity": "medium"
-            })
-        else:
-            # Check if annual leave is insufficient
-            leave_patterns = [
-                r'annual.*leave.*(\d+).*day',
-                r'vacation.*(\d+).*day',
-                r'(\d+).*day.*annual.*leave'
-            ]
-            
-            for pattern in leave_patterns:
-                matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-                for match in matches:
-                    leave_days = int(match.group(1))
-                    if leave_days < 8:
-                        context = self._extract_clause_context(contract_text, match.start(), match.end())
-                        flagged_clauses.append({
-                            "clause_text": context,
-                            "issue": f"Annual leave of {leave_days} days is below Employment Act 1955 Section 60E minimum of 8 days",
-                            "severity": "medium"
-                        })
-                        break
-    
-    def _analyze_salary_and_benefits(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Analysis of salary and benefits compliance"""
-        
-        # Check for below minimum wage (RM1,500 as of 2022)
-        salary_patterns = [
-            r'salary.*rm\s*(\d+(?:,\d+)*)',
-            r'wage.*rm\s*(\d+(?:,\d+)*)',
-            r'rm\s*(\d+(?:,\d+)*).*(?:salary|wage|month)'
-        ]
-        
-        for pattern in salary_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-            for match in matches:
-                salary_str = match.group(1).replace(',', '')
-                salary_amount = int(salary_str)
-                
-                if salary_amount < 1500:
-                    context = self._extract_clause_context(contract_text, match.start(), match.end())
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Monthly salary of RM{salary_amount} is below the minimum wage of RM1,500 under the Minimum Wages Order 2022",
-                        "severity": "high"
-                    })
-                    break
-    
-    def _analyze_probation_period(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Analysis of probation period under Employment Act 1955 Section 11"""
-        
-        probation_patterns = [
-            r'probation.*period.*(\d+).*month',
-            r'probationary.*(\d+).*month',
-            r'(\d+).*month.*probation'
-        ]
-        
-        for pattern in probation_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE)
-            for match in matches:
-                probation_months = int(match.group(1))
-                if probation_months > 6:
-                    context = self._extract_clause_context(contract_text, match.start(), match.end())
-                    flagged_clauses.append({
-                        "clause_text": context,
-                        "issue": f"Probation period of {probation_months} months exceeds Employment Act 1955 Section 11 maximum of 6 months",
-                        "severity": "medium"
-                    })
-                    break
-    
-    def _analyze_rest_days_and_holidays(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Analysis of rest days and public holidays under Employment Act 1955 Sections 60C, 60D"""
-        
-        if not re.search(r'rest.*day|public.*holiday|gazetted.*holiday', text_lower):
-            flagged_clauses.append({
-                "clause_text": "Employment terms and working conditions",
-                "issue": "Missing rest day and public holiday provisions required under Employment Act 1955 Sections 60C and 60D",
-                "severity": "medium"
-            })
-    
-    def _analyze_statutory_contributions(self, contract_text: str, text_lower: str, flagged_clauses: list):
-        """Analysis of EPF and SOCSO contributions"""
-        
-        if not re.search(r'epf|employees.*provident.*fund', text_lower):
-            flagged_clauses.append({
-                "clause_text": "Employee benefits and contributions",
-                "issue": "Missing EPF (Employees Provident Fund) contribution provisions as required under EPF Act 1991",
-                "severity": "medium"
-            })
-        
-        if not re.search(r'socso|social.*security|employment.*injury', text_lower):
-            flagged_clauses.append({
-                "clause_text": "Employee benefits and contributions",
-                "issue": "Missing SOCSO (Social Security Organisation) contribution provisions as required under SOCSO Act 1969",
-                "severity": "medium"
-            })
-    
     def _analyze_general_contract_issues(self, contract_text: str, text_lower: str, flagged_clauses: list):
         """Analysis of general contract law issues"""
         
         # 1. Unconscionable liability limitations
-        liability_match = re.search(r'liability.*limited.*to.*(?:rm\s*)?(\d+(?:,\d+)*)', text_lower)
+        liability_match = CONTRACT_PATTERNS["general.liability_cap"].search(text_lower)
         if liability_match:
             amount_str = liability_match.group(1).replace(',', '')
             amount = int(amount_str)
@@ -1945,22 +2183,26 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
                 flagged_clauses.append({
                     "clause_text": context,
                     "issue": f"Liability limitation of RM{amount} may be unconscionably low and unenforceable under contract law",
-                    "severity": "medium"
+                    "severity": "medium",
+                    "start": liability_match.start(),
+                    "end": liability_match.end()
                 })
         
         # 2. Unilateral modification rights
-        if re.search(r'(?:company|employer|party).*may.*(?:modify|change|alter).*(?:unilaterally|without.*consent)', text_lower):
-            modification_clause = re.search(r'(?:company|employer|party).*may.*(?:modify|change|alter).*?(?:\.|$)', contract_text, re.IGNORECASE | re.DOTALL)
+        if CONTRACT_PATTERNS["general.unilateral_modification"].search(text_lower):
+            modification_clause = CONTRACT_PATTERNS["general.modification_clause"].search(contract_text)
             if modification_clause:
-                context = modification_clause.group(0)[:200] + ("..." if len(modification_clause.group(0)) > 200 else "")
+                start, end = modification_clause.span()
                 flagged_clauses.append({
-                    "clause_text": context,
+                    "clause_text": clause_excerpt(contract_text, start, end),
                     "issue": "Unilateral modification rights without consideration may be unenforceable under contract law",
-                    "severity": "medium"
+                    "severity": "medium",
+                    "start": start,
+                    "end": end
                 })
         
         # 3. Missing essential contract elements
-        if not re.search(r'consideration|payment|compensation|remuneration', text_lower):
+        if not CONTRACT_PATTERNS["general.consideration"].search(text_lower):
             flagged_clauses.append({
                 "clause_text": "Contract terms and conditions",
                 "issue": "Missing consideration or payment terms may affect contract enforceability under contract law",
@@ -1971,20 +2213,7 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         """
         Extract contextual clause text around a specific match position.
         """
-        # Find sentence boundaries around the match
-        start_context = max(0, start_pos - context_chars)
-        end_context = min(len(contract_text), end_pos + context_chars)
-        
-        # Try to find sentence boundaries
-        context = contract_text[start_context:end_context]
-        
-        # Clean up the context
-        context = re.sub(r'\s+', ' ', context).strip()
-        
-        if len(context) > 200:
-            context = context[:200] + "..."
-        
-        return context
+        return clause_context(contract_text, start_pos, end_pos, context_chars)
     
     def _detect_ccpa_violations(self, contract_text: str, text_lower: str) -> tuple[List[str], List[str]]:
         """
@@ -2000,15 +2229,15 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         missing_rights = []
         
         # Right to Correct (§ 1798.106)
-        if not re.search(r'right\s+to\s+correct|correct.*personal.*information|rectif', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.right_to_correct"].search(text_lower):
             missing_rights.append("Right to Correct personal information")
         
         # Right to Limit Use of Sensitive Personal Information (§ 1798.121)
-        if not re.search(r'limit.*use.*sensitive|sensitive.*personal.*information.*limit|opt.*out.*sensitive', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.right_to_limit_sensitive"].search(text_lower):
             missing_rights.append("Right to Limit Use of Sensitive Personal Information")
         
         # Right of Non-Discrimination (§ 1798.125)
-        if not re.search(r'non.*discrimination|right.*not.*discriminate|equal.*treatment', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.non_discrimination"].search(text_lower):
             missing_rights.append("Right of Non-Discrimination")
         
         if missing_rights:
@@ -2019,11 +2248,11 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         discrimination_violations = []
         
         # Check for prohibited fee structures when opting out
-        if re.search(r'opt.*out.*(?:may|will|result).*(?:additional|extra).*fee|fee.*opt.*out|charge.*opt.*out', text_lower):
+        if CONTRACT_PATTERNS["ccpa.opt_out_fee"].search(text_lower):
             discrimination_violations.append("Charging fees for opt-out requests (§ 1798.125(a)(1))")
         
         # Check for service limitations tied to opt-out
-        if re.search(r'opt.*out.*(?:may|will).*limit.*service|service.*limited.*opt.*out', text_lower):
+        if CONTRACT_PATTERNS["ccpa.opt_out_service_limit"].search(text_lower):
             discrimination_violations.append("Limiting services for opt-out requests (§ 1798.125(a)(2))")
         
         if discrimination_violations:
@@ -2034,19 +2263,19 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         contact_methods = []
         
         # Check for toll-free number
-        if re.search(r'toll.*free|1.*800.*|1.*888.*|1.*877.*|1.*866.*', text_lower):
+        if CONTRACT_PATTERNS["ccpa.contact_toll_free"].search(text_lower):
             contact_methods.append("toll-free")
         
         # Check for website
-        if re.search(r'website|online.*form|web.*form|www\.|http', text_lower):
+        if CONTRACT_PATTERNS["ccpa.contact_website"].search(text_lower):
             contact_methods.append("website")
         
         # Check for email
-        if re.search(r'email|@.*\.com|contact.*email', text_lower):
+        if CONTRACT_PATTERNS["ccpa.contact_email"].search(text_lower):
             contact_methods.append("email")
         
         # Check for postal address
-        if re.search(r'mail.*address|postal.*address|mailing.*address|street.*address', text_lower):
+        if CONTRACT_PATTERNS["ccpa.contact_postal"].search(text_lower):
             contact_methods.append("postal")
         
         if len(contact_methods) < 2:
@@ -2059,14 +2288,14 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         response_time_violations = []
         
         # Check for response times over 45 days initial response
-        response_matches = re.finditer(r'respond.*within.*(\d+).*days?|(\d+).*days?.*respond', text_lower)
+        response_matches = CONTRACT_PATTERNS["ccpa.response_days"].finditer(text_lower)
         for match in response_matches:
             days = int(match.group(1) or match.group(2))
             if days > 45:
                 response_time_violations.append(f"Initial response time of {days} days exceeds CCPA § 1798.130(a)(2) maximum of 45 days")
         
         # Check for total fulfillment time over 90 days
-        fulfillment_matches = re.finditer(r'fulfill.*within.*(\d+).*days?|complete.*within.*(\d+).*days?', text_lower)
+        fulfillment_matches = CONTRACT_PATTERNS["ccpa.fulfillment_days"].finditer(text_lower)
         for match in fulfillment_matches:
             days = int(match.group(1) or match.group(2))
             if days > 90:
@@ -2080,15 +2309,15 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         fee_violations = []
         
         # Check for verification fees
-        if re.search(r'verification.*fee|fee.*verification|charge.*verify|verification.*cost', text_lower):
+        if CONTRACT_PATTERNS["ccpa.verification_fee"].search(text_lower):
             fee_violations.append("Charging verification fees")
         
         # Check for processing fees
-        if re.search(r'processing.*fee|fee.*processing|charge.*process.*request', text_lower):
+        if CONTRACT_PATTERNS["ccpa.processing_fee"].search(text_lower):
             fee_violations.append("Charging processing fees")
         
         # Check for any consumer request fees
-        if re.search(r'fee.*consumer.*request|charge.*consumer.*right|cost.*exercise.*right', text_lower):
+        if CONTRACT_PATTERNS["ccpa.consumer_request_fee"].search(text_lower):
             fee_violations.append("Charging fees for exercising consumer rights")
         
         if fee_violations:
@@ -2099,15 +2328,15 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         service_provider_violations = []
         
         # Check if service providers can use data for own purposes
-        if re.search(r'service.*provider.*(?:can|may|use).*(?:own|their).*purpose|vendor.*use.*own.*business', text_lower):
+        if CONTRACT_PATTERNS["ccpa.provider_own_purpose"].search(text_lower):
             service_provider_violations.append("Allowing service providers to use data for their own business purposes")
         
         # Check if service providers can sell/share data
-        if re.search(r'service.*provider.*(?:sell|share).*data|vendor.*sell.*data|third.*party.*sell', text_lower):
+        if CONTRACT_PATTERNS["ccpa.provider_sells_data"].search(text_lower):
             service_provider_violations.append("Allowing service providers to sell or share personal information")
         
         # Check for lack of service provider restrictions
-        if re.search(r'service.*provider|vendor|third.*party', text_lower) and not re.search(r'service.*provider.*(?:shall|must|limited|restrict)', text_lower):
+        if CONTRACT_PATTERNS["ccpa.service_provider_mentioned"].search(text_lower) and not CONTRACT_PATTERNS["ccpa.service_provider_restricted"].search(text_lower):
             service_provider_violations.append("Missing service provider restrictions and oversight requirements")
         
         if service_provider_violations:
@@ -2129,15 +2358,15 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
             notice_violations.append(f"Missing CCPA-specific personal information categories (only {categories_mentioned}/9 mentioned)")
         
         # Check for retention periods
-        if not re.search(r'retention.*period|retain.*for|keep.*for.*year|delete.*after', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.retention_period"].search(text_lower):
             notice_violations.append("Missing retention period disclosure")
         
         # Check for source disclosure
-        if not re.search(r'source.*information|collect.*from|obtain.*from|gather.*from', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.information_source"].search(text_lower):
             notice_violations.append("Missing source of information disclosure")
         
         # Check for third party categories
-        if not re.search(r'third.*part.*categor|share.*with.*type|disclose.*to.*categor', text_lower):
+        if not CONTRACT_PATTERNS["ccpa.third_party_categories"].search(text_lower):
             notice_violations.append("Missing third party categories disclosure")
         
         if notice_violations:
@@ -2148,14 +2377,14 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         additional_violations = []
         
         # Check for proper data sale disclosure (§ 1798.115)
-        if re.search(r'sell.*data|sale.*personal.*information|sell.*personal', text_lower):
-            if not re.search(r'opt.*out|do.*not.*sell', text_lower):
+        if CONTRACT_PATTERNS["ccpa.data_sale"].search(text_lower):
+            if not CONTRACT_PATTERNS["ccpa.opt_out_notice"].search(text_lower):
                 additional_violations.append("Data sale disclosed but missing required opt-out notice under § 1798.115")
         
         # Check for sensitive PI handling (§ 1798.121)
         sensitive_terms = ['health', 'biometric', 'genetic', 'precise geolocation', 'racial', 'religious', 'sexual orientation']
         if any(term in text_lower for term in sensitive_terms):
-            if not re.search(r'sensitive.*personal.*information|limit.*use.*sensitive', text_lower):
+            if not CONTRACT_PATTERNS["ccpa.sensitive_information_disclosure"].search(text_lower):
                 additional_violations.append("Handling sensitive personal information without proper CCPA § 1798.121 disclosures")
         
         if additional_violations:
@@ -2171,97 +2400,82 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         Extract exact clause text that contains violations.
         """
         # 1. CRITICAL: Detect discrimination clauses (§ 1798.125)
-        discrimination_patterns = [
-            r'opt.*out.*(?:may|will|result).*(?:additional|extra).*fee[^.]*\.',
-            r'opt.*out.*(?:may|will).*limit.*service[^.]*\.',
-            r'(?:additional|extra).*fee.*opt.*out[^.]*\.',
-            r'service.*limited.*opt.*out[^.]*\.'
-        ]
-        
-        for pattern in discrimination_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE | re.DOTALL)
+        for rule in CONTRACT_PATTERNS.group("ccpa.discrimination_clause"):
+            matches = rule.finditer(contract_text)
             for match in matches:
                 clause_text = match.group(0).strip()
+                start, end = self._stripped_span(match)
                 if len(clause_text) > 20:  # Ensure substantial content
                     flagged_clauses.append({
                         "clause_text": clause_text,
                         "issue": "CRITICAL CCPA VIOLATION: Discriminatory practice for exercising opt-out rights violates CCPA § 1798.125",
-                        "severity": "high"
+                        "severity": "high",
+                        "start": start,
+                        "end": end
                     })
         
         # 2. HIGH PRIORITY: Service provider violations (§ 1798.140(ag))
-        service_provider_patterns = [
-            r'service.*provider.*(?:can|may|use).*(?:own|their).*purpose[^.]*\.',
-            r'vendor.*use.*own.*business[^.]*\.',
-            r'service.*provider.*(?:sell|share).*data[^.]*\.',
-            r'third.*party.*sell.*data[^.]*\.'
-        ]
-        
-        for pattern in service_provider_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE | re.DOTALL)
+        for rule in CONTRACT_PATTERNS.group("ccpa.service_provider_clause"):
+            matches = rule.finditer(contract_text)
             for match in matches:
                 clause_text = match.group(0).strip()
+                start, end = self._stripped_span(match)
                 if len(clause_text) > 20:
                     flagged_clauses.append({
                         "clause_text": clause_text,
                         "issue": "SERVICE PROVIDER VIOLATION: Allowing service providers to use data for own purposes violates CCPA § 1798.140(ag)",
-                        "severity": "high"
+                        "severity": "high",
+                        "start": start,
+                        "end": end
                     })
         
         # 3. HIGH PRIORITY: Prohibited fee structures (§ 1798.130(a)(2))
-        fee_patterns = [
-            r'verification.*fee[^.]*\.',
-            r'fee.*verification[^.]*\.',
-            r'processing.*fee.*request[^.]*\.',
-            r'charge.*verify[^.]*\.',
-            r'cost.*exercise.*right[^.]*\.'
-        ]
-        
-        for pattern in fee_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE | re.DOTALL)
+        for rule in CONTRACT_PATTERNS.group("ccpa.fee_clause"):
+            matches = rule.finditer(contract_text)
             for match in matches:
                 clause_text = match.group(0).strip()
+                start, end = self._stripped_span(match)
                 if len(clause_text) > 20:
                     flagged_clauses.append({
                         "clause_text": clause_text,
                         "issue": "PROHIBITED FEE STRUCTURE: Charging fees for consumer rights requests violates CCPA § 1798.130(a)(2)",
-                        "severity": "high"
+                        "severity": "high",
+                        "start": start,
+                        "end": end
                     })
         
         # 4. MEDIUM PRIORITY: Response time violations (§ 1798.130(a)(2))
-        response_time_patterns = [
-            r'respond.*within.*(\d+).*days?[^.]*\.',
-            r'(\d+).*days?.*respond.*request[^.]*\.'
-        ]
-        
-        for pattern in response_time_patterns:
-            matches = re.finditer(pattern, contract_text, re.IGNORECASE | re.DOTALL)
+        for rule in CONTRACT_PATTERNS.group("ccpa.response_time_clause"):
+            matches = rule.finditer(contract_text)
             for match in matches:
                 clause_text = match.group(0).strip()
-                days_match = re.search(r'(\d+)', clause_text)
+                start, end = self._stripped_span(match)
+                days_match = CONTRACT_PATTERNS["general.number"].search(clause_text)
                 if days_match and int(days_match.group(1)) > 45:
                     flagged_clauses.append({
                         "clause_text": clause_text,
                         "issue": f"RESPONSE TIME VIOLATION: {days_match.group(1)} days exceeds CCPA § 1798.130(a)(2) maximum of 45 days",
-                        "severity": "medium"
+                        "severity": "medium",
+                        "start": start,
+                        "end": end
                     })
         
         # 5. MEDIUM PRIORITY: Contact method violations (§ 1798.130)
         # Check entire contact section for inadequate methods
-        contact_section_pattern = r'(?:how.*to.*exercise|contact.*us|exercise.*rights)[\s\S]*?(?=\n\s*#{1,6}|\n\s*\*\*|$)'
-        contact_match = re.search(contact_section_pattern, contract_text, re.IGNORECASE)
+        contact_match = CONTRACT_PATTERNS["ccpa.contact_section"].search(contract_text)
         
         if contact_match:
             contact_section = contact_match.group(0)
+            contact_lower = contact_section.lower()
             contact_methods = 0
             
-            if re.search(r'toll.*free|1.*800.*|1.*888.*|1.*877.*|1.*866.*', contact_section, re.IGNORECASE):
+            if CONTRACT_PATTERNS["ccpa.contact_toll_free"].search(contact_lower):
                 contact_methods += 1
-            if re.search(r'website|online.*form|web.*form|www\.|http', contact_section, re.IGNORECASE):
+            if CONTRACT_PATTERNS["ccpa.contact_website"].search(contact_lower):
                 contact_methods += 1
-            if re.search(r'email|@.*\.com', contact_section, re.IGNORECASE):
+            if CONTRACT_PATTERNS["ccpa.contact_email"].search(contact_lower):
                 contact_methods += 1
-            if re.search(r'mail.*address|postal.*address|mailing.*address|street.*address', contact_section, re.IGNORECASE):
+            if CONTRACT_PATTERNS["ccpa.contact_postal"].search(contact_lower):
                 contact_methods += 1
             
             if contact_methods < 2:
@@ -2270,23 +2484,50 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
                 flagged_clauses.append({
                     "clause_text": contact_excerpt,
                     "issue": f"INADEQUATE CONTACT METHODS: Only {contact_methods} method(s) provided, CCPA § 1798.130(a)(1) requires at least 2 methods",
-                    "severity": "medium"
+                    "severity": "medium",
+                    "start": contact_match.start(),
+                    "end": contact_match.end()
                 })
         
         # 6. CRITICAL: Data sale without proper opt-out (§ 1798.115)
-        data_sale_pattern = r'(?:sell.*personal.*information|sale.*personal.*data)(?:(?!opt.*out|do.*not.*sell).)*[^.]*\.'
-        matches = re.finditer(data_sale_pattern, contract_text, re.IGNORECASE | re.DOTALL)
+        matches = CONTRACT_PATTERNS["ccpa.data_sale_clause"].finditer(contract_text)
         for match in matches:
             clause_text = match.group(0).strip()
-            if len(clause_text) > 20 and not re.search(r'opt.*out|do.*not.*sell', clause_text, re.IGNORECASE):
+            start, end = self._stripped_span(match)
+            if len(clause_text) > 20 and not CONTRACT_PATTERNS["ccpa.opt_out_notice"].search(clause_text.lower()):
                 flagged_clauses.append({
                     "clause_text": clause_text,
                     "issue": "DATA SALE VIOLATION: Personal information sale disclosed without required opt-out notice under CCPA § 1798.115",
-                    "severity": "high"
+                    "severity": "high",
+                    "start": start,
+                    "end": end
                 })
         
         logger.info(f"CCPA clause analysis complete: {len([c for c in flagged_clauses if 'CCPA' in c.get('issue', '')])} CCPA-specific violations flagged")
     
+    @staticmethod
+    def _stripped_span(match: re.Match) -> Tuple[int, int]:
+        """The offsets of match.group(0).strip() in the searched text."""
+        start, end = match.span()
+        text = match.string
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+    
+    def _ccpa_violation_findings(self, contract_text: str, text_lower: str) -> List[Dict[str, Any]]:
+        """The CCPA violations of _detect_ccpa_violations as law rule findings."""
+        requirements, recommendations = self._detect_ccpa_violations(contract_text, text_lower)
+        return ([{"requirement": requirement} for requirement in requirements] +
+                [{"recommendation": recommendation} for recommendation in recommendations])
+    
+    def _ccpa_clause_findings(self, contract_text: str, text_lower: str) -> List[Dict[str, Any]]:
+        """The clauses flagged by _analyze_ccpa_clause_violations as law rule findings."""
+        flagged_clauses = []
+        self._analyze_ccpa_clause_violations(contract_text, text_lower, flagged_clauses)
+        return flagged_clauses
+    
     def _validate_compliance_issues(self, compliance_issues: List[Dict[str, Any]], jurisdiction: str) -> List[Dict[str, Any]]:
         """
         Validate and filter compliance issues to ensure they are appropriate for the jurisdiction.
@@ -2405,9 +2646,12 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
         return critical_clauses
     
     def _enhance_ai_response(self, ai_response: str, contract_text: str, 
-                           metadata: Dict[str, Any], jurisdiction: str) -> str:
+                           metadata: Dict[str, Any], jurisdiction: str,
+                           intelligent_analysis: Optional[str] = None) -> str:
         """
         Enhance a minimal AI response (Gemini or Granite) by combining it with domain expertise.
+        
+        intelligent_analysis is the heuristic analysis JSON if it was already computed.
         """
         try:
             # Parse existing AI response
@@ -2417,9 +2661,10 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
             ai_json = {"summary": "", "flagged_clauses": [], "compliance_issues": []}
         
         # Get our intelligent analysis to supplement AI
-        intelligent_analysis = self._get_intelligent_mock_analysis(
-            contract_text, metadata, {}, jurisdiction
-        )
+        if intelligent_analysis is None:
+            intelligent_analysis = self._get_intelligent_mock_analysis(
+                contract_text, metadata, {}, jurisdiction
+            )
         
         try:
             intelligent_json = json.loads(intelligent_analysis)
@@ -2466,9 +2711,10 @@ OUTPUT FORMAT: Valid JSON with summary, flagged_clauses, and compliance_issues a
     
     # Keep the old method name for backward compatibility
     def _enhance_granite_response(self, granite_response: str, contract_text: str, 
-                                 metadata: Dict[str, Any], jurisdiction: str) -> str:
+                                 metadata: Dict[str, Any], jurisdiction: str,
+                                 intelligent_analysis: Optional[str] = None) -> str:
         """Backward compatibility wrapper for _enhance_ai_response"""
-        return self._enhance_ai_response(granite_response, contract_text, metadata, jurisdiction)
+        return self._enhance_ai_response(granite_response, contract_text, metadata, jurisdiction, intelligent_analysis)
     
     def _create_enhanced_summary(self, granite_summary: str, intelligent_summary: str,
                                 flagged_count: int, compliance_count: int,
@@ -6,6 +6,7 @@ from models.BulkAnalysisRequest import BulkAnalysisRequest
 from models.ContractAnalysisModel import ContractAnalysisRequest
 from models.ContractAnalysisResponseModel import ContractAnalysisResponse
 from service.ContractAnalyzerService import ContractAnalyzerService
+from utils.deadline import DeadlineExceeded, check_deadline
 
 # Import our new helper modules
 from utils.file_validators import FileValidator, TextSanitizer
@@ -44,7 +45,8 @@ class DocumentProcessorService:
         self, 
         file_content: bytes, 
         filename: str, 
-        jurisdiction: str = "MY"
+        jurisdiction: str = "MY",
+        use_cache: bool = True
     ) -> ContractAnalysisResponse:
         """
         Process a single document with comprehensive validation and error handling.
@@ -53,6 +55,7 @@ class DocumentProcessorService:
             file_content: The document content as bytes
             filename: The original filename
             jurisdiction: The legal jurisdiction for analysis
+            use_cache: If False, bypass cached AI responses for this document
             
         Returns:
             ContractAnalysisResponse: Analysis results
@@ -60,6 +63,7 @@ class DocumentProcessorService:
         Raises:
             ValueError: For validation errors or processing failures
             TypeError: For incorrect input types
+            DeadlineExceeded: If the request deadline passes before the analysis starts
         """
         # Input validation
         if not file_content or not filename:
@@ -72,7 +76,8 @@ class DocumentProcessorService:
             # Step 1: Validate file security and format
             self.file_validator.validate_file(file_content, filename)
             
-            # Step 2: Extract text content
+            # Step 2: Extract text content (bounded by the time left for the request)
+            check_deadline("text extraction")
             extracted_text = await self.text_extractor.extract_text_async(file_content, filename)
             
             # Step 3: Clean and validate text
@@ -89,13 +94,17 @@ class DocumentProcessorService:
             validated_jurisdiction = self.jurisdiction_validator.validate_jurisdiction(jurisdiction)
             
             # Step 6: Create analysis request and process
+            check_deadline("contract analysis")
             analysis_request = ContractAnalysisRequest(
                 text=cleaned_text,
-                jurisdiction=validated_jurisdiction
+                jurisdiction=validated_jurisdiction,
+                use_cache=use_cache
             )
             
             return await self.contract_analyzer.analyze_contract(analysis_request)
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Document processing failed for {filename}: {str(e)}")
             raise ValueError(f"Failed to process document {filename}: {str(e)}")
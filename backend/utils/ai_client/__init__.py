@@ -10,7 +10,7 @@ from .config import ModelType, WatsonXConfig
 from .client import WatsonXClient
 from .gemini_config import GeminiConfig
 from .gemini_client import GeminiClient
-from .exceptions import WatsonXError, AuthenticationError, APIError, ConfigurationError, ResponseParsingError
+from .exceptions import WatsonXError, AuthenticationError, APIError, CircuitOpenError, ConfigurationError, ResponseParsingError
 
 __all__ = [
     'ModelType',
@@ -21,6 +21,7 @@ __all__ = [
     'WatsonXError',
     'AuthenticationError',
     'APIError',
+    'CircuitOpenError',
     'ConfigurationError',
     'ResponseParsingError'
 ]
@@ -2,42 +2,65 @@
 Authentication handling for IBM Cloud WatsonX services.
 """
 
+import asyncio
+import threading
+import time
 import requests
 import logging
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from .exceptions import AuthenticationError
 
 logger = logging.getLogger(__name__)
 
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+TOKEN_REQUEST_TIMEOUT = 30
+DEFAULT_TOKEN_LIFETIME = 3600  # IAM tokens live for one hour unless told otherwise
+REFRESH_MARGIN = 300  # Start a background refresh this many seconds before expiry
+EXPIRY_SKEW = 30  # Treat tokens this close to expiry as already expired
 
-class IBMCloudAuth:
-    """Handles IBM Cloud IAM authentication for WatsonX services"""
+
+class TokenManager:
+    """
+    Process-wide IAM token cache for a single API key.
     
-    IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
-    TOKEN_REQUEST_TIMEOUT = 30
+    Tracks the token expiry reported by IAM, refreshes it on a background timer
+    before it expires and makes sure only one refresh runs at a time, so
+    concurrent requests never pay for an IAM round trip once a token is cached.
+    """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, token_url: str = IAM_TOKEN_URL):
         """
-        Initialize IBM Cloud authentication.
+        Initialize the token manager.
         
         Args:
             api_key: IBM Cloud API key
-            
-        Raises:
-            AuthenticationError: If API key is not provided
+            token_url: IAM token endpoint (overridable for local stubs)
         """
-        if not api_key:
-            raise AuthenticationError("IBM Cloud API key is required")
-            
         self.api_key = api_key
-        self._access_token: Optional[str] = None
+        self.token_url = token_url
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
     
-    def get_access_token(self, force_refresh: bool = False) -> str:
+    @property
+    def expires_at(self) -> float:
+        """Epoch time at which the cached token expires (0 if none is cached)."""
+        return self._expires_at
+    
+    def _valid_token(self) -> Optional[str]:
+        """Return the cached token if it is not about to expire."""
+        token = self._token
+        if token and time.time() < self._expires_at - EXPIRY_SKEW:
+            return token
+        return None
+    
+    def get_token(self, force_refresh: bool = False) -> str:
         """
-        Get a valid IBM Cloud IAM access token.
+        Get a valid access token, fetching one only when needed.
         
         Args:
-            force_refresh: If True, forces token refresh even if cached token exists
+            force_refresh: If True, replaces the cached token even if it is still valid
             
         Returns:
             Valid access token string
@@ -45,17 +68,91 @@ class IBMCloudAuth:
         Raises:
             AuthenticationError: If token acquisition fails
         """
-        if self._access_token and not force_refresh:
-            return self._access_token
+        token = self._valid_token()
+        if token and not force_refresh:
+            return token
+        return self._refresh(stale_token=self._token if force_refresh else None)
+    
+    async def get_token_async(self, force_refresh: bool = False) -> str:
+        """
+        Get a valid access token without blocking the event loop.
+        
+        A cached token is returned directly; fetching a new one runs in a worker thread.
+        
+        Args:
+            force_refresh: If True, replaces the cached token even if it is still valid
+            
+        Returns:
+            Valid access token string
             
-        return self._fetch_new_token()
+        Raises:
+            AuthenticationError: If token acquisition fails
+        """
+        token = self._valid_token()
+        if token and not force_refresh:
+            return token
+        return await asyncio.to_thread(self._refresh, self._token if force_refresh else None)
+    
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Drop the cached token.
+        
+        Args:
+            token: If given, only drop the cache when it still holds this token, so
+                   concurrent callers rejecting the same token trigger one refresh
+        """
+        with self._refresh_lock:
+            if token is not None and token != self._token:
+                return
+            self._token = None
+            self._expires_at = 0.0
+            self._cancel_timer()
+        logger.debug("Access token invalidated")
+    
+    def close(self) -> None:
+        """Stop the background refresh timer."""
+        with self._refresh_lock:
+            self._cancel_timer()
+    
+    def _refresh(self, stale_token: Optional[str] = None) -> str:
+        """Fetch a new token unless another caller already did while we waited."""
+        with self._refresh_lock:
+            current = self._valid_token()
+            if current and current != stale_token:
+                return current
+            token, lifetime = self._fetch_new_token()
+            self._token = token
+            self._expires_at = time.time() + lifetime
+            self._schedule_refresh(lifetime)
+            return token
+    
+    def _schedule_refresh(self, lifetime: float) -> None:
+        """Arm the background timer that refreshes the token before expiry."""
+        self._cancel_timer()
+        margin = min(REFRESH_MARGIN, lifetime / 5)
+        self._timer = threading.Timer(max(lifetime - margin, 1.0), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+    
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _background_refresh(self) -> None:
+        """Timer callback; on failure the current token stays usable until it expires."""
+        try:
+            self._refresh(stale_token=self._token)
+            logger.debug("Pre-refreshed IBM Cloud access token")
+        except AuthenticationError as e:
+            logger.warning(f"Background token refresh failed, will retry on next request: {e}")
     
-    def _fetch_new_token(self) -> str:
+    def _fetch_new_token(self) -> Tuple[str, float]:
         """
         Fetch a new access token from IBM Cloud IAM.
         
         Returns:
-            New access token string
+            Tuple of (access token, lifetime in seconds)
             
         Raises:
             AuthenticationError: If token fetch fails
@@ -69,10 +166,10 @@ class IBMCloudAuth:
         try:
             logger.debug("Requesting new IBM Cloud access token")
             response = requests.post(
-                self.IAM_TOKEN_URL,
+                self.token_url,
                 headers=headers,
                 data=data,
-                timeout=self.TOKEN_REQUEST_TIMEOUT
+                timeout=TOKEN_REQUEST_TIMEOUT
             )
             response.raise_for_status()
             
@@ -80,10 +177,10 @@ class IBMCloudAuth:
             
             if "access_token" not in token_data:
                 raise AuthenticationError("No access_token in response")
-                
-            self._access_token = token_data["access_token"]
-            logger.info("Successfully obtained IBM Cloud access token")
-            return self._access_token
+            
+            lifetime = self._token_lifetime(token_data)
+            logger.info(f"Successfully obtained IBM Cloud access token (valid for {int(lifetime)}s)")
+            return token_data["access_token"], lifetime
             
         except requests.exceptions.Timeout:
             raise AuthenticationError("Token request timed out")
@@ -93,7 +190,109 @@ class IBMCloudAuth:
         except (KeyError, ValueError) as e:
             raise AuthenticationError(f"Invalid token response format: {e}")
     
-    def invalidate_token(self) -> None:
-        """Invalidate the cached access token, forcing refresh on next request"""
-        self._access_token = None
-        logger.debug("Access token invalidated")
+    @staticmethod
+    def _token_lifetime(token_data: Dict) -> float:
+        """Read the token lifetime from IAM's 'expiration' or 'expires_in' fields."""
+        expiration = token_data.get("expiration")
+        if isinstance(expiration, (int, float)) and expiration > 0:
+            return max(float(expiration) - time.time(), 0.0)
+        expires_in = token_data.get("expires_in")
+        if isinstance(expires_in, (int, float)) and expires_in > 0:
+            return float(expires_in)
+        return float(DEFAULT_TOKEN_LIFETIME)
+
+
+_managers_lock = threading.Lock()
+_token_managers: Dict[Tuple[str, str], TokenManager] = {}
+
+
+def get_token_manager(api_key: str, token_url: str = IAM_TOKEN_URL) -> TokenManager:
+    """
+    Get the process-wide token manager for an API key, creating it on first use.
+    
+    Args:
+        api_key: IBM Cloud API key
+        token_url: IAM token endpoint
+        
+    Returns:
+        Shared TokenManager instance
+    """
+    with _managers_lock:
+        manager = _token_managers.get((token_url, api_key))
+        if manager is None:
+            manager = _token_managers[(token_url, api_key)] = TokenManager(api_key, token_url)
+        return manager
+
+
+def reset_token_managers() -> None:
+    """Stop all background refreshes and drop every cached token."""
+    with _managers_lock:
+        managers = list(_token_managers.values())
+        _token_managers.clear()
+    for manager in managers:
+        manager.close()
+
+
+class IBMCloudAuth:
+    """Handles IBM Cloud IAM authentication for WatsonX services"""
+    
+    IAM_TOKEN_URL = IAM_TOKEN_URL
+    TOKEN_REQUEST_TIMEOUT = TOKEN_REQUEST_TIMEOUT
+    
+    def __init__(self, api_key: str, token_url: str = IAM_TOKEN_URL):
+        """
+        Initialize IBM Cloud authentication.
+        
+        Tokens are shared with every other client using the same API key.
+        
+        Args:
+            api_key: IBM Cloud API key
+            token_url: IAM token endpoint (overridable for local stubs)
+            
+        Raises:
+            AuthenticationError: If API key is not provided
+        """
+        if not api_key:
+            raise AuthenticationError("IBM Cloud API key is required")
+            
+        self.api_key = api_key
+        self._tokens = get_token_manager(api_key, token_url)
+    
+    def get_access_token(self, force_refresh: bool = False) -> str:
+        """
+        Get a valid IBM Cloud IAM access token.
+        
+        Args:
+            force_refresh: If True, forces token refresh even if cached token exists
+            
+        Returns:
+            Valid access token string
+            
+        Raises:
+            AuthenticationError: If token acquisition fails
+        """
+        return self._tokens.get_token(force_refresh)
+    
+    async def get_access_token_async(self, force_refresh: bool = False) -> str:
+        """
+        Get a valid access token without blocking the event loop.
+        
+        Args:
+            force_refresh: If True, forces token refresh even if cached token exists
+            
+        Returns:
+            Valid access token string
+            
+        Raises:
+            AuthenticationError: If token acquisition fails
+        """
+        return await self._tokens.get_token_async(force_refresh)
+    
+    def invalidate_token(self, token: Optional[str] = None) -> None:
+        """
+        Invalidate the cached access token, forcing refresh on next request.
+        
+        Args:
+            token: If given, only invalidate when the cache still holds this token
+        """
+        self._tokens.invalidate(token)
@@ -0,0 +1,211 @@
+"""
+Content-addressed response cache for AI generations.
+
+Responses are keyed by a hash of (provider, model, prompt, generation
+parameters), so an identical generation request is answered from a bounded
+in-memory LRU or an optional SQLite tier instead of calling the provider again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(provider: str, model: str, prompt: str, params: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed cache key for a generation request.
+
+    Args:
+        provider: AI provider name ("gemini", "watsonx")
+        model: Model identifier
+        prompt: Full prompt text, including any system message
+        params: Generation parameters that affect the output
+
+    Returns:
+        Hex SHA-256 digest identifying the request
+    """
+    payload = json.dumps(
+        {"provider": provider, "model": model, "prompt": prompt, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: bounded in-memory LRU plus optional SQLite store.
+
+    Both tiers honour the same TTL. Entries found only on disk are promoted to
+    memory. Hits and misses are recorded per provider and tier.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 86400.0,
+                 path: Optional[str] = None, enabled: bool = True):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Maximum number of responses kept in memory
+            ttl: Seconds an entry stays valid (0 disables expiry)
+            path: Optional SQLite file for the persistent tier
+            enabled: If False, every lookup misses and nothing is stored
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if enabled and path:
+            self._db = self._open_db(path)
+
+    @classmethod
+    def from_environment(cls) -> 'ResponseCache':
+        """Create a cache from AI_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "256")),
+            ttl=float(os.getenv("AI_CACHE_TTL", "86400")),
+            path=os.getenv("AI_CACHE_PATH") or None,
+            enabled=os.getenv("AI_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    @staticmethod
+    def _open_db(path: str) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier, falling back to memory-only on failure."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.commit()
+            logger.info(f"AI response cache persisting to {path}")
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open AI response cache at {path}, using memory only: {e}")
+            return None
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return not self.ttl or time.time() - created_at < self.ttl
+
+    def get(self, key: str, provider: str = "unknown") -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key from make_cache_key
+            provider: Provider label used for hit/miss metrics
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._is_fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    metrics.increment("ai_cache_hits", provider=provider, tier="memory")
+                    return entry[1]
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"AI response cache read failed: {e}")
+                    row = None
+                if row is not None and self._is_fresh(row[1]):
+                    self._store_memory(key, row[0], row[1])
+                    metrics.increment("ai_cache_hits", provider=provider, tier="disk")
+                    return row[0]
+
+        metrics.increment("ai_cache_misses", provider=provider)
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Key from make_cache_key
+            value: Response text to cache
+        """
+        if not self.enabled:
+            return
+
+        created_at = time.time()
+        with self._lock:
+            self._store_memory(key, value, created_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, value, created_at)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"AI response cache write failed: {e}")
+
+    def _store_memory(self, key: str, value: str, created_at: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries. Caller holds the lock."""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM responses")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"AI response cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and configuration for health and metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "persistent": self._db is not None
+            }
+
+
+_cache_lock = threading.Lock()
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache, creating it from the environment on first use."""
+    global _response_cache
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache.from_environment()
+        return _response_cache
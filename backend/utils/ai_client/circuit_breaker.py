@@ -0,0 +1,345 @@
+"""
+Per-provider circuit breakers for AI calls.
+
+While a provider is failing or answering very slowly, each analysis would
+otherwise wait out the full request timeout before falling back to heuristic
+analysis. A breaker watches a rolling window of upstream call outcomes and
+latencies, opens when the error or slow-call rate is too high, rejects calls
+immediately while open, and lets a few probe calls through (half-open) after
+a cool-down to detect recovery.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Tuple
+
+from .exceptions import APIError, CircuitOpenError
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an error says something about the provider's health.
+
+    Timeouts, transport errors, throttling and 5xx responses count; client-side
+    errors such as a malformed request (4xx) or an unparseable answer do not.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (APIError, asyncio.TimeoutError, ConnectionError)):
+        status = getattr(error, "status_code", None)
+        return status is None or status >= 500 or status in (408, 429)
+    return False
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one AI provider.
+
+    Closed: calls pass and their outcomes are recorded. Once the window holds at
+    least min_calls outcomes and the failure rate or slow-call rate reaches its
+    threshold, the breaker opens. Open: calls are rejected with CircuitOpenError
+    for open_seconds. Half-open: up to half_open_max_calls probes pass; one
+    success closes the breaker, one failure opens it again.
+    """
+
+    def __init__(self, name: str, window_seconds: float = 60.0, min_calls: int = 5,
+                 failure_rate_threshold: float = 0.5, slow_call_seconds: float = 30.0,
+                 slow_call_rate_threshold: float = 0.8, open_seconds: float = 30.0,
+                 half_open_max_calls: int = 1, enabled: bool = True):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Provider name used in logs, metrics and errors
+            window_seconds: Length of the rolling outcome window
+            min_calls: Outcomes needed in the window before the breaker can open
+            failure_rate_threshold: Failure ratio (0-1) that opens the breaker
+            slow_call_seconds: Calls at least this long count as slow
+            slow_call_rate_threshold: Slow-call ratio (0-1) that opens the breaker
+            open_seconds: How long the breaker stays open before probing
+            half_open_max_calls: Concurrent probe calls allowed while half-open
+            enabled: If False, every call is allowed and nothing is tracked
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        # (finished_at, failed, slow) per recorded call
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        metrics.set_gauge("ai_circuit_state", _STATE_GAUGE[CLOSED], provider=name)
+
+    @classmethod
+    def from_environment(cls, name: str) -> 'CircuitBreaker':
+        """Create a breaker from AI_BREAKER_* environment variables."""
+        return cls(
+            name,
+            window_seconds=float(os.getenv("AI_BREAKER_WINDOW", "60")),
+            min_calls=int(os.getenv("AI_BREAKER_MIN_CALLS", "5")),
+            failure_rate_threshold=float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("AI_BREAKER_SLOW_CALL_SECONDS", "30")),
+            slow_call_rate_threshold=float(os.getenv("AI_BREAKER_SLOW_CALL_RATE", "0.8")),
+            open_seconds=float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30")),
+            half_open_max_calls=int(os.getenv("AI_BREAKER_HALF_OPEN_CALLS", "1")),
+            enabled=os.getenv("AI_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        """State after applying the open timeout. Caller holds the lock."""
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        """Move to a new state. Caller holds the lock."""
+        if state == self._state:
+            return
+        logger.warning(f"{self.name} circuit breaker {self._state} -> {state}")
+        self._state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state == CLOSED:
+            self._outcomes.clear()
+        metrics.set_gauge("ai_circuit_state", _STATE_GAUGE[state], provider=self.name)
+        metrics.increment("ai_circuit_transitions", provider=self.name, state=state)
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call would currently be let through, without claiming a probe slot.
+
+        Callers with a cheap alternative (heuristic analysis) use this to skip the
+        provider entirely while it is unavailable.
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            return state == CLOSED or (state == HALF_OPEN and self._probes < self.half_open_max_calls)
+
+    def before_call(self) -> None:
+        """
+        Claim permission for one upstream call.
+
+        Raises:
+            CircuitOpenError: If the breaker is open or all probe slots are taken
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            retry_in = max(self.open_seconds - (now - self._opened_at), 0.0) if state == OPEN else 0.0
+        metrics.increment("ai_circuit_rejections", provider=self.name)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, duration: float, failed: bool) -> None:
+        """
+        Record the outcome of a call that before_call allowed.
+
+        Args:
+            duration: Call latency in seconds
+            failed: Whether the call failed in a way that reflects provider health
+        """
+        if not self.enabled:
+            return
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                self._transition(OPEN if failed or slow else CLOSED)
+                return
+            if state == OPEN:
+                return  # A call started before the breaker opened
+
+            self._outcomes.append((now, failed, slow))
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+
+            total = len(self._outcomes)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, call_failed, _ in self._outcomes if call_failed)
+            slow_calls = sum(1 for _, _, call_slow in self._outcomes if call_slow)
+            if failures / total >= self.failure_rate_threshold or slow_calls / total >= self.slow_call_rate_threshold:
+                self._transition(OPEN)
+
+    def _release_probe(self) -> None:
+        """Give back a probe slot for a call that ended without an outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Run a blocking upstream call under the breaker.
+
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+        """
+        self.before_call()
+        started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            self.record(time.monotonic() - started, is_upstream_failure(e))
+            raise
+        self._record_success(time.monotonic() - started)
+        return result
+
+    async def call_async(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run an upstream coroutine under the breaker.
+
+        A call cancelled because every caller's deadline passed counts as slow
+        once it has run for slow_call_seconds; shorter cancellations are not
+        recorded.
+
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+        """
+        self.before_call()
+        started = time.monotonic()
+        try:
+            result = await coro_factory()
+        except asyncio.CancelledError:
+            duration = time.monotonic() - started
+            if duration >= self.slow_call_seconds:
+                self.record(duration, True)
+            else:
+                self._release_probe()
+            raise
+        except Exception as e:
+            self.record(time.monotonic() - started, is_upstream_failure(e))
+            raise
+        self._record_success(time.monotonic() - started)
+        return result
+
+    async def stream_async(self, stream_factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Relay an upstream stream under the breaker.
+
+        The call counts as one outcome, recorded when the stream ends or fails;
+        a stream abandoned by its consumer is treated like a cancelled call.
+
+        Raises:
+            CircuitOpenError: If the breaker rejects the call
+        """
+        self.before_call()
+        started = time.monotonic()
+        stream = stream_factory()
+        try:
+            async for item in stream:
+                yield item
+        except (asyncio.CancelledError, GeneratorExit):
+            duration = time.monotonic() - started
+            if duration >= self.slow_call_seconds:
+                self.record(duration, True)
+            else:
+                self._release_probe()
+            raise
+        except Exception as e:
+            self.record(time.monotonic() - started, is_upstream_failure(e))
+            raise
+        finally:
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+        self._record_success(time.monotonic() - started)
+
+    def _record_success(self, duration: float) -> None:
+        """Record a successful call and its latency (used to size hedge delays)."""
+        metrics.observe("ai_upstream_seconds", duration, provider=self.name)
+        self.record(duration, False)
+
+    def reset(self) -> None:
+        """Close the breaker and forget recorded outcomes."""
+        with self._lock:
+            self._transition(CLOSED)
+            self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and window counts for health and metrics endpoints."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            outcomes = [outcome for outcome in self._outcomes if now - outcome[0] <= self.window_seconds]
+            stats = {
+                "enabled": self.enabled,
+                "state": state,
+                "window_calls": len(outcomes),
+                "window_failures": sum(1 for _, failed, _ in outcomes if failed),
+                "window_slow_calls": sum(1 for _, _, slow in outcomes if slow)
+            }
+            if state == OPEN:
+                stats["retry_in"] = round(max(self.open_seconds - (now - self._opened_at), 0.0), 1)
+            return stats
+
+
+_registry_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """
+    Get the process-wide breaker for a provider, creating it from the environment on first use.
+
+    Args:
+        name: Provider name ("gemini", "watsonx")
+
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker.from_environment(name)
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """State of every registered breaker."""
+    with _registry_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+def reset_circuit_breakers() -> None:
+    """Close every registered breaker (used by tests and operators after an incident)."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
@@ -2,14 +2,28 @@
 Main WatsonX AI client implementation.
 """
 
-import requests
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-import re
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
+import httpx
+
+from . import transport
 from .config import WatsonXConfig
 from .auth import IBMCloudAuth
+from .cache import ResponseCache, get_response_cache, make_cache_key
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .metrics import metrics
+from .recording import get_recorder
 from .prompts import PromptFormatter, PromptTemplates
+from .rate_limit import RateLimiter, get_rate_limiter
+from .retry import RetryPolicy, get_retry_policy, parse_retry_after
+from .tokens import TokenBudget, estimate_tokens, record_budget
+from .json_extract import extract_analysis_json
+from ..deadline import bounded_timeout
+from .streaming import aiter_sse_json, stream_with_deadline
+from .singleflight import async_flights, sync_flights
 from .exceptions import APIError, ResponseParsingError, ConfigurationError
 
 logger = logging.getLogger(__name__)
@@ -23,13 +37,19 @@ class WatsonXClient:
     specifically tailored for legal document processing and compliance analysis.
     """
     
-    def __init__(self, config: Optional[WatsonXConfig] = None):
+    def __init__(self, config: Optional[WatsonXConfig] = None, cache: Optional[ResponseCache] = None,
+                 breaker: Optional[CircuitBreaker] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         """
         Initialize the WatsonX client.
         
         Args:
             config: Optional configuration object. If not provided, 
                    will attempt to load from environment variables.
+            cache: Optional response cache. Defaults to the process-wide cache.
+            breaker: Optional circuit breaker. Defaults to the process-wide WatsonX breaker.
+            rate_limiter: Optional rate limiter. Defaults to the process-wide WatsonX limiter.
+            retry_policy: Optional retry policy. Defaults to the process-wide policy.
                    
         Raises:
             ConfigurationError: If configuration is invalid or incomplete
@@ -39,17 +59,29 @@ class WatsonXClient:
         
         config.validate()
         self.config = config
-        self.auth = IBMCloudAuth(config.api_key)
+        self.auth = IBMCloudAuth(config.api_key, config.iam_url)
+        self.cache = cache if cache is not None else get_response_cache()
+        self.breaker = breaker if breaker is not None else get_circuit_breaker("watsonx")
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter("watsonx")
+        self.retry_policy = retry_policy if retry_policy is not None else get_retry_policy()
         
         logger.info(f"WatsonX client initialized with model: {config.model_id}")
     
-    def _make_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    @property
+    def model_id(self) -> str:
+        """The model contract analyses are sent to."""
+        return self.config.model_id
+    
+    def _make_request(self, prompt: str, system_message: Optional[str] = None,
+                      max_tokens: Optional[int] = None, use_cache: bool = True) -> str:
         """
         Make a request to the WatsonX API for structured JSON responses.
         
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response from the model as JSON
@@ -58,18 +90,44 @@ class WatsonXClient:
             APIError: If the API request fails
             ResponseParsingError: If response cannot be parsed
         """
-        response_text = self._make_raw_request(prompt, system_message)
+        response_text = self._make_raw_request(prompt, system_message, max_tokens=max_tokens, use_cache=use_cache)
         # Clean the response to extract just the JSON part
         cleaned_response = self._extract_json_from_response(response_text)
         return cleaned_response
     
-    def _make_text_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    async def _make_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                  timeout: Optional[float] = None, max_tokens: Optional[int] = None,
+                                  use_cache: bool = True) -> str:
+        """
+        Async variant of _make_request using the pooled asyncio transport.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            max_tokens: Optional override for the configured max_tokens
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Returns:
+            Generated text response from the model as JSON
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        response_text = await self._make_raw_request_async(
+            prompt, system_message, max_tokens=max_tokens, timeout=timeout, use_cache=use_cache
+        )
+        return self._extract_json_from_response(response_text)
+    
+    def _make_text_request(self, prompt: str, system_message: Optional[str] = None, use_cache: bool = True) -> str:
         """
         Make a request to the WatsonX API for plain text responses.
         
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response from the model as plain text
@@ -77,103 +135,403 @@ class WatsonXClient:
         Raises:
             APIError: If the API request fails
         """
-        return self._make_raw_request(prompt, system_message)
+        return self._make_raw_request(prompt, system_message, use_cache=use_cache)
     
-    def _make_raw_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    async def _make_text_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                       timeout: Optional[float] = None, use_cache: bool = True) -> str:
         """
-        Make a raw request to the WatsonX API without response processing.
+        Async variant of _make_text_request using the pooled asyncio transport.
         
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
-            Raw generated text response from the model
+            Generated text response from the model as plain text
             
         Raises:
-            APIError: If the API request fails
-            ResponseParsingError: If response cannot be parsed
+            APIError: If the API request fails or the deadline is exceeded
         """
-        try:
-            token = self.auth.get_access_token()
-        except Exception as e:
-            logger.error(f"Authentication failed: {e}")
-            raise
-        
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {token}"
-        }
+        return await self._make_raw_request_async(prompt, system_message, timeout=timeout, use_cache=use_cache)
+    
+    def _build_generation_body(self, prompt: str, system_message: Optional[str] = None,
+                               max_tokens: Optional[int] = None,
+                               temperature: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Build the text generation request body.
         
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            
+        Returns:
+            JSON-serialisable request body
+        """
         # Format prompt for Granite models
         formatted_prompt = PromptFormatter.format_for_granite(prompt, system_message)
         
-        body = {
+        return {
             "project_id": self.config.project_id,
             "model_id": self.config.model_id,
             "parameters": {
-                "temperature": self.config.temperature,
-                "max_new_tokens": self.config.max_tokens,
+                "temperature": self.config.temperature if temperature is None else temperature,
+                "max_new_tokens": self.config.max_tokens if max_tokens is None else max_tokens,
                 "top_p": self.config.top_p,
                 "stop_sequences": [],  # Remove stop sequences that might truncate JSON
                 "include_stop_sequence": False
             },
             "input": formatted_prompt
         }
+    
+    @staticmethod
+    def _build_headers(token: str) -> Dict[str, str]:
+        """Build request headers for an authenticated WatsonX call."""
+        return {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
+    
+    @staticmethod
+    def _cache_key(body: Dict[str, Any]) -> str:
+        """Content-addressed cache key for a generation request body."""
+        return make_cache_key("watsonx", body["model_id"], body["input"], body["parameters"])
+    
+    def _parse_generation_response(self, response: httpx.Response) -> str:
+        """
+        Validate an HTTP response and extract the generated text.
+        
+        Args:
+            response: Response returned by the WatsonX API
+            
+        Returns:
+            Raw generated text from the model
+            
+        Raises:
+            APIError: If the API returned an error status
+            ResponseParsingError: If response cannot be parsed
+        """
+        # Log response details for debugging
+        logger.debug(f"Response status: {response.status_code}")
+        logger.debug(f"Response headers: {dict(response.headers)}")
+        
+        if response.status_code != 200:
+            logger.error(f"API request failed with status {response.status_code}")
+            logger.error(f"Response body: {response.text}")
+            response_data = {}
+            try:
+                response_data = response.json()
+            except ValueError:
+                pass
+            raise APIError(
+                f"WatsonX API HTTP error: {response.status_code} {response.reason_phrase}",
+                response.status_code,
+                response_data,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
         
+        try:
+            result = response.json()
+        except ValueError:
+            raise ResponseParsingError("WatsonX returned a non-JSON response", response.text)
+        
+        if "results" in result and len(result["results"]) > 0:
+            logger.debug(f"Successfully received response from WatsonX")
+            return result["results"][0]["generated_text"]
+        
+        logger.error(f"Unexpected response format: {result}")
+        raise ResponseParsingError("Invalid response format from WatsonX", str(result))
+    
+    def _make_raw_request(self, prompt: str, system_message: Optional[str] = None,
+                          max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                          timeout: Optional[float] = None, use_cache: bool = True) -> str:
+        """
+        Make a raw request to the WatsonX API without response processing.
+        
+        Blocking variant that reuses the shared keep-alive pool; prefer
+        _make_raw_request_async from coroutines.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            timeout: Optional per-request timeout in seconds (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Returns:
+            Raw generated text response from the model
+            
+        Raises:
+            APIError: If the API request fails
+            CircuitOpenError: If the WatsonX circuit breaker is open
+            ResponseParsingError: If response cannot be parsed
+        """
+        body = self._build_generation_body(prompt, system_message, max_tokens, temperature)
+        request_timeout = timeout or self.config.timeout
+        
+        cache_key = self._cache_key(body)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="watsonx")
+            if cached is not None:
+                return cached
+        
+        # Never wait on the provider past the deadline of the request being served
+        request_timeout = bounded_timeout(request_timeout, "watsonx")
+        
+        deadline = time.monotonic() + request_timeout
+        
+        def send() -> str:
+            self.rate_limiter.acquire_blocking(estimate_tokens(body["input"]))
+            return self.breaker.call(lambda: self._send_sync(body, request_timeout, cache_key))
+        
+        # Identical concurrent requests share a single upstream call (and its retries)
+        return sync_flights.do(cache_key, lambda: self.retry_policy.call(send, "watsonx", deadline))
+    
+    def _send_sync(self, body: Dict[str, Any], request_timeout: float, cache_key: str) -> str:
+        """Authenticate and send one generation request, retrying once on 401, and cache the result."""
+        token = self._get_token()
+        response = self._post_sync(token, body, request_timeout)
+        if response.status_code == 401:
+            # Token was revoked or expired early; refresh once and retry
+            logger.warning("WatsonX rejected the access token, refreshing and retrying once")
+            self.auth.invalidate_token(token)
+            response = self._post_sync(self._get_token(), body, request_timeout)
+        
+        result = self._parse_generation_response(response)
+        self._store(cache_key, body, result)
+        return result
+    
+    def _store(self, cache_key: str, body: Dict[str, Any], result: str) -> None:
+        """Cache an upstream result, charge its tokens to the rate limiter and record it when AI_RECORD_PATH is set."""
+        self.cache.set(cache_key, result)
+        self.rate_limiter.charge(estimate_tokens(result))
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record("watsonx", self.config.model_id, body["input"], result)
+    
+    def _get_token(self) -> str:
+        """Get an access token, logging authentication failures."""
+        try:
+            return self.auth.get_access_token()
+        except Exception as e:
+            logger.error(f"Authentication failed: {e}")
+            raise
+    
+    def _post_sync(self, token: str, body: Dict[str, Any], request_timeout: float) -> httpx.Response:
+        """Send one generation request on the blocking keep-alive pool."""
+        pool_settings = self.config.pool_settings()
         try:
             logger.debug(f"Making request to WatsonX API: {self.config.base_url}")
             logger.debug(f"Request body: {body}")
-            response = requests.post(
+            return transport.get_sync_client(pool_settings).post(
                 self.config.base_url,
-                headers=headers,
+                headers=self._build_headers(token),
                 json=body,
-                timeout=self.config.timeout
+                timeout=pool_settings.timeout(request_timeout)
             )
+        except httpx.TimeoutException:
+            raise APIError("Request to WatsonX API timed out", 408)
+        except httpx.HTTPError as e:
+            logger.error(f"WatsonX API request failed: {e}")
+            raise APIError(f"WatsonX API request failed: {e}")
+    
+    async def _make_raw_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                      max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                                      timeout: Optional[float] = None, use_cache: bool = True) -> str:
+        """
+        Make a raw request to the WatsonX API on the pooled asyncio transport.
+        
+        The whole call, including authentication, is bounded by a single deadline
+        so a slow Granite generation never holds the event loop.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
-            # Log response details for debugging
-            logger.debug(f"Response status: {response.status_code}")
-            logger.debug(f"Response headers: {dict(response.headers)}")
-            
-            if response.status_code != 200:
-                logger.error(f"API request failed with status {response.status_code}")
-                logger.error(f"Response body: {response.text}")
-            
-            response.raise_for_status()
-            
-            result = response.json()
+        Returns:
+            Raw generated text response from the model
             
-            if "results" in result and len(result["results"]) > 0:
-                generated_text = result["results"][0]["generated_text"]
-                logger.debug(f"Successfully received response from WatsonX")
-                
-                return generated_text
-            else:
-                logger.error(f"Unexpected response format: {result}")
-                raise ResponseParsingError("Invalid response format from WatsonX", str(result))
-                
-        except requests.exceptions.Timeout:
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the WatsonX circuit breaker is open
+            ResponseParsingError: If response cannot be parsed
+        """
+        body = self._build_generation_body(prompt, system_message, max_tokens, temperature)
+        request_timeout = timeout or self.config.timeout
+        
+        cache_key = self._cache_key(body)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="watsonx")
+            if cached is not None:
+                return cached
+        
+        # Never wait on the provider past the deadline of the request being served
+        request_timeout = bounded_timeout(request_timeout, "watsonx")
+        
+        deadline = time.monotonic() + request_timeout
+        
+        async def send() -> str:
+            await self.rate_limiter.acquire(estimate_tokens(body["input"]))
+            return await self.breaker.call_async(lambda: self._send_async(body, request_timeout, cache_key))
+        
+        try:
+            # Identical concurrent requests share a single upstream call (with its
+            # rate limit slots and retries); each caller still honours its own deadline
+            return await asyncio.wait_for(
+                async_flights.do(cache_key, lambda: self.retry_policy.call_async(send, "watsonx", deadline)),
+                timeout=request_timeout
+            )
+        except asyncio.TimeoutError:
+            raise APIError(f"Request to WatsonX API exceeded deadline of {request_timeout}s", 408)
+    
+    async def _send_async(self, body: Dict[str, Any], request_timeout: float, cache_key: str) -> str:
+        """Authenticate and send one generation request on the async pool, retrying once on 401, and cache the result."""
+        token = await self._get_token_async()
+        response = await self._post_async(token, body, request_timeout)
+        if response.status_code == 401:
+            logger.warning("WatsonX rejected the access token, refreshing and retrying once")
+            self.auth.invalidate_token(token)
+            response = await self._post_async(await self._get_token_async(), body, request_timeout)
+        
+        result = self._parse_generation_response(response)
+        self._store(cache_key, body, result)
+        return result
+    
+    async def _get_token_async(self) -> str:
+        """Get an access token without blocking, logging authentication failures."""
+        try:
+            return await self.auth.get_access_token_async()
+        except Exception as e:
+            logger.error(f"Authentication failed: {e}")
+            raise
+    
+    async def _post_async(self, token: str, body: Dict[str, Any], request_timeout: float) -> httpx.Response:
+        """Send one generation request on the pooled asyncio transport."""
+        pool_settings = self.config.pool_settings()
+        try:
+            logger.debug(f"Making async request to WatsonX API: {self.config.base_url}")
+            return await transport.get_async_client(pool_settings).post(
+                self.config.base_url,
+                headers=self._build_headers(token),
+                json=body,
+                timeout=pool_settings.timeout(request_timeout)
+            )
+        except httpx.TimeoutException:
             raise APIError("Request to WatsonX API timed out", 408)
-        except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else None
-            response_data = {}
-            try:
-                response_data = e.response.json() if e.response else {}
-            except:
-                pass
-            raise APIError(f"WatsonX API HTTP error: {e}", status_code, response_data)
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"WatsonX API request failed: {e}")
             raise APIError(f"WatsonX API request failed: {e}")
     
-    def analyze_contract(self, contract_text: str, compliance_checklist: Dict[str, Any]) -> str:
+    async def _stream_raw_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                        max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                                        timeout: Optional[float] = None,
+                                        use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Stream generated text from the WatsonX generation_stream endpoint.
+        
+        Streams are not shared between identical concurrent requests; the full
+        text is cached once a stream that yielded text completes, and a cached
+        response is yielded as a single fragment.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            timeout: Optional deadline in seconds for the whole stream (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Yields:
+            Generated text fragments in order
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the WatsonX circuit breaker is open
+        """
+        body = self._build_generation_body(prompt, system_message, max_tokens, temperature)
+        request_timeout = timeout or self.config.timeout
+        
+        cache_key = self._cache_key(body)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="watsonx")
+            if cached is not None:
+                yield cached
+                return
+        
+        # Never wait on the provider past the deadline of the request being served
+        request_timeout = bounded_timeout(request_timeout, "watsonx")
+        
+        async def attempt() -> AsyncIterator[str]:
+            await self.rate_limiter.acquire(estimate_tokens(body["input"]))
+            async for chunk in self.breaker.stream_async(lambda: self._send_stream(body, request_timeout)):
+                yield chunk
+        
+        # A stream that fails before its first fragment is retried
+        deadline = time.monotonic() + request_timeout
+        parts = []
+        async for chunk in stream_with_deadline(
+            self.retry_policy.stream_async(attempt, "watsonx", deadline), request_timeout, "watsonx"
+        ):
+            parts.append(chunk)
+            yield chunk
+        if parts:
+            self._store(cache_key, body, "".join(parts))
+    
+    async def _send_stream(self, body: Dict[str, Any], request_timeout: float) -> AsyncIterator[str]:
+        """Authenticate and stream one generation request, retrying once on 401 before any text arrives."""
+        pool_settings = self.config.pool_settings()
+        client = transport.get_async_client(pool_settings)
+        url = self.config.stream_url()
+        token = await self._get_token_async()
+        for attempt in range(2):
+            try:
+                logger.debug(f"Making streaming request to WatsonX API: {url}")
+                async with client.stream(
+                    "POST", url,
+                    headers={**self._build_headers(token), "Accept": "text/event-stream"},
+                    json=body,
+                    timeout=pool_settings.timeout(request_timeout)
+                ) as response:
+                    if response.status_code == 401 and attempt == 0:
+                        logger.warning("WatsonX rejected the access token, refreshing and retrying once")
+                        self.auth.invalidate_token(token)
+                        token = await self._get_token_async()
+                        continue
+                    if response.status_code != 200:
+                        await response.aread()
+                        self._parse_generation_response(response)  # Raises APIError
+                    async for payload in aiter_sse_json(response.aiter_lines()):
+                        if payload.get("errors"):
+                            raise APIError(f"WatsonX stream reported an error: {payload['errors']}", 500, payload)
+                        results = payload.get("results") or []
+                        if results and results[0].get("generated_text"):
+                            yield results[0]["generated_text"]
+                    return
+            except httpx.TimeoutException:
+                raise APIError("Streaming request to WatsonX API timed out", 408)
+            except httpx.HTTPError as e:
+                logger.error(f"WatsonX streaming request failed: {e}")
+                raise APIError(f"WatsonX API request failed: {e}")
+    
+    def analyze_contract(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                         use_cache: bool = True, contract_type: Optional[str] = None) -> str:
         """
         Analyze a contract against a compliance checklist.
         
         Args:
             contract_text: The contract text to analyze
             compliance_checklist: Compliance requirements to check against
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
             
         Returns:
             JSON string containing analysis results
@@ -184,11 +542,161 @@ class WatsonXClient:
         """
         logger.info("Starting contract compliance analysis")
         
-        template = PromptTemplates.CONTRACT_ANALYSIS
-        prompt = template["builder"](contract_text, compliance_checklist)
-        system_message = PromptFormatter.SYSTEM_MESSAGES[template["system"]]
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="watsonx")
+        record_budget("watsonx", budget)
+        return self._make_request(
+            prompt, system_message, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
+    
+    async def analyze_contract_async(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                                     timeout: Optional[float] = None, use_cache: bool = True,
+                                     contract_type: Optional[str] = None) -> str:
+        """
+        Analyze a contract against a compliance checklist without blocking the event loop.
         
-        return self._make_request(prompt, system_message)
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Returns:
+            JSON string containing analysis results
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        logger.info("Starting async contract compliance analysis")
+        
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="watsonx")
+        record_budget("watsonx", budget)
+        return await self._make_request_async(
+            prompt, system_message, timeout=timeout, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
+    
+    async def analyze_contract_stream(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                                      timeout: Optional[float] = None, use_cache: bool = True,
+                                      contract_type: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the raw analysis text as it is generated.
+        
+        Feed the fragments to streaming.AnalysisStreamParser to receive findings
+        as they complete and the final analysis JSON.
+        
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            timeout: Optional deadline in seconds for the whole stream
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Yields:
+            Generated text fragments in order
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the WatsonX circuit breaker is open
+        """
+        logger.info("Starting streamed contract compliance analysis")
+        
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="watsonx")
+        record_budget("watsonx", budget)
+        async for chunk in self._stream_raw_request_async(
+            prompt, system_message, max_tokens=budget.max_output_tokens, timeout=timeout, use_cache=use_cache
+        ):
+            yield chunk
+    
+    def plan_contract_analysis(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                               contract_type: Optional[str] = None) -> Tuple[str, str, TokenBudget]:
+        """
+        Build the contract analysis prompt within this model's context window.
+        
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, system message, token budget)
+        """
+        system_message = PromptFormatter.SYSTEM_MESSAGES[PromptTemplates.CONTRACT_ANALYSIS["system"]]
+        prompt, budget = PromptFormatter.build_budgeted_contract_analysis_prompt(
+            contract_text,
+            compliance_checklist,
+            model_id=self.config.model_id,
+            max_output_tokens=self.config.max_tokens,
+            system_message=system_message,
+            contract_type=contract_type
+        )
+        return prompt, system_message, budget
+    
+    def plan_batch_contract_analysis(self, documents: List[Tuple[str, str]], compliance_checklist: Dict[str, Any],
+                                     contract_type: Optional[str] = None) -> Tuple[str, str, TokenBudget]:
+        """
+        Build one analysis prompt for several short contracts within this model's context window.
+        
+        Args:
+            documents: (contract id, contract text) pairs
+            compliance_checklist: Compliance requirements shared by every contract
+            contract_type: Optional contract type shared by the batch, used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, system message, token budget)
+        """
+        system_message = PromptFormatter.SYSTEM_MESSAGES[PromptTemplates.CONTRACT_ANALYSIS["system"]]
+        prompt, budget = PromptFormatter.build_batch_contract_analysis_prompt(
+            documents,
+            compliance_checklist,
+            model_id=self.config.model_id,
+            max_output_tokens=self.config.max_tokens,
+            system_message=system_message,
+            contract_type=contract_type
+        )
+        return prompt, system_message, budget
+    
+    async def analyze_contract_batch_async(self, documents: List[Tuple[str, str]],
+                                           compliance_checklist: Dict[str, Any],
+                                           timeout: Optional[float] = None, use_cache: bool = True,
+                                           contract_type: Optional[str] = None) -> str:
+        """
+        Analyze several short contracts in a single request.
+        
+        Args:
+            documents: (contract id, contract text) pairs
+            compliance_checklist: Compliance requirements shared by every contract
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional contract type shared by the batch, used to trim the checklist
+            
+        Returns:
+            JSON string with a "results" array of per-contract analyses keyed by "contract_id"
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        logger.info(f"Starting batched compliance analysis of {len(documents)} contracts")
+        
+        prompt, system_message, budget = self.plan_batch_contract_analysis(
+            documents, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="watsonx")
+        record_budget("watsonx", budget)
+        metrics.increment("ai_batched_contracts", len(documents), provider="watsonx")
+        return await self._make_request_async(
+            prompt, system_message, timeout=timeout, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
     
     def extract_contract_metadata(self, contract_text: str) -> str:
         """
@@ -250,7 +758,7 @@ class WatsonXClient:
             logger.info("Performing WatsonX client health check")
             # Simple test request
             test_prompt = "Return only the word 'healthy' as a JSON string."
-            response = self._make_request(test_prompt)
+            response = self._make_request(test_prompt, use_cache=False)
             logger.info("Health check passed")
             return True
         except Exception as e:
@@ -267,222 +775,45 @@ class WatsonXClient:
         Returns:
             Cleaned JSON string
         """
-        import json
-        
-        # First, try to find complete JSON object in the response
-        json_pattern = r'\{.*?\}'
-        matches = re.findall(json_pattern, response_text, re.DOTALL)
-        
-        for match in matches:
-            try:
-                # Test if this is valid JSON
-                parsed = json.loads(match)
-                
-                # Check if it looks like a complete contract analysis response
-                if self._is_complete_analysis_response(parsed):
-                    # Normalize the compliance issues in the complete response
-                    normalized_response = self._normalize_complete_response(parsed)
-                    logger.debug(f"Found valid complete JSON in response (length: {len(match)})")
-                    return json.dumps(normalized_response)
-                elif self._is_partial_compliance_issue(parsed):
-                    # Wrap partial response in complete structure
-                    logger.debug(f"Found partial compliance issue, wrapping in complete structure")
-                    wrapped = self._wrap_partial_response(parsed)
-                    return json.dumps(wrapped)
-                else:
-                    logger.debug(f"Found valid JSON but unknown structure, using as-is")
-                    return match
-                    
-            except json.JSONDecodeError:
-                continue
-        
-        # If no complete JSON found, try to extract and repair incomplete JSON
-        lines = response_text.strip().split('\n')
-        json_lines = []
-        in_json = False
-        brace_count = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('{') and not in_json:
-                in_json = True
-                brace_count = 1
-                json_lines.append(line)
-            elif in_json:
-                json_lines.append(line)
-                brace_count += stripped.count('{') - stripped.count('}')
-                
-                # If braces are balanced, we have complete JSON
-                if brace_count == 0:
-                    break
-        
-        if json_lines:
-            potential_json = '\n'.join(json_lines)
-            
-            # Try to parse as-is first
-            try:
-                parsed = json.loads(potential_json)
-                if self._is_partial_compliance_issue(parsed):
-                    wrapped = self._wrap_partial_response(parsed)
-                    return json.dumps(wrapped)
-                else:
-                    logger.debug(f"Extracted valid JSON by line parsing (length: {len(potential_json)})")
-                    return potential_json
-            except json.JSONDecodeError:
-                # Try to repair incomplete JSON
-                repaired_json = self._attempt_json_repair(potential_json)
-                if repaired_json:
-                    logger.debug(f"Successfully repaired incomplete JSON")
-                    return repaired_json
-        
-        # If all else fails, return a default structure with error message
-        logger.warning(f"Could not extract or repair JSON from response, returning fallback")
-        fallback = {
-            "summary": "Error: Could not parse AI response",
-            "flagged_clauses": [],
-            "compliance_issues": []
-        }
-        return json.dumps(fallback)
-    
-    def _is_complete_analysis_response(self, parsed_json: dict) -> bool:
-        """Check if JSON contains expected contract analysis structure."""
-        required_keys = {"summary", "flagged_clauses", "compliance_issues"}
-        return required_keys.issubset(set(parsed_json.keys()))
-    
-    def _is_partial_compliance_issue(self, parsed_json: dict) -> bool:
-        """Check if JSON looks like a single compliance issue object."""
-        compliance_issue_keys = {"law", "missing_requirements", "recommendations"}
-        return compliance_issue_keys.issubset(set(parsed_json.keys()))
-    
-    def _wrap_partial_response(self, partial_json: dict) -> dict:
-        """Wrap a partial compliance issue in the expected complete structure."""
-        # Normalize the compliance issue data
-        normalized_issue = self._normalize_compliance_issue(partial_json)
-        
-        return {
-            "summary": f"Contract analysis found issues with {partial_json.get('law', 'compliance requirements')}",
-            "flagged_clauses": [],
-            "compliance_issues": [normalized_issue]
-        }
+        return extract_analysis_json(response_text)
     
-    def _normalize_complete_response(self, response: dict) -> dict:
-        """Normalize a complete response to ensure proper data types."""
-        normalized = response.copy()
-        
-        # Normalize compliance issues
-        if "compliance_issues" in normalized and normalized["compliance_issues"]:
-            normalized_issues = []
-            for issue in normalized["compliance_issues"]:
-                normalized_issues.append(self._normalize_compliance_issue(issue))
-            normalized["compliance_issues"] = normalized_issues
-        
-        return normalized
-    
-    def _normalize_compliance_issue(self, issue: dict) -> dict:
-        """Normalize a compliance issue to ensure proper data types."""
-        normalized = issue.copy()
-        
-        # Ensure missing_requirements is a list
-        if "missing_requirements" in normalized:
-            req = normalized["missing_requirements"]
-            if isinstance(req, str):
-                # Convert single string to list
-                normalized["missing_requirements"] = [req] if req else []
-            elif not isinstance(req, list):
-                # Convert other types to list
-                normalized["missing_requirements"] = [str(req)]
-        
-        # Ensure recommendations is a list
-        if "recommendations" in normalized:
-            rec = normalized["recommendations"]
-            if isinstance(rec, str):
-                # Convert single string to list
-                normalized["recommendations"] = [rec] if rec else []
-            elif not isinstance(rec, list):
-                # Convert other types to list
-                normalized["recommendations"] = [str(rec)]
-        
-        return normalized
-    
-    def _attempt_json_repair(self, incomplete_json: str) -> str:
-        """
-        Attempt to repair incomplete JSON by adding missing closing braces/brackets.
+    def generate_text(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3,
+                      use_cache: bool = True) -> str:
+        """
+        Generate text using the WatsonX AI model with custom parameters.
         
         Args:
-            incomplete_json: Potentially incomplete JSON string
+            prompt: The prompt to send to the model
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for text generation (0.0 to 1.0)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
-            Repaired JSON string or None if repair failed
+            Generated text response
+            
+        Raises:
+            APIError: If the API request fails
         """
-        import json
-        
-        # Count open vs closed braces and brackets
-        open_braces = incomplete_json.count('{')
-        close_braces = incomplete_json.count('}')
-        open_brackets = incomplete_json.count('[')
-        close_brackets = incomplete_json.count(']')
-        
-        # Try to complete the JSON
-        repaired = incomplete_json.strip()
-        
-        # If we're missing closing brackets, add them
-        missing_brackets = open_brackets - close_brackets
-        missing_braces = open_braces - close_braces
-        
-        # Add missing closing brackets first
-        for _ in range(missing_brackets):
-            repaired += ']'
-        
-        # Add missing closing braces
-        for _ in range(missing_braces):
-            repaired += '}'
-        
-        # Test if the repair worked
-        try:
-            json.loads(repaired)
-            return repaired
-        except json.JSONDecodeError:
-            # If simple repair failed, try adding minimal structure
-            if incomplete_json.strip().endswith(','):
-                # Remove trailing comma and try again
-                repaired = incomplete_json.strip().rstrip(',')
-                for _ in range(missing_brackets):
-                    repaired += ']'
-                for _ in range(missing_braces):
-                    repaired += '}'
-                
-                try:
-                    json.loads(repaired)
-                    return repaired
-                except json.JSONDecodeError:
-                    pass
-            
-            return None
-    def generate_text(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3) -> str:
+        return self._make_raw_request(prompt, max_tokens=max_tokens, temperature=temperature, use_cache=use_cache)
+    
+    async def generate_text_async(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3,
+                                  timeout: Optional[float] = None, use_cache: bool = True) -> str:
         """
-        Generate text using the WatsonX AI model with custom parameters.
+        Generate text without blocking the event loop.
         
         Args:
             prompt: The prompt to send to the model
             max_tokens: Maximum number of tokens to generate
             temperature: Temperature for text generation (0.0 to 1.0)
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response
             
         Raises:
-            APIError: If the API request fails
+            APIError: If the API request fails or the deadline is exceeded
         """
-        # Temporarily override config parameters
-        original_max_tokens = self.config.max_tokens
-        original_temperature = self.config.temperature
-        
-        try:
-            self.config.max_tokens = max_tokens
-            self.config.temperature = temperature
-            
-            return self._make_text_request(prompt)
-        finally:
-            # Restore original config
-            self.config.max_tokens = original_max_tokens
-            self.config.temperature = original_temperature
+        return await self._make_raw_request_async(
+            prompt, max_tokens=max_tokens, temperature=temperature, timeout=timeout, use_cache=use_cache
+        )
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 from .exceptions import ConfigurationError
+from .transport import PoolSettings
 
 
 class ModelType(Enum):
@@ -21,11 +22,16 @@ class WatsonXConfig:
     api_key: str
     project_id: str
     base_url: str = "https://us-south.ml.cloud.ibm.com/ml/v1/text/generation?version=2023-05-29"
+    iam_url: str = "https://iam.cloud.ibm.com/identity/token"
     model_id: str = ModelType.GRANITE_13B.value
     temperature: float = 0.1
     max_tokens: int = 8191  # Maximum allowed by IBM WatsonX
     top_p: float = 0.95
     timeout: int = 120  # Increased from 60 to 120 seconds for longer documents
+    pool_size: int = 20  # Max concurrent connections in the shared keep-alive pool
+    pool_keepalive: int = 10  # Idle connections kept warm between requests
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
 
     @classmethod
     def from_environment(cls) -> 'WatsonXConfig':
@@ -36,7 +42,29 @@ class WatsonXConfig:
         if not api_key or not project_id:
             raise ConfigurationError("IBM_API_KEY and WATSONX_PROJECT_ID must be set")
         
-        return cls(api_key=api_key, project_id=project_id)
+        return cls(
+            api_key=api_key,
+            project_id=project_id,
+            base_url=os.getenv("WATSONX_URL") or cls.base_url,
+            iam_url=os.getenv("IBM_IAM_URL") or cls.iam_url,
+            pool_size=int(os.getenv("WATSONX_POOL_SIZE", "20")),
+            pool_keepalive=int(os.getenv("WATSONX_POOL_KEEPALIVE", "10"))
+        )
+
+    def stream_url(self) -> str:
+        """Streaming variant of base_url (text/generation_stream), keeping its query string."""
+        if "/text/generation_stream" in self.base_url:
+            return self.base_url
+        return self.base_url.replace("/text/generation", "/text/generation_stream", 1)
+
+    def pool_settings(self) -> PoolSettings:
+        """Pool settings used to share HTTP connections across client instances."""
+        return PoolSettings(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_keepalive,
+            keepalive_expiry=self.keepalive_expiry,
+            connect_timeout=self.connect_timeout
+        )
 
     def validate(self) -> None:
         """Validate configuration parameters."""
@@ -46,9 +74,15 @@ class WatsonXConfig:
             raise ConfigurationError("Project ID is required")
         if not self.base_url:
             raise ConfigurationError("Base URL is required")
+        if not self.iam_url:
+            raise ConfigurationError("IAM URL is required")
         if self.temperature < 0 or self.temperature > 1:
             raise ConfigurationError("Temperature must be between 0 and 1")
         if self.max_tokens <= 0:
             raise ConfigurationError("Max tokens must be positive")
         if self.top_p <= 0 or self.top_p > 1:
             raise ConfigurationError("Top-p must be between 0 and 1")
+        if self.pool_size <= 0:
+            raise ConfigurationError("Pool size must be positive")
+        if self.pool_keepalive < 0 or self.pool_keepalive > self.pool_size:
+            raise ConfigurationError("Pool keep-alive must be between 0 and pool size")
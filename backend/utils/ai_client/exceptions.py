@@ -17,12 +17,23 @@ class AuthenticationError(WatsonXError):
 class APIError(WatsonXError):
     """Raised when WatsonX API returns an error"""
     
-    def __init__(self, message: str, status_code: int = None, response_data: dict = None):
+    def __init__(self, message: str, status_code: int = None, response_data: dict = None,
+                 retry_after: float = None):
         self.status_code = status_code
         self.response_data = response_data
+        self.retry_after = retry_after  # Seconds the provider asked us to wait (Retry-After)
         super().__init__(message)
 
 
+class CircuitOpenError(APIError):
+    """Raised instead of calling an AI provider whose circuit breaker is open"""
+    
+    def __init__(self, provider: str, retry_in: float = 0.0):
+        self.provider = provider
+        self.retry_in = retry_in
+        super().__init__(f"{provider} circuit breaker is open; retry in {retry_in:.1f}s", 503)
+
+
 class ConfigurationError(WatsonXError):
     """Raised when configuration is invalid or incomplete"""
     
@@ -0,0 +1,152 @@
+"""
+Bounded execution pools for blocking AI SDK calls.
+
+SDKs such as google-generativeai expose blocking generate calls. Running them
+on a dedicated, size-limited thread pool keeps the event loop free while
+capping how many upstream calls a single worker process makes at once.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """
+    Size-limited worker pool with queue-depth and in-flight gauges.
+
+    Blocking callables run on a private thread pool; native coroutines share the
+    same concurrency cap through a per-loop semaphore so both paths report the
+    same gauges.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"ai-{name}")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, int]:
+        """Current gauge values for this pool."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "in_flight": self._in_flight
+            }
+
+    def _update(self, queued_delta: int = 0, in_flight_delta: int = 0) -> None:
+        with self._lock:
+            self._queued += queued_delta
+            self._in_flight += in_flight_delta
+            queued, in_flight = self._queued, self._in_flight
+        metrics.set_gauge("ai_executor_queue_depth", queued, pool=self.name)
+        metrics.set_gauge("ai_executor_in_flight", in_flight, pool=self.name)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        If the caller is cancelled while the call is still queued, the call is
+        dropped and never reaches the upstream service.
+        """
+        loop = asyncio.get_running_loop()
+        claim_lock = threading.Lock()
+        state = {"claimed": False}
+        self._update(queued_delta=1)
+
+        def call():
+            with claim_lock:
+                if state["claimed"]:
+                    return None  # Caller gave up while the call was queued
+                state["claimed"] = True
+            self._update(queued_delta=-1, in_flight_delta=1)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._update(in_flight_delta=-1)
+
+        try:
+            return await loop.run_in_executor(self._pool, call)
+        finally:
+            with claim_lock:
+                abandoned = not state["claimed"]
+                state["claimed"] = True
+            if abandoned:
+                self._update(queued_delta=-1)
+
+    async def run_coroutine(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a native coroutine under the same concurrency cap and gauges."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_workers)
+
+        self._update(queued_delta=1)
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            self._update(queued_delta=-1)
+            raise
+        self._update(queued_delta=-1, in_flight_delta=1)
+        try:
+            return await coro_factory()
+        finally:
+            semaphore.release()
+            self._update(in_flight_delta=-1)
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop calls that have not started."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_registry_lock = threading.Lock()
+_executors: Dict[str, BoundedExecutor] = {}
+
+
+def get_executor(name: str, max_workers: int) -> BoundedExecutor:
+    """
+    Get the process-wide executor for a provider, creating it on first use.
+
+    Args:
+        name: Pool name, usually the provider ("gemini")
+        max_workers: Pool size used when the pool is first created
+
+    Returns:
+        Shared BoundedExecutor instance
+    """
+    with _registry_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = BoundedExecutor(name, max_workers)
+            logger.info(f"Created bounded AI executor '{name}' with {max_workers} workers")
+        elif executor.max_workers != max_workers:
+            logger.debug(f"Executor '{name}' already exists with {executor.max_workers} workers; ignoring size {max_workers}")
+        return executor
+
+
+def executor_stats() -> Dict[str, Dict[str, int]]:
+    """Gauge values for every registered executor."""
+    with _registry_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in executors.items()}
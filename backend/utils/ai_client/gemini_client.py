@@ -2,14 +2,27 @@
 Main Gemini AI client implementation.
 """
 
+import asyncio
 import logging
-import json
-import re
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import AsyncIterator, Dict, Any, List, Iterator, Optional, Tuple
 import google.generativeai as genai
 
+from .cache import ResponseCache, get_response_cache, make_cache_key
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .executor import get_executor
+from .singleflight import async_flights, sync_flights
 from .gemini_config import GeminiConfig
+from .metrics import metrics
+from .recording import get_recorder
 from .prompts import PromptFormatter, PromptTemplates
+from .rate_limit import RateLimiter, get_rate_limiter
+from .retry import RetryPolicy, get_retry_policy
+from .tokens import TokenBudget, estimate_tokens, record_budget
+from .json_extract import extract_analysis_json
+from ..deadline import bounded_timeout
+from .streaming import stream_with_deadline
 from .exceptions import APIError, ResponseParsingError, ConfigurationError
 
 logger = logging.getLogger(__name__)
@@ -23,13 +36,19 @@ class GeminiClient:
     specifically tailored for legal document processing and compliance analysis.
     """
     
-    def __init__(self, config: Optional[GeminiConfig] = None):
+    def __init__(self, config: Optional[GeminiConfig] = None, cache: Optional[ResponseCache] = None,
+                 breaker: Optional[CircuitBreaker] = None, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
         """
         Initialize the Gemini client.
         
         Args:
             config: Optional configuration object. If not provided, 
                    will attempt to load from environment variables.
+            cache: Optional response cache. Defaults to the process-wide cache.
+            breaker: Optional circuit breaker. Defaults to the process-wide Gemini breaker.
+            rate_limiter: Optional rate limiter. Defaults to the process-wide Gemini limiter.
+            retry_policy: Optional retry policy. Defaults to the process-wide policy.
                    
         Raises:
             ConfigurationError: If configuration is invalid or incomplete
@@ -40,21 +59,42 @@ class GeminiClient:
         config.validate()
         self.config = config
         
-        # Configure the Gemini API
-        genai.configure(api_key=config.api_key)
+        if config.stub_url:
+            # Offline load testing against the local stub server
+            from .stub_server import StubGenerativeModel
+            self.model = StubGenerativeModel(config.stub_url, config.model_name, config.timeout)
+            logger.info(f"Gemini client using stub server at {config.stub_url}")
+        else:
+            # Configure the Gemini API
+            genai.configure(api_key=config.api_key)
+            
+            # Initialize the model
+            self.model = genai.GenerativeModel(config.model_name)
         
-        # Initialize the model
-        self.model = genai.GenerativeModel(config.model_name)
+        # Shared, size-limited pool for blocking SDK calls
+        self.executor = get_executor("gemini", config.max_workers)
+        self.cache = cache if cache is not None else get_response_cache()
+        self.breaker = breaker if breaker is not None else get_circuit_breaker("gemini")
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter("gemini")
+        self.retry_policy = retry_policy if retry_policy is not None else get_retry_policy()
         
         logger.info(f"Gemini client initialized with model: {config.model_name}")
     
-    def _make_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    @property
+    def model_id(self) -> str:
+        """The model contract analyses are sent to."""
+        return self.config.model_name
+    
+    def _make_request(self, prompt: str, system_message: Optional[str] = None,
+                      max_tokens: Optional[int] = None, use_cache: bool = True) -> str:
         """
         Make a request to the Gemini API for structured JSON responses.
         
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response from the model as JSON
@@ -63,18 +103,44 @@ class GeminiClient:
             APIError: If the API request fails
             ResponseParsingError: If response cannot be parsed
         """
-        response_text = self._make_raw_request(prompt, system_message)
+        response_text = self._make_raw_request(prompt, system_message, max_tokens=max_tokens, use_cache=use_cache)
         # Clean the response to extract just the JSON part
         cleaned_response = self._extract_json_from_response(response_text)
         return cleaned_response
     
-    def _make_text_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    async def _make_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                  timeout: Optional[float] = None, max_tokens: Optional[int] = None,
+                                  use_cache: bool = True) -> str:
+        """
+        Awaitable variant of _make_request running on the bounded Gemini pool.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            max_tokens: Optional override for the configured max_tokens
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Returns:
+            Generated text response from the model as JSON
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        response_text = await self._make_raw_request_async(
+            prompt, system_message, max_tokens=max_tokens, timeout=timeout, use_cache=use_cache
+        )
+        return self._extract_json_from_response(response_text)
+    
+    def _make_text_request(self, prompt: str, system_message: Optional[str] = None, use_cache: bool = True) -> str:
         """
         Make a request to the Gemini API for plain text responses.
         
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response from the model as plain text
@@ -82,60 +148,360 @@ class GeminiClient:
         Raises:
             APIError: If the API request fails
         """
-        return self._make_raw_request(prompt, system_message)
+        return self._make_raw_request(prompt, system_message, use_cache=use_cache)
+    
+    async def _make_text_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                       timeout: Optional[float] = None, use_cache: bool = True) -> str:
+        """
+        Awaitable variant of _make_text_request running on the bounded Gemini pool.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Returns:
+            Generated text response from the model as plain text
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+        """
+        return await self._make_raw_request_async(prompt, system_message, timeout=timeout, use_cache=use_cache)
+    
+    @staticmethod
+    def _combine_prompt(prompt: str, system_message: Optional[str] = None) -> str:
+        """Combine system message with prompt, as Gemini takes a single input."""
+        if system_message:
+            return f"{system_message}\n\n{prompt}"
+        return prompt
+    
+    def _generation_config(self, max_tokens: Optional[int] = None,
+                           temperature: Optional[float] = None) -> "genai.types.GenerationConfig":
+        """Build generation parameters, applying optional per-call overrides."""
+        return genai.types.GenerationConfig(
+            temperature=self.config.temperature if temperature is None else temperature,
+            max_output_tokens=self.config.max_tokens if max_tokens is None else max_tokens,
+            top_p=self.config.top_p
+        )
     
-    def _make_raw_request(self, prompt: str, system_message: Optional[str] = None) -> str:
+    def _cache_key(self, full_prompt: str, max_tokens: Optional[int] = None,
+                   temperature: Optional[float] = None) -> str:
+        """Content-addressed cache key for a generation request."""
+        return make_cache_key("gemini", self.config.model_name, full_prompt, {
+            "temperature": self.config.temperature if temperature is None else temperature,
+            "max_output_tokens": self.config.max_tokens if max_tokens is None else max_tokens,
+            "top_p": self.config.top_p
+        })
+    
+    @staticmethod
+    def _response_text(response: Any) -> str:
+        """Extract text from an SDK response, raising if it is empty."""
+        if response and response.text:
+            logger.debug(f"Successfully received response from Gemini")
+            return response.text
+        logger.error(f"No response text returned from Gemini")
+        raise ResponseParsingError("No response text returned from Gemini", str(response))
+    
+    def _make_raw_request(self, prompt: str, system_message: Optional[str] = None,
+                          max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                          use_cache: bool = True) -> str:
         """
         Make a raw request to the Gemini API without response processing.
         
+        This is a blocking call; coroutines should use _make_raw_request_async.
+        
         Args:
             prompt: The formatted prompt to send
             system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Raw generated text response from the model
             
         Raises:
             APIError: If the API request fails
+            CircuitOpenError: If the Gemini circuit breaker is open
             ResponseParsingError: If response cannot be parsed
         """
+        full_prompt = self._combine_prompt(prompt, system_message)
+        cache_key = self._cache_key(full_prompt, max_tokens, temperature)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="gemini")
+            if cached is not None:
+                return cached
+        
+        # Never wait on the provider past the deadline of the request being served
+        deadline = time.monotonic() + bounded_timeout(self.config.timeout, "gemini")
+        
+        def send() -> str:
+            self.rate_limiter.acquire_blocking(estimate_tokens(full_prompt))
+            return self.breaker.call(lambda: self._generate_and_store(full_prompt, max_tokens, temperature, cache_key))
+        
+        # Identical concurrent requests share a single upstream call (and its retries)
+        return sync_flights.do(cache_key, lambda: self.retry_policy.call(send, "gemini", deadline))
+    
+    def _generate_and_store(self, full_prompt: str, max_tokens: Optional[int],
+                            temperature: Optional[float], cache_key: str) -> str:
+        """Blocking SDK call whose result is written to the response cache."""
+        result = self._generate(full_prompt, max_tokens, temperature)
+        self._store(cache_key, full_prompt, result)
+        return result
+    
+    def _store(self, cache_key: str, full_prompt: str, result: str) -> None:
+        """Cache an upstream result, charge its tokens to the rate limiter and record it when AI_RECORD_PATH is set."""
+        self.cache.set(cache_key, result)
+        self.rate_limiter.charge(estimate_tokens(result))
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record("gemini", self.config.model_name, full_prompt, result)
+    
+    def _generate(self, full_prompt: str, max_tokens: Optional[int] = None,
+                  temperature: Optional[float] = None) -> str:
+        """Blocking SDK call for a combined prompt."""
         try:
-            # Combine system message with prompt for Gemini
-            full_prompt = prompt
-            if system_message:
-                full_prompt = f"{system_message}\n\n{prompt}"
-            
             logger.debug(f"Making request to Gemini API with model: {self.config.model_name}")
             logger.debug(f"Request prompt: {full_prompt[:200]}...")
             
             # Generate content with specified parameters
             response = self.model.generate_content(
                 full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.config.temperature,
-                    max_output_tokens=self.config.max_tokens,
-                    top_p=self.config.top_p
-                )
+                generation_config=self._generation_config(max_tokens, temperature)
             )
+            return self._response_text(response)
+                
+        except Exception as e:
+            logger.error(f"Gemini API request failed: {e}")
+            raise self._api_error(e)
+    
+    @staticmethod
+    def _api_error(error: Exception) -> APIError:
+        """
+        Wrap an SDK error as an APIError, keeping its HTTP status so throttling
+        and outages can be retried. A response without text is not retried.
+        """
+        if isinstance(error, APIError):
+            return error
+        if isinstance(error, ResponseParsingError):
+            return APIError(f"Gemini API request failed: {error}", 422)
+        code = getattr(error, "code", None)
+        return APIError(f"Gemini API request failed: {error}", int(code) if isinstance(code, int) else None)
+    
+    async def _make_raw_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                      max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                                      timeout: Optional[float] = None, use_cache: bool = True) -> str:
+        """
+        Make a raw Gemini request without blocking the event loop.
+        
+        Calls run on the shared size-limited Gemini pool, or through the SDK's
+        generate_content_async when use_native_async is enabled, so one worker
+        can hold many concurrent analyses without serialising them.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            timeout: Optional per-request deadline in seconds (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Returns:
+            Raw generated text response from the model
             
-            if response and response.text:
-                logger.debug(f"Successfully received response from Gemini")
-                return response.text
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the Gemini circuit breaker is open
+            ResponseParsingError: If response cannot be parsed
+        """
+        request_timeout = timeout or self.config.timeout
+        full_prompt = self._combine_prompt(prompt, system_message)
+        cache_key = self._cache_key(full_prompt, max_tokens, temperature)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="gemini")
+            if cached is not None:
+                return cached
+        
+        # Never wait on the provider past the deadline of the request being served
+        request_timeout = bounded_timeout(request_timeout, "gemini")
+        
+        deadline = time.monotonic() + request_timeout
+        
+        async def send() -> str:
+            await self.rate_limiter.acquire(estimate_tokens(full_prompt))
+            return await self.breaker.call_async(generate_and_store)
+        
+        async def generate_and_store() -> str:
+            if self.config.use_native_async and hasattr(self.model, "generate_content_async"):
+                result = await self.executor.run_coroutine(
+                    lambda: self._generate_native(full_prompt, max_tokens, temperature)
+                )
             else:
-                logger.error(f"No response text returned from Gemini")
-                raise ResponseParsingError("No response text returned from Gemini", str(response))
-                
+                result = await self.executor.run(self._generate, full_prompt, max_tokens, temperature)
+            self._store(cache_key, full_prompt, result)
+            return result
+        
+        try:
+            # Identical concurrent requests share a single upstream call (with its
+            # rate limit slots and retries); each caller still honours its own deadline
+            return await asyncio.wait_for(
+                async_flights.do(cache_key, lambda: self.retry_policy.call_async(send, "gemini", deadline)),
+                timeout=request_timeout
+            )
+        except asyncio.TimeoutError:
+            raise APIError(f"Request to Gemini API exceeded deadline of {request_timeout}s", 408)
+    
+    async def _generate_native(self, full_prompt: str, max_tokens: Optional[int] = None,
+                               temperature: Optional[float] = None) -> str:
+        """SDK-native async call for a combined prompt."""
+        try:
+            response = await self.model.generate_content_async(
+                full_prompt, generation_config=self._generation_config(max_tokens, temperature)
+            )
+            return self._response_text(response)
         except Exception as e:
             logger.error(f"Gemini API request failed: {e}")
-            raise APIError(f"Gemini API request failed: {e}")
+            raise self._api_error(e)
+    
+    async def _stream_raw_request_async(self, prompt: str, system_message: Optional[str] = None,
+                                        max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                                        timeout: Optional[float] = None,
+                                        use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Stream generated text from Gemini without blocking the event loop.
+        
+        The blocking SDK stream is drained on the bounded Gemini pool (or read
+        with generate_content_async when use_native_async is enabled). Streams
+        are not shared between identical concurrent requests; the full text is
+        cached once a stream that yielded text completes, and a cached response
+        is yielded as a single fragment.
+        
+        Args:
+            prompt: The formatted prompt to send
+            system_message: Optional system message for context
+            max_tokens: Optional override for the configured max_tokens
+            temperature: Optional override for the configured temperature
+            timeout: Optional deadline in seconds for the whole stream (defaults to config timeout)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            
+        Yields:
+            Generated text fragments in order
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the Gemini circuit breaker is open
+        """
+        request_timeout = timeout or self.config.timeout
+        full_prompt = self._combine_prompt(prompt, system_message)
+        cache_key = self._cache_key(full_prompt, max_tokens, temperature)
+        if use_cache:
+            cached = self.cache.get(cache_key, provider="gemini")
+            if cached is not None:
+                yield cached
+                return
+        
+        # Never wait on the provider past the deadline of the request being served
+        request_timeout = bounded_timeout(request_timeout, "gemini")
+        
+        if self.config.use_native_async and hasattr(self.model, "generate_content_async"):
+            open_stream = lambda: self._stream_native(full_prompt, max_tokens, temperature)
+        else:
+            open_stream = lambda: self._stream_pooled(full_prompt, max_tokens, temperature)
+        
+        async def attempt() -> AsyncIterator[str]:
+            await self.rate_limiter.acquire(estimate_tokens(full_prompt))
+            async for chunk in self.breaker.stream_async(open_stream):
+                yield chunk
+        
+        # A stream that fails before its first fragment is retried
+        deadline = time.monotonic() + request_timeout
+        parts = []
+        async for chunk in stream_with_deadline(
+            self.retry_policy.stream_async(attempt, "gemini", deadline), request_timeout, "gemini"
+        ):
+            parts.append(chunk)
+            yield chunk
+        if parts:
+            self._store(cache_key, full_prompt, "".join(parts))
     
-    def analyze_contract(self, contract_text: str, compliance_checklist: Dict[str, Any]) -> str:
+    async def _stream_pooled(self, full_prompt: str, max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """Drain the blocking SDK stream on the Gemini pool, relaying fragments to the event loop."""
+        loop = asyncio.get_running_loop()
+        fragments: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        abandoned = threading.Event()
+        
+        def drain() -> None:
+            try:
+                for fragment in self._generate_stream(full_prompt, max_tokens, temperature):
+                    if abandoned.is_set():
+                        break
+                    loop.call_soon_threadsafe(fragments.put_nowait, fragment)
+            finally:
+                loop.call_soon_threadsafe(fragments.put_nowait, finished)
+        
+        worker = asyncio.ensure_future(self.executor.run(drain))
+        try:
+            while True:
+                fragment = await fragments.get()
+                if fragment is finished:
+                    break
+                yield fragment
+            await worker  # Re-raises an SDK error
+        finally:
+            abandoned.set()
+            if not worker.done():
+                worker.cancel()
+    
+    def _generate_stream(self, full_prompt: str, max_tokens: Optional[int] = None,
+                         temperature: Optional[float] = None) -> Iterator[str]:
+        """Blocking SDK stream for a combined prompt."""
+        try:
+            logger.debug(f"Making streaming request to Gemini API with model: {self.config.model_name}")
+            response = self.model.generate_content(
+                full_prompt,
+                generation_config=self._generation_config(max_tokens, temperature),
+                stream=True
+            )
+            for chunk in response:
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Gemini streaming request failed: {e}")
+            raise self._api_error(e)
+    
+    async def _stream_native(self, full_prompt: str, max_tokens: Optional[int] = None,
+                             temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """SDK-native async stream for a combined prompt."""
+        try:
+            response = await self.model.generate_content_async(
+                full_prompt, generation_config=self._generation_config(max_tokens, temperature), stream=True
+            )
+            async for chunk in response:
+                text = getattr(chunk, "text", "")
+                if text:
+                    yield text
+        except Exception as e:
+            logger.error(f"Gemini streaming request failed: {e}")
+            raise self._api_error(e)
+    
+    def execution_stats(self) -> Dict[str, int]:
+        """Queue-depth and in-flight gauges of the Gemini execution pool."""
+        return self.executor.stats()
+    
+    def analyze_contract(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                         use_cache: bool = True, contract_type: Optional[str] = None) -> str:
         """
         Analyze a contract against a compliance checklist.
         
         Args:
             contract_text: The contract text to analyze
             compliance_checklist: Compliance requirements to check against
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
             
         Returns:
             JSON string containing analysis results
@@ -146,11 +512,161 @@ class GeminiClient:
         """
         logger.info("Starting contract compliance analysis with Gemini")
         
-        template = PromptTemplates.CONTRACT_ANALYSIS
-        prompt = template["builder"](contract_text, compliance_checklist)
-        system_message = PromptFormatter.SYSTEM_MESSAGES[template["system"]]
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="gemini")
+        record_budget("gemini", budget)
+        return self._make_request(
+            prompt, system_message, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
+    
+    async def analyze_contract_async(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                                     timeout: Optional[float] = None, use_cache: bool = True,
+                                     contract_type: Optional[str] = None) -> str:
+        """
+        Analyze a contract against a compliance checklist without blocking the event loop.
         
-        return self._make_request(prompt, system_message)
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Returns:
+            JSON string containing analysis results
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        logger.info("Starting async contract compliance analysis with Gemini")
+        
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="gemini")
+        record_budget("gemini", budget)
+        return await self._make_request_async(
+            prompt, system_message, timeout=timeout, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
+    
+    async def analyze_contract_stream(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                                      timeout: Optional[float] = None, use_cache: bool = True,
+                                      contract_type: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream the raw analysis text as it is generated.
+        
+        Feed the fragments to streaming.AnalysisStreamParser to receive findings
+        as they complete and the final analysis JSON.
+        
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            timeout: Optional deadline in seconds for the whole stream
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Yields:
+            Generated text fragments in order
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            CircuitOpenError: If the Gemini circuit breaker is open
+        """
+        logger.info("Starting streamed contract compliance analysis with Gemini")
+        
+        prompt, system_message, budget = self.plan_contract_analysis(
+            contract_text, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="gemini")
+        record_budget("gemini", budget)
+        async for chunk in self._stream_raw_request_async(
+            prompt, system_message, max_tokens=budget.max_output_tokens, timeout=timeout, use_cache=use_cache
+        ):
+            yield chunk
+    
+    def plan_contract_analysis(self, contract_text: str, compliance_checklist: Dict[str, Any],
+                               contract_type: Optional[str] = None) -> Tuple[str, str, TokenBudget]:
+        """
+        Build the contract analysis prompt within this model's context window.
+        
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            contract_type: Optional detected contract type used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, system message, token budget)
+        """
+        system_message = PromptFormatter.SYSTEM_MESSAGES[PromptTemplates.CONTRACT_ANALYSIS["system"]]
+        prompt, budget = PromptFormatter.build_budgeted_contract_analysis_prompt(
+            contract_text,
+            compliance_checklist,
+            model_id=self.config.model_name,
+            max_output_tokens=self.config.max_tokens,
+            system_message=system_message,
+            contract_type=contract_type
+        )
+        return prompt, system_message, budget
+    
+    def plan_batch_contract_analysis(self, documents: List[Tuple[str, str]], compliance_checklist: Dict[str, Any],
+                                     contract_type: Optional[str] = None) -> Tuple[str, str, TokenBudget]:
+        """
+        Build one analysis prompt for several short contracts within this model's context window.
+        
+        Args:
+            documents: (contract id, contract text) pairs
+            compliance_checklist: Compliance requirements shared by every contract
+            contract_type: Optional contract type shared by the batch, used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, system message, token budget)
+        """
+        system_message = PromptFormatter.SYSTEM_MESSAGES[PromptTemplates.CONTRACT_ANALYSIS["system"]]
+        prompt, budget = PromptFormatter.build_batch_contract_analysis_prompt(
+            documents,
+            compliance_checklist,
+            model_id=self.config.model_name,
+            max_output_tokens=self.config.max_tokens,
+            system_message=system_message,
+            contract_type=contract_type
+        )
+        return prompt, system_message, budget
+    
+    async def analyze_contract_batch_async(self, documents: List[Tuple[str, str]],
+                                           compliance_checklist: Dict[str, Any],
+                                           timeout: Optional[float] = None, use_cache: bool = True,
+                                           contract_type: Optional[str] = None) -> str:
+        """
+        Analyze several short contracts in a single request.
+        
+        Args:
+            documents: (contract id, contract text) pairs
+            compliance_checklist: Compliance requirements shared by every contract
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
+            contract_type: Optional contract type shared by the batch, used to trim the checklist
+            
+        Returns:
+            JSON string with a "results" array of per-contract analyses keyed by "contract_id"
+            
+        Raises:
+            APIError: If the API request fails or the deadline is exceeded
+            ResponseParsingError: If response cannot be parsed
+        """
+        logger.info(f"Starting batched compliance analysis of {len(documents)} contracts")
+        
+        prompt, system_message, budget = self.plan_batch_contract_analysis(
+            documents, compliance_checklist, contract_type
+        )
+        metrics.observe("ai_prompt_tokens", budget.prompt_tokens, provider="gemini")
+        record_budget("gemini", budget)
+        metrics.increment("ai_batched_contracts", len(documents), provider="gemini")
+        return await self._make_request_async(
+            prompt, system_message, timeout=timeout, max_tokens=budget.max_output_tokens, use_cache=use_cache
+        )
     
     def extract_contract_metadata(self, contract_text: str) -> str:
         """
@@ -207,7 +723,7 @@ class GeminiClient:
             logger.info("Performing Gemini client health check")
             # Simple test request
             test_prompt = "Return only the word 'healthy' as a JSON string."
-            response = self._make_request(test_prompt)
+            response = self._make_request(test_prompt, use_cache=False)
             logger.info("Health check passed")
             return True
         except Exception as e:
@@ -224,236 +740,45 @@ class GeminiClient:
         Returns:
             Cleaned JSON string
         """
-        # First, try to find complete JSON object in the response
-        json_pattern = r'\{.*?\}'
-        matches = re.findall(json_pattern, response_text, re.DOTALL)
-        
-        for match in matches:
-            try:
-                # Test if this is valid JSON
-                parsed = json.loads(match)
-                
-                # Check if it looks like a complete contract analysis response
-                if self._is_complete_analysis_response(parsed):
-                    # Normalize the compliance issues in the complete response
-                    normalized_response = self._normalize_complete_response(parsed)
-                    logger.debug(f"Found valid complete JSON in response (length: {len(match)})")
-                    return json.dumps(normalized_response)
-                elif self._is_partial_compliance_issue(parsed):
-                    # Wrap partial response in complete structure
-                    logger.debug(f"Found partial compliance issue, wrapping in complete structure")
-                    wrapped = self._wrap_partial_response(parsed)
-                    return json.dumps(wrapped)
-                else:
-                    logger.debug(f"Found valid JSON but unknown structure, using as-is")
-                    return match
-                    
-            except json.JSONDecodeError:
-                continue
-        
-        # If no complete JSON found, try to extract and repair incomplete JSON
-        lines = response_text.strip().split('\n')
-        json_lines = []
-        in_json = False
-        brace_count = 0
-        
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith('{') and not in_json:
-                in_json = True
-                brace_count = 1
-                json_lines.append(line)
-            elif in_json:
-                json_lines.append(line)
-                brace_count += stripped.count('{') - stripped.count('}')
-                
-                # If braces are balanced, we have complete JSON
-                if brace_count == 0:
-                    break
-        
-        if json_lines:
-            potential_json = '\n'.join(json_lines)
-            
-            # Try to parse as-is first
-            try:
-                parsed = json.loads(potential_json)
-                if self._is_partial_compliance_issue(parsed):
-                    wrapped = self._wrap_partial_response(parsed)
-                    return json.dumps(wrapped)
-                else:
-                    logger.debug(f"Extracted valid JSON by line parsing (length: {len(potential_json)})")
-                    return potential_json
-            except json.JSONDecodeError:
-                # Try to repair incomplete JSON
-                repaired_json = self._attempt_json_repair(potential_json)
-                if repaired_json:
-                    logger.debug(f"Successfully repaired incomplete JSON")
-                    return repaired_json
-        
-        # If all else fails, return a default structure with error message
-        logger.warning(f"Could not extract or repair JSON from response, returning fallback")
-        fallback = {
-            "summary": "Error: Could not parse AI response",
-            "flagged_clauses": [],
-            "compliance_issues": []
-        }
-        return json.dumps(fallback)
-    
-    def _is_complete_analysis_response(self, parsed_json: dict) -> bool:
-        """Check if JSON contains expected contract analysis structure."""
-        required_keys = {"summary", "flagged_clauses", "compliance_issues"}
-        return required_keys.issubset(set(parsed_json.keys()))
-    
-    def _is_partial_compliance_issue(self, parsed_json: dict) -> bool:
-        """Check if JSON looks like a single compliance issue object."""
-        compliance_issue_keys = {"law", "missing_requirements", "recommendations"}
-        return compliance_issue_keys.issubset(set(parsed_json.keys()))
-    
-    def _wrap_partial_response(self, partial_json: dict) -> dict:
-        """Wrap a partial compliance issue in the expected complete structure."""
-        # Normalize the compliance issue data
-        normalized_issue = self._normalize_compliance_issue(partial_json)
-        
-        return {
-            "summary": f"Contract analysis found issues with {partial_json.get('law', 'compliance requirements')}",
-            "flagged_clauses": [],
-            "compliance_issues": [normalized_issue]
-        }
-    
-    def _normalize_complete_response(self, response: dict) -> dict:
-        """Normalize a complete response to ensure proper data types."""
-        normalized = response.copy()
-        
-        # Normalize compliance issues
-        if "compliance_issues" in normalized and normalized["compliance_issues"]:
-            normalized_issues = []
-            for issue in normalized["compliance_issues"]:
-                normalized_issues.append(self._normalize_compliance_issue(issue))
-            normalized["compliance_issues"] = normalized_issues
-        
-        return normalized
-    
-    def _normalize_compliance_issue(self, issue: dict) -> dict:
-        """Normalize a compliance issue to ensure proper data types."""
-        normalized = issue.copy()
-        
-        # Ensure missing_requirements is a list
-        if "missing_requirements" in normalized:
-            req = normalized["missing_requirements"]
-            if isinstance(req, str):
-                # Convert single string to list
-                normalized["missing_requirements"] = [req] if req else []
-            elif not isinstance(req, list):
-                # Convert other types to list
-                normalized["missing_requirements"] = [str(req)]
-        
-        # Ensure recommendations is a list
-        if "recommendations" in normalized:
-            rec = normalized["recommendations"]
-            if isinstance(rec, str):
-                # Convert single string to list
-                normalized["recommendations"] = [rec] if rec else []
-            elif not isinstance(rec, list):
-                # Convert other types to list
-                normalized["recommendations"] = [str(rec)]
-        
-        return normalized
-    
-    def _attempt_json_repair(self, incomplete_json: str) -> str:
-        """
-        Attempt to repair incomplete JSON by adding missing closing braces/brackets.
+        return extract_analysis_json(response_text)
+    
+    def generate_text(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3,
+                      use_cache: bool = True) -> str:
+        """
+        Generate text using the Gemini AI model with custom parameters.
         
         Args:
-            incomplete_json: Potentially incomplete JSON string
+            prompt: The prompt to send to the model
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for text generation (0.0 to 1.0)
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
-            Repaired JSON string or None if repair failed
-        """
-        # Count open vs closed braces and brackets
-        open_braces = incomplete_json.count('{')
-        close_braces = incomplete_json.count('}')
-        open_brackets = incomplete_json.count('[')
-        close_brackets = incomplete_json.count(']')
-        
-        # Try to complete the JSON
-        repaired = incomplete_json.strip()
-        
-        # If we're missing closing brackets, add them
-        missing_brackets = open_brackets - close_brackets
-        missing_braces = open_braces - close_braces
-        
-        # Add missing closing brackets first
-        for _ in range(missing_brackets):
-            repaired += ']'
-        
-        # Add missing closing braces
-        for _ in range(missing_braces):
-            repaired += '}'
-        
-        # Test if the repair worked
-        try:
-            json.loads(repaired)
-            return repaired
-        except json.JSONDecodeError:
-            # If simple repair failed, try adding minimal structure
-            if incomplete_json.strip().endswith(','):
-                # Remove trailing comma and try again
-                repaired = incomplete_json.strip().rstrip(',')
-                for _ in range(missing_brackets):
-                    repaired += ']'
-                for _ in range(missing_braces):
-                    repaired += '}'
-                
-                try:
-                    json.loads(repaired)
-                    return repaired
-                except json.JSONDecodeError:
-                    pass
+            Generated text response
             
-            return None
-
-    def generate_text(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3) -> str:
+        Raises:
+            APIError: If the API request fails
         """
-        Generate text using the Gemini AI model with custom parameters.
+        return self._make_raw_request(prompt, max_tokens=max_tokens, temperature=temperature, use_cache=use_cache)
+    
+    async def generate_text_async(self, prompt: str, max_tokens: int = 200, temperature: float = 0.3,
+                                  timeout: Optional[float] = None, use_cache: bool = True) -> str:
+        """
+        Generate text without blocking the event loop.
         
         Args:
             prompt: The prompt to send to the model
             max_tokens: Maximum number of tokens to generate
             temperature: Temperature for text generation (0.0 to 1.0)
+            timeout: Optional per-request deadline in seconds
+            use_cache: If False, skip the response cache lookup (the fresh result is still stored)
             
         Returns:
             Generated text response
             
         Raises:
-            APIError: If the API request fails
+            APIError: If the API request fails or the deadline is exceeded
         """
-        try:
-            # Temporarily adjust configuration
-            original_max_tokens = self.config.max_tokens
-            original_temperature = self.config.temperature
-            
-            # Update config temporarily
-            self.config.max_tokens = max_tokens
-            self.config.temperature = temperature
-            
-            # Generate response
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.config.temperature,
-                    max_output_tokens=self.config.max_tokens
-                )
-            )
-            
-            # Restore original config
-            self.config.max_tokens = original_max_tokens
-            self.config.temperature = original_temperature
-            
-            if response and response.text:
-                return response.text
-            else:
-                raise APIError("No response text returned from Gemini")
-                
-        except Exception as e:
-            logger.error(f"Gemini API request failed: {e}")
-            raise APIError(f"Gemini API request failed: {e}")
\ No newline at end of file
+        return await self._make_raw_request_async(
+            prompt, max_tokens=max_tokens, temperature=temperature, timeout=timeout, use_cache=use_cache
+        )
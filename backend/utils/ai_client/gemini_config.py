@@ -16,6 +16,9 @@ class GeminiConfig:
     max_tokens: int = 8192  # Maximum allowed by Gemini
     top_p: float = 0.95
     timeout: int = 120  # Increased from 60 to 120 seconds for longer documents
+    max_workers: int = 16  # Size of the bounded pool running blocking SDK calls
+    use_native_async: bool = False  # Use the SDK's generate_content_async instead of the pool
+    stub_url: Optional[str] = None  # Send requests to a local stub server instead of Google
 
     @classmethod
     def from_environment(cls) -> 'GeminiConfig':
@@ -30,7 +33,10 @@ class GeminiConfig:
         
         return cls(
             api_key=api_key,
-            model_name=model_name
+            model_name=model_name,
+            max_workers=int(os.getenv("GEMINI_MAX_WORKERS", "16")),
+            use_native_async=os.getenv("GEMINI_NATIVE_ASYNC", "false").lower() in ("1", "true", "yes"),
+            stub_url=os.getenv("GEMINI_STUB_URL") or None
         )
 
     def validate(self) -> None:
@@ -44,4 +50,6 @@ class GeminiConfig:
         if self.max_tokens <= 0:
             raise ConfigurationError("Max tokens must be positive")
         if self.top_p <= 0 or self.top_p > 1:
-            raise ConfigurationError("Top-p must be between 0 and 1")
\ No newline at end of file
+            raise ConfigurationError("Top-p must be between 0 and 1")
+        if self.max_workers <= 0:
+            raise ConfigurationError("Max workers must be positive")
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Hedged requests across AI providers.
+
+A hedged call sends the request to the primary provider and, if no
+acceptable answer has arrived after a delay (normally a high percentile of
+the primary's recent latency), sends it to the secondary as well. The first
+acceptable answer wins and the other attempt is cancelled, trading a small
+amount of extra load for a much shorter latency tail.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .exceptions import APIError
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Histogram of successful upstream call latencies, labelled by provider
+UPSTREAM_LATENCY_METRIC = "ai_upstream_seconds"
+
+
+def hedge_delay(provider: str, percentile: float = 95.0, min_samples: int = 20,
+                default_delay: float = 10.0, min_delay: float = 0.5) -> float:
+    """
+    Delay before hedging a request to provider, from its recent latency.
+
+    Args:
+        provider: Primary provider name ("gemini", "watsonx")
+        percentile: Latency percentile (0-100) after which to hedge
+        min_samples: Samples needed before the histogram is trusted
+        default_delay: Delay used until enough samples exist
+        min_delay: Lower bound, so a run of cache-fast calls cannot hedge everything
+
+    Returns:
+        Delay in seconds
+    """
+    value, samples = metrics.percentile(UPSTREAM_LATENCY_METRIC, percentile, provider=provider)
+    if value is None or samples < min_samples:
+        return default_delay
+    return max(value, min_delay)
+
+
+async def hedged_call(primary: Callable[[], Awaitable[Any]],
+                      secondary: Optional[Callable[[], Awaitable[Any]]],
+                      delay: float,
+                      accept: Callable[[Any], bool] = lambda result: True,
+                      names: Tuple[str, str] = ("primary", "secondary")) -> Tuple[Any, str]:
+    """
+    Run primary, hedging to secondary after delay, and return the first acceptable result.
+
+    The secondary is also started straight away if the primary fails or returns
+    an unacceptable result before the delay. Whichever attempt is still running
+    when a winner is found is cancelled.
+
+    Args:
+        primary: Zero-argument callable returning the primary attempt
+        secondary: Zero-argument callable returning the hedge attempt, or None to disable hedging
+        delay: Seconds to wait for the primary before hedging
+        accept: Predicate deciding whether a result is usable
+        names: Labels of the two attempts for logs and metrics
+
+    Returns:
+        Tuple of (result, name of the attempt that produced it)
+
+    Raises:
+        The last attempt's error, or APIError if no attempt produced an acceptable result
+    """
+    attempts: Dict["asyncio.Future[Any]", str] = {asyncio.ensure_future(primary()): names[0]}
+    pending = set(attempts)
+    hedged = secondary is None
+    last_error: Optional[BaseException] = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=None if hedged else delay, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    logger.warning(f"{attempts[task]} attempt failed: {last_error}")
+                elif accept(task.result()):
+                    metrics.increment("ai_hedged_calls", winner=attempts[task], hedged=str(len(attempts) > 1).lower())
+                    return task.result(), attempts[task]
+                else:
+                    logger.warning(f"{attempts[task]} attempt returned an unusable result")
+
+            if not hedged:
+                # Primary is slow or has already failed: bring in the secondary
+                hedged = True
+                reason = "slow" if not done else "failed"
+                logger.info(f"Hedging request to {names[1]} ({names[0]} {reason})")
+                metrics.increment("ai_hedges_sent", reason=reason)
+                hedge = asyncio.ensure_future(secondary())
+                attempts[hedge] = names[1]
+                pending.add(hedge)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_error is not None:
+        raise last_error
+    raise APIError("No AI provider returned a usable response")
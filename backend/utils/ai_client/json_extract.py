@@ -0,0 +1,292 @@
+"""
+Extraction of JSON objects from LLM output.
+
+Model responses often wrap the JSON answer in prose or code fences, and long
+answers are sometimes cut off at the token limit. Objects are located by
+brace position and decoded with the C JSON decoder; when that fails, a
+scanner tracking strings, escapes and the stack of open containers tells
+prose in braces apart from a truncated answer and closes the latter at the
+last point where it was still valid JSON. The first outermost object wins,
+never a nested fragment of it.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_PARTIAL_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+FALLBACK_ANALYSIS = {
+    "summary": "Error: Could not parse AI response",
+    "flagged_clauses": [],
+    "compliance_issues": []
+}
+
+
+class _Candidate:
+    """Scan state of one top-level object: open containers and the last safe cut."""
+
+    __slots__ = ("start", "stack", "expect_key", "safe_end")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.stack: List[str] = ["{"]
+        # Per open object: True while the next string is a key
+        self.expect_key: List[bool] = [True]
+        self.safe_end = start + 1  # "{" + "}" is valid
+
+    def value_done(self, end: int) -> None:
+        """A complete value ended at end; the text up to here can be closed validly."""
+        self.safe_end = end
+
+    def closers(self) -> str:
+        return "".join(_CLOSERS[opener] for opener in reversed(self.stack))
+
+
+def scan_json_objects(text: str, start: int = 0) -> Iterator[Tuple[int, int, Optional[str]]]:
+    """
+    Yield the outermost JSON object candidates in text, in one pass.
+
+    Braces inside strings are ignored. A candidate containing prose or
+    mismatched brackets is abandoned and scanning resumes at the offending
+    character, so an object nested inside it can still be found.
+
+    Args:
+        text: Text that may contain JSON objects
+        start: Offset to start scanning from
+
+    Yields:
+        (start, end, closers): closers is None for a balanced object text[start:end];
+        for an object still open when the text ends, text[start:end] is its longest
+        prefix that can be closed validly and closers is the suffix that closes it
+    """
+    position = text.find("{", start)
+    while position >= 0:
+        end, closers, resume = _scan_object(text, position)
+        if end is not None:
+            yield position, end, closers
+        if closers is not None:
+            return
+        position = text.find("{", resume)
+
+
+def _scan_object(text: str, start: int) -> Tuple[Optional[int], Optional[str], int]:
+    """
+    Scan the object opening at text[start], jumping between structural characters.
+
+    Returns:
+        (end, None, end) for a balanced object; (safe end, closers, len(text)) for
+        an object cut off by the end of text; (None, None, resume offset) when the
+        braces turn out to hold something other than JSON
+    """
+    length = len(text)
+    candidate = _Candidate(start)
+    position = start + 1
+
+    while True:
+        match = _STRUCTURAL.search(text, position)
+        index = match.start() if match else length
+
+        # Bare token (number or literal) since the last structural character
+        token = text[position:index].rstrip()
+        if token and not token.isspace():
+            if not _is_scalar(token.lstrip()):
+                if match is None:
+                    break  # Cut off in the middle of a literal or number
+                return None, None, index  # Prose in braces, not JSON
+            candidate.value_done(position + len(token))
+        if match is None:
+            break
+
+        char = text[index]
+        top = candidate.stack[-1]
+        position = index + 1
+        if char == '"':
+            is_key = top == "{" and candidate.expect_key[-1]
+            end = _string_end(text, position)
+            if end < 0:
+                if not is_key:
+                    # Keep the partial value and close the string
+                    return _trim_partial_escape(text, start), '"' + candidate.closers(), length
+                break
+            if not is_key:
+                candidate.value_done(end + 1)
+            position = end + 1
+        elif char in "{[":
+            candidate.stack.append(char)
+            candidate.expect_key.append(char == "{")
+            candidate.value_done(position)
+        elif char in "}]":
+            if _CLOSERS[top] != char:
+                return None, None, index  # Mismatched brackets, not JSON
+            candidate.stack.pop()
+            candidate.expect_key.pop()
+            if not candidate.stack:
+                return position, None, position
+            candidate.value_done(position)
+        elif top == "{":
+            # "," starts the next key, ":" its value
+            candidate.expect_key[-1] = char == ","
+
+    return candidate.safe_end, candidate.closers(), length
+
+
+def _string_end(text: str, position: int) -> int:
+    """Index of the quote closing the string that starts at position, or -1 if it is cut off."""
+    while True:
+        match = _STRING_SPECIAL.search(text, position)
+        if match is None:
+            return -1
+        if match.group() == '"':
+            return match.start()
+        position = match.start() + 2  # Skip the escaped character
+        if position > len(text):
+            return -1
+
+
+def _trim_partial_escape(text: str, start: int) -> int:
+    """End of text for a cut-off string, dropping an escape sequence cut in half."""
+    length = len(text)
+    partial_escape = _PARTIAL_ESCAPE.search(text, max(start, length - 6))
+    if partial_escape and _escape_is_open(text, partial_escape.start()):
+        return partial_escape.start()
+    return length
+
+
+def _escape_is_open(text: str, backslash: int) -> bool:
+    """Whether the backslash at this index starts an escape (is not itself escaped)."""
+    preceding = 0
+    while backslash - preceding - 1 >= 0 and text[backslash - preceding - 1] == "\\":
+        preceding += 1
+    return preceding % 2 == 0
+
+
+def _is_scalar(token: str) -> bool:
+    """Whether token is a complete JSON number or literal."""
+    if token in ("true", "false", "null"):
+        return True
+    try:
+        json.loads(token)
+        return token[-1].isdigit()
+    except ValueError:
+        return False
+
+
+def extract_json_object(text: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Find the first outermost JSON object in text, repairing truncation.
+
+    Each opening brace is tried with the C decoder first, which handles
+    well-formed answers without a Python-level scan. If decoding fails, the
+    scanner decides whether the object was cut off (and closes it) or the braces
+    hold prose or malformed JSON, in which case the next brace is tried, so an
+    object nested inside still counts.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Tuple of (parsed object, its JSON text), or (None, None) if none was found
+    """
+    position = text.find("{")
+    while position >= 0:
+        try:
+            parsed, end = _DECODER.raw_decode(text, position)
+            return parsed, text[position:end]
+        except json.JSONDecodeError as error:
+            # Prose like "{placeholder}" fails at its first token; only scan spans
+            # that got further, which may be a truncated answer
+            if text[position + 1:error.pos].strip() or error.pos >= len(text):
+                end, closers, _ = _scan_object(text, position)
+            else:
+                closers = None
+            if closers is not None:
+                fragment = text[position:end] + closers
+                try:
+                    parsed = json.loads(fragment)
+                    logger.debug(f"Repaired truncated JSON by closing {len(closers)} containers")
+                    return parsed, fragment
+                except ValueError:
+                    pass
+        position = text.find("{", position + 1)
+    return None, None
+
+
+def extract_analysis_json(response_text: str) -> str:
+    """
+    Extract a contract analysis JSON string from a model response.
+
+    A complete analysis is normalised, a lone compliance issue is wrapped in the
+    analysis structure, any other object is returned as found, and a fallback
+    analysis is returned when no JSON object can be recovered.
+
+    Args:
+        response_text: Raw response from the AI model
+
+    Returns:
+        JSON string
+    """
+    parsed, raw = extract_json_object(response_text)
+    if parsed is None:
+        logger.warning("Could not extract or repair JSON from response, returning fallback")
+        return json.dumps(FALLBACK_ANALYSIS)
+
+    if is_complete_analysis_response(parsed):
+        logger.debug(f"Found valid complete JSON in response (length: {len(raw)})")
+        return json.dumps(normalize_complete_response(parsed))
+    if is_partial_compliance_issue(parsed):
+        logger.debug("Found partial compliance issue, wrapping in complete structure")
+        return json.dumps(wrap_partial_response(parsed))
+    logger.debug("Found valid JSON but unknown structure, using as-is")
+    return raw
+
+
+def is_complete_analysis_response(parsed_json: dict) -> bool:
+    """Check if JSON contains expected contract analysis structure."""
+    required_keys = {"summary", "flagged_clauses", "compliance_issues"}
+    return required_keys.issubset(set(parsed_json.keys()))
+
+
+def is_partial_compliance_issue(parsed_json: dict) -> bool:
+    """Check if JSON looks like a single compliance issue object."""
+    compliance_issue_keys = {"law", "missing_requirements", "recommendations"}
+    return compliance_issue_keys.issubset(set(parsed_json.keys()))
+
+
+def wrap_partial_response(partial_json: dict) -> dict:
+    """Wrap a partial compliance issue in the expected complete structure."""
+    return {
+        "summary": f"Contract analysis found issues with {partial_json.get('law', 'compliance requirements')}",
+        "flagged_clauses": [],
+        "compliance_issues": [normalize_compliance_issue(partial_json)]
+    }
+
+
+def normalize_complete_response(response: dict) -> dict:
+    """Normalize a complete response to ensure proper data types."""
+    normalized = response.copy()
+    if normalized.get("compliance_issues"):
+        normalized["compliance_issues"] = [
+            normalize_compliance_issue(issue) for issue in normalized["compliance_issues"]
+        ]
+    return normalized
+
+
+def normalize_compliance_issue(issue: dict) -> dict:
+    """Normalize a compliance issue so list fields are always lists."""
+    normalized = issue.copy()
+    for key in ("missing_requirements", "recommendations"):
+        if key in normalized:
+            value = normalized[key]
+            if isinstance(value, str):
+                normalized[key] = [value] if value else []
+            elif not isinstance(value, list):
+                normalized[key] = [str(value)]
+    return normalized
@@ -0,0 +1,124 @@
+"""
+Lightweight in-process metrics for AI client components.
+
+Counters, gauges and histograms are kept in a single process-wide registry
+and exposed as a plain dictionary snapshot for health and metrics endpoints.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+HISTOGRAM_WINDOW = 1024  # Recent samples kept per histogram for percentile estimates
+
+
+def _metric_key(name: str, labels: Dict[str, Any]) -> str:
+    """Build a stable metric key such as 'ai_requests{provider=gemini}'."""
+    if not labels:
+        return name
+    label_str = ",".join(f"{key}={labels[key]}" for key in sorted(labels))
+    return f"{name}{{{label_str}}}"
+
+
+class Histogram:
+    """Running count/sum plus a bounded window of recent samples."""
+
+    def __init__(self, window: int = HISTOGRAM_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the given percentile (0-100) of the recent samples, or None if empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """Increase a counter."""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to an absolute value."""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_gauge(self, name: str, delta: float, **labels) -> None:
+        """Move a gauge up or down by delta."""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a histogram sample."""
+        key = _metric_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_metric_key(name, labels), 0)
+
+    def get_gauge(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._gauges.get(_metric_key(name, labels), 0)
+
+    def percentile(self, name: str, pct: float, **labels) -> Tuple[Optional[float], int]:
+        """Return (percentile value, sample count) for a histogram."""
+        with self._lock:
+            histogram = self._histograms.get(_metric_key(name, labels))
+            if histogram is None:
+                return None, 0
+            return histogram.percentile(pct), len(histogram.samples)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable copy of all metrics."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: hist.summary() for key, hist in self._histograms.items()}
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics (used by tests)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+# Process-wide registry shared by all AI client components
+metrics = MetricsRegistry()
@@ -1,5 +1,67 @@
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from .tokens import (
+    BATCH_OUTPUT_TOKENS_PER_CONTRACT, MIN_OUTPUT_TOKENS, TokenBudget, compact_json, context_window,
+    estimate_tokens, trim_checklist
+)
+
+# Shared by single-contract and batched analysis prompts
+ANALYSIS_INSTRUCTIONS = """ANALYSIS INSTRUCTIONS:
+
+1. READ THE ENTIRE CONTRACT CAREFULLY
+   - Identify the contract type and business relationship
+   - Determine if personal data is actually processed
+   - Identify the governing jurisdiction
+   - Note the parties and their roles
+
+2. DETERMINE APPLICABLE LAWS
+   Based on what you read, apply ONLY relevant legal frameworks:
+   
+   IF this is a data processing agreement OR privacy policy OR contains personal data collection:
+   → Apply GDPR/PDPA requirements
+   
+   IF this is an employment contract OR contractor agreement with employment-like terms:
+   → Apply employment law requirements
+   
+   FOR ALL contracts:
+   → Apply general contract law principles
+
+3. IDENTIFY GENUINE VIOLATIONS ONLY
+   Look for specific clauses that violate mandatory legal requirements:
+   
+   For Data Processing (if applicable):
+   ✓ Check for proper consent mechanisms
+   ✓ Verify lawful basis for processing
+   ✓ Ensure data subject rights are addressed
+   ✓ Check cross-border transfer safeguards
+   ✓ Verify breach notification procedures
+   ✓ Check security measures
+   
+   For Employment (if applicable):
+   ✓ Verify termination notice periods meet minimums
+   ✓ Check overtime and working time compliance
+   ✓ Ensure minimum wage compliance
+   ✓ Verify leave entitlements
+   
+   For All Contracts:
+   ✓ Check liability limitations are reasonable
+   ✓ Ensure termination clauses are fair
+   ✓ Verify indemnification is balanced
+   ✓ Check for unconscionable terms
+
+4. EXTRACT CLEAN CLAUSE TEXT
+   When flagging problematic clauses:
+   - Remove all markdown formatting (\n, **, ##, etc.)
+   - Provide the exact problematic text in readable format
+   - Keep clause text concise but complete
+
+5. ASSESS SEVERITY ACCURATELY
+   - HIGH: Violates mandatory law with serious penalties
+   - MEDIUM: Non-compliance with guidance or best practices  
+   - LOW: Minor technical issues
+
+IMPORTANT: If the contract is a simple service agreement with no personal data processing, do NOT flag PDPA violations. If it's not an employment contract, do NOT flag employment law issues."""
 
 
 class PromptFormatter:
@@ -180,8 +242,157 @@ Analyze carefully and return complete JSON response:"""
         """
         # Clean the contract text for better analysis
         cleaned_contract = PromptFormatter._clean_contract_text(contract_text)
-        checklist_str = json.dumps(compliance_checklist, indent=2)
+        checklist_str = compact_json(compliance_checklist)
+        
+        return PromptFormatter._render_contract_analysis_prompt(cleaned_contract, checklist_str)
+    
+    @staticmethod
+    def build_budgeted_contract_analysis_prompt(contract_text: str, compliance_checklist: Dict[str, Any],
+                                                model_id: str, max_output_tokens: int,
+                                                system_message: Optional[str] = None,
+                                                contract_type: Optional[str] = None) -> Tuple[str, TokenBudget]:
+        """
+        Build the contract analysis prompt so that prompt and answer fit the model's context.
+        
+        The checklist is trimmed to the detected contract type and compacted; if the
+        prompt is still too large the checklist is trimmed further, then the contract
+        text is shortened. The output allowance is capped to the space left over.
+        
+        Args:
+            contract_text: The contract text to analyze
+            compliance_checklist: Compliance requirements to check against
+            model_id: Model the prompt is for (selects the context window)
+            max_output_tokens: Configured maximum number of generated tokens
+            system_message: System message sent with the prompt
+            contract_type: Detected contract type used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, token budget)
+        """
+        window = context_window(model_id)
+        system_tokens = estimate_tokens(system_message or "")
+        cleaned_contract = PromptFormatter._clean_contract_text(contract_text)
+        instruction_tokens = estimate_tokens(PromptFormatter._render_contract_analysis_prompt("", ""))
+        # Leave room for at least a minimal answer
+        input_allowance = window - min(max_output_tokens, MIN_OUTPUT_TOKENS)
+        
+        contract_tokens = estimate_tokens(cleaned_contract)
+        for level in range(3):
+            checklist_str = compact_json(trim_checklist(compliance_checklist, contract_type, level))
+            checklist_tokens = estimate_tokens(checklist_str)
+            if system_tokens + instruction_tokens + checklist_tokens + contract_tokens <= input_allowance:
+                break
+        
+        contract_truncated = False
+        contract_allowance = input_allowance - system_tokens - instruction_tokens - checklist_tokens
+        if contract_tokens > contract_allowance:
+            # Shrink proportionally, keeping the head and tail like _clean_contract_text does
+            max_chars = max(int(len(cleaned_contract) * max(contract_allowance, 0) / contract_tokens) - 64, 0)
+            cleaned_contract = PromptFormatter._clean_contract_text(cleaned_contract, max_chars=max_chars)
+            contract_tokens = estimate_tokens(cleaned_contract)
+            contract_truncated = True
+        
+        prompt = PromptFormatter._render_contract_analysis_prompt(cleaned_contract, checklist_str)
+        budget = TokenBudget(
+            model=model_id,
+            context_window=window,
+            system_tokens=system_tokens,
+            instruction_tokens=instruction_tokens,
+            checklist_tokens=checklist_tokens,
+            contract_tokens=contract_tokens,
+            checklist_trim_level=level,
+            contract_truncated=contract_truncated
+        )
+        budget.max_output_tokens = max(min(max_output_tokens, window - budget.prompt_tokens), 0)
+        return prompt, budget
+    
+    @staticmethod
+    def build_batch_contract_analysis_prompt(documents: List[Tuple[str, str]], compliance_checklist: Dict[str, Any],
+                                             model_id: str, max_output_tokens: int,
+                                             system_message: Optional[str] = None,
+                                             contract_type: Optional[str] = None) -> Tuple[str, TokenBudget]:
+        """
+        Build one analysis prompt for several short contracts sharing a checklist.
+        
+        Each contract is wrapped in delimiters carrying its id and the model is asked
+        for a "results" array with one analysis per id, so the instructions and the
+        checklist are sent once for the whole batch. Contracts are never shortened;
+        callers check the returned budget (see TokenBudget.fits_batch) and send
+        smaller batches when it does not fit.
+        
+        Args:
+            documents: (contract id, contract text) pairs
+            compliance_checklist: Compliance requirements shared by every contract
+            model_id: Model the prompt is for (selects the context window)
+            max_output_tokens: Configured maximum number of generated tokens
+            system_message: System message sent with the prompt
+            contract_type: Detected contract type shared by the batch, used to trim the checklist
+            
+        Returns:
+            Tuple of (prompt, token budget)
+        """
+        window = context_window(model_id)
+        system_tokens = estimate_tokens(system_message or "")
+        contracts_block = "\n\n".join(
+            f"<<<CONTRACT {contract_id}>>>\n"
+            f"{PromptFormatter._clean_contract_text(text).replace('<<<', '<<')}\n"
+            f"<<<END CONTRACT {contract_id}>>>"
+            for contract_id, text in documents
+        )
+        contract_tokens = estimate_tokens(contracts_block)
+        instruction_tokens = estimate_tokens(
+            PromptFormatter._render_batch_analysis_prompt("", "", [contract_id for contract_id, _ in documents])
+        )
+        output_allowance = min(max_output_tokens, BATCH_OUTPUT_TOKENS_PER_CONTRACT * len(documents))
+        input_allowance = window - output_allowance
+        
+        for level in range(3):
+            checklist_str = compact_json(trim_checklist(compliance_checklist, contract_type, level))
+            checklist_tokens = estimate_tokens(checklist_str)
+            if system_tokens + instruction_tokens + checklist_tokens + contract_tokens <= input_allowance:
+                break
         
+        prompt = PromptFormatter._render_batch_analysis_prompt(
+            contracts_block, checklist_str, [contract_id for contract_id, _ in documents]
+        )
+        budget = TokenBudget(
+            model=model_id,
+            context_window=window,
+            system_tokens=system_tokens,
+            instruction_tokens=instruction_tokens,
+            checklist_tokens=checklist_tokens,
+            contract_tokens=contract_tokens,
+            checklist_trim_level=level
+        )
+        budget.max_output_tokens = max(min(max_output_tokens, window - budget.prompt_tokens), 0)
+        return prompt, budget
+    
+    @staticmethod
+    def _render_batch_analysis_prompt(contracts_block: str, checklist_str: str, contract_ids: List[str]) -> str:
+        """Fill the analysis instructions for a delimited batch of contracts."""
+        ids = ", ".join(contract_ids)
+        return f"""LEGAL COMPLIANCE ANALYSIS TASK - BATCH OF {len(contract_ids)} CONTRACTS
+
+Each contract below is enclosed between <<<CONTRACT id>>> and <<<END CONTRACT id>>>.
+Analyze every contract independently and never attribute a clause to another contract.
+
+CONTRACTS TO ANALYZE:
+{contracts_block}
+
+APPLICABLE LEGAL REQUIREMENTS (shared by all contracts):
+{checklist_str}
+
+{ANALYSIS_INSTRUCTIONS}
+
+BATCH RESPONSE FORMAT (replaces the single-contract format):
+Return ONE JSON object with a "results" array containing exactly one entry per contract ({ids}), in order:
+{{"results": [{{"contract_id": "<id>", "summary": "...", "flagged_clauses": [...], "compliance_issues": [...]}}]}}
+
+Provide your analysis as valid JSON only."""
+    
+    @staticmethod
+    def _render_contract_analysis_prompt(cleaned_contract: str, checklist_str: str) -> str:
+        """Fill the contract analysis instructions with a prepared contract and checklist."""
         return f"""LEGAL COMPLIANCE ANALYSIS TASK
 
 CONTRACT TO ANALYZE:
@@ -192,71 +403,18 @@ CONTRACT TO ANALYZE:
 APPLICABLE LEGAL REQUIREMENTS:
 {checklist_str}
 
-ANALYSIS INSTRUCTIONS:
-
-1. READ THE ENTIRE CONTRACT CAREFULLY
-   - Identify the contract type and business relationship
-   - Determine if personal data is actually processed
-   - Identify the governing jurisdiction
-   - Note the parties and their roles
-
-2. DETERMINE APPLICABLE LAWS
-   Based on what you read, apply ONLY relevant legal frameworks:
-   
-   IF this is a data processing agreement OR privacy policy OR contains personal data collection:
-   → Apply GDPR/PDPA requirements
-   
-   IF this is an employment contract OR contractor agreement with employment-like terms:
-   → Apply employment law requirements
-   
-   FOR ALL contracts:
-   → Apply general contract law principles
-
-3. IDENTIFY GENUINE VIOLATIONS ONLY
-   Look for specific clauses that violate mandatory legal requirements:
-   
-   For Data Processing (if applicable):
-   ✓ Check for proper consent mechanisms
-   ✓ Verify lawful basis for processing
-   ✓ Ensure data subject rights are addressed
-   ✓ Check cross-border transfer safeguards
-   ✓ Verify breach notification procedures
-   ✓ Check security measures
-   
-   For Employment (if applicable):
-   ✓ Verify termination notice periods meet minimums
-   ✓ Check overtime and working time compliance
-   ✓ Ensure minimum wage compliance
-   ✓ Verify leave entitlements
-   
-   For All Contracts:
-   ✓ Check liability limitations are reasonable
-   ✓ Ensure termination clauses are fair
-   ✓ Verify indemnification is balanced
-   ✓ Check for unconscionable terms
-
-4. EXTRACT CLEAN CLAUSE TEXT
-   When flagging problematic clauses:
-   - Remove all markdown formatting (\n, **, ##, etc.)
-   - Provide the exact problematic text in readable format
-   - Keep clause text concise but complete
-
-5. ASSESS SEVERITY ACCURATELY
-   - HIGH: Violates mandatory law with serious penalties
-   - MEDIUM: Non-compliance with guidance or best practices  
-   - LOW: Minor technical issues
-
-IMPORTANT: If the contract is a simple service agreement with no personal data processing, do NOT flag PDPA violations. If it's not an employment contract, do NOT flag employment law issues.
+{ANALYSIS_INSTRUCTIONS}
 
 Provide your analysis as valid JSON only."""
     
     @staticmethod
-    def _clean_contract_text(contract_text: str) -> str:
+    def _clean_contract_text(contract_text: str, max_chars: int = 8000) -> str:
         """
         Clean contract text to remove excessive whitespace and formatting issues.
         
         Args:
             contract_text: Raw contract text
+            max_chars: Length above which the middle of the contract is dropped
             
         Returns:
             Cleaned contract text
@@ -274,10 +432,10 @@ Provide your analysis as valid JSON only."""
         cleaned = '\n'.join(cleaned_lines)
         
         # If contract is very long, truncate but ensure we keep important parts
-        if len(cleaned) > 8000:  # Reasonable limit for analysis
+        if len(cleaned) > max_chars:  # Reasonable limit for analysis
             # Try to keep the beginning and end, which often contain key terms
-            first_half = cleaned[:4000]
-            last_half = cleaned[-4000:]
+            first_half = cleaned[:max_chars // 2]
+            last_half = cleaned[-(max_chars // 2):] if max_chars >= 2 else ""
             cleaned = first_half + "\n\n[... middle section truncated ...]\n\n" + last_half
         
         return cleaned
@@ -0,0 +1,347 @@
+"""
+Per-provider request and token rate limiting for AI calls.
+
+Providers enforce requests-per-minute and tokens-per-minute quotas and answer
+429 once either is exceeded; bulk runs used to hit them and then retry in
+bursts. A RateLimiter keeps one token bucket per quota, shared by every
+client of the provider in the process, and queues callers that would exceed
+it. Waiting callers are served strictly by priority, then arrival order, so
+interactive analyses overtake queued bulk jobs.
+
+The priority of a call comes from the request_priority() context, which
+asyncio tasks inherit from the code that created them.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_URGENT = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_URGENT: "urgent", PRIORITY_BULK: "bulk"}
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("ai_request_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """
+    Run AI calls made inside the block (and tasks created in it) at a priority.
+
+    Args:
+        priority: PRIORITY_INTERACTIVE, PRIORITY_URGENT or PRIORITY_BULK
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """Priority of AI calls made in the current context."""
+    return _priority.get()
+
+
+class _TokenBucket:
+    """Continuously refilled bucket holding at most burst_seconds worth of a per-minute rate."""
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount can be taken. Amounts above capacity wait for a full bucket."""
+        needed = min(amount, self.capacity)
+        return max(needed - self.level, 0.0) / self.rate
+
+
+class _Waiter:
+    """A queued caller: ordered by priority, then arrival."""
+
+    __slots__ = ("priority", "sequence", "tokens", "wake")
+
+    def __init__(self, priority: int, sequence: int, tokens: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.sequence = sequence
+        self.tokens = tokens
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one AI provider.
+
+    Callers acquire one request and an estimate of their prompt tokens before
+    calling the provider, and charge the generated tokens once the answer is
+    known; charges may drive the token bucket negative, which delays the next
+    callers. Only the first caller in the priority queue may take from the
+    buckets; it sleeps until they hold enough, the others until they reach the
+    front. A quota set to 0 is not limited.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 burst_seconds: float = 10.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            name: Provider name used in logs and metrics
+            requests_per_minute: Request quota, 0 for none
+            tokens_per_minute: Token quota (prompt plus generated tokens), 0 for none
+            burst_seconds: Seconds of quota that may be used at once after an idle period
+        """
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.burst_seconds = burst_seconds
+
+        self._lock = threading.Lock()
+        self._requests = _TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute > 0 else None
+        self._tokens = _TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute > 0 else None
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_environment(cls, name: str) -> 'RateLimiter':
+        """Create a limiter from <NAME>_RATE_LIMIT_RPM / _TPM and AI_RATE_LIMIT_BURST_SECONDS."""
+        prefix = name.upper()
+        return cls(
+            name,
+            requests_per_minute=float(os.getenv(f"{prefix}_RATE_LIMIT_RPM", "0")),
+            tokens_per_minute=float(os.getenv(f"{prefix}_RATE_LIMIT_TPM", "0")),
+            burst_seconds=float(os.getenv("AI_RATE_LIMIT_BURST_SECONDS", "10"))
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    async def acquire(self, tokens: int = 0, priority: Optional[int] = None) -> float:
+        """
+        Wait for the quota to send one request with this many prompt tokens.
+
+        Cancelling the caller (for example when its deadline passes) leaves the queue.
+
+        Args:
+            tokens: Estimated prompt tokens of the request
+            priority: Queue priority; defaults to the request_priority() context
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake() -> None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # The waiter's loop has closed
+
+        started = time.monotonic()
+        waiter = self._enqueue(tokens, priority, wake)
+        try:
+            while True:
+                event.clear()
+                granted, delay = self._poll(waiter)
+                if granted:
+                    break
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._leave(waiter)
+            raise
+        return self._granted(waiter, started)
+
+    def acquire_blocking(self, tokens: int = 0, priority: Optional[int] = None) -> float:
+        """
+        Blocking variant of acquire for calls made from worker threads.
+
+        Args:
+            tokens: Estimated prompt tokens of the request
+            priority: Queue priority; defaults to the request_priority() context
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+        event = threading.Event()
+        started = time.monotonic()
+        waiter = self._enqueue(tokens, priority, event.set)
+        try:
+            while True:
+                event.clear()
+                granted, delay = self._poll(waiter)
+                if granted:
+                    break
+                event.wait(delay)
+        except BaseException:
+            self._leave(waiter)
+            raise
+        return self._granted(waiter, started)
+
+    def charge(self, tokens: int) -> None:
+        """
+        Take generated tokens from the token quota once a response is known.
+
+        Args:
+            tokens: Estimated tokens of the generated text
+        """
+        if self._tokens is None or tokens <= 0:
+            return
+        with self._lock:
+            self._tokens.refill(time.monotonic())
+            self._tokens.level -= tokens
+
+    def _enqueue(self, tokens: int, priority: Optional[int], wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(current_priority() if priority is None else priority, next(self._sequence), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+            depth = len(self._waiters)
+        metrics.set_gauge("ai_rate_limit_queue_depth", depth, provider=self.name)
+        return waiter
+
+    def _poll(self, waiter: _Waiter) -> Tuple[bool, Optional[float]]:
+        """
+        Grant the waiter its quota if it is first in line and the buckets allow.
+
+        Returns:
+            (granted, seconds to sleep before polling again; None to sleep until woken)
+        """
+        with self._lock:
+            if self._waiters[0] is not waiter:
+                return False, None
+            now = time.monotonic()
+            delay = 0.0
+            for bucket, amount in ((self._requests, 1), (self._tokens, waiter.tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    delay = max(delay, bucket.delay(amount))
+            if delay > 0:
+                return False, delay
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= waiter.tokens
+            heapq.heappop(self._waiters)
+            head = self._waiters[0] if self._waiters else None
+        if head is not None:
+            head.wake()
+        return True, 0.0
+
+    def _leave(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up and let the next one in line check the buckets."""
+        with self._lock:
+            if waiter not in self._waiters:
+                return
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            head = self._waiters[0] if self._waiters else None
+            depth = len(self._waiters)
+        metrics.set_gauge("ai_rate_limit_queue_depth", depth, provider=self.name)
+        if head is not None:
+            head.wake()
+
+    def _granted(self, waiter: _Waiter, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._lock:
+            depth = len(self._waiters)
+        metrics.set_gauge("ai_rate_limit_queue_depth", depth, provider=self.name)
+        metrics.observe("ai_rate_limit_wait_seconds", waited, provider=self.name,
+                        priority=PRIORITY_NAMES.get(waiter.priority, waiter.priority))
+        if waited >= 1.0:
+            logger.debug(f"{self.name} rate limit delayed a request by {waited:.2f}s")
+        return waited
+
+    def reset(self) -> None:
+        """Refill both buckets (queued callers are re-checked)."""
+        with self._lock:
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.level = bucket.capacity
+                    bucket.updated = time.monotonic()
+            head = self._waiters[0] if self._waiters else None
+        if head is not None:
+            head.wake()
+
+    def stats(self) -> Dict[str, Any]:
+        """Quotas, bucket levels and queue depth for health and metrics endpoints."""
+        with self._lock:
+            now = time.monotonic()
+            stats: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "queued": len(self._waiters)
+            }
+            for key, bucket in (("available_requests", self._requests), ("available_tokens", self._tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    stats[key] = round(bucket.level, 1)
+            return stats
+
+
+_registry_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a provider, creating it from the environment on first use.
+
+    Args:
+        name: Provider name ("gemini", "watsonx")
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    with _registry_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = RateLimiter.from_environment(name)
+        return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """State of every registered rate limiter."""
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+def reset_rate_limiters() -> None:
+    """Refill every registered rate limiter (used by tests)."""
+    with _registry_lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limiter.reset()
@@ -0,0 +1,117 @@
+"""
+Recording of real AI responses for offline replay.
+
+When AI_RECORD_PATH is set, every response received from an upstream provider
+is appended to that JSON Lines file together with a fingerprint of the exact
+prompt sent. The stub server (stub_server.py) can load the file and answer
+identical prompts with the recorded responses, so load tests and CI runs
+reproduce real model output without calling IBM or Google.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """
+    Fingerprint of the prompt text exactly as sent to the provider.
+
+    Args:
+        prompt: Provider-level prompt (WatsonX "input" or the combined Gemini prompt)
+
+    Returns:
+        Hex SHA-256 digest of the prompt
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class ResponseRecorder:
+    """Append-only JSON Lines recorder of (provider, prompt fingerprint, response)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: JSON Lines file to append recordings to (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def record(self, provider: str, model: str, prompt: str, response: str) -> None:
+        """
+        Append one upstream response.
+
+        Args:
+            provider: Provider name ("gemini", "watsonx")
+            model: Model identifier
+            prompt: Prompt exactly as sent to the provider
+            response: Raw generated text returned by the provider
+        """
+        line = json.dumps({
+            "provider": provider,
+            "model": model,
+            "prompt_sha256": prompt_fingerprint(prompt),
+            "prompt_chars": len(prompt),
+            "response": response,
+            "recorded_at": time.time()
+        }, ensure_ascii=False)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Could not record AI response to {self.path}: {e}")
+
+
+def load_recordings(path: str) -> Dict[str, str]:
+    """
+    Load recorded responses keyed by prompt fingerprint.
+
+    Later recordings of the same prompt replace earlier ones; malformed lines
+    are skipped.
+
+    Args:
+        path: JSON Lines file written by ResponseRecorder
+
+    Returns:
+        Mapping of prompt fingerprint to response text
+    """
+    recordings: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                recordings[entry["prompt_sha256"]] = entry["response"]
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping malformed recording on line {line_number} of {path}")
+    return recordings
+
+
+_recorder_lock = threading.Lock()
+_recorder: Optional[ResponseRecorder] = None
+_recorder_path: Optional[str] = None
+
+
+def get_recorder() -> Optional[ResponseRecorder]:
+    """Get the process-wide recorder for AI_RECORD_PATH, or None when recording is off."""
+    global _recorder, _recorder_path
+    path = os.getenv("AI_RECORD_PATH") or None
+    with _recorder_lock:
+        if path != _recorder_path:
+            _recorder = ResponseRecorder(path) if path else None
+            _recorder_path = path
+            if path:
+                logger.info(f"Recording AI responses to {path}")
+        return _recorder
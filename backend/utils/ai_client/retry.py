@@ -0,0 +1,263 @@
+"""
+Retries of transient AI provider failures.
+
+Throttling (429), unavailable or overloaded upstreams (5xx) and timeouts
+usually clear within seconds, but a failed analysis falls back to heuristic
+analysis. A RetryPolicy retries such failures a bounded number of times with
+full-jitter exponential backoff, waits as long as the provider asks in a
+Retry-After header, and never sleeps past the caller's deadline.
+"""
+
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from .exceptions import APIError, CircuitOpenError
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the provider did not process the request, safe to resend
+# even for calls that must not run twice
+REJECTED_STATUSES = frozenset({429, 503})
+# Statuses worth retrying for idempotent calls (the first attempt may have run)
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delay-seconds or HTTP date).
+
+    Args:
+        value: Header value, or None
+
+    Returns:
+        Non-negative seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def is_retryable(error: BaseException, idempotent: bool = True) -> bool:
+    """
+    Whether a failed call may be sent again.
+
+    Args:
+        error: Error raised by the attempt
+        idempotent: Whether repeating a call that reached the provider is harmless
+
+    Returns:
+        True for throttling, transient upstream errors and transport failures
+    """
+    if isinstance(error, CircuitOpenError) or not isinstance(error, APIError):
+        return False
+    if error.status_code is None:
+        return idempotent  # Transport failure; the request may have been received
+    return error.status_code in (TRANSIENT_STATUSES if idempotent else REJECTED_STATUSES)
+
+
+class RetryPolicy:
+    """
+    Bounded retries with full-jitter exponential backoff.
+
+    Attempt n (from 0) that fails is retried after a random delay between 0 and
+    min(max_delay, base_delay * 2**n), or after the provider's Retry-After when
+    it sent one. A retry whose delay would end past the deadline is not made;
+    the last error is raised instead.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 max_retry_after: float = 30.0, enabled: bool = True):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_attempts: Total attempts per call, including the first
+            base_delay: Backoff ceiling in seconds for the first retry
+            max_delay: Upper bound of the backoff ceiling
+            max_retry_after: Longest Retry-After honoured; longer requests are not retried
+            enabled: If False, every call is attempted once
+        """
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.enabled = enabled
+
+    @classmethod
+    def from_environment(cls) -> 'RetryPolicy':
+        """Create a policy from AI_RETRY_* environment variables."""
+        return cls(
+            max_attempts=int(os.getenv("AI_RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("AI_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("AI_RETRY_MAX_DELAY", "8")),
+            max_retry_after=float(os.getenv("AI_RETRY_MAX_RETRY_AFTER", "30")),
+            enabled=os.getenv("AI_RETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    def backoff(self, attempt: int, error: BaseException) -> Optional[float]:
+        """
+        Delay before retrying a failed attempt.
+
+        Args:
+            attempt: Index of the failed attempt (0 for the first)
+            error: Error raised by the attempt
+
+        Returns:
+            Seconds to wait, or None if the provider asked for a longer wait than max_retry_after
+        """
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _next_delay(self, attempt: int, error: BaseException, idempotent: bool,
+                    deadline: Optional[float], now: float, provider: str) -> Optional[float]:
+        """Delay before the next attempt, or None to give up and raise error."""
+        if not self.enabled or not is_retryable(error, idempotent):
+            return None
+        delay = self.backoff(attempt, error)
+        if attempt + 1 >= self.max_attempts:
+            reason = "attempts"
+        elif delay is None:
+            reason = "retry_after"
+        elif deadline is not None and now + delay >= deadline:
+            reason = "deadline"
+        else:
+            status = getattr(error, "status_code", None)
+            metrics.increment("ai_retries", provider=provider, status=status if status is not None else "transport")
+            logger.warning(f"{provider} call failed ({error}); retry {attempt + 1}/{self.max_attempts - 1} in {delay:.2f}s")
+            return delay
+        metrics.increment("ai_retry_giveups", provider=provider, reason=reason)
+        return None
+
+    def _finish(self, attempts: int, provider: str) -> None:
+        metrics.observe("ai_call_attempts", attempts, provider=provider)
+
+    async def call_async(self, coro_factory: Callable[[], Awaitable[Any]], provider: str,
+                         deadline: Optional[float] = None, idempotent: bool = True) -> Any:
+        """
+        Run a coroutine, retrying transient failures.
+
+        Args:
+            coro_factory: Creates a fresh attempt
+            provider: Provider name for logs and metrics
+            deadline: time.monotonic() value after which no retry is started
+            idempotent: Whether an attempt that reached the provider may be repeated
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: Error of the last attempt
+        """
+        attempt = 0
+        while True:
+            try:
+                result = await coro_factory()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, idempotent, deadline, time.monotonic(), provider)
+                if delay is None:
+                    self._finish(attempt + 1, provider)
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._finish(attempt + 1, provider)
+            return result
+
+    def call(self, func: Callable[[], Any], provider: str, deadline: Optional[float] = None,
+             idempotent: bool = True) -> Any:
+        """
+        Blocking variant of call_async.
+
+        Raises:
+            Exception: Error of the last attempt
+        """
+        attempt = 0
+        while True:
+            try:
+                result = func()
+            except Exception as e:
+                delay = self._next_delay(attempt, e, idempotent, deadline, time.monotonic(), provider)
+                if delay is None:
+                    self._finish(attempt + 1, provider)
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._finish(attempt + 1, provider)
+            return result
+
+    async def stream_async(self, stream_factory: Callable[[], AsyncIterator[Any]], provider: str,
+                           deadline: Optional[float] = None, idempotent: bool = True) -> AsyncIterator[Any]:
+        """
+        Relay a stream, retrying it while it fails before yielding anything.
+
+        Once an item has been passed on, a failure is raised as is: the
+        consumer has already seen part of the answer.
+
+        Raises:
+            Exception: Error of the last attempt
+        """
+        attempt = 0
+        while True:
+            started = False
+            stream = stream_factory()
+            try:
+                async for item in stream:
+                    started = True
+                    yield item
+            except Exception as e:
+                delay = None if started else self._next_delay(
+                    attempt, e, idempotent, deadline, time.monotonic(), provider
+                )
+                if delay is None:
+                    self._finish(attempt + 1, provider)
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                close = getattr(stream, "aclose", None)
+                if close is not None:
+                    await close()
+            self._finish(attempt + 1, provider)
+            return
+
+
+_registry_lock = threading.Lock()
+_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """
+    Get the process-wide retry policy, creating it from the environment on first use.
+
+    Returns:
+        Shared RetryPolicy instance
+    """
+    global _policy
+    with _registry_lock:
+        if _policy is None:
+            _policy = RetryPolicy.from_environment()
+        return _policy
@@ -0,0 +1,154 @@
+"""
+Single-flight coalescing of identical in-flight AI requests.
+
+When several callers issue the same generation request at once (double
+submits, duplicate contracts in a bulk job), only the first one calls the
+provider; the rest wait for and share its result or error.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _AsyncCall:
+    """Shared upstream task and the number of callers still waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce identical coroutine calls on the running event loop.
+
+    The shared call runs as its own task and each caller awaits it through
+    asyncio.shield, so one caller being cancelled (or timing out) does not
+    cancel the call for the others. The call is cancelled only when every
+    caller has gone away.
+    """
+
+    def __init__(self, name: str = "ai"):
+        self.name = name
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _AsyncCall]]" = weakref.WeakKeyDictionary()
+
+    def _loop_calls(self) -> Dict[str, _AsyncCall]:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.get(loop)
+        if calls is None:
+            calls = self._calls[loop] = {}
+        return calls
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running on this loop."""
+        return len(self._loop_calls())
+
+    async def do(self, key: str, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run coro_factory() once per key, sharing the outcome with concurrent callers.
+
+        Args:
+            key: Identity of the request (usually the response cache key)
+            coro_factory: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            Result of the shared call
+
+        Raises:
+            Whatever the shared call raised, re-raised in every caller
+        """
+        calls = self._loop_calls()
+        call = calls.get(key)
+        if call is None:
+            call = calls[key] = _AsyncCall(asyncio.ensure_future(coro_factory()))
+            call.task.add_done_callback(lambda task: self._finish(calls, key, call))
+            metrics.increment("ai_singleflight_calls", group=self.name, role="leader")
+        else:
+            logger.debug(f"Joining in-flight request {key[:12]}")
+            metrics.increment("ai_singleflight_calls", group=self.name, role="follower")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up; stop the upstream call and let new callers start afresh
+                if calls.get(key) is call:
+                    del calls[key]
+                call.task.cancel()
+
+    @staticmethod
+    def _finish(calls: Dict[str, _AsyncCall], key: str, call: _AsyncCall) -> None:
+        if calls.get(key) is call:
+            del calls[key]
+        # Mark the exception as retrieved when no caller was left to see it
+        if not call.task.cancelled():
+            call.task.exception()
+
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SyncSingleFlight:
+    """Coalesce identical blocking calls made from different threads."""
+
+    def __init__(self, name: str = "ai"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _SyncCall] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run func() once per key, sharing the outcome with concurrent callers.
+
+        Args:
+            key: Identity of the request (usually the response cache key)
+            func: Zero-argument callable performing the request
+
+        Returns:
+            Result of the shared call
+
+        Raises:
+            Whatever the shared call raised, re-raised in every caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _SyncCall()
+
+        if not leader:
+            metrics.increment("ai_singleflight_calls", group=self.name, role="follower")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.increment("ai_singleflight_calls", group=self.name, role="leader")
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Process-wide groups shared by all AI clients; keys already include the provider
+async_flights = AsyncSingleFlight("ai")
+sync_flights = SyncSingleFlight("ai")
@@ -0,0 +1,250 @@
+"""
+Incremental parsing of streamed contract analyses.
+
+Providers stream an analysis as text fragments. AnalysisStreamParser consumes
+them as they arrive and reports each flagged clause and compliance issue as
+soon as its object closes, so callers can forward findings long before the
+generation finishes. The complete text is still parsed (and repaired if it
+was cut off) with the regular extraction once the stream ends.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from .exceptions import APIError
+from .json_extract import _STRUCTURAL, _CLOSERS, _string_end, extract_analysis_json, normalize_compliance_issue
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Top-level analysis arrays whose elements are reported as they close
+FINDING_EVENTS = {"flagged_clauses": "flagged_clause", "compliance_issues": "compliance_issue"}
+
+
+class AnalysisStreamParser:
+    """
+    Push parser for a streamed analysis JSON object.
+
+    Call feed() with each text fragment; it returns the events completed by that
+    fragment as (kind, payload) tuples, where kind is "summary",
+    "flagged_clause" or "compliance_issue". Text is scanned once: each call
+    resumes where the previous one stopped. Prose before the object, including
+    prose with braces in it, is skipped.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.summary: Optional[str] = None
+        self.counts = {kind: 0 for kind in FINDING_EVENTS.values()}
+        self._position = 0
+        self._start: Optional[int] = None  # Opening brace of the analysis object
+        self._stack: List[str] = []
+        self._expect_key = True  # Next top-level string is a key
+        self._key: Optional[str] = None  # Last top-level key
+        self._string_start: Optional[int] = None  # Opening quote of an unfinished string
+        self._element_start: Optional[int] = None  # Opening brace of the current finding
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """Whether the analysis object has been closed."""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next fragment of streamed text.
+
+        Args:
+            chunk: Text fragment, split at any character
+
+        Returns:
+            Events completed by this fragment, in stream order
+        """
+        self.text += chunk
+        events: List[Tuple[str, Any]] = []
+        text = self.text
+        length = len(text)
+        position = self._position
+
+        while position < length and not self._done:
+            if self._string_start is not None:
+                end = _string_end(text, self._string_start + 1)
+                if end < 0:
+                    break  # String continues in the next fragment
+                self._string_closed(self._string_start, end, events)
+                self._string_start = None
+                position = end + 1
+                continue
+
+            if self._start is None:
+                brace = text.find("{", position)
+                if brace < 0:
+                    position = length
+                    break
+                self._begin(brace)
+                position = brace + 1
+                continue
+
+            match = _STRUCTURAL.search(text, position)
+            if match is None:
+                break  # A bare token may continue in the next fragment
+            index = match.start()
+            if len(self._stack) == 1 and self._expect_key and text[position:index].strip():
+                # A bare word where a key belongs: the brace opened prose, not the answer
+                position = self._abandon()
+                continue
+
+            char = text[index]
+            position = index + 1
+            if char == '"':
+                self._string_start = index
+            elif char in "{[":
+                if (char == "{" and len(self._stack) == 2 and self._stack[1] == "["
+                        and self._key in FINDING_EVENTS):
+                    self._element_start = index
+                self._stack.append(char)
+            elif char in "}]":
+                if _CLOSERS[self._stack[-1]] != char:
+                    position = self._abandon()
+                    continue
+                self._stack.pop()
+                if len(self._stack) == 2 and self._element_start is not None:
+                    self._element_closed(self._element_start, position, events)
+                    self._element_start = None
+                elif not self._stack:
+                    self._done = True
+            elif len(self._stack) == 1:
+                # "," starts the next key, ":" its value
+                self._expect_key = char == ","
+
+        self._position = position
+        return events
+
+    def finish(self) -> str:
+        """
+        The complete analysis as a JSON string, repairing a truncated stream.
+
+        Returns:
+            JSON string, as produced by extract_analysis_json
+        """
+        return extract_analysis_json(self.text)
+
+    def _begin(self, brace: int) -> None:
+        self._start = brace
+        self._stack = ["{"]
+        self._expect_key = True
+        self._key = None
+        self._element_start = None
+
+    def _abandon(self) -> int:
+        """Drop the current candidate object and resume the search after its brace."""
+        resume = self._start + 1
+        self._start = None
+        self._stack = []
+        self._element_start = None
+        return resume
+
+    def _string_closed(self, start: int, end: int, events: List[Tuple[str, Any]]) -> None:
+        if len(self._stack) != 1:
+            return  # Strings inside findings are parsed with their element
+        value = json.loads(self.text[start:end + 1])
+        if self._expect_key:
+            self._key = value
+        elif self._key == "summary":
+            self.summary = value
+            events.append(("summary", value))
+
+    def _element_closed(self, start: int, end: int, events: List[Tuple[str, Any]]) -> None:
+        try:
+            element = json.loads(self.text[start:end])
+        except ValueError:
+            logger.debug(f"Skipping malformed streamed {self._key} element")
+            return
+        kind = FINDING_EVENTS[self._key]
+        if kind == "compliance_issue":
+            element = normalize_compliance_issue(element)
+        self.counts[kind] += 1
+        events.append((kind, element))
+
+
+def parse_sse_data(line: str) -> Optional[Any]:
+    """
+    JSON payload of a server-sent event "data:" line, or None for any other line.
+
+    Args:
+        line: One line of an event stream, without its line break
+
+    Returns:
+        Decoded payload, or None
+    """
+    if not line.startswith("data:"):
+        return None
+    payload = line[5:].strip()
+    if not payload or payload == "[DONE]":
+        return None
+    try:
+        return json.loads(payload)
+    except ValueError:
+        logger.debug(f"Ignoring undecodable event stream line: {payload[:100]}")
+        return None
+
+
+def iter_sse_json(lines: Iterable[str]) -> Iterator[Any]:
+    """Decoded "data:" payloads of a blocking event stream."""
+    for line in lines:
+        payload = parse_sse_data(line)
+        if payload is not None:
+            yield payload
+
+
+async def aiter_sse_json(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """Decoded "data:" payloads of an asynchronous event stream."""
+    async for line in lines:
+        payload = parse_sse_data(line)
+        if payload is not None:
+            yield payload
+
+
+async def stream_with_deadline(chunks: AsyncIterator[str], timeout: float, provider: str) -> AsyncIterator[str]:
+    """
+    Relay a text stream under a single overall deadline.
+
+    The time to the first fragment is recorded in the ai_first_chunk_seconds
+    histogram for the provider.
+
+    Args:
+        chunks: Upstream text fragments
+        timeout: Deadline in seconds for the whole stream
+        provider: Provider name for errors and metrics
+
+    Yields:
+        Text fragments
+
+    Raises:
+        APIError: If the deadline passes before the stream ends
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    first = True
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+            except StopAsyncIteration:
+                return
+            if first:
+                metrics.observe("ai_first_chunk_seconds", loop.time() - started, provider=provider)
+                first = False
+            yield chunk
+    except asyncio.TimeoutError:
+        raise APIError(f"Streaming request to {provider} exceeded deadline of {timeout}s", 408)
+    finally:
+        close = getattr(chunks, "aclose", None)
+        if close is not None:
+            await close()
@@ -0,0 +1,388 @@
+"""
+Local stand-in for the WatsonX and Gemini APIs.
+
+Serves the IBM IAM token endpoint, the WatsonX text generation endpoints and
+the Gemini generateContent endpoints (plain and streamed as server-sent
+events) with configurable latency, error rate and canned or recorded
+responses, so the analysis pipeline can be load tested offline and
+reproducibly.
+
+Run it with:
+
+    python -m utils.ai_client.stub_server --port 8089 --latency lognormal:1.5,0.5 \\
+        --error-rate 0.02 --replay recordings.jsonl
+
+and point the backend at it:
+
+    WATSONX_URL=http://127.0.0.1:8089/ml/v1/text/generation?version=2023-05-29
+    IBM_IAM_URL=http://127.0.0.1:8089/identity/token
+    GEMINI_STUB_URL=http://127.0.0.1:8089
+
+To capture real responses for replay, run the backend against the real
+providers with AI_RECORD_PATH=recordings.jsonl (see recording.py).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .exceptions import APIError, ConfigurationError
+from .retry import parse_retry_after
+from .recording import load_recordings, prompt_fingerprint
+from .streaming import iter_sse_json, aiter_sse_json
+
+logger = logging.getLogger(__name__)
+
+# Returned when neither a recording nor a canned response applies
+DEFAULT_ANALYSIS_RESPONSE = json.dumps({
+    "summary": "Stub analysis: the contract was reviewed by the local stub model.",
+    "flagged_clauses": [{
+        "clause_text": "The Company may terminate this agreement at any time without notice.",
+        "issue": "Termination without notice may breach statutory notice requirements.",
+        "severity": "high"
+    }],
+    "compliance_issues": [{
+        "law": "EMPLOYMENT_ACT_MY",
+        "missing_requirements": ["Minimum notice period for termination"],
+        "recommendations": ["Specify a notice period that meets the statutory minimum"]
+    }]
+})
+
+
+def parse_latency(spec: str) -> "LatencyDistribution":
+    """
+    Parse a latency distribution such as "fixed:0.5", "uniform:0.2,1.5" or "lognormal:1.2,0.6".
+
+    Args:
+        spec: "<kind>:<params>" with seconds as the unit; lognormal takes median and sigma
+
+    Returns:
+        LatencyDistribution
+
+    Raises:
+        ConfigurationError: If the specification is not understood
+    """
+    kind, _, raw_params = spec.partition(":")
+    try:
+        params = [float(value) for value in raw_params.split(",") if value.strip()]
+    except ValueError:
+        raise ConfigurationError(f"Invalid latency parameters: {spec}")
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind] or any(value < 0 for value in params):
+        raise ConfigurationError(
+            f"Invalid latency spec '{spec}'; use fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA"
+        )
+    return LatencyDistribution(kind, params)
+
+
+@dataclass
+class LatencyDistribution:
+    """Simulated upstream latency in seconds."""
+    kind: str = "fixed"
+    params: List[float] = field(default_factory=lambda: [0.0])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return self.params[0]
+
+
+@dataclass
+class StubBehavior:
+    """How the stub answers: latency, injected errors and response bodies."""
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0
+    error_status: int = 503
+    canned_responses: List[str] = field(default_factory=list)
+    recordings: Dict[str, str] = field(default_factory=dict)
+    seed: Optional[int] = None
+    stream_chunks: int = 8  # Fragments per streamed answer; the latency is spread across them
+    retry_after: Optional[float] = None  # Retry-After seconds sent with injected errors
+
+    def __post_init__(self):
+        if not 0 <= self.error_rate <= 1:
+            raise ConfigurationError("Error rate must be between 0 and 1")
+        if self.stream_chunks <= 0:
+            raise ConfigurationError("Stream chunks must be positive")
+        self._rng = random.Random(self.seed)
+        self._canned: Iterator[str] = itertools.cycle(self.canned_responses or [DEFAULT_ANALYSIS_RESPONSE])
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0, "replay_hits": 0, "replay_misses": 0}
+
+    @classmethod
+    def from_files(cls, latency: str = "fixed:0", error_rate: float = 0.0, error_status: int = 503,
+                   responses_path: Optional[str] = None, replay_path: Optional[str] = None,
+                   seed: Optional[int] = None, stream_chunks: int = 8,
+                   retry_after: Optional[float] = None) -> 'StubBehavior':
+        """
+        Build behaviour from a latency spec and optional response files.
+
+        Args:
+            latency: Latency distribution spec (see parse_latency)
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status used for injected errors
+            responses_path: JSON file holding a list of canned responses (strings or objects)
+            replay_path: JSON Lines recordings written with AI_RECORD_PATH
+            seed: Random seed for reproducible latency and error sequences
+            stream_chunks: Fragments per streamed answer
+            retry_after: Retry-After seconds sent with injected errors
+
+        Returns:
+            StubBehavior
+        """
+        canned: List[str] = []
+        if responses_path:
+            with open(responses_path, encoding="utf-8") as handle:
+                bodies = json.load(handle)
+            if not isinstance(bodies, list):
+                bodies = [bodies]
+            canned = [body if isinstance(body, str) else json.dumps(body) for body in bodies]
+        return cls(
+            latency=parse_latency(latency),
+            error_rate=error_rate,
+            error_status=error_status,
+            canned_responses=canned,
+            recordings=load_recordings(replay_path) if replay_path else {},
+            seed=seed,
+            stream_chunks=stream_chunks,
+            retry_after=retry_after
+        )
+
+    def plan(self, prompt: str) -> Dict[str, Any]:
+        """
+        Decide how to answer one request.
+
+        Returns:
+            Dictionary with the simulated "delay", and either "error" (True) or "text"
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency.sample(self._rng)
+            if self._rng.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return {"delay": delay, "error": True}
+            recorded = self.recordings.get(prompt_fingerprint(prompt))
+            if self.recordings:
+                self.stats["replay_hits" if recorded is not None else "replay_misses"] += 1
+            return {"delay": delay, "text": recorded if recorded is not None else next(self._canned)}
+
+
+def split_stream(text: str, parts: int) -> List[str]:
+    """Split text into at most parts roughly equal fragments for a streamed answer."""
+    size = max(1, math.ceil(len(text) / parts))
+    return [text[index:index + size] for index in range(0, len(text), size)] or [""]
+
+
+def create_stub_app(behavior: Optional[StubBehavior] = None) -> FastAPI:
+    """
+    Create the stub API application.
+
+    Args:
+        behavior: Latency, error and response behaviour (defaults to instant canned answers)
+
+    Returns:
+        FastAPI application
+    """
+    behavior = behavior or StubBehavior()
+    app = FastAPI(title="Regscope AI stub")
+    app.state.behavior = behavior
+
+    async def answer(prompt: str, body_for: Any) -> JSONResponse:
+        outcome = behavior.plan(prompt)
+        if outcome.get("error"):
+            return await answer_error(outcome)
+        if outcome["delay"]:
+            await asyncio.sleep(outcome["delay"])
+        return JSONResponse(content=body_for(outcome["text"]))
+
+    async def answer_stream(prompt: str, event_for: Callable[[str], Any], event_name: Optional[str] = None):
+        outcome = behavior.plan(prompt)
+        if outcome.get("error"):
+            return await answer_error(outcome)
+        fragments = split_stream(outcome["text"], behavior.stream_chunks)
+        prefix = f"event: {event_name}\n" if event_name else ""
+
+        async def events() -> AsyncIterator[str]:
+            for fragment in fragments:
+                if outcome["delay"]:
+                    await asyncio.sleep(outcome["delay"] / len(fragments))
+                yield f"{prefix}data: {json.dumps(event_for(fragment))}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def answer_error(outcome: Dict[str, Any]) -> JSONResponse:
+        if outcome["delay"]:
+            await asyncio.sleep(outcome["delay"])
+        headers = {"Retry-After": f"{behavior.retry_after:g}"} if behavior.retry_after is not None else None
+        return JSONResponse(
+            status_code=behavior.error_status,
+            content={"errors": [{"code": "stub_injected_error", "message": "Injected failure"}]},
+            headers=headers
+        )
+
+    @app.post("/identity/token")
+    async def iam_token():
+        return {"access_token": "stub-token", "token_type": "Bearer", "expires_in": 3600}
+
+    @app.post("/ml/v1/text/generation")
+    async def watsonx_generation(request: Request):
+        body = await request.json()
+        return await answer(body.get("input", ""), lambda text: {
+            "model_id": body.get("model_id"),
+            "results": [{"generated_text": text, "stop_reason": "eos_token"}]
+        })
+
+    @app.post("/ml/v1/text/generation_stream")
+    async def watsonx_generation_stream(request: Request):
+        body = await request.json()
+        return await answer_stream(body.get("input", ""), lambda text: {
+            "model_id": body.get("model_id"),
+            "results": [{"generated_text": text}]
+        }, event_name="message")
+
+    def gemini_prompt(body: Dict[str, Any]) -> str:
+        return "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+
+    def gemini_body(text: str) -> Dict[str, Any]:
+        return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}]}
+
+    @app.post("/v1beta/models/{model}:generateContent")
+    async def gemini_generation(model: str, request: Request):
+        return await answer(gemini_prompt(await request.json()), gemini_body)
+
+    @app.post("/v1beta/models/{model}:streamGenerateContent")
+    async def gemini_generation_stream(model: str, request: Request):
+        return await answer_stream(gemini_prompt(await request.json()), gemini_body)
+
+    @app.get("/stub/stats")
+    async def stub_stats():
+        return dict(behavior.stats)
+
+    return app
+
+
+class StubGenerationResponse:
+    """Minimal stand-in for the google-generativeai response object."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """
+    Gemini-compatible model shim that talks to the stub server.
+
+    GeminiClient uses it instead of genai.GenerativeModel when GEMINI_STUB_URL is
+    set; it implements the generate_content calls the client relies on.
+    """
+
+    def __init__(self, base_url: str, model_name: str, timeout: float = 120.0):
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model_name}:generateContent"
+        self.stream_url = f"{base_url.rstrip('/')}/v1beta/models/{model_name}:streamGenerateContent?alt=sse"
+        self.timeout = timeout
+
+    @staticmethod
+    def _request_body(prompt: str, generation_config: Any = None) -> Dict[str, Any]:
+        config = {}
+        for name, key in (("temperature", "temperature"), ("max_output_tokens", "maxOutputTokens"), ("top_p", "topP")):
+            value = generation_config.get(name) if isinstance(generation_config, dict) else getattr(generation_config, name, None)
+            if value is not None:
+                config[key] = value
+        return {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "generationConfig": config}
+
+    @staticmethod
+    def _check(response: httpx.Response) -> None:
+        if response.status_code != 200:
+            raise APIError(
+                f"Gemini stub returned {response.status_code}", response.status_code,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+
+    @staticmethod
+    def _candidate_text(body: Dict[str, Any]) -> StubGenerationResponse:
+        candidates = body.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return StubGenerationResponse("".join(part.get("text", "") for part in parts))
+
+    def generate_content(self, prompt: str, generation_config: Any = None, stream: bool = False) -> Any:
+        if stream:
+            return self._stream(prompt, generation_config)
+        response = httpx.post(self.url, json=self._request_body(prompt, generation_config), timeout=self.timeout)
+        self._check(response)
+        return self._candidate_text(response.json())
+
+    async def generate_content_async(self, prompt: str, generation_config: Any = None, stream: bool = False) -> Any:
+        if stream:
+            return self._stream_async(prompt, generation_config)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(self.url, json=self._request_body(prompt, generation_config))
+        self._check(response)
+        return self._candidate_text(response.json())
+
+    def _stream(self, prompt: str, generation_config: Any = None) -> Iterator[StubGenerationResponse]:
+        body = self._request_body(prompt, generation_config)
+        with httpx.stream("POST", self.stream_url, json=body, timeout=self.timeout) as response:
+            self._check(response)
+            for payload in iter_sse_json(response.iter_lines()):
+                yield self._candidate_text(payload)
+
+    async def _stream_async(self, prompt: str, generation_config: Any = None) -> AsyncIterator[StubGenerationResponse]:
+        body = self._request_body(prompt, generation_config)
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with client.stream("POST", self.stream_url, json=body) as response:
+                self._check(response)
+                async for payload in aiter_sse_json(response.aiter_lines()):
+                    yield self._candidate_text(payload)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point: run the stub server with uvicorn."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local WatsonX/Gemini stub for offline load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S, uniform:MIN,MAX or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--responses", help="JSON file with a list of canned responses")
+    parser.add_argument("--replay", help="JSON Lines recordings captured with AI_RECORD_PATH")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    parser.add_argument("--stream-chunks", type=int, default=8, help="Fragments per streamed answer")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected errors")
+    args = parser.parse_args(argv)
+
+    behavior = StubBehavior.from_files(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        responses_path=args.responses,
+        replay_path=args.replay,
+        seed=args.seed,
+        stream_chunks=args.stream_chunks,
+        retry_after=args.retry_after
+    )
+    logger.info(f"Stub serving {len(behavior.recordings)} recorded responses")
+    uvicorn.run(create_stub_app(behavior), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Token budgeting for AI prompts.
+
+Provides a fast local token estimate, the context window of each configured
+model, and helpers to keep the compliance checklist small enough that the
+prompt and the requested output both fit in the model's context. The budget of
+each prompt a client sends is recorded for the enclosing collect_budgets()
+block, so callers can report it without building the prompt again.
+"""
+
+import contextvars
+import functools
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Context window (input + output tokens) per model id
+MODEL_CONTEXT_WINDOWS = {
+    "ibm/granite-13b-instruct-v2": 8192,
+    "ibm/granite-20b-instruct-v2": 8192,
+    "ibm/granite-34b-code-instruct": 8192,
+    "gemini-pro": 32760,
+    "gemini-1.0-pro": 32760,
+    "gemini-1.5-flash": 1048576,
+    "gemini-1.5-pro": 2097152,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+MIN_OUTPUT_TOKENS = 1024  # Never squeeze the JSON answer below this
+BATCH_OUTPUT_TOKENS_PER_CONTRACT = 768  # Answer space reserved per contract in a batched prompt
+
+# Words and individual punctuation marks; long words cost roughly one token per 4 characters
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Map analyzer contract types to the contract type names used in the law files
+CONTRACT_TYPE_ALIASES = {
+    "employment": ["Employment Contract", "Fixed-Term Contract", "Part-Time Contract"],
+    "service": ["Service Agreement", "Cloud Service Agreement"],
+    "service_agreement": ["Service Agreement", "Cloud Service Agreement"],
+    "privacy": ["Data Processing Agreement", "Privacy Policy"],
+    "data_processing": ["Data Processing Agreement"],
+    "nda": ["NDA", "Non-Disclosure Agreement"],
+}
+
+# Per-provision fields the model does not need to judge compliance
+_PROVISION_FIELDS_DROPPED = ("ai_prompt_guidance", "exceptions", "description")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text without a model tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate token count (errs slightly high for English legal text)
+    """
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def context_window(model_id: str) -> int:
+    """
+    Get the context window for a model id.
+
+    Args:
+        model_id: Model identifier as configured for the client
+
+    Returns:
+        Context window in tokens, or DEFAULT_CONTEXT_WINDOW for unknown models
+    """
+    if model_id in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model_id]
+    # Versioned names such as "gemini-1.5-pro-002" share their family's window
+    for known_id, window in sorted(MODEL_CONTEXT_WINDOWS.items(), key=lambda item: -len(item[0])):
+        if model_id.startswith(known_id):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def compact_json(data: Any) -> str:
+    """Serialise data without indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _drop_empty(value: Any) -> Any:
+    """Recursively drop None, empty strings and empty containers."""
+    if isinstance(value, dict):
+        cleaned = {key: _drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in cleaned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        cleaned = [_drop_empty(item) for item in value]
+        return [item for item in cleaned if item not in (None, "", [], {})]
+    return value
+
+
+def trim_checklist(compliance_checklist: Dict[str, Any], contract_type: Optional[str] = None,
+                   level: int = 0) -> Dict[str, Any]:
+    """
+    Reduce a compliance checklist to what is relevant for the contract.
+
+    Args:
+        compliance_checklist: Checklist from RegulatoryEngineService.get_compliance_checklist
+        contract_type: Detected contract type (analyzer or law-file naming)
+        level: 0 keeps provision requirements and penalties, 1 drops penalties and
+               recommended clauses, 2 keeps only section references and mandatory clauses
+
+    Returns:
+        Trimmed checklist with empty entries removed
+    """
+    type_names: List[str] = []
+    if contract_type:
+        type_names = CONTRACT_TYPE_ALIASES.get(contract_type.lower(), [contract_type])
+
+    trimmed = {}
+    for law_id, law in compliance_checklist.items():
+        if not isinstance(law, dict):
+            trimmed[law_id] = law
+            continue
+
+        metadata = law.get("metadata") or {}
+        entry: Dict[str, Any] = {"name": metadata.get("name") if isinstance(metadata, dict) else None}
+
+        provisions = {}
+        for name, provision in (law.get("key_provisions") or {}).items():
+            if not isinstance(provision, dict):
+                continue
+            kept = {key: item for key, item in provision.items() if key not in _PROVISION_FIELDS_DROPPED}
+            if level >= 1:
+                kept.pop("penalties_for_breach", None)
+            if level >= 2:
+                kept = {"section": provision.get("section")}
+            provisions[name] = kept
+        entry["key_provisions"] = provisions
+
+        specific = law.get("contract_specific_requirements") or {}
+        if isinstance(specific, dict):
+            if type_names:
+                specific = {name: specific[name] for name in type_names if name in specific}
+            if level >= 1:
+                specific = {
+                    name: {"mandatory_clauses": requirements.get("mandatory_clauses"),
+                           "prohibited_clauses": None if level >= 2 else requirements.get("prohibited_clauses")}
+                    if isinstance(requirements, dict) else requirements
+                    for name, requirements in specific.items()
+                }
+        entry["contract_specific_requirements"] = specific
+
+        trimmed[law_id] = _drop_empty(entry)
+
+    return trimmed
+
+
+@dataclass
+class TokenBudget:
+    """Token accounting for one prompt against a model's context window."""
+    model: str
+    context_window: int
+    system_tokens: int = 0
+    instruction_tokens: int = 0
+    checklist_tokens: int = 0
+    contract_tokens: int = 0
+    max_output_tokens: int = 0
+    checklist_trim_level: int = 0
+    contract_truncated: bool = False
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.system_tokens + self.instruction_tokens + self.checklist_tokens + self.contract_tokens
+
+    @property
+    def remaining_tokens(self) -> int:
+        return self.context_window - self.prompt_tokens - self.max_output_tokens
+
+    def fits_batch(self, contracts: int) -> bool:
+        """Whether this prompt leaves enough answer space for a batch of this many contracts."""
+        return self.max_output_tokens >= BATCH_OUTPUT_TOKENS_PER_CONTRACT * contracts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary for response metadata."""
+        data = asdict(self)
+        data["prompt_tokens"] = self.prompt_tokens
+        return data
+
+
+_sent_budgets: contextvars.ContextVar[Optional[List[Tuple[str, TokenBudget]]]] = contextvars.ContextVar(
+    "ai_sent_budgets", default=None
+)
+
+
+@contextmanager
+def collect_budgets(budgets: Optional[List[Tuple[str, TokenBudget]]] = None) -> Iterator[List[Tuple[str, TokenBudget]]]:
+    """
+    Collect the budget of every prompt sent inside the block (and tasks created in it).
+
+    A block nested in another collects for itself only; the outer block does
+    not see its budgets unless they are recorded again.
+
+    Args:
+        budgets: List to append to (defaults to a new one)
+
+    Yields:
+        The (provider, budget) pairs, appended as the prompts are sent
+    """
+    budgets = [] if budgets is None else budgets
+    token = _sent_budgets.set(budgets)
+    try:
+        yield budgets
+    finally:
+        _sent_budgets.reset(token)
+
+
+def collecting_budgets(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run a coroutine function in its own collect_budgets() block; sent_budgets() returns what it sent."""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with collect_budgets():
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def record_budget(provider: str, budget: TokenBudget) -> None:
+    """Record the budget of a prompt sent to provider for the enclosing collect_budgets() block, if any."""
+    budgets = _sent_budgets.get()
+    if budgets is not None:
+        budgets.append((provider, budget))
+
+
+def sent_budgets() -> List[Tuple[str, TokenBudget]]:
+    """The (provider, budget) pairs collected so far by the enclosing collect_budgets() block."""
+    return list(_sent_budgets.get() or [])
@@ -0,0 +1,101 @@
+"""
+Shared HTTP transport for AI client components.
+
+Keeps a single keep-alive connection pool per pool configuration so every
+client instance in the process reuses warm connections instead of opening a
+new TLS session for each generation request.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Connection pool settings shared by clients talking to the same service."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 10.0
+
+    def limits(self) -> httpx.Limits:
+        """Build the httpx pool limits for these settings."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def timeout(self, request_timeout: float) -> httpx.Timeout:
+        """Build an httpx timeout with the pooled connect timeout."""
+        return httpx.Timeout(request_timeout, connect=min(self.connect_timeout, request_timeout))
+
+
+_lock = threading.Lock()
+_sync_clients: Dict[PoolSettings, httpx.Client] = {}
+# Async clients are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[PoolSettings, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def get_sync_client(settings: PoolSettings) -> httpx.Client:
+    """
+    Get the process-wide blocking HTTP client for the given pool settings.
+
+    Args:
+        settings: Pool settings identifying the shared pool
+
+    Returns:
+        Pooled httpx.Client instance
+    """
+    with _lock:
+        client = _sync_clients.get(settings)
+        if client is None or client.is_closed:
+            client = httpx.Client(limits=settings.limits())
+            _sync_clients[settings] = client
+            logger.debug(f"Created pooled HTTP client (max_connections={settings.max_connections})")
+        return client
+
+
+def get_async_client(settings: PoolSettings) -> httpx.AsyncClient:
+    """
+    Get the asyncio HTTP client for the given pool settings on the running loop.
+
+    Args:
+        settings: Pool settings identifying the shared pool
+
+    Returns:
+        Pooled httpx.AsyncClient bound to the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(settings)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=settings.limits())
+            loop_clients[settings] = client
+            logger.debug(f"Created pooled async HTTP client (max_connections={settings.max_connections})")
+        return client
+
+
+async def close_clients() -> None:
+    """Close all pooled clients owned by the running loop and the blocking pool."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        loop_clients = _async_clients.pop(loop, {})
+        sync_clients = list(_sync_clients.values())
+        _sync_clients.clear()
+
+    for client in loop_clients.values():
+        await client.aclose()
+    for client in sync_clients:
+        client.close()
+
+    logger.info("Closed pooled AI HTTP clients")
@@ -0,0 +1,428 @@
+"""
+Clause fingerprint cache for per-clause analysis findings.
+
+Contracts reuse the same boilerplate clauses (confidentiality, governing law,
+liability caps) across thousands of documents. contract_clauses() cuts a
+contract into clauses along its section tree and normalises each one, so the
+same clause numbered or laid out differently in another contract has the same
+fingerprint:
+
+    lowercased                     as ContractDocument.lower
+    heading numbers dropped        "7.2 Confidentiality" and "12.2 Confidentiality" agree
+    whitespace runs collapsed      to one newline if the run has one, else one space
+
+A clause is the text before the first heading, or a numbered section with its
+subsections; title and recital headings (a contract's title line among them)
+and sections longer than CLAUSE_MAX_CHARS are cut at their subsections, level
+by level (contract_sections.section_spans). Longer text without headings is
+cut after every line whose CRC-32 is divisible by CONTENT_CUT_LINES, so
+boundaries depend on the lines themselves and inserting a line into one
+contract changes only the clause around it.
+
+The law rule engine and the chunked AI analysis look clauses up by fingerprint
+in a ClauseCache (a bounded in-memory LRU plus an optional SQLite tier, like
+utils/ai_client/cache.py) and only analyse the novel ones. Cached values are
+JSON, offsets in them index the normalised clause text, and Clause.document_span
+maps them back into the contract. Hits and misses are counted per jurisdiction
+(benchmarks/bench_clause_cache.py compares cold, warm and uncached evaluation).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from utils.ai_client.metrics import metrics
+from utils.contract_document import ContractDocument, Span
+from utils.contract_sections import SectionTree, section_spans
+
+logger = logging.getLogger(__name__)
+
+CLAUSE_MAX_CHARS = 4000
+CONTENT_CUT_LINES = 4
+_SQLITE_BATCH = 500
+
+# Whitespace runs that normalisation replaces, by one newline if the run has one, else one space
+_COLLAPSIBLE = re.compile(r'\s\s+|[\t\r\f\v]')
+
+
+def _replacement(match: re.Match) -> str:
+    return "\n" if "\n" in match.group() else " "
+
+
+def make_clause_key(namespace: str, fingerprint: str) -> str:
+    """
+    Build the cache key of a clause's findings.
+
+    Args:
+        namespace: What the findings are of, e.g. the analysis and its rules version
+        fingerprint: Clause.fingerprint
+
+    Returns:
+        Hex SHA-256 digest identifying the findings
+    """
+    return hashlib.sha256(f"{namespace}\n{fingerprint}".encode("utf-8")).hexdigest()
+
+
+class Clause:
+    """
+    One clause of a contract: its normalised text and the map back to contract offsets.
+
+    The map is only built when an offset is first mapped back, which is only
+    needed for clauses with findings.
+    """
+
+    __slots__ = ("start", "end", "text", "_source", "_skip", "_normal_starts", "_document_starts", "_fingerprint")
+
+    def __init__(self, start: int, end: int, text: str, source: Optional[str] = None, skip: Sequence[Span] = ()):
+        """
+        Initialize the clause.
+
+        Args:
+            start: Offset of the clause in the contract
+            end: Offset of the end of the clause in the contract
+            text: The normalised clause
+            source: The lowercased contract text was normalised from, or None
+                if text is source[start:end] as it is
+            skip: Sorted spans of the clause dropped from text
+        """
+        self.start = start
+        self.end = end
+        self.text = text
+        self._source = source
+        self._skip = skip
+        self._normal_starts: Optional[List[int]] = None
+        self._document_starts: Optional[List[int]] = None
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def normalize(cls, text_lower: str, start: int, end: int, skip: Sequence[Span] = ()) -> "Clause":
+        """
+        Normalise text_lower[start:end] into a clause.
+
+        Args:
+            text_lower: The lowercased contract
+            start: Offset of the clause
+            end: Offset of the end of the clause
+            skip: Sorted spans inside the clause to drop, e.g. heading numbers
+        """
+        text = "".join(_COLLAPSIBLE.sub(_replacement, text_lower[piece_start:piece_end])
+                       for piece_start, piece_end, _ in cls._pieces(start, end, skip))
+        return cls(start, end, text, text_lower, skip)
+
+    @classmethod
+    def whole(cls, text_lower: str) -> "Clause":
+        """The whole contract as one clause, as it is."""
+        return cls(0, len(text_lower), text_lower)
+
+    @staticmethod
+    def _pieces(start: int, end: int, skip: Sequence[Span]) -> Iterator[Tuple[int, int, int]]:
+        """The kept pieces of start:end around the skipped spans, with where the text resumes after each."""
+        position = start
+        for skip_start, skip_end in [*skip, (end, end)]:
+            skip_start = min(max(skip_start, position), end)
+            skip_end = min(max(skip_end, skip_start), end)
+            yield position, skip_start, skip_end
+            position = skip_end
+
+    def _build_map(self) -> None:
+        """Record where the normalised text and the contract stop advancing together."""
+        breaks: List[Span] = [(0, self.start)]
+        if self._source is not None:
+            length = 0
+            for piece_start, piece_end, resume in self._pieces(self.start, self.end, self._skip):
+                last = piece_start
+                for match in _COLLAPSIBLE.finditer(self._source, piece_start, piece_end):
+                    length += match.start() - last + 1
+                    breaks.append((length, match.end()))
+                    last = match.end()
+                length += piece_end - last
+                if resume > piece_end:
+                    breaks.append((length, resume))
+        self._normal_starts = [normal for normal, _ in breaks]
+        self._document_starts = [document for _, document in breaks]
+
+    @property
+    def fingerprint(self) -> str:
+        """Hex SHA-256 digest of the normalised clause."""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def document_offset(self, offset: int) -> int:
+        """The contract offset of an offset into the normalised clause."""
+        if self._normal_starts is None:
+            self._build_map()
+        index = bisect_right(self._normal_starts, offset) - 1
+        return self._document_starts[index] + offset - self._normal_starts[index]
+
+    def document_span(self, start: int, end: int) -> Span:
+        """The contract span of a span of the normalised clause."""
+        return self.document_offset(start), self.document_offset(end)
+
+    def __repr__(self) -> str:
+        return f"Clause({self.start}, {self.end}, {self.text[:40]!r})"
+
+
+def _content_cut(document: ContractDocument, start: int, end: int, max_chars: int) -> List[Span]:
+    """Cut text without headings after lines chosen by their content, and before max_chars is exceeded."""
+    text, lower = document.text, document.lower
+    spans = []
+    clause_start = position = start
+    while position < end:
+        line_end = text.find("\n", position, end)
+        if line_end < 0:
+            line_end = end
+        if position > clause_start and line_end - clause_start > max_chars:
+            spans.append(document.strip_span(clause_start, position))
+            clause_start = position
+        if zlib.crc32(lower[position:line_end].strip().encode("utf-8")) % CONTENT_CUT_LINES == 0:
+            spans.append(document.strip_span(clause_start, line_end))
+            clause_start = line_end
+        position = line_end + 1
+    spans.append(document.strip_span(clause_start, end))
+    return [(span_start, span_end) for span_start, span_end in spans if span_end > span_start]
+
+
+def contract_clauses(document: ContractDocument, tree: SectionTree,
+                     max_chars: int = CLAUSE_MAX_CHARS) -> List[Clause]:
+    """
+    Cut a contract into normalised clauses along its section tree.
+
+    Args:
+        document: The tokenized contract
+        tree: Its section tree
+        max_chars: Length above which a section is cut at its subsections or lines
+
+    Returns:
+        The clauses, in contract order
+    """
+    numbers = [(section.heading_start, section.title_start) for section in tree if section.number]
+    number_starts = [start for start, _ in numbers]
+    clauses = []
+    for span in section_spans(tree, document.text, max_chars, cut_unnumbered=True):
+        pieces = _content_cut(document, *span, max_chars) if span[1] - span[0] > max_chars else [span]
+        for start, end in pieces:
+            first = bisect_right(number_starts, start - 1)
+            last = bisect_right(number_starts, end - 1)
+            clauses.append(Clause.normalize(document.lower, start, end, numbers[first:last]))
+    return clauses
+
+
+class ClauseCache:
+    """
+    Two-tier cache of per-clause findings: bounded in-memory LRU plus optional SQLite store.
+
+    Values must be JSON-serializable; the memory tier hands out the stored
+    object itself, so callers must not modify it. Both tiers honour the same
+    TTL and entries found only on disk are promoted to memory. Hits and misses
+    are counted per jurisdiction, and recorded in the metrics per kind of
+    findings and tier.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 86400.0,
+                 path: Optional[str] = None, enabled: bool = True):
+        """
+        Initialize the clause cache.
+
+        Args:
+            max_entries: Maximum number of clause findings kept in memory
+            ttl: Seconds an entry stays valid (0 disables expiry)
+            path: Optional SQLite file for the persistent tier
+            enabled: If False, every lookup misses and nothing is stored
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+        if enabled and path:
+            self._db = self._open_db(path)
+
+    @classmethod
+    def from_environment(cls) -> 'ClauseCache':
+        """Create a cache from CLAUSE_CACHE_* environment variables."""
+        return cls(
+            max_entries=int(os.getenv("CLAUSE_CACHE_MAX_ENTRIES", "10000")),
+            ttl=float(os.getenv("CLAUSE_CACHE_TTL", "86400")),
+            path=os.getenv("CLAUSE_CACHE_PATH") or None,
+            enabled=os.getenv("CLAUSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    @staticmethod
+    def _open_db(path: str) -> Optional[sqlite3.Connection]:
+        """Open the SQLite tier, falling back to memory-only on failure."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS clauses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            db.commit()
+            logger.info(f"Clause cache persisting to {path}")
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open clause cache at {path}, using memory only: {e}")
+            return None
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return not self.ttl or time.time() - created_at < self.ttl
+
+    def get_many(self, keys: Sequence[str], jurisdiction: str, kind: str) -> List[Optional[Any]]:
+        """
+        Look up the findings of several clauses.
+
+        Args:
+            keys: Keys from make_clause_key
+            jurisdiction: Jurisdiction of the contract, for hit rates
+            kind: Kind of findings, e.g. "rules" or "ai", for metrics
+
+        Returns:
+            The cached findings of each key, or None where it missed
+        """
+        if not self.enabled:
+            return [None] * len(keys)
+
+        values: List[Optional[Any]] = [None] * len(keys)
+        disk_hits = 0
+        with self._lock:
+            missing: Dict[str, List[int]] = {}
+            for index, key in enumerate(keys):
+                entry = self._memory.get(key)
+                if entry is not None:
+                    if self._is_fresh(entry[0]):
+                        self._memory.move_to_end(key)
+                        values[index] = entry[1]
+                        continue
+                    del self._memory[key]
+                missing.setdefault(key, []).append(index)
+
+            if self._db is not None and missing:
+                for row_key, value, created_at in self._read_rows(list(missing)):
+                    if not self._is_fresh(created_at):
+                        continue
+                    try:
+                        value = json.loads(value)
+                    except ValueError:
+                        continue
+                    self._store_memory(row_key, value, created_at)
+                    for index in missing[row_key]:
+                        values[index] = value
+                        disk_hits += 1
+
+            hits = sum(value is not None for value in values)
+            counts = self._counts.setdefault(jurisdiction, {"hits": 0, "misses": 0})
+            counts["hits"] += hits
+            counts["misses"] += len(keys) - hits
+
+        if hits > disk_hits:
+            metrics.increment("clause_cache_hits", hits - disk_hits, jurisdiction=jurisdiction, kind=kind, tier="memory")
+        if disk_hits:
+            metrics.increment("clause_cache_hits", disk_hits, jurisdiction=jurisdiction, kind=kind, tier="disk")
+        if len(keys) > hits:
+            metrics.increment("clause_cache_misses", len(keys) - hits, jurisdiction=jurisdiction, kind=kind)
+        return values
+
+    def _read_rows(self, keys: List[str]) -> List[Tuple[str, str, float]]:
+        """Rows of the SQLite tier for keys, read in batches. Caller holds the lock."""
+        rows = []
+        try:
+            for index in range(0, len(keys), _SQLITE_BATCH):
+                batch = keys[index:index + _SQLITE_BATCH]
+                rows.extend(self._db.execute(
+                    f"SELECT key, value, created_at FROM clauses WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+        except sqlite3.Error as e:
+            logger.warning(f"Clause cache read failed: {e}")
+        return rows
+
+    def set_many(self, values: Mapping[str, Any]) -> None:
+        """
+        Store the findings of several clauses in both tiers, in one SQLite transaction.
+
+        Args:
+            values: Findings by key from make_clause_key
+        """
+        if not self.enabled or not values:
+            return
+
+        created_at = time.time()
+        with self._lock:
+            for key, value in values.items():
+                self._store_memory(key, value, created_at)
+            if self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO clauses (key, value, created_at) VALUES (?, ?, ?)",
+                        [(key, json.dumps(value, separators=(",", ":")), created_at) for key, value in values.items()]
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Clause cache write failed: {e}")
+
+    def _store_memory(self, key: str, value: Any, created_at: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries. Caller holds the lock."""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached clause from both tiers and reset the hit counts."""
+        with self._lock:
+            self._memory.clear()
+            self._counts.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM clauses")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Clause cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size, configuration and hit rates per jurisdiction for health and metrics endpoints."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "persistent": self._db is not None,
+                "jurisdictions": {
+                    jurisdiction: {
+                        **counts,
+                        "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 4)
+                        if counts["hits"] + counts["misses"] else None
+                    }
+                    for jurisdiction, counts in sorted(self._counts.items())
+                }
+            }
+
+
+_cache_lock = threading.Lock()
+_clause_cache: Optional[ClauseCache] = None
+
+
+def get_clause_cache() -> ClauseCache:
+    """Get the process-wide clause cache, creating it from the environment on first use."""
+    global _clause_cache
+    with _cache_lock:
+        if _clause_cache is None:
+            _clause_cache = ClauseCache.from_environment()
+        return _clause_cache
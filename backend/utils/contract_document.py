@@ -0,0 +1,171 @@
+"""
+A contract tokenized once per request and shared by every analyzer.
+
+The metadata analysis, section filtering and rule checks each used to derive
+their own view of the same text: contract_text.lower(), contract_text.split(),
+re.findall(r'[.!?]+'), re.split(r'\n\s*\n\s*') and the same again for every
+candidate section. A ContractDocument derives them once and keeps the results
+as offset arrays:
+
+    lines       start offsets and running word counts
+    sentences   pieces between runs of . ! ?, as re.split(r'[.!?]+')
+    paragraphs  pieces between blank lines, as re.split(r'\n\s*\n\s*')
+
+Sections and paragraphs are runs of whole lines, so their word and sentence
+counts are bisections on these arrays instead of another pass over their
+text. Words are counted per line rather than given an offset each, which keeps
+the tokenizer in C (str.split per line): a Python object per word would cost
+more than the passes it saves.
+
+Analyzers pass spans around instead of copies of section and clause text:
+offsets index text and lower alike, and are stored as 32-bit integers.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+Span = Tuple[int, int]
+
+_TERMINATORS = re.compile(r'[.!?]+')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n\s*')
+_LONGER_THAN_TWO = (2).__lt__
+
+
+def _lower_char(char: str) -> str:
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+class ContractDocument:
+    """
+    The line, sentence and paragraph offsets of one contract.
+
+    Build it once per request (ContractAnalyzerService does so in
+    _prepare_analysis and keeps it in the contract metadata) and read it from
+    any thread.
+    """
+
+    __slots__ = (
+        "text", "lower", "long_word_count", "line_starts", "line_words",
+        "sentence_starts", "sentence_ends", "paragraph_starts", "paragraph_ends"
+    )
+
+    def __init__(self, text: str):
+        """
+        Tokenize a contract.
+
+        Args:
+            text: The (preprocessed) contract text
+        """
+        self.text = text
+        self.lower = text.lower()
+        if len(self.lower) != len(text):
+            # A few characters lowercase to two (e.g. "İ"); keep those as they
+            # are, so that offsets into lower index text too
+            self.lower = "".join(_lower_char(char) for char in text)
+        # line_words[i] counts the words of the lines before line i
+        self.line_starts = array("I")
+        self.line_words = array("I", [0])
+
+        words = long_words = position = 0
+        for line in text.split('\n'):
+            self.line_starts.append(position)
+            line_words = line.split()
+            words += len(line_words)
+            long_words += sum(map(_LONGER_THAN_TWO, map(len, line_words)))
+            self.line_words.append(words)
+            position += len(line) + 1
+        self.long_word_count = long_words
+
+        # Sentence i runs from sentence_starts[i] to sentence_ends[i]; every
+        # sentence_ends entry but the last starts a terminator
+        self.sentence_starts = array("I", [0])
+        self.sentence_ends = array("I")
+        for match in _TERMINATORS.finditer(text):
+            self.sentence_ends.append(match.start())
+            self.sentence_starts.append(match.end())
+        self.sentence_ends.append(len(text))
+
+        self.paragraph_starts = array("I", [0])
+        self.paragraph_ends = array("I")
+        for match in _PARAGRAPH_BREAK.finditer(text):
+            self.paragraph_ends.append(match.start())
+            self.paragraph_starts.append(match.end())
+        self.paragraph_ends.append(len(text))
+
+    @property
+    def word_count(self) -> int:
+        """Number of words, as len(text.split())."""
+        return self.line_words[-1]
+
+    @property
+    def sentence_count(self) -> int:
+        """Number of sentence terminators (runs of . ! ?), as len(re.findall(r'[.!?]+', text))."""
+        return len(self.sentence_ends) - 1
+
+    def _lines(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """
+        The lines [first, last) of text[start:end], or None when the span cuts
+        into a line's words (the running counts then do not apply).
+        """
+        first = bisect_right(self.line_starts, start) - 1
+        last = bisect_left(self.line_starts, end)
+        line_end = self.line_starts[last] - 1 if last < len(self.line_starts) else len(self.text)
+        text = self.text
+        if text[self.line_starts[first]:start].strip() or text[end:line_end].strip():
+            return None
+        return first, last
+
+    def words_in(self, start: int, end: int) -> int:
+        """Number of words in text[start:end], as len(text[start:end].split())."""
+        lines = self._lines(start, end) if start < end else None
+        if lines is None:
+            return len(self.text[start:end].split())
+        return self.line_words[lines[1]] - self.line_words[lines[0]]
+
+    def sentences_in(self, start: int, end: int) -> int:
+        """Number of sentence terminators in text[start:end], as re.findall(r'[.!?]+') on it."""
+        if start >= end:
+            return 0
+        terminators = len(self.sentence_ends) - 1
+        count = bisect_left(self.sentence_ends, end, 0, terminators) - bisect_left(self.sentence_ends, start, 0, terminators)
+        # A terminator cut by the start of the span still counts
+        if start > 0 and self.text[start] in '.!?' and self.text[start - 1] in '.!?':
+            count += 1
+        return count
+
+    def sentence_spans(self, start: int = 0, end: Optional[int] = None) -> List[Span]:
+        """
+        The sentence pieces overlapping text[start:end], clipped to it.
+
+        Over the whole text these are the pieces of re.split(r'[.!?]+', text).
+        """
+        end = len(self.text) if end is None else end
+        spans = []
+        for index in range(bisect_left(self.sentence_ends, start), len(self.sentence_starts)):
+            if self.sentence_starts[index] > end:
+                break
+            spans.append((max(self.sentence_starts[index], start), min(self.sentence_ends[index], end)))
+        return spans
+
+    def paragraph_spans(self) -> List[Span]:
+        """The paragraph pieces, as re.split(r'\\n\\s*\\n\\s*', text)."""
+        return list(zip(self.paragraph_starts, self.paragraph_ends))
+
+    def lower_span(self, start: int, end: int) -> str:
+        """The lowercased text[start:end], sliced from the lowercased text."""
+        return self.lower[start:end]
+
+    def strip_span(self, start: int, end: int) -> Span:
+        """The span of text[start:end].strip()."""
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
+
+    def __len__(self) -> int:
+        return len(self.text)
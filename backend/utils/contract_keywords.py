@@ -0,0 +1,135 @@
+"""
+Keyword indicators of the contract classification heuristics.
+
+Each automaton compiles the indicator phrases of one kind of text, keyed by
+category, so the analyzer classifies a contract with one scan instead of a
+substring search per phrase. Keywords are lowercase and are matched against
+lowercased text.
+
+CONTRACT_KEYWORDS (whole contract, ContractAnalyzerService metadata):
+    type.<Type>.strong|moderate|weak   contract type indicators, weighted 3/2/1
+    feature.<name>                     content areas, e.g. feature.payment_terms
+    jurisdiction.<code>                jurisdiction indicators
+
+SECTION_TITLE_KEYWORDS / SECTION_CONTENT_KEYWORDS (one candidate section):
+    non_contract                       titles of document furniture, not clauses
+    contract                           wording typical of contract clauses
+
+DOCUMENT_KEYWORDS (uploaded documents, DocumentMetadataExtractor):
+    type.<type>                        contract type keywords, scored by occurrences
+    jurisdiction.<code>                jurisdiction hints
+"""
+
+from utils.keyword_automaton import KeywordAutomaton
+
+CONTRACT_TYPE_INDICATORS = {
+    "Employment": {
+        "strong": ["employee", "employer", "employment", "position", "job duties", "workplace", "termination of employment"],
+        "moderate": ["salary", "wage", "work schedule", "benefits", "leave", "resignation"],
+        "weak": ["work", "duties", "responsibilities"]
+    },
+    "Service": {
+        "strong": ["service provider", "client", "deliverables", "scope of work", "statement of work"],
+        "moderate": ["services", "performance", "completion", "milestone"],
+        "weak": ["provide", "deliver", "complete"]
+    },
+    "Privacy": {
+        "strong": ["privacy policy", "privacy notice", "california consumer privacy act", "ccpa",
+                   "personal information collection", "privacy rights"],
+        "moderate": ["personal information", "data collection", "consumer rights", "privacy", "california resident"],
+        "weak": ["collect", "information", "data"]
+    },
+    "NDA": {
+        "strong": ["non-disclosure", "confidentiality agreement", "trade secret", "proprietary information"],
+        "moderate": ["confidential", "proprietary", "confidentiality"],
+        "weak": ["information", "disclosure"]
+    },
+    "Rental": {
+        "strong": ["landlord", "tenant", "lease agreement", "rental agreement", "premises"],
+        "moderate": ["rent", "lease", "property", "occupancy"],
+        "weak": ["monthly", "deposit"]
+    },
+    "Sales": {
+        "strong": ["purchase agreement", "sale agreement", "buyer", "seller", "transfer of ownership"],
+        "moderate": ["purchase", "sale", "goods", "products", "delivery"],
+        "weak": ["buy", "sell", "payment"]
+    },
+    "Partnership": {
+        "strong": ["partnership agreement", "joint venture", "business partnership", "profit sharing"],
+        "moderate": ["partner", "partnership", "collaboration", "venture"],
+        "weak": ["together", "joint", "share"]
+    }
+}
+
+INDICATOR_WEIGHTS = {"strong": 3, "moderate": 2, "weak": 1}
+
+CONTRACT_FEATURES = {
+    "data_processing": [
+        "personal data", "data processing", "data protection", "privacy policy",
+        "data subject", "gdpr", "pdpa", "collect information", "process data",
+        "personal information", "california", "ccpa", "consumer rights", "privacy rights",
+        "collect personal", "share data", "sell data", "sale of personal information"
+    ],
+    "termination_clauses": [
+        "termination", "terminate this", "end of contract", "contract expiry",
+        "cancellation", "breach of contract", "dissolution"
+    ],
+    "payment_terms": [
+        "payment terms", "payment schedule", "compensation", "remuneration",
+        "salary", "wage", "fee", "amount due", "invoice"
+    ],
+    "liability_clauses": [
+        "liability", "liable for", "damages", "indemnify", "indemnification",
+        "limitation of liability", "hold harmless", "responsibility for"
+    ],
+    "ip_clauses": [
+        "intellectual property", "copyright", "patent", "trademark",
+        "work product", "invention", "proprietary rights", "trade secret"
+    ]
+}
+
+CONTRACT_JURISDICTIONS = {
+    "MY": ["malaysia", "malaysian", "kuala lumpur", "ringgit", "rm ", "employment act 1955", "companies act 2016"],
+    "SG": ["singapore", "singaporean", "sgd", "singapore dollar", "companies act singapore"],
+    "US": ["united states", "usd", "us dollar", "state of california", "state of new york", "delaware", "california",
+           "ccpa", "california consumer privacy act", "california resident"],
+    "EU": ["european union", "gdpr", "euro", "eur", "brussels", "directive 95/46/ec"]
+}
+
+CONTRACT_KEYWORDS = KeywordAutomaton("contract_metadata")
+for _type, _tiers in CONTRACT_TYPE_INDICATORS.items():
+    for _tier, _keywords in _tiers.items():
+        CONTRACT_KEYWORDS.add(f"type.{_type}.{_tier}", _keywords)
+for _feature, _keywords in CONTRACT_FEATURES.items():
+    CONTRACT_KEYWORDS.add(f"feature.{_feature}", _keywords)
+for _code, _keywords in CONTRACT_JURISDICTIONS.items():
+    CONTRACT_KEYWORDS.add(f"jurisdiction.{_code}", _keywords)
+
+SECTION_TITLE_KEYWORDS = KeywordAutomaton("section_title", {
+    "non_contract": [
+        "summary", "analysis", "review", "note", "disclaimer", "generated",
+        "created", "overview", "introduction", "conclusion", "appendix",
+        "table of contents", "index", "header", "footer", "document",
+        "title", "subject", "re:", "from:", "to:", "date:", "version",
+        "page", "confidential", "draft", "final", "approved"
+    ]
+})
+
+SECTION_CONTENT_KEYWORDS = KeywordAutomaton("section_content", {
+    "contract": [
+        "party", "parties", "agreement", "contract", "shall", "will",
+        "hereby", "whereas", "therefore", "obligations", "rights",
+        "terms", "conditions", "provision", "clause", "section"
+    ]
+})
+
+DOCUMENT_KEYWORDS = KeywordAutomaton("document_metadata", {
+    "type.employment": ["employment", "employee", "salary", "job title"],
+    "type.nda": ["non-disclosure", "confidentiality", "proprietary"],
+    "type.service": ["service agreement", "consultant", "contractor"],
+    "type.data_processing": ["data processing", "gdpr", "personal data"],
+    "jurisdiction.MY": ["malaysia", "kuala lumpur", "pdpa", "employment act 1955"],
+    "jurisdiction.SG": ["singapore", "pdpa singapore", "singapore law"],
+    "jurisdiction.US": ["united states", "california", "ccpa", "federal law"],
+    "jurisdiction.EU": ["gdpr", "european union", "data protection"]
+})
@@ -0,0 +1,125 @@
+"""
+Regular expressions of the rule-based contract analysis.
+
+Every pattern ContractAnalyzerService matches against contract text is
+registered here once, compiled at import time, under a name of the form
+<area>.<check>. Rules checking a specific statute carry its law id; general
+contract law rules have none. Rules tried one after the other as alternatives
+belong to a group and are fetched with CONTRACT_PATTERNS.group(name).
+
+Rules with no flags are matched against the lowercased contract text; those
+compiled with IGNORECASE run on the original text so match offsets can be used
+to extract clause context.
+
+The per-law statutory checks (Employment Act 1955, PDPA, GDPR and the CCPA
+consumer rights check) are declared in the compliance_rules of the law files
+instead and compiled by utils/law_rules.py. The CCPA detectors below aggregate
+many signals into one finding and are plugged into those rules by name.
+"""
+
+import re
+
+from utils.pattern_registry import PatternRegistry
+
+CONTRACT_PATTERNS = PatternRegistry("contract_analyzer")
+
+_rule = CONTRACT_PATTERNS.register
+
+EMPLOYMENT_ACT_MY = "EMPLOYMENT_ACT_MY"
+CCPA_US = "CCPA_US"
+
+# Section heading lines, on the original text; one pass finds all four kinds
+# and utils/contract_sections.py nests them into a tree. Each match starts at
+# the newline before the line (a literal the engine skips ahead to) and the
+# lookahead gives up on long lines at once, so most body lines cost one step;
+# the text is scanned with a newline added at both ends.
+_rule("section.heading", r"""
+    \n(?=[^\n]{1,100}\n)[ \t]*(?:
+        # Numbered sections (e.g., "1. Definitions", "2.1 Scope", "2.1.3. Exceptions")
+        (?P<number>\d+(?:\.\d+)+|\d+(?=\.))\.?[ \t]+(?P<numbered>[A-Z][^.\n]{5,50})
+        # Lettered sections (e.g., "A. Terms", "B. Conditions")
+      | (?P<letter>[A-Z])\.[ \t]+(?P<lettered>[A-Z][^.\n]{5,50})
+        # Named sections in contracts (e.g., "WHEREAS", "NOW THEREFORE")
+      | (?P<recital>WHEREAS|NOW[ \t]+THEREFORE|WITNESSETH|RECITALS?)[ \t]*[,:]
+        # Title case headings
+      | (?P<titled>[A-Z][a-z][^.\n]{10,80})[.]?
+    )[ \t]*$
+""", re.MULTILINE | re.VERBOSE)
+
+# Per-section checks (run on each lowercased section)
+_rule("section.notice_period", r'(\d+)\s*(day|week|month)', law=EMPLOYMENT_ACT_MY)
+_rule("section.amount", r'(\d+(?:,\d+)*)')
+
+# General contract law, on the lowercased text unless noted
+_rule("general.liability_cap", r'liability.*limited.*to.*(?:rm\s*)?(\d+(?:,\d+)*)')
+_rule("general.unilateral_modification",
+      r'(?:company|employer|party).*may.*(?:modify|change|alter).*(?:unilaterally|without.*consent)')
+_rule("general.modification_clause", r'(?:company|employer|party).*may.*(?:modify|change|alter).*?(?:\.|$)',
+      re.IGNORECASE | re.DOTALL)
+_rule("general.consideration", r'consideration|payment|compensation|remuneration')
+_rule("general.number", r'(\d+)')
+
+# CCPA, on the lowercased text
+_rule("ccpa.right_to_correct", r'right\s+to\s+correct|correct.*personal.*information|rectif', law=CCPA_US)
+_rule("ccpa.right_to_limit_sensitive",
+      r'limit.*use.*sensitive|sensitive.*personal.*information.*limit|opt.*out.*sensitive', law=CCPA_US)
+_rule("ccpa.non_discrimination", r'non.*discrimination|right.*not.*discriminate|equal.*treatment', law=CCPA_US)
+_rule("ccpa.opt_out_fee", r'opt.*out.*(?:may|will|result).*(?:additional|extra).*fee|fee.*opt.*out|charge.*opt.*out',
+      law=CCPA_US)
+_rule("ccpa.opt_out_service_limit", r'opt.*out.*(?:may|will).*limit.*service|service.*limited.*opt.*out', law=CCPA_US)
+_rule("ccpa.contact_toll_free", r'toll.*free|1.*800.*|1.*888.*|1.*877.*|1.*866.*', law=CCPA_US)
+_rule("ccpa.contact_website", r'website|online.*form|web.*form|www\.|http', law=CCPA_US)
+_rule("ccpa.contact_email", r'email|@.*\.com|contact.*email', law=CCPA_US)
+_rule("ccpa.contact_postal", r'mail.*address|postal.*address|mailing.*address|street.*address', law=CCPA_US)
+_rule("ccpa.response_days", r'respond.*within.*(\d+).*days?|(\d+).*days?.*respond', law=CCPA_US)
+_rule("ccpa.fulfillment_days", r'fulfill.*within.*(\d+).*days?|complete.*within.*(\d+).*days?', law=CCPA_US)
+_rule("ccpa.verification_fee", r'verification.*fee|fee.*verification|charge.*verify|verification.*cost', law=CCPA_US)
+_rule("ccpa.processing_fee", r'processing.*fee|fee.*processing|charge.*process.*request', law=CCPA_US)
+_rule("ccpa.consumer_request_fee", r'fee.*consumer.*request|charge.*consumer.*right|cost.*exercise.*right',
+      law=CCPA_US)
+_rule("ccpa.provider_own_purpose",
+      r'service.*provider.*(?:can|may|use).*(?:own|their).*purpose|vendor.*use.*own.*business', law=CCPA_US)
+_rule("ccpa.provider_sells_data", r'service.*provider.*(?:sell|share).*data|vendor.*sell.*data|third.*party.*sell',
+      law=CCPA_US)
+_rule("ccpa.service_provider_mentioned", r'service.*provider|vendor|third.*party', law=CCPA_US)
+_rule("ccpa.service_provider_restricted", r'service.*provider.*(?:shall|must|limited|restrict)', law=CCPA_US)
+_rule("ccpa.retention_period", r'retention.*period|retain.*for|keep.*for.*year|delete.*after', law=CCPA_US)
+_rule("ccpa.information_source", r'source.*information|collect.*from|obtain.*from|gather.*from', law=CCPA_US)
+_rule("ccpa.third_party_categories", r'third.*part.*categor|share.*with.*type|disclose.*to.*categor', law=CCPA_US)
+_rule("ccpa.data_sale", r'sell.*data|sale.*personal.*information|sell.*personal', law=CCPA_US)
+_rule("ccpa.opt_out_notice", r'opt.*out|do.*not.*sell', law=CCPA_US)
+_rule("ccpa.sensitive_information_disclosure", r'sensitive.*personal.*information|limit.*use.*sensitive', law=CCPA_US)
+
+# CCPA clause extraction, on the original text
+for _group, _patterns in (
+    ("ccpa.discrimination_clause", (
+        ("opt_out_fee", r'opt.*out.*(?:may|will|result).*(?:additional|extra).*fee[^.]*\.'),
+        ("opt_out_service_limit", r'opt.*out.*(?:may|will).*limit.*service[^.]*\.'),
+        ("fee_for_opt_out", r'(?:additional|extra).*fee.*opt.*out[^.]*\.'),
+        ("service_limited", r'service.*limited.*opt.*out[^.]*\.'),
+    )),
+    ("ccpa.service_provider_clause", (
+        ("own_purpose", r'service.*provider.*(?:can|may|use).*(?:own|their).*purpose[^.]*\.'),
+        ("vendor_own_business", r'vendor.*use.*own.*business[^.]*\.'),
+        ("sells_data", r'service.*provider.*(?:sell|share).*data[^.]*\.'),
+        ("third_party_sells", r'third.*party.*sell.*data[^.]*\.'),
+    )),
+    ("ccpa.fee_clause", (
+        ("verification_fee", r'verification.*fee[^.]*\.'),
+        ("fee_verification", r'fee.*verification[^.]*\.'),
+        ("processing_fee", r'processing.*fee.*request[^.]*\.'),
+        ("charge_verify", r'charge.*verify[^.]*\.'),
+        ("exercise_cost", r'cost.*exercise.*right[^.]*\.'),
+    )),
+    ("ccpa.response_time_clause", (
+        ("respond_within", r'respond.*within.*(\d+).*days?[^.]*\.'),
+        ("days_to_respond", r'(\d+).*days?.*respond.*request[^.]*\.'),
+    )),
+):
+    for _name, _pattern in _patterns:
+        _rule(f"{_group}.{_name}", _pattern, re.IGNORECASE | re.DOTALL, law=CCPA_US, group=_group)
+
+_rule("ccpa.contact_section", r'(?:how.*to.*exercise|contact.*us|exercise.*rights)[\s\S]*?(?=\n\s*#{1,6}|\n\s*\*\*|$)',
+      re.IGNORECASE, law=CCPA_US)
+_rule("ccpa.data_sale_clause", r'(?:sell.*personal.*information|sale.*personal.*data)(?:(?!opt.*out|do.*not.*sell).)*[^.]*\.',
+      re.IGNORECASE | re.DOTALL, law=CCPA_US)
@@ -0,0 +1,210 @@
+"""
+Hierarchical contract sections, parsed in one pass over the lines.
+
+The section extractor used to run four multi-line regexes over the whole
+contract one after the other (numbered, lettered, recital and title case
+headings, each capturing the content under the heading) and kept the ten
+largest results. parse_sections() finds all four heading forms in a single scan
+with the section.heading rule and nests them into a tree:
+
+    numbered    "1. Definitions", "2.1 Scope", "2.1.3. Exceptions"   level = numbering depth
+    lettered    "A. Terms"                                             one below the enclosing section
+    recital     "WHEREAS:", "NOW THEREFORE,"                           level 1
+    titled      "Termination of Employment"                            level 1
+
+A title case line only counts as a heading at the start of the text or after a
+blank line. A section holds offsets, not text: the heading line starts at
+heading_start (its title at title_start, after any number), the text directly
+under it runs from start to end, and its subsections follow until subtree_end.
+
+The rule only looks at lines of up to 100 characters and never past the end of
+a line, and the tree is built with a stack of the open sections, so parsing is
+linear in the length of the contract (benchmarks/bench_section_parser.py).
+"""
+
+from bisect import bisect_right
+from typing import Iterator, List, Optional
+
+from utils.contract_document import ContractDocument, Span
+from utils.contract_patterns import CONTRACT_PATTERNS
+
+
+class ContractSection:
+    """One heading of the contract and the text under it, by offset."""
+
+    __slots__ = (
+        "index", "kind", "number", "title", "level", "heading_start", "title_start", "start", "end",
+        "subtree_end", "parent", "children"
+    )
+
+    def __init__(self, index: int, kind: str, number: Optional[str], title: str, level: int,
+                 heading_start: int, title_start: int, start: int, parent: Optional["ContractSection"]):
+        self.index = index
+        self.kind = kind
+        self.number = number
+        self.title = title
+        self.level = level
+        self.heading_start = heading_start
+        self.title_start = title_start
+        self.start = start
+        self.end = start
+        self.subtree_end = start
+        self.parent = parent
+        self.children: List[ContractSection] = []
+
+    @property
+    def id(self) -> str:
+        """The section number or letter, or "Section <n>" for unnumbered headings."""
+        return self.number or f"Section {self.index + 1}"
+
+    @property
+    def label(self) -> str:
+        """The heading as written, e.g. "2.1 Scope"."""
+        return f"{self.number} {self.title}" if self.number else self.title
+
+    def path(self) -> List["ContractSection"]:
+        """The sections from the top level down to this one."""
+        path = []
+        section: Optional[ContractSection] = self
+        while section is not None:
+            path.append(section)
+            section = section.parent
+        return path[::-1]
+
+    def __repr__(self) -> str:
+        return f"ContractSection({self.label!r}, level={self.level})"
+
+
+class SectionTree:
+    """The sections of one contract, in document order and nested by level."""
+
+    __slots__ = ("sections", "roots", "_heading_starts")
+
+    def __init__(self, sections: List[ContractSection]):
+        self.sections = sections
+        self.roots = [section for section in sections if section.parent is None]
+        self._heading_starts = [section.heading_start for section in sections]
+
+    def section_at(self, offset: int) -> Optional[ContractSection]:
+        """The innermost section whose heading or text contains offset, if any."""
+        index = bisect_right(self._heading_starts, offset) - 1
+        section = self.sections[index] if index >= 0 else None
+        while section is not None and offset >= section.subtree_end:
+            section = section.parent
+        return section
+
+    @property
+    def depth(self) -> int:
+        """The deepest nesting level."""
+        return max((section.level for section in self.sections), default=0)
+
+    def __iter__(self) -> Iterator[ContractSection]:
+        return iter(self.sections)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+
+def _after_blank_line(text: str, position: int) -> bool:
+    """Whether the line starting at position is the first line or follows a blank one."""
+    if position == 0:
+        return True
+    previous_start = text.rfind("\n", 0, position - 1) + 1
+    return not text[previous_start:position - 1].strip()
+
+
+def parse_sections(document: ContractDocument) -> SectionTree:
+    """
+    Parse the headings of a contract into a section tree.
+
+    Args:
+        document: The tokenized (preprocessed) contract
+
+    Returns:
+        The sections, nested by numbering depth and heading kind
+    """
+    text = document.text
+    sections: List[ContractSection] = []
+    open_sections: List[ContractSection] = []
+
+    def close(section: ContractSection, position: int) -> None:
+        section.subtree_end = document.strip_span(section.start, position)[1]
+        if section.children:
+            section.end = document.strip_span(section.start, section.children[0].heading_start)[1]
+        else:
+            section.end = section.subtree_end
+
+    # Offsets into the padded text are one more than into text, so a match
+    # starting at the newline before a line starts at the line's offset in text
+    for match in CONTRACT_PATTERNS["section.heading"].finditer(f"\n{text}\n"):
+        kind = match.lastgroup
+        # A title case line inside a paragraph is a wrapped line, not a heading
+        if kind == "titled" and not _after_blank_line(text, match.start()):
+            continue
+        if kind == "numbered":
+            number = match.group("number")
+            level = number.count(".") + 1
+        elif kind == "lettered":
+            number = match.group("letter")
+            enclosing = next((section for section in reversed(open_sections) if section.kind != "lettered"), None)
+            level = enclosing.level + 1 if enclosing else 1
+        else:
+            number = None
+            level = 1
+        title = " ".join(match.group(kind).split()) if kind == "recital" else match.group(kind).strip().rstrip(":")
+
+        while open_sections and open_sections[-1].level >= level:
+            close(open_sections.pop(), match.start())
+        parent = open_sections[-1] if open_sections else None
+        start = match.end() - 1
+        while start < len(text) and text[start].isspace():
+            start += 1
+        section = ContractSection(len(sections), kind, number, title, level, match.start(), match.start(kind) - 1,
+                                  start, parent)
+        if parent is not None:
+            parent.children.append(section)
+        sections.append(section)
+        open_sections.append(section)
+
+    for section in reversed(open_sections):
+        close(section, len(text))
+    return SectionTree(sections)
+
+
+def section_spans(tree: SectionTree, text: str, max_chars: int, cut_unnumbered: bool = False) -> List[Span]:
+    """
+    Cut a contract along its section tree into pieces of at most max_chars where the headings allow.
+
+    The contract is cut at its top-level headings: the text before the first
+    heading, then each section with its subsections. A section longer than
+    max_chars is cut again at its subsections, level by level; pieces without
+    subsection headings are kept whole, however long.
+
+    Args:
+        tree: The section tree of text
+        text: The contract
+        max_chars: Length above which a section is cut at its subsections
+        cut_unnumbered: Also cut title and recital sections at their subsections, whatever their length
+
+    Returns:
+        The spans of the non-blank pieces with surrounding whitespace stripped, in order
+    """
+    spans: List[Span] = []
+
+    def cut(start: int, end: int, sections: List[ContractSection]) -> None:
+        # The text before the first heading, then each section up to the next one
+        boundaries = [start] + [section.heading_start for section in sections] + [end]
+        for piece_start, piece_end, section in zip(boundaries, boundaries[1:], [None] + sections):
+            piece = text[piece_start:piece_end]
+            stripped = piece.strip()
+            if not stripped:
+                continue
+            if section is not None and section.children and \
+                    (len(stripped) > max_chars or (cut_unnumbered and section.number is None)):
+                cut(piece_start, piece_end, section.children)
+            else:
+                offset = piece_start + len(piece) - len(piece.lstrip())
+                spans.append((offset, offset + len(stripped)))
+
+    cut(0, len(text), tree.roots)
+    return spans
@@ -0,0 +1,254 @@
+"""
+Request-scoped deadlines for the analysis pipeline.
+
+A request to the API passes through file validation, text extraction,
+sanitisation, contract analysis and the AI provider call, each with its own
+fixed timeout; none of them knew how much of the client's patience was left.
+DeadlineMiddleware starts a Deadline for every HTTP request, from the
+X-Request-Timeout header (seconds) or the server default, and makes it the
+current deadline for everything the request runs. Stages cap their own
+timeouts with bounded_timeout(), check it between steps with check_deadline(),
+and the analyzer answers from heuristics when too little time remains for an
+AI call. Work for a client that disconnects before its response is sent is
+cancelled.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT_HEADER = "x-request-timeout"
+
+_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a stage starts after the request deadline has passed."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Request deadline exceeded before {stage}")
+
+
+class Deadline:
+    """A point in time (time.monotonic()) by which a request must be answered."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float):
+        """
+        Initialize a deadline.
+
+        Args:
+            seconds: Time budget from now
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.2f}s)"
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run the block (and tasks created in it) under a deadline.
+
+    Args:
+        seconds: Time budget from now, or None to run without a deadline
+
+    Yields:
+        The new Deadline, or None
+    """
+    deadline = Deadline(seconds) if seconds is not None else None
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def without_deadline(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Run a coroutine function without a deadline, for work that outlives the request that started it."""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with request_deadline(None):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the current request, or None outside of one."""
+    return _deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one."""
+    deadline = _deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def check_deadline(stage: str) -> None:
+    """
+    Fail fast instead of starting a stage the client will not wait for.
+
+    Args:
+        stage: Name of the stage about to start, for the error message
+
+    Raises:
+        DeadlineExceeded: If the current request's deadline has passed
+    """
+    deadline = _deadline.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(stage)
+
+
+def bounded_timeout(timeout: float, stage: str) -> float:
+    """
+    Timeout for a stage: its own limit, capped by the time left for the request.
+
+    Args:
+        timeout: The stage's configured timeout in seconds
+        stage: Name of the stage, for the error message
+
+    Returns:
+        Seconds the stage may take
+
+    Raises:
+        DeadlineExceeded: If the current request's deadline has passed
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(stage)
+    return min(timeout, remaining)
+
+
+def parse_request_timeout(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds from an X-Request-Timeout header value.
+
+    Returns:
+        Positive seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value.strip())
+    except ValueError:
+        return None
+    return seconds if seconds > 0 else None
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware that runs each HTTP request under a Deadline and cancels
+    it if the client disconnects before the response is complete.
+
+    The budget is the X-Request-Timeout header, capped at max_timeout, or
+    default_timeout when the header is absent; a default of 0 leaves requests
+    without a header unbounded. Once the request body has been read, the
+    middleware listens for the client's disconnect itself and hands it to the
+    application if it asks.
+    """
+
+    def __init__(self, app: Any, default_timeout: Optional[float] = None,
+                 max_timeout: Optional[float] = None):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            default_timeout: Budget in seconds for requests without the header
+                (defaults to REQUEST_TIMEOUT_SECONDS, 0 for none)
+            max_timeout: Upper bound for client-requested budgets
+                (defaults to REQUEST_TIMEOUT_MAX_SECONDS)
+        """
+        self.app = app
+        if default_timeout is None:
+            default_timeout = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "150"))
+        if max_timeout is None:
+            max_timeout = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "600"))
+        self.default_timeout = default_timeout if default_timeout > 0 else None
+        self.max_timeout = max_timeout
+
+    def _budget(self, scope: Dict[str, Any]) -> Optional[float]:
+        """Seconds allowed for a request from its header or the server default."""
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == REQUEST_TIMEOUT_HEADER:
+                seconds = parse_request_timeout(value.decode("latin-1"))
+                if seconds is not None:
+                    return min(seconds, self.max_timeout)
+        return self.default_timeout
+
+    async def __call__(self, scope: Dict[str, Any], receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        body_read = asyncio.Event()
+        disconnected = asyncio.Event()
+        responded = False
+
+        async def receive_request() -> Dict[str, Any]:
+            if body_read.is_set():
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                body_read.set()
+            return message
+
+        async def send_response(message: Dict[str, Any]) -> None:
+            nonlocal responded
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                responded = True
+            await send(message)
+
+        async def watch_disconnect() -> None:
+            await body_read.wait()
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        with request_deadline(self._budget(scope)):
+            request_task = asyncio.ensure_future(self.app(scope, receive_request, send_response))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            while not request_task.done():
+                await asyncio.wait({request_task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                if watcher.done():
+                    if disconnected.is_set() and not responded and not request_task.done():
+                        logger.info(f"Client disconnected; cancelling {scope.get('method')} {scope.get('path')}")
+                        request_task.cancel()
+                    break
+            try:
+                await request_task
+            except asyncio.CancelledError:
+                if not disconnected.is_set():
+                    raise
+        finally:
+            if not watcher.done():
+                watcher.cancel()
+            if not request_task.done():
+                request_task.cancel()
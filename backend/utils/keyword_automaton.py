@@ -0,0 +1,176 @@
+"""
+Multi-keyword matching in a single pass over the text (Aho-Corasick).
+
+Contract classification checks a few hundred indicator phrases, one substring
+search each. A KeywordAutomaton compiles the phrases of every category into one
+automaton, so a single scan reports which phrases occur and how often.
+
+Keywords are matched verbatim as substrings, like `keyword in text`, so callers
+lowercase the text when the keywords are lowercase. Occurrence counts follow
+str.count: occurrences of one keyword that overlap each other count once.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class KeywordMatches:
+    """Keywords found by a KeywordAutomaton scan, with their occurrence counts."""
+
+    __slots__ = ("counts", "_categories")
+
+    def __init__(self, counts: Dict[str, int], categories: Mapping[str, Tuple[str, ...]]):
+        """
+        Initialize the scan result.
+
+        Args:
+            counts: Occurrences per keyword found (keywords not found are absent)
+            categories: Keywords of each category of the automaton
+        """
+        self.counts = counts
+        self._categories = categories
+
+    def found(self, category: str) -> List[str]:
+        """Keywords of category found in the text, in registration order."""
+        return [keyword for keyword in self._categories.get(category, ()) if keyword in self.counts]
+
+    def has(self, category: str) -> bool:
+        """Whether any keyword of category occurs in the text."""
+        return any(keyword in self.counts for keyword in self._categories.get(category, ()))
+
+    def distinct(self, category: str) -> int:
+        """Number of different keywords of category found."""
+        return len(self.found(category))
+
+    def occurrences(self, category: str) -> int:
+        """Total occurrences of the keywords of category."""
+        return sum(self.counts.get(keyword, 0) for keyword in self._categories.get(category, ()))
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.counts
+
+    def __repr__(self) -> str:
+        return f"KeywordMatches({self.counts!r})"
+
+
+class KeywordAutomaton:
+    """
+    Named keyword categories compiled into one Aho-Corasick automaton.
+
+    A keyword may belong to several categories. The automaton is built lazily
+    on the first scan after keywords were added; once built it is read-only and
+    can be scanned from several threads at once.
+    """
+
+    def __init__(self, name: str, categories: Optional[Mapping[str, Iterable[str]]] = None):
+        """
+        Initialize the automaton.
+
+        Args:
+            name: Automaton name used in logs and benchmarks
+            categories: Keywords per category to add right away
+        """
+        self.name = name
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        self._transitions: List[Dict[str, int]] = []
+        self._outputs: List[Tuple[str, ...]] = []
+        self._built = False
+        for category, keywords in (categories or {}).items():
+            self.add(category, keywords)
+
+    def add(self, category: str, keywords: Iterable[str]) -> None:
+        """
+        Add keywords to a category.
+
+        Args:
+            category: Category name, e.g. "type.Employment.strong"
+            keywords: Keywords to match verbatim
+
+        Raises:
+            ValueError: If a keyword is empty
+        """
+        keywords = tuple(keywords)
+        if any(not keyword for keyword in keywords):
+            raise ValueError(f"Empty keyword in category '{category}' of {self.name}")
+        existing = self._categories.get(category, ())
+        self._categories[category] = existing + tuple(keyword for keyword in keywords if keyword not in existing)
+        self._built = False
+
+    @property
+    def categories(self) -> Tuple[str, ...]:
+        return tuple(self._categories)
+
+    def keywords(self, category: str) -> Tuple[str, ...]:
+        """
+        Keywords of a category, in registration order.
+
+        Raises:
+            KeyError: If the category does not exist
+        """
+        return self._categories[category]
+
+    def _build(self) -> None:
+        """Build the trie, then resolve failure links into a full transition table."""
+        transitions: List[Dict[str, int]] = [{}]
+        outputs: List[List[str]] = [[]]
+        for keyword in dict.fromkeys(keyword for keywords in self._categories.values() for keyword in keywords):
+            state = 0
+            for char in keyword:
+                following = transitions[state].get(char)
+                if following is None:
+                    following = len(transitions)
+                    transitions[state][char] = following
+                    transitions.append({})
+                    outputs.append([])
+                state = following
+            outputs[state].append(keyword)
+
+        # Breadth-first, each state inherits the transitions of its failure
+        # state, so a scan never follows failure links: one lookup per char.
+        failure = [0] * len(transitions)
+        queue = deque()
+        for state in transitions[0].values():
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, following in list(transitions[state].items()):
+                queue.append(following)
+                fallback = transitions[failure[state]].get(char, 0)
+                failure[following] = fallback if fallback != following else 0
+                outputs[following].extend(outputs[failure[following]])
+            for char, following in transitions[failure[state]].items():
+                transitions[state].setdefault(char, following)
+
+        self._transitions = transitions
+        self._outputs = [tuple(found) for found in outputs]
+        self._built = True
+
+    def scan(self, text: str) -> KeywordMatches:
+        """
+        Find every keyword in text in one pass.
+
+        Args:
+            text: Text to search (lowercase it first to match lowercase keywords)
+
+        Returns:
+            The keywords found and their occurrence counts
+        """
+        if not self._built:
+            self._build()
+        transitions = self._transitions
+        outputs = self._outputs
+        counts: Dict[str, int] = {}
+        last_end: Dict[str, int] = {}
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                for keyword in outputs[state]:
+                    # Like str.count, skip occurrences overlapping the previous one
+                    if end - len(keyword) >= last_end.get(keyword, 0):
+                        counts[keyword] = counts.get(keyword, 0) + 1
+                        last_end[keyword] = end
+        return KeywordMatches(counts, self._categories)
+
+    def __len__(self) -> int:
+        return len({keyword for keywords in self._categories.values() for keyword in keywords})
@@ -3,6 +3,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from utils.law_rules import LawRuleEngine
+
 logger = logging.getLogger(__name__)
 
 class LawLoader:
@@ -11,6 +13,8 @@ class LawLoader:
     1. Loads the base structure and mappings from a central `mappings.json`.
     2. Enriches the loaded laws with detailed data from individual JSON files
        in a specified directory.
+    3. Compiles the compliance_rules declared in the law files into a
+       LawRuleEngine for the rule-based contract analysis.
     """
     def __init__(self, 
                  mappings_file: str = "data/general/mappings.json",
@@ -26,9 +30,10 @@ class LawLoader:
         self._risk_levels: Dict[str, Any] = {}
         self._metadata: Dict[str, Any] = {}
         
-        # Perform the two-stage load
+        # Perform the two-stage load, then compile the declared compliance rules once
         self._initialize_from_mappings()
         self._enrich_with_detailed_laws()
+        self._rule_engine = self._compile_compliance_rules()
 
     def _initialize_from_mappings(self):
         logger.info(f"Loading base mappings from {self.mappings_file}...")
@@ -81,6 +86,12 @@ class LawLoader:
                 logger.error(f"Failed to load or enrich from {law_file_path.name}: {e}")
         logger.info(f"Enrichment complete. {enriched_count} laws were updated with detailed data.")
 
+    def _compile_compliance_rules(self) -> LawRuleEngine:
+        try:
+            return LawRuleEngine.from_laws(self._law_cache)
+        except Exception as e:
+            logger.error(f"FATAL: Invalid compliance rules in {self.detailed_laws_dir}: {e}")
+            raise
 
     # --- Public Accessor Methods ---
     # These methods remain largely the same, but now serve much richer data.
@@ -117,4 +128,8 @@ class LawLoader:
         return checklist
 
     def get_law_details(self, law_code: str) -> Optional[Dict[str, Any]]:
-        return self._law_cache.get(law_code)
\ No newline at end of file
+        return self._law_cache.get(law_code)
+
+    def get_rule_engine(self) -> LawRuleEngine:
+        """The compliance rules of the loaded laws, compiled at load time."""
+        return self._rule_engine
\ No newline at end of file
@@ -0,0 +1,560 @@
+"""
+Declarative statutory compliance rules, compiled from the law data files.
+
+A law file may declare the checks the rule-based analysis runs for it in a
+"compliance_rules" section:
+
+    "compliance_rules": {
+        "applies_to": {"jurisdictions": ["MY"], "contract_types": ["Employment"]},
+        "fallback_requirements": ["..."],
+        "fallback_recommendations": ["..."],
+        "rules": [{"id": "overtime_compensation", "check": "required", ...}]
+    }
+
+applies_to restricts the law to jurisdictions, analyzer contract types and
+content features (e.g. "data_processing" for metadata["has_data_processing"]).
+The fallback lists replace AI requirements or recommendations that were all
+generic placeholders.
+
+Every rule has an id and a check:
+
+    required   pattern(s) or terms that must occur; reported when none does
+    forbidden  pattern(s) that must not occur; matches whose clause context
+               contains an "unless_context" term are allowed
+    limit      pattern(s) capturing a number checked against "min"/"max", or
+               against the first of "limits" whose "when" terms occur in the
+               match; "units" and "unit_group" convert e.g. weeks into days
+    terms      "terms" of which at most "max_missing" may be absent
+    detector   a named Python detector supplied by the caller, for checks that
+               aggregate many signals into one finding
+
+A rule reports a compliance requirement ("requirement", "recommendation") and/or
+a flagged clause ("issue", "severity"). Flagged clauses quote the clause around
+the match, the first match of "anchor" (for required rules, compiled with
+"anchor_flags"), or "clause_text".
+Texts are str.format templates over {value}, {unit}, {plural} and {missing}.
+"provision" links the rule to an entry of the law's key_provisions.
+
+Patterns run on the lowercased contract; flagged clauses quote the original
+text, and anchors with the IGNORECASE flag are quoted from it too. Rules are
+compiled once when the laws are loaded; their patterns live in one
+PatternRegistry and all of their terms in one KeywordAutomaton, so evaluating
+a contract scans it once for every term of every applicable law.
+
+Evaluation is in two steps: LawRule.find() matches the patterns in one clause,
+and LawRule.evaluate() reports on the matches of all clauses together (the
+first violation, a requirement met nowhere). The engine evaluates a contract as
+one clause, or clause by clause (utils.clause_cache) with the matches of each
+distinct clause looked up in a ClauseCache. Rules that are not clause-local
+(LawRule.clause_local) always see the whole contract, so both ways report the
+same findings: detector rules, rules whose pattern or anchor runs with DOTALL
+and may span clauses, and limit rules of scope "first", whose first match is
+the first in the contract.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Container, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from utils.clause_cache import Clause, ClauseCache, make_clause_key
+from utils.keyword_automaton import KeywordAutomaton
+from utils.pattern_registry import PatternRegistry, PatternRule
+
+logger = logging.getLogger(__name__)
+
+CHECKS = ("required", "forbidden", "limit", "terms", "detector")
+SCOPES = ("first", "first_violation", "all")
+CLAUSE_EXCERPT_CHARS = 200
+
+# A detector receives the contract and its lowercased text and returns finding
+# dictionaries with any of the RuleFinding text fields, and the start and end
+# offsets of a flagged clause
+Detector = Callable[[str, str], List[Dict[str, Any]]]
+
+_FLAGS = {"IGNORECASE": re.IGNORECASE, "MULTILINE": re.MULTILINE, "DOTALL": re.DOTALL}
+_WHITESPACE = re.compile(r'\s+')
+
+
+def clause_context(text: str, start: int, end: int, context_chars: int = 150) -> str:
+    """
+    The clause around a match: context_chars either side, whitespace collapsed,
+    cut to CLAUSE_EXCERPT_CHARS characters.
+    """
+    context = text[max(0, start - context_chars):min(len(text), end + context_chars)]
+    context = _WHITESPACE.sub(' ', context).strip()
+    if len(context) > CLAUSE_EXCERPT_CHARS:
+        context = context[:CLAUSE_EXCERPT_CHARS] + "..."
+    return context
+
+
+def clause_excerpt(text: str, start: int, end: int) -> str:
+    """The start of the clause text[start:end], cut to CLAUSE_EXCERPT_CHARS characters without copying the rest."""
+    if end - start > CLAUSE_EXCERPT_CHARS:
+        return text[start:start + CLAUSE_EXCERPT_CHARS] + "..."
+    return text[start:end]
+
+
+@dataclass
+class RuleFinding:
+    """One violation reported by a rule; span holds the offsets of the matched text."""
+    law: str
+    rule: str
+    requirement: Optional[str] = None
+    recommendation: Optional[str] = None
+    issue: Optional[str] = None
+    severity: Optional[str] = None
+    clause_text: Optional[str] = None
+    span: Optional[Tuple[int, int]] = None
+
+    def flagged_clause(self) -> Optional[Dict[str, Any]]:
+        """The finding as a flagged clause, if it reports one, with the offsets of the matched text."""
+        if self.issue is None or self.clause_text is None:
+            return None
+        clause = {"clause_text": self.clause_text, "issue": self.issue, "severity": self.severity or "medium"}
+        if self.span is not None:
+            clause["start"], clause["end"] = self.span
+        return clause
+
+
+class LawRule:
+    """A compiled rule of one law."""
+
+    _TEXT_FIELDS = ("requirement", "recommendation", "issue", "severity")
+
+    def __init__(self, law: str, definition: Mapping[str, Any], registry: PatternRegistry,
+                 provisions: Mapping[str, Any]):
+        """
+        Compile a rule definition.
+
+        Args:
+            law: Identifier of the law declaring the rule
+            definition: The rule as declared in the law file
+            registry: Registry the rule's patterns are compiled into
+            provisions: The law's key_provisions, to validate "provision"
+
+        Raises:
+            ValueError: If the definition is incomplete or inconsistent
+            re.error: If a pattern does not compile
+        """
+        self.law = law
+        self.id = definition.get("id") or ""
+        self.name = f"{law}.{self.id}"
+        self.check = definition.get("check")
+        if not self.id or self.check not in CHECKS:
+            raise ValueError(f"Rule '{self.name}' needs an id and a check out of {', '.join(CHECKS)}")
+        self.scope = definition.get("scope", "first_violation")
+        if self.scope not in SCOPES:
+            raise ValueError(f"Rule '{self.name}' has unknown scope '{self.scope}'")
+        self.provision = definition.get("provision")
+        if self.provision is not None and self.provision not in provisions:
+            raise ValueError(f"Rule '{self.name}' refers to unknown provision '{self.provision}'")
+
+        flags = self._flags(definition.get("flags", []))
+        sources = definition.get("patterns") or ([definition["pattern"]] if "pattern" in definition else [])
+        self.patterns: Tuple[PatternRule, ...] = tuple(
+            registry.register(self.name if len(sources) == 1 else f"{self.name}.{index}", source, flags, law=law,
+                              group=self.name if len(sources) > 1 else None)
+            for index, source in enumerate(sources, 1)
+        )
+        anchor_flags = self._flags(definition.get("anchor_flags", []))
+        self.anchor_on_original = bool(anchor_flags & re.IGNORECASE)
+        self.anchor = (registry.register(f"{self.name}.anchor", definition["anchor"], anchor_flags, law=law)
+                       if "anchor" in definition else None)
+        self.clause_local = self.check != "detector" and not (
+            (flags | (anchor_flags if self.anchor is not None else 0)) & re.DOTALL
+            or (self.check == "limit" and self.scope == "first")
+        )
+
+        self.terms = tuple(term.lower() for term in definition.get("terms", []))
+        self.max_missing = int(definition.get("max_missing", 0))
+        self.unless_context = tuple(term.lower() for term in definition.get("unless_context", []))
+        self.clause_text = definition.get("clause_text")
+        self.detector = definition.get("detector")
+        self.min = definition.get("min")
+        self.max = definition.get("max")
+        self.limits = tuple(definition.get("limits", []))
+        self.units = {unit.lower(): factor for unit, factor in definition.get("units", {}).items()}
+        self.unit_group = definition.get("unit_group")
+        self.value_group = definition.get("value_group")
+        self.missing = definition.get("missing")
+        self.texts = {field: definition[field] for field in self._TEXT_FIELDS if field in definition}
+
+        if self.check in ("required", "forbidden", "limit") and not (self.patterns or (self.check == "required" and self.terms)):
+            raise ValueError(f"Rule '{self.name}' ({self.check}) needs a pattern")
+        if self.check == "terms" and not self.terms:
+            raise ValueError(f"Rule '{self.name}' (terms) needs terms")
+        if self.check == "detector" and not self.detector:
+            raise ValueError(f"Rule '{self.name}' (detector) needs a detector name")
+        if self.check == "limit" and self.min is None and self.max is None and not self.limits:
+            raise ValueError(f"Rule '{self.name}' (limit) needs min, max or limits")
+
+    def _flags(self, names: Iterable[str]) -> int:
+        flags = 0
+        for flag in names:
+            if flag not in _FLAGS:
+                raise ValueError(f"Rule '{self.name}' has unknown flag '{flag}'")
+            flags |= _FLAGS[flag]
+        return flags
+
+    def find(self, clause: str) -> Optional[Dict[str, Any]]:
+        """
+        What the rule's patterns match in one clause, with offsets into the clause.
+
+        evaluate() reports on the matches of every clause of a contract
+        together, so they are found once per distinct clause and can be cached
+        (see utils.clause_cache). Rules that are not clause_local are given the
+        whole contract instead. Terms and detector rules find nothing here.
+
+        Args:
+            clause: The lowercased (normalised) clause, or the lowercased contract
+
+        Returns:
+            JSON-serializable matches, or None for terms and detector rules
+        """
+        if self.check == "required":
+            if any(rule.search(clause) for rule in self.patterns):
+                return {"matched": True}
+            anchor = self.anchor.search(clause) if self.anchor is not None else None
+            return {"matched": False, "anchor": anchor.span() if anchor else None}
+        if self.check == "forbidden":
+            return {"matches": [[match.span() for match in rule.finditer(clause)] for rule in self.patterns]}
+        if self.check == "limit":
+            found = []
+            for rule in self.patterns:
+                matches = []
+                for match in ([rule.search(clause)] if self.scope == "first" else rule.finditer(clause)):
+                    value = self._value(match) if match is not None else None
+                    if value is not None:
+                        unit = (match.group(self.unit_group) or "").lower() if self.unit_group else ""
+                        matches.append((match.start(), match.end(), value, unit, match.group(0).lower()))
+                found.append(matches)
+            return {"matches": found}
+        return None
+
+    def evaluate(self, text: str, text_lower: str, clauses: Sequence[Clause], found: Sequence[Optional[Dict[str, Any]]],
+                 keywords: Container[str], detectors: Mapping[str, Detector]) -> List[RuleFinding]:
+        """
+        Check a contract against the rule.
+
+        Args:
+            text: The contract
+            text_lower: The lowercased contract
+            clauses: The clauses of the contract, in order
+            found: What find() returned for each clause
+            keywords: Terms found in the contract by the engine's keyword scan
+            detectors: Named detectors for detector rules
+
+        Returns:
+            The rule's findings, in contract order
+        """
+        if self.check == "required":
+            return self._required(text, text_lower, clauses, found, keywords, detectors)
+        if self.check == "forbidden":
+            return self._forbidden(text, clauses, found)
+        if self.check == "limit":
+            return self._limit(text, clauses, found)
+        if self.check == "terms":
+            missing = [term for term in self.terms if term not in keywords]
+            if len(missing) <= self.max_missing:
+                return []
+            return [self._finding(self.texts, clause_text=self.clause_text, missing=", ".join(missing))]
+        return self._detect(text, text_lower, detectors)
+
+    @staticmethod
+    def _located(clauses: Sequence[Clause], found: Sequence[Dict[str, Any]], index: int) -> Iterator[Tuple[Any, ...]]:
+        """The matches of the index-th pattern in every clause, in contract order, with their clause."""
+        for clause, matches in zip(clauses, found):
+            for match in matches["matches"][index]:
+                yield (clause, *match)
+
+    def _required(self, text: str, text_lower: str, clauses: Sequence[Clause], found: Sequence[Dict[str, Any]],
+                  keywords: Container[str], detectors: Mapping[str, Detector]) -> List[RuleFinding]:
+        if any(matches["matched"] for matches in found):
+            return []
+        if any(term in keywords for term in self.terms):
+            return []
+        findings = self._detect(text, text_lower, detectors) if self.detector else []
+        clause_text, span = self.clause_text, None
+        if self.anchor is not None:
+            anchor_text = text if self.anchor_on_original else text_lower
+            span = next((clause.document_span(*matches["anchor"])
+                         for clause, matches in zip(clauses, found) if matches["anchor"]), None)
+            clause_text = clause_excerpt(anchor_text, *span) if span else None
+        texts = self.texts if clause_text is not None else {
+            field: value for field, value in self.texts.items() if field in ("requirement", "recommendation")
+        }
+        if texts:
+            findings.append(self._finding(texts, clause_text=clause_text, span=span))
+        return findings
+
+    def _forbidden(self, text: str, clauses: Sequence[Clause], found: Sequence[Dict[str, Any]]) -> List[RuleFinding]:
+        findings = []
+        for index in range(len(self.patterns)):
+            for clause, start, end in self._located(clauses, found, index):
+                start, end = clause.document_span(start, end)
+                context = clause_context(text, start, end)
+                context_lower = context.lower()
+                if any(term in context_lower for term in self.unless_context):
+                    continue
+                findings.append(self._finding(self.texts, clause_text=context, span=(start, end)))
+                if self.scope != "all":
+                    break
+        return findings
+
+    def _limit(self, text: str, clauses: Sequence[Clause], found: Sequence[Dict[str, Any]]) -> List[RuleFinding]:
+        findings = []
+        matched = False
+        for index in range(len(self.patterns)):
+            for clause, start, end, value, unit, matched_text in self._located(clauses, found, index):
+                matched = True
+                limit = self._limit_for(matched_text)
+                if limit is None:
+                    continue
+                measured = value * self.units.get(unit, 1)
+                if (limit.get("min") is not None and measured < limit["min"]) or \
+                        (limit.get("max") is not None and measured > limit["max"]):
+                    texts = {**self.texts, **{field: limit[field] for field in self._TEXT_FIELDS if field in limit}}
+                    start, end = clause.document_span(start, end)
+                    findings.append(self._finding(
+                        texts, clause_text=clause_context(text, start, end), span=(start, end),
+                        value=value, unit=unit, plural="s" if value > 1 else ""
+                    ))
+                    if self.scope != "all":
+                        break
+        if not matched and self.missing:
+            findings.append(self._finding(self.missing, clause_text=self.missing.get("clause_text")))
+        return findings
+
+    def _value(self, match: re.Match) -> Optional[int]:
+        """The number captured by the rule's value group, or its first non-empty group."""
+        if self.value_group is not None:
+            raw = match.group(self.value_group)
+        else:
+            raw = next((group for group in match.groups() if group), None)
+        if not raw:
+            return None
+        try:
+            return int(raw.replace(',', ''))
+        except ValueError:
+            return None
+
+    def _limit_for(self, matched_text: str) -> Optional[Dict[str, Any]]:
+        """The limit applying to a match: the first of limits whose terms occur in it, else min/max."""
+        for limit in self.limits:
+            if any(term in matched_text for term in limit.get("when", [])):
+                return limit
+        if self.min is None and self.max is None:
+            return None
+        return {"min": self.min, "max": self.max}
+
+    def _detect(self, text: str, text_lower: str, detectors: Mapping[str, Detector]) -> List[RuleFinding]:
+        detector = detectors.get(self.detector)
+        if detector is None:
+            logger.warning(f"Rule '{self.name}' skipped: detector '{self.detector}' was not supplied")
+            return []
+        findings = []
+        for found in detector(text, text_lower):
+            fields = {field: value for field, value in found.items() if field in RuleFinding.__dataclass_fields__}
+            if "start" in found:
+                fields["span"] = (found["start"], found["end"])
+            findings.append(RuleFinding(self.law, self.name, **fields))
+        return findings
+
+    def _finding(self, texts: Mapping[str, Any], clause_text: Optional[str] = None,
+                 span: Optional[Tuple[int, int]] = None, **values: Any) -> RuleFinding:
+        rendered = {
+            field: texts[field].format(**values) if field != "severity" else texts[field]
+            for field in self._TEXT_FIELDS if field in texts
+        }
+        return RuleFinding(self.law, self.name, clause_text=clause_text if "issue" in rendered else None,
+                           span=span, **rendered)
+
+
+class CompiledLaw:
+    """The applicability and compiled rules of one law."""
+
+    def __init__(self, law: str, section: Mapping[str, Any], registry: PatternRegistry,
+                 provisions: Mapping[str, Any]):
+        applies_to = section.get("applies_to", {})
+        self.law = law
+        self.jurisdictions = tuple(applies_to.get("jurisdictions", []))
+        self.contract_types = tuple(applies_to.get("contract_types", []))
+        self.features = tuple(applies_to.get("features", []))
+        self.fallback_requirements = list(section.get("fallback_requirements", []))
+        self.fallback_recommendations = list(section.get("fallback_recommendations", []))
+        self.rules = tuple(LawRule(law, definition, registry, provisions) for definition in section.get("rules", []))
+        ids = [rule.id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Duplicate rule ids in the compliance rules of {law}")
+
+    def applies(self, contract_type: str, features: Iterable[str]) -> bool:
+        if self.contract_types and contract_type not in self.contract_types:
+            return False
+        return all(feature in features for feature in self.features)
+
+
+class RuleEvaluation:
+    """Findings of one contract, grouped by law in evaluation order."""
+
+    def __init__(self, findings: Dict[str, List[RuleFinding]]):
+        self.findings = findings
+
+    def compliance_issues(self) -> List[Dict[str, Any]]:
+        """One compliance issue per law with missing requirements, in the analyzer's format."""
+        issues = []
+        for law, findings in self.findings.items():
+            requirements = [finding.requirement for finding in findings if finding.requirement]
+            if requirements:
+                issues.append({
+                    "law": law,
+                    "missing_requirements": requirements,
+                    "recommendations": [finding.recommendation for finding in findings if finding.recommendation]
+                })
+        return issues
+
+    def flagged_clauses(self) -> List[Dict[str, Any]]:
+        """The flagged clauses of every law."""
+        return [
+            clause for findings in self.findings.values() for finding in findings
+            for clause in (finding.flagged_clause(),) if clause is not None
+        ]
+
+
+class LawRuleEngine:
+    """
+    The compliance rules of every loaded law, indexed by jurisdiction.
+
+    Build it with LawRuleEngine.from_laws once the law files are loaded; it is
+    read-only afterwards and can evaluate contracts from several threads.
+    """
+
+    def __init__(self, laws: Sequence[CompiledLaw], registry: PatternRegistry, version: str = ""):
+        self.laws = {law.law: law for law in laws}
+        self.patterns = registry
+        self.version = version
+        self._by_jurisdiction: Dict[str, Tuple[CompiledLaw, ...]] = {}
+        for law in sorted(laws, key=lambda compiled: compiled.law):
+            for jurisdiction in law.jurisdictions:
+                self._by_jurisdiction[jurisdiction] = self._by_jurisdiction.get(jurisdiction, ()) + (law,)
+        self.keywords = KeywordAutomaton("law_rule_terms")
+        for law in laws:
+            for rule in law.rules:
+                if rule.terms:
+                    self.keywords.add(rule.name, rule.terms)
+
+    @classmethod
+    def from_laws(cls, laws: Mapping[str, Mapping[str, Any]]) -> "LawRuleEngine":
+        """
+        Compile the compliance_rules sections of the loaded laws.
+
+        The engine's version is a digest of the sections, so cached clause
+        matches are not reused once a rule changes.
+
+        Args:
+            laws: Law data keyed by law id, as loaded by LawLoader
+
+        Raises:
+            ValueError: If a rule definition is invalid
+            re.error: If a rule pattern does not compile
+        """
+        registry = PatternRegistry("law_rules")
+        sections = {
+            law_id: data["compliance_rules"] for law_id, data in sorted(laws.items())
+            if isinstance(data, Mapping) and data.get("compliance_rules")
+        }
+        compiled = [
+            CompiledLaw(law_id, section, registry, laws[law_id].get("key_provisions") or {})
+            for law_id, section in sections.items()
+        ]
+        version = hashlib.sha256(json.dumps(sections, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        logger.info(f"Compiled {sum(len(law.rules) for law in compiled)} compliance rules for {len(compiled)} laws")
+        return cls(compiled, registry, version)
+
+    def applicable_laws(self, jurisdiction: str, contract_type: str, features: Iterable[str] = ()) -> List[str]:
+        """Ids of the laws whose rules apply to a contract, in evaluation order."""
+        features = set(features)
+        return [law.law for law in self._by_jurisdiction.get(jurisdiction, ()) if law.applies(contract_type, features)]
+
+    def evaluate(self, contract_text: str, jurisdiction: str, contract_type: str, features: Iterable[str] = (),
+                 detectors: Optional[Mapping[str, Detector]] = None,
+                 text_lower: Optional[str] = None, clauses: Optional[Sequence[Clause]] = None,
+                 cache: Optional[ClauseCache] = None) -> RuleEvaluation:
+        """
+        Check a contract against the rules of every applicable law.
+
+        Args:
+            contract_text: The contract
+            jurisdiction: Jurisdiction code, e.g. "MY"
+            contract_type: Analyzer contract type, e.g. "Employment"
+            features: Content features present, e.g. {"data_processing"}
+            detectors: Named detectors for detector rules
+            text_lower: The lowercased contract, if already computed
+            clauses: The contract's clauses, to match the rules clause by clause
+            cache: Cache of the matches of clauses already seen
+
+        Returns:
+            The findings, grouped by law
+        """
+        text_lower = contract_text.lower() if text_lower is None else text_lower
+        laws = [self.laws[law] for law in self.applicable_laws(jurisdiction, contract_type, features)]
+        whole = [Clause.whole(text_lower)]
+        if clauses is None:
+            clauses = whole
+        found = self._find(laws, jurisdiction, clauses, cache)
+        keywords = set().union(*(matches["terms"] for matches in found))
+        findings = {}
+        for law in laws:
+            findings[law.law] = [
+                finding for rule in law.rules
+                for finding in (
+                    rule.evaluate(contract_text, text_lower, clauses,
+                                  [matches["rules"].get(rule.name) for matches in found], keywords, detectors or {})
+                    if rule.clause_local else
+                    rule.evaluate(contract_text, text_lower, whole, [rule.find(text_lower)], keywords, detectors or {})
+                )
+            ]
+        return RuleEvaluation(findings)
+
+    def _find(self, laws: Sequence[CompiledLaw], jurisdiction: str, clauses: Sequence[Clause],
+              cache: Optional[ClauseCache]) -> List[Dict[str, Any]]:
+        """
+        The terms and clause-local rule matches of each clause: cached for
+        clauses seen before under the same laws and rules, found and cached for
+        the others.
+        """
+        keys: List[str] = []
+        if cache is not None and cache.enabled:
+            namespace = f"law_rules:{jurisdiction}:{','.join(law.law for law in laws)}:{self.version}"
+            keys = [make_clause_key(namespace, clause.fingerprint) for clause in clauses]
+            found = cache.get_many(keys, jurisdiction, kind="rules")
+        else:
+            found = [None] * len(clauses)
+        scan_terms = any(rule.terms for law in laws for rule in law.rules)
+        novel = {}
+        for index, clause in enumerate(clauses):
+            if found[index] is None:
+                found[index] = {
+                    "terms": sorted(self.keywords.scan(clause.text).counts) if scan_terms else [],
+                    "rules": {
+                        rule.name: matches for law in laws for rule in law.rules if rule.clause_local
+                        for matches in (rule.find(clause.text),) if matches is not None
+                    }
+                }
+                if keys:
+                    novel[keys[index]] = found[index]
+        if novel:
+            cache.set_many(novel)
+        return found
+
+    def fallback_requirements(self, law: str) -> List[str]:
+        """Requirements to report for a law when the AI only produced placeholders."""
+        compiled = self.laws.get(law)
+        return list(compiled.fallback_requirements) if compiled else []
+
+    def fallback_recommendations(self, law: str) -> List[str]:
+        """Recommendations to report for a law when the AI only produced placeholders."""
+        compiled = self.laws.get(law)
+        return list(compiled.fallback_recommendations) if compiled else []
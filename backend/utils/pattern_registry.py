@@ -0,0 +1,285 @@
+"""
+Named, precompiled regular expressions with per-rule match statistics.
+
+The rule-based contract analysis runs well over a hundred regular expressions
+per contract. Keeping them in a PatternRegistry compiles each one once at
+import time and gives it a name, its flags and the law it checks. Every search
+also records how often the rule ran, how many matches it produced and how long
+it took, so the rules that dominate CPU time on large contracts can be read
+from the metrics endpoint.
+
+Many rules chain .* between terms and some run with DOTALL over the whole
+document, so their backtracking can grow polynomially (or worse) with the
+input. Every search therefore runs under a time budget (PATTERN_TIME_BUDGET_MS,
+250 ms by default). When the regex package is installed rules are compiled
+with it, and a match that exceeds its budget is aborted: search() returns
+None, finditer() stops, and the rule's timeout counter and the log name the
+offending rule. With the standard re module a single match cannot be
+interrupted; finditer() still stops between matches once over budget and
+overruns are counted the same way. benchmarks/bench_pattern_growth.py finds
+the rules whose matching time grows faster than the input.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import regex as _engine
+except ImportError:
+    _engine = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_SECONDS = float(os.getenv("PATTERN_TIME_BUDGET_MS", "250")) / 1000
+# Whether a match can be aborted when it runs over its budget
+ABORTABLE = _engine is not None
+
+_FLAG_NAMES = (
+    (re.IGNORECASE, "IGNORECASE"),
+    (re.MULTILINE, "MULTILINE"),
+    (re.DOTALL, "DOTALL"),
+    (re.VERBOSE, "VERBOSE"),
+)
+
+
+def flag_names(flags: int) -> List[str]:
+    """Names of the re flags set in flags."""
+    return [name for flag, name in _FLAG_NAMES if flags & flag]
+
+
+class PatternRule:
+    """
+    A named, compiled regular expression that records its own usage.
+
+    Counters are updated under the owning registry's lock, as rules run
+    concurrently in the analysis worker threads.
+    """
+
+    __slots__ = ("name", "regex", "law", "group", "budget", "calls", "matches", "seconds", "timeouts", "_lock")
+
+    def __init__(self, name: str, pattern: str, flags: int = 0, law: Optional[str] = None,
+                 group: Optional[str] = None, lock: Optional[threading.Lock] = None,
+                 budget: Optional[float] = None):
+        """
+        Initialize and compile a rule.
+
+        Args:
+            name: Unique rule name, e.g. "general.liability_cap"
+            pattern: Regular expression source
+            flags: re flags to compile with
+            law: Identifier of the law the rule checks (e.g. "EMPLOYMENT_ACT_MY"), if any
+            group: Name of the rule group the rule belongs to, if any
+            lock: Lock guarding the statistics (one per registry)
+            budget: Seconds one search may take (DEFAULT_BUDGET_SECONDS when None)
+
+        Raises:
+            re.error: If the pattern does not compile
+        """
+        self.name = name
+        # Compile with re first: it validates the syntax the rules are written in
+        self.regex = re.compile(pattern, flags)
+        if _engine is not None:
+            self.regex = _engine.compile(pattern, flags)
+        self.law = law
+        self.group = group
+        self.budget = DEFAULT_BUDGET_SECONDS if budget is None else budget
+        self.calls = 0
+        self.matches = 0
+        self.seconds = 0.0
+        self.timeouts = 0
+        self._lock = lock or threading.Lock()
+
+    @property
+    def pattern(self) -> str:
+        return self.regex.pattern
+
+    @property
+    def flags(self) -> int:
+        return self.regex.flags
+
+    def search(self, text: str, budget: Optional[float] = None) -> Optional[re.Match]:
+        """
+        Find the first match in text.
+
+        Args:
+            text: Text to search
+            budget: Seconds the search may take, instead of the rule's budget
+
+        Returns:
+            The match, or None (also when the search was aborted over budget)
+        """
+        budget = self.budget if budget is None else budget
+        started = time.perf_counter()
+        try:
+            match = self.regex.search(text, timeout=budget) if ABORTABLE else self.regex.search(text)
+            timed_out = False
+        except TimeoutError:
+            match, timed_out = None, True
+        elapsed = time.perf_counter() - started
+        self._record(1 if match else 0, elapsed, timed_out or elapsed > budget, budget, len(text))
+        return match
+
+    def finditer(self, text: str, budget: Optional[float] = None) -> Iterator[re.Match]:
+        """
+        Iterate over the matches in text.
+
+        Time is measured while the iterator is advanced and recorded when it is
+        exhausted or closed (for example by a break out of the loop). Iteration
+        stops once the matches took longer than the budget.
+
+        Args:
+            text: Text to search
+            budget: Seconds the whole iteration may take, instead of the rule's budget
+
+        Yields:
+            Matches in order
+        """
+        budget = self.budget if budget is None else budget
+        matches = 0
+        elapsed = 0.0
+        timed_out = False
+        iterator = self.regex.finditer(text, timeout=budget) if ABORTABLE else self.regex.finditer(text)
+        try:
+            while not timed_out:
+                started = time.perf_counter()
+                try:
+                    match = next(iterator, None)
+                except TimeoutError:
+                    match, timed_out = None, True
+                elapsed += time.perf_counter() - started
+                if match is None:
+                    return
+                matches += 1
+                timed_out = elapsed > budget
+                yield match
+        finally:
+            self._record(matches, elapsed, timed_out, budget, len(text))
+
+    def _record(self, matches: int, seconds: float, timed_out: bool, budget: float, length: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.matches += matches
+            self.seconds += seconds
+            self.timeouts += timed_out
+        if timed_out:
+            logger.warning(f"Pattern rule '{self.name}' exceeded its {budget * 1000:.0f} ms budget "
+                           f"({seconds * 1000:.0f} ms on {length} characters)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Definition and usage of the rule."""
+        with self._lock:
+            calls, matches, seconds, timeouts = self.calls, self.matches, self.seconds, self.timeouts
+        return {
+            "name": self.name,
+            "law": self.law,
+            "pattern": self.pattern,
+            "flags": flag_names(self.flags),
+            "calls": calls,
+            "matches": matches,
+            "seconds": round(seconds, 6),
+            "mean_ms": round(seconds / calls * 1000, 4) if calls else 0.0,
+            "budget_ms": round(self.budget * 1000, 3),
+            "timeouts": timeouts
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.matches = 0
+            self.seconds = 0.0
+            self.timeouts = 0
+
+    def __repr__(self) -> str:
+        return f"PatternRule({self.name!r}, {self.pattern!r})"
+
+
+class PatternRegistry:
+    """An ordered set of uniquely named PatternRules."""
+
+    def __init__(self, name: str):
+        """
+        Initialize an empty registry.
+
+        Args:
+            name: Registry name used in metrics
+        """
+        self.name = name
+        self._rules: Dict[str, PatternRule] = {}
+        self._groups: Dict[str, Tuple[PatternRule, ...]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, pattern: str, flags: int = 0, law: Optional[str] = None,
+                 group: Optional[str] = None, budget: Optional[float] = None) -> PatternRule:
+        """
+        Compile and add a rule.
+
+        Args:
+            name: Unique rule name
+            pattern: Regular expression source
+            flags: re flags to compile with
+            law: Identifier of the law the rule checks, if any
+            group: Name of a group of alternative rules that are tried in order
+            budget: Seconds one search may take (DEFAULT_BUDGET_SECONDS when None)
+
+        Returns:
+            The registered rule
+
+        Raises:
+            ValueError: If a rule of that name is already registered
+            re.error: If the pattern does not compile
+        """
+        if name in self._rules:
+            raise ValueError(f"Pattern rule '{name}' is already registered in {self.name}")
+        rule = PatternRule(name, pattern, flags, law, group, self._lock, budget)
+        self._rules[name] = rule
+        if group is not None:
+            self._groups[group] = self._groups.get(group, ()) + (rule,)
+        return rule
+
+    def __getitem__(self, name: str) -> PatternRule:
+        return self._rules[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rules
+
+    def __iter__(self) -> Iterator[PatternRule]:
+        return iter(list(self._rules.values()))
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def group(self, group: str) -> Tuple[PatternRule, ...]:
+        """
+        Rules of a group, in registration order.
+
+        Raises:
+            KeyError: If no rule belongs to the group
+        """
+        return self._groups[group]
+
+    def stats(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Usage of the rules, most expensive first.
+
+        Args:
+            top: Only return this many rules
+
+        Returns:
+            One stats dictionary per rule (see PatternRule.stats)
+        """
+        stats = sorted((rule.stats() for rule in self), key=lambda entry: entry["seconds"], reverse=True)
+        return stats[:top] if top is not None else stats
+
+    def timed_out(self) -> List[Dict[str, Any]]:
+        """Stats of the rules that ran over their budget at least once, most timeouts first."""
+        return sorted((stats for stats in self.stats() if stats["timeouts"]),
+                      key=lambda entry: entry["timeouts"], reverse=True)
+
+    def reset_stats(self) -> None:
+        """Zero every rule's counters."""
+        for rule in self:
+            rule.reset()
@@ -2,12 +2,14 @@
 
 import asyncio
 import logging
+import os
 from typing import List, Optional
 
 from models.BulkAnalysisRequest import BulkAnalysisRequest
 from models.ContractAnalysisModel import ContractAnalysisRequest
 from models.ContractAnalysisResponseModel import ContractAnalysisResponse
 from service.ContractAnalyzerService import ContractAnalyzerService
+from utils.ai_client.rate_limit import PRIORITY_BULK, PRIORITY_URGENT, request_priority
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +21,24 @@ class BulkProcessManager:
         self.max_concurrent_tasks = max_concurrent_tasks
         self.max_bulk_size = max_bulk_size
         self.contract_analyzer = ContractAnalyzerService()
+        # Pack short contracts several per AI prompt (see ContractAnalyzerService.analyze_contract_batch)
+        self.batch_prompts = os.getenv("BULK_BATCH_PROMPTS", "false").lower() in ("1", "true", "yes")
     
     async def process_bulk_documents(self, bulk_request: BulkAnalysisRequest) -> List[ContractAnalysisResponse]:
         """Process multiple documents with controlled concurrency."""
         self._validate_bulk_request(bulk_request)
         
         try:
-            if bulk_request.priority == "urgent":
-                results = await self._process_concurrent(bulk_request.contracts)
-            else:
-                results = await self._process_sequential(bulk_request.contracts)
+            # Bulk AI calls queue behind interactive analyses at the provider rate limiters
+            priority = PRIORITY_URGENT if bulk_request.priority == "urgent" else PRIORITY_BULK
+            batch_prompts = self.batch_prompts if bulk_request.batch_prompts is None else bulk_request.batch_prompts
+            with request_priority(priority):
+                if batch_prompts:
+                    results = await self._process_batched(bulk_request.contracts)
+                elif bulk_request.priority == "urgent":
+                    results = await self._process_concurrent(bulk_request.contracts)
+                else:
+                    results = await self._process_sequential(bulk_request.contracts)
             
             # Send notification if email provided
             if bulk_request.notification_email:
@@ -89,6 +99,21 @@ class BulkProcessManager:
         
         return valid_results
     
+    async def _process_batched(self, contracts: List[ContractAnalysisRequest]) -> List[ContractAnalysisResponse]:
+        """Process contracts with short ones batched into shared prompts, preserving order."""
+        results = await self.contract_analyzer.analyze_contract_batch(
+            contracts, concurrency=self.max_concurrent_tasks
+        )
+        
+        responses = []
+        for i, (contract, result) in enumerate(zip(contracts, results)):
+            if isinstance(result, Exception):
+                logger.error(f"Contract {i + 1} analysis failed: {str(result)}")
+                result = self._create_error_response(contract, str(result))
+            responses.append(result)
+        
+        return responses
+    
     async def _process_sequential(self, contracts: List[ContractAnalysisRequest]) -> List[ContractAnalysisResponse]:
         """Process contracts sequentially for better resource management."""
         results = []
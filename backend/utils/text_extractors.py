@@ -10,6 +10,9 @@ from typing import List
 import PyPDF2
 import docx
 
+from utils.contract_keywords import DOCUMENT_KEYWORDS
+from utils.deadline import bounded_timeout
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,24 +44,33 @@ class TextExtractor:
             return asyncio.run(self.extract_text_async(file_content, filename))
     
     async def extract_text_async(self, file_content: bytes, filename: str) -> str:
-        """Async version - this is the main implementation."""
+        """
+        Async version - this is the main implementation.
+        
+        Extraction timeouts are capped by the time left before the request deadline.
+        
+        Raises:
+            DeadlineExceeded: If the request deadline has already passed
+            ValueError: If the format is unsupported or extraction fails or times out
+        """
         file_ext = Path(filename).suffix.lower()
+        extraction_timeout = bounded_timeout(self.extraction_timeout, "text extraction")
         
         try:
             if file_ext == '.pdf':
                 text = await asyncio.wait_for(
                     self._extract_from_pdf(file_content), 
-                    timeout=self.extraction_timeout
+                    timeout=extraction_timeout
                 )
             elif file_ext == '.docx':
                 text = await asyncio.wait_for(
                     self._extract_from_docx(file_content), 
-                    timeout=self.extraction_timeout
+                    timeout=extraction_timeout
                 )
             elif file_ext == '.txt':
                 text = await asyncio.wait_for(
                     self._extract_from_txt(file_content), 
-                    timeout=10.0  # Shorter timeout for text files
+                    timeout=min(extraction_timeout, 10.0)  # Shorter timeout for text files
                 )
             else:
                 raise ValueError(f"Unsupported file format: {file_ext}")
@@ -294,21 +306,13 @@ class DocumentMetadataExtractor:
         if not text or len(text) < 50:
             return 'general'
         
-        text_lower = text.lower()
-        
-        # Simple keyword matching for common contract types
-        type_keywords = {
-            'employment': ['employment', 'employee', 'salary', 'job title'],
-            'nda': ['non-disclosure', 'confidentiality', 'proprietary'],
-            'service': ['service agreement', 'consultant', 'contractor'],
-            'data_processing': ['data processing', 'gdpr', 'personal data']
+        # Simple keyword matching for common contract types, in one scan
+        keywords = DOCUMENT_KEYWORDS.scan(text.lower())
+        scores = {
+            category[len('type.'):]: keywords.occurrences(category)
+            for category in DOCUMENT_KEYWORDS.categories if category.startswith('type.')
         }
         
-        scores = {}
-        for contract_type, keywords in type_keywords.items():
-            score = sum(text_lower.count(keyword) for keyword in keywords)
-            scores[contract_type] = score
-        
         if not any(scores.values()):
             return 'general'
         
@@ -367,22 +371,13 @@ class DocumentMetadataExtractor:
         if not text:
             return []
         
-        text_lower = text.lower()
-        
         # Simplified jurisdiction detection
-        jurisdiction_keywords = {
-            'MY': ['malaysia', 'kuala lumpur', 'pdpa', 'employment act 1955'],
-            'SG': ['singapore', 'pdpa singapore', 'singapore law'],
-            'US': ['united states', 'california', 'ccpa', 'federal law'],
-            'EU': ['gdpr', 'european union', 'data protection']
-        }
-        
-        detected = []
-        for jurisdiction, keywords in jurisdiction_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                detected.append(jurisdiction)
-        
-        return detected
+        keywords = DOCUMENT_KEYWORDS.scan(text.lower())
+        return [
+            category[len('jurisdiction.'):]
+            for category in DOCUMENT_KEYWORDS.categories
+            if category.startswith('jurisdiction.') and keywords.has(category)
+        ]
     
     async def _assess_text_quality(self, text: str) -> float:
         """Assess text quality (0.0 to 1.0)."""
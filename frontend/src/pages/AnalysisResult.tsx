@@ -10,6 +10,9 @@ interface FlaggedClause {
     clause_text: string;
     issue: string;
     severity: 'low' | 'medium' | 'high';
+    start?: number;
+    end?: number;
+    section?: string;
 }
 
 interface ComplianceIssue {
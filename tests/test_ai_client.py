@@ -2,11 +2,23 @@
 Tests for the refactored WatsonX AI client modules.
 """
 
+import asyncio
 import pytest
 import os
+import time
+import httpx
 from unittest.mock import Mock, patch, MagicMock
 from backend.utils.ai_client import WatsonXClient, WatsonXConfig, ModelType
-from backend.utils.ai_client.exceptions import ConfigurationError, AuthenticationError, APIError
+from backend.utils.ai_client.auth import IBMCloudAuth, reset_token_managers
+from backend.utils.ai_client.cache import ResponseCache, get_response_cache, make_cache_key
+from backend.utils.ai_client.circuit_breaker import CircuitBreaker, reset_circuit_breakers
+from backend.utils.ai_client.hedging import hedge_delay, hedged_call
+from backend.utils.ai_client.metrics import metrics
+from backend.utils.ai_client.exceptions import ConfigurationError, AuthenticationError, APIError, CircuitOpenError
+from backend.utils.ai_client.prompts import PromptFormatter
+from backend.utils.ai_client.rate_limit import PRIORITY_BULK, RateLimiter, request_priority
+from backend.utils.ai_client.retry import RetryPolicy, is_retryable, parse_retry_after
+from backend.utils.ai_client.tokens import context_window, estimate_tokens, trim_checklist
 
 
 class TestWatsonXConfig:
@@ -61,6 +73,9 @@ class TestWatsonXClient:
     
     def setup_method(self):
         """Set up test configuration"""
+        reset_token_managers()
+        reset_circuit_breakers()
+        get_response_cache().clear()
         self.config = WatsonXConfig(
             api_key="test_key",
             project_id="test_project"
@@ -80,8 +95,8 @@ class TestWatsonXClient:
                 WatsonXClient()
     
     @patch('backend.utils.ai_client.auth.requests.post')
-    @patch('backend.utils.ai_client.client.requests.post')
-    def test_contract_analysis_success(self, mock_api_post, mock_auth_post):
+    @patch('backend.utils.ai_client.client.transport.get_sync_client')
+    def test_contract_analysis_success(self, mock_get_client, mock_auth_post):
         """Test successful contract analysis"""
         # Mock authentication
         mock_auth_post.return_value.json.return_value = {"access_token": "test_token"}
@@ -93,14 +108,103 @@ class TestWatsonXClient:
                 "generated_text": '{"summary": "Test analysis", "flagged_clauses": [], "compliance_issues": []}'
             }]
         }
-        mock_api_post.return_value.json.return_value = mock_api_response
-        mock_api_post.return_value.raise_for_status.return_value = None
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json=mock_api_response)
+        
+        mock_get_client.return_value = httpx.Client(transport=httpx.MockTransport(handler))
         
         client = WatsonXClient(self.config)
         result = client.analyze_contract("Test contract", {"laws": []})
         
         assert "Test analysis" in result
-        mock_api_post.assert_called_once()
+        assert len(requests_seen) == 1
+        assert requests_seen[0].headers["Authorization"] == "Bearer test_token"
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    @patch('backend.utils.ai_client.client.transport.get_async_client')
+    def test_contract_analysis_async_success(self, mock_get_client, mock_auth_post):
+        """Test async contract analysis uses the pooled async transport"""
+        mock_auth_post.return_value.json.return_value = {"access_token": "test_token"}
+        mock_auth_post.return_value.raise_for_status.return_value = None
+        
+        def handler(request):
+            return httpx.Response(200, json={"results": [{
+                "generated_text": '{"summary": "Async analysis", "flagged_clauses": [], "compliance_issues": []}'
+            }]})
+        
+        mock_get_client.return_value = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        client = WatsonXClient(self.config)
+        result = asyncio.run(client.analyze_contract_async("Test contract", {"laws": []}))
+        
+        assert "Async analysis" in result
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    @patch('backend.utils.ai_client.client.transport.get_async_client')
+    def test_async_request_deadline(self, mock_get_client, mock_auth_post):
+        """Test a per-request deadline converts a slow call into an APIError"""
+        mock_auth_post.return_value.json.return_value = {"access_token": "test_token"}
+        mock_auth_post.return_value.raise_for_status.return_value = None
+        
+        async def slow_handler(request):
+            await asyncio.sleep(1)
+            return httpx.Response(200, json={"results": [{"generated_text": "late"}]})
+        
+        mock_get_client.return_value = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        
+        client = WatsonXClient(self.config)
+        with pytest.raises(APIError) as exc_info:
+            asyncio.run(client.generate_text_async("Hello", timeout=0.05))
+        assert exc_info.value.status_code == 408
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    @patch('backend.utils.ai_client.client.transport.get_sync_client')
+    def test_unauthorized_response_refreshes_token_once(self, mock_get_client, mock_auth_post):
+        """Test a 401 invalidates the cached token and retries once with a fresh one"""
+        mock_auth_post.return_value.raise_for_status.return_value = None
+        mock_auth_post.return_value.json.side_effect = [
+            {"access_token": "stale_token", "expires_in": 3600},
+            {"access_token": "fresh_token", "expires_in": 3600}
+        ]
+        
+        def handler(request):
+            if request.headers["Authorization"] == "Bearer stale_token":
+                return httpx.Response(401, json={"errors": [{"code": "authentication_token_expired"}]})
+            return httpx.Response(200, json={"results": [{"generated_text": "ok"}]})
+        
+        mock_get_client.return_value = httpx.Client(transport=httpx.MockTransport(handler))
+        
+        client = WatsonXClient(self.config)
+        assert client.generate_text("Hello") == "ok"
+        assert mock_auth_post.call_count == 2
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    @patch('backend.utils.ai_client.client.transport.get_sync_client')
+    def test_repeat_request_served_from_cache(self, mock_get_client, mock_auth_post):
+        """Test an identical generation is answered from cache unless bypassed"""
+        mock_auth_post.return_value.json.return_value = {"access_token": "test_token"}
+        mock_auth_post.return_value.raise_for_status.return_value = None
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={"results": [{"generated_text": "cached text"}]})
+        
+        mock_get_client.return_value = httpx.Client(transport=httpx.MockTransport(handler))
+        
+        client = WatsonXClient(self.config)
+        assert client.generate_text("Summarise this") == "cached text"
+        assert client.generate_text("Summarise this") == "cached text"
+        assert len(requests_seen) == 1
+        
+        client.generate_text("Summarise this", use_cache=False)
+        assert len(requests_seen) == 2
+        
+        client.generate_text("Summarise this", temperature=0.9)
+        assert len(requests_seen) == 3
     
     @patch('backend.utils.ai_client.auth.requests.post')
     def test_authentication_failure(self, mock_post):
@@ -127,6 +231,702 @@ class TestWatsonXClient:
         with patch.object(client, '_make_request', side_effect=Exception("Error")):
             assert client.health_check() is False
 
+    def test_empty_stream_is_not_cached(self):
+        """Test a stream that yields no text leaves nothing in the response cache"""
+        client = WatsonXClient(self.config, cache=ResponseCache())
+
+        async def empty_stream(body, request_timeout):
+            return
+            yield
+
+        async def consume():
+            return [chunk async for chunk in client._stream_raw_request_async("prompt")]
+
+        with patch.object(client, '_send_stream', side_effect=empty_stream):
+            assert asyncio.run(consume()) == []
+        assert client.cache.stats()["memory_entries"] == 0
+
+
+class TestTokenManager:
+    """Test process-wide IAM token caching"""
+    
+    def setup_method(self):
+        reset_token_managers()
+    
+    def teardown_method(self):
+        reset_token_managers()
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    def test_token_shared_across_clients(self, mock_post):
+        """Test clients with the same API key reuse one cached token"""
+        mock_post.return_value.json.return_value = {"access_token": "test_token", "expires_in": 3600}
+        mock_post.return_value.raise_for_status.return_value = None
+        
+        assert IBMCloudAuth("shared_key").get_access_token() == "test_token"
+        assert IBMCloudAuth("shared_key").get_access_token() == "test_token"
+        assert mock_post.call_count == 1
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    def test_expired_token_is_refetched(self, mock_post):
+        """Test a token whose IAM expiration has passed is not reused"""
+        import time
+        mock_post.return_value.raise_for_status.return_value = None
+        mock_post.return_value.json.side_effect = [
+            {"access_token": "old_token", "expiration": int(time.time()) + 10},
+            {"access_token": "new_token", "expires_in": 3600}
+        ]
+        
+        auth = IBMCloudAuth("expiring_key")
+        assert auth.get_access_token() == "old_token"
+        # Within the expiry skew, so the next call must fetch a new token
+        assert auth.get_access_token() == "new_token"
+    
+    @patch('backend.utils.ai_client.auth.requests.post')
+    def test_concurrent_callers_trigger_single_refresh(self, mock_post):
+        """Test only one IAM request is made when many coroutines need a token"""
+        import time
+        
+        def slow_post(*args, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.json.return_value = {"access_token": "test_token", "expires_in": 3600}
+            return response
+        
+        mock_post.side_effect = slow_post
+        auth = IBMCloudAuth("concurrent_key")
+        
+        async def fetch_all():
+            return await asyncio.gather(*(auth.get_access_token_async() for _ in range(8)))
+        
+        assert asyncio.run(fetch_all()) == ["test_token"] * 8
+        assert mock_post.call_count == 1
+
+
+class TestResponseCache:
+    """Test the content-addressed response cache"""
+    
+    def test_key_depends_on_every_input(self):
+        """Test keys change with provider, model, prompt and parameters"""
+        base = make_cache_key("gemini", "gemini-pro", "prompt", {"temperature": 0.1})
+        assert base == make_cache_key("gemini", "gemini-pro", "prompt", {"temperature": 0.1})
+        assert base != make_cache_key("watsonx", "gemini-pro", "prompt", {"temperature": 0.1})
+        assert base != make_cache_key("gemini", "gemini-1.5-pro", "prompt", {"temperature": 0.1})
+        assert base != make_cache_key("gemini", "gemini-pro", "prompt!", {"temperature": 0.1})
+        assert base != make_cache_key("gemini", "gemini-pro", "prompt", {"temperature": 0.2})
+    
+    def test_lru_eviction(self):
+        """Test the memory tier evicts the least recently used entry"""
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        assert cache.get("a") == "1"
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+    
+    def test_ttl_expiry(self):
+        """Test expired entries are not returned"""
+        cache = ResponseCache(ttl=60)
+        with patch('backend.utils.ai_client.cache.time.time', return_value=1000.0):
+            cache.set("key", "value")
+        with patch('backend.utils.ai_client.cache.time.time', return_value=1059.0):
+            assert cache.get("key") == "value"
+        with patch('backend.utils.ai_client.cache.time.time', return_value=1061.0):
+            assert cache.get("key") is None
+    
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        """Test responses stored on disk are served by a new cache instance"""
+        path = str(tmp_path / "responses.db")
+        ResponseCache(path=path).set("key", "value")
+        assert ResponseCache(path=path).get("key") == "value"
+    
+    def test_disabled_cache_never_hits(self):
+        """Test a disabled cache stores nothing"""
+        cache = ResponseCache(enabled=False)
+        cache.set("key", "value")
+        assert cache.get("key") is None
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight requests"""
+    
+    def test_concurrent_callers_share_one_call(self):
+        """Test identical concurrent requests make one upstream call"""
+        from backend.utils.ai_client.singleflight import AsyncSingleFlight
+        flights = AsyncSingleFlight("test")
+        calls = []
+        
+        async def upstream():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        async def run_all():
+            return await asyncio.gather(*(flights.do("key", upstream) for _ in range(5)))
+        
+        assert asyncio.run(run_all()) == ["result"] * 5
+        assert len(calls) == 1
+    
+    def test_errors_propagate_to_every_waiter(self):
+        """Test a failed shared call raises in all callers"""
+        from backend.utils.ai_client.singleflight import AsyncSingleFlight
+        flights = AsyncSingleFlight("test")
+        
+        async def upstream():
+            await asyncio.sleep(0.01)
+            raise APIError("upstream failed", 500)
+        
+        async def run_all():
+            return await asyncio.gather(*(flights.do("key", upstream) for _ in range(3)), return_exceptions=True)
+        
+        results = asyncio.run(run_all())
+        assert all(isinstance(result, APIError) for result in results)
+    
+    def test_cancelling_one_waiter_keeps_shared_call(self):
+        """Test a cancelled caller does not cancel the call for the others"""
+        from backend.utils.ai_client.singleflight import AsyncSingleFlight
+        flights = AsyncSingleFlight("test")
+        
+        async def upstream():
+            await asyncio.sleep(0.05)
+            return "result"
+        
+        async def run():
+            impatient = asyncio.ensure_future(flights.do("key", upstream))
+            patient = asyncio.ensure_future(flights.do("key", upstream))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            return await patient, impatient.cancelled()
+        
+        assert asyncio.run(run()) == ("result", True)
+    
+    def test_shared_call_cancelled_when_all_waiters_leave(self):
+        """Test the upstream call stops once nobody is waiting for it"""
+        from backend.utils.ai_client.singleflight import AsyncSingleFlight
+        flights = AsyncSingleFlight("test")
+        state = {"cancelled": False}
+        
+        async def upstream():
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+        
+        async def run():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(flights.do("key", upstream), timeout=0.01)
+            await asyncio.sleep(0)
+            return flights.in_flight()
+        
+        assert asyncio.run(run()) == 0
+        assert state["cancelled"] is True
+    
+    def test_sync_callers_share_one_call(self):
+        """Test identical blocking requests from several threads make one call"""
+        import threading
+        import time
+        from backend.utils.ai_client.singleflight import SyncSingleFlight
+        flights = SyncSingleFlight("test")
+        calls = []
+        results = []
+        
+        def upstream():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+        
+        threads = [threading.Thread(target=lambda: results.append(flights.do("key", upstream))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == ["result"] * 4
+        assert len(calls) == 1
+
+
+class TestBoundedExecutor:
+    """Test the bounded execution pool used for blocking SDK calls"""
+    
+    def test_concurrency_is_capped_and_gauges_drain(self):
+        """Test no more than max_workers calls run at once and gauges return to zero"""
+        import threading
+        import time
+        from backend.utils.ai_client.executor import BoundedExecutor
+        
+        executor = BoundedExecutor("test-cap", max_workers=2)
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+        
+        def blocking_call(value):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return value * 2
+        
+        async def run_all():
+            return await asyncio.gather(*(executor.run(blocking_call, i) for i in range(6)))
+        
+        try:
+            assert asyncio.run(run_all()) == [0, 2, 4, 6, 8, 10]
+            assert state["peak"] <= 2
+            assert executor.stats()["queue_depth"] == 0
+            assert executor.stats()["in_flight"] == 0
+        finally:
+            executor.shutdown()
+    
+    def test_gemini_async_request_runs_off_loop(self):
+        """Test the Gemini async path runs the blocking SDK call on the pool"""
+        import threading
+        from backend.utils.ai_client.gemini_client import GeminiClient
+        from backend.utils.ai_client.gemini_config import GeminiConfig
+        
+        with patch('backend.utils.ai_client.gemini_client.genai') as mock_genai:
+            caller_threads = []
+            
+            def generate_content(prompt, generation_config=None):
+                caller_threads.append(threading.current_thread().name)
+                return Mock(text='{"flagged_clauses": [], "compliance_issues": []}')
+            
+            mock_genai.GenerativeModel.return_value.generate_content.side_effect = generate_content
+            client = GeminiClient(GeminiConfig(api_key="test_key"), cache=ResponseCache(enabled=False))
+            
+            result = asyncio.run(client.generate_text_async("Hello"))
+        
+        assert "flagged_clauses" in result
+        assert caller_threads and caller_threads[0].startswith("ai-gemini")
+
+
+class TestTokenBudget:
+    """Test token estimation and budgeted prompt building"""
+
+    CHECKLIST = {
+        "PDPA_MY": {
+            "metadata": {"name": "Personal Data Protection Act 2010"},
+            "key_provisions": {
+                "consent": {
+                    "section": "s.6",
+                    "description": "General principle " * 50,
+                    "ai_prompt_guidance": "Look for consent wording " * 50,
+                    "penalties_for_breach": "Fine up to RM300,000",
+                    "requirements": ["Obtain consent before processing"]
+                }
+            },
+            "contract_specific_requirements": {
+                "Employment Contract": {"mandatory_clauses": ["Employee data consent"]},
+                "Service Agreement": {"mandatory_clauses": ["Processor obligations"],
+                                      "prohibited_clauses": ["Unlimited data transfer"]}
+            }
+        }
+    }
+
+    def test_estimate_tokens(self):
+        """Test the estimate counts words and punctuation and grows with long words"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("The Employer shall pay.") == 7
+        assert estimate_tokens("indemnification") > estimate_tokens("pay")
+
+    def test_context_window_lookup(self):
+        """Test exact, versioned and unknown model ids"""
+        assert context_window("ibm/granite-13b-instruct-v2") == 8192
+        assert context_window("gemini-1.5-pro-002") == 2097152
+        assert context_window("unknown-model") == 8192
+
+    def test_trim_checklist_levels(self):
+        """Test trimming drops guidance and keeps only the contract type's requirements"""
+        level0 = trim_checklist(self.CHECKLIST, "Service", level=0)["PDPA_MY"]
+        assert "ai_prompt_guidance" not in level0["key_provisions"]["consent"]
+        assert level0["key_provisions"]["consent"]["penalties_for_breach"]
+        assert list(level0["contract_specific_requirements"]) == ["Service Agreement"]
+
+        level2 = trim_checklist(self.CHECKLIST, "Service", level=2)["PDPA_MY"]
+        assert level2["key_provisions"]["consent"] == {"section": "s.6"}
+        assert level2["contract_specific_requirements"]["Service Agreement"] == {
+            "mandatory_clauses": ["Processor obligations"]
+        }
+
+    def test_budget_caps_output_to_context_window(self):
+        """Test Granite prompt plus output never exceeds its 8k context"""
+        prompt, budget = PromptFormatter.build_budgeted_contract_analysis_prompt(
+            "The Provider shall deliver the services. " * 800,
+            self.CHECKLIST,
+            model_id="ibm/granite-13b-instruct-v2",
+            max_output_tokens=8191,
+            contract_type="Service"
+        )
+
+        assert budget.context_window == 8192
+        assert budget.max_output_tokens < 8191
+        assert budget.prompt_tokens + budget.max_output_tokens <= budget.context_window
+        assert estimate_tokens(prompt) <= budget.prompt_tokens + 16
+        assert "ai_prompt_guidance" not in prompt
+
+    def test_large_context_model_keeps_configured_output(self):
+        """Test models with room to spare keep the configured output limit"""
+        _, budget = PromptFormatter.build_budgeted_contract_analysis_prompt(
+            "Short contract.", self.CHECKLIST, model_id="gemini-1.5-flash", max_output_tokens=8192
+        )
+
+        assert budget.max_output_tokens == 8192
+        assert budget.checklist_trim_level == 0
+        assert not budget.contract_truncated
+
+    def test_batch_prompt_delimits_each_contract(self):
+        """Test a batched prompt keeps every contract whole behind its own id"""
+        documents = [("C1", "The Provider shall deliver."), ("C2", "Fees are paid <<<monthly>>>.")]
+
+        prompt, budget = PromptFormatter.build_batch_contract_analysis_prompt(
+            documents, self.CHECKLIST, model_id="gemini-1.5-flash", max_output_tokens=8192
+        )
+
+        assert prompt.count("<<<CONTRACT C1>>>") == 1 and "<<<END CONTRACT C2>>>" in prompt
+        assert "The Provider shall deliver." in prompt and "<<monthly>>" in prompt
+        assert '"contract_id"' in prompt
+        assert budget.fits_batch(2)
+
+    def test_batch_budget_rejects_oversized_batch(self):
+        """Test a batch without answer space for every contract does not fit"""
+        documents = [(f"C{number}", "The Provider shall deliver the services. " * 300) for number in range(4)]
+
+        _, budget = PromptFormatter.build_batch_contract_analysis_prompt(
+            documents, self.CHECKLIST, model_id="ibm/granite-13b-instruct-v2", max_output_tokens=8191
+        )
+
+        assert not budget.fits_batch(len(documents))
+
+
+class TestCircuitBreaker:
+    """Test the per-provider circuit breaker"""
+
+    @staticmethod
+    def _fail(status_code=503):
+        raise APIError("upstream failed", status_code)
+
+    def _trip(self, breaker, calls=4):
+        for _ in range(calls):
+            with pytest.raises(APIError):
+                breaker.call(self._fail)
+
+    def test_opens_on_failure_rate_and_rejects_fast(self):
+        """Test the breaker opens once the failure rate is reached and rejects calls"""
+        breaker = CircuitBreaker("test", min_calls=4, failure_rate_threshold=0.5, open_seconds=60)
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+        self._trip(breaker, calls=2)
+
+        assert breaker.state == "open"
+        assert not breaker.allow_request()
+        called = []
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.call(lambda: called.append(True))
+        assert not called
+        assert error.value.status_code == 503
+        assert breaker.stats()["retry_in"] > 0
+
+    def test_client_errors_do_not_open(self):
+        """Test 4xx responses other than 408/429 do not count as provider failures"""
+        breaker = CircuitBreaker("test", min_calls=4)
+        for _ in range(6):
+            with pytest.raises(APIError):
+                breaker.call(lambda: self._fail(400))
+
+        assert breaker.state == "closed"
+
+    def test_slow_calls_open(self):
+        """Test a high slow-call rate opens the breaker even without errors"""
+        breaker = CircuitBreaker("test", min_calls=2, slow_call_seconds=0.0, slow_call_rate_threshold=1.0)
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+
+        assert breaker.state == "open"
+
+    def test_half_open_probe_success_closes(self):
+        """Test a successful probe after the cool-down closes the breaker"""
+        breaker = CircuitBreaker("test", min_calls=2, open_seconds=0.01)
+        self._trip(breaker, calls=2)
+        time.sleep(0.02)
+
+        assert breaker.state == "half_open"
+        assert breaker.call(lambda: "recovered") == "recovered"
+        assert breaker.state == "closed"
+
+    def test_half_open_probe_failure_reopens(self):
+        """Test a failed probe reopens the breaker and only one probe is admitted"""
+        breaker = CircuitBreaker("test", min_calls=2, open_seconds=0.01)
+        self._trip(breaker, calls=2)
+        time.sleep(0.02)
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record(0.1, failed=True)
+        assert breaker.state == "open"
+
+    def test_async_deadline_cancellation_counts_as_slow(self):
+        """Test a cancelled call that ran past the slow threshold is recorded"""
+        breaker = CircuitBreaker("test", min_calls=1, slow_call_seconds=0.01, slow_call_rate_threshold=1.0)
+
+        async def scenario():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(breaker.call_async(lambda: asyncio.sleep(1)), timeout=0.05)
+
+        asyncio.run(scenario())
+        assert breaker.state == "open"
+
+    @patch('backend.utils.ai_client.auth.requests.post')
+    def test_client_fails_fast_when_open(self, mock_auth_post):
+        """Test the WatsonX client rejects requests without calling the API while open"""
+        breaker = CircuitBreaker("watsonx", min_calls=1)
+        client = WatsonXClient(WatsonXConfig(api_key="test_key", project_id="test_project"),
+                               cache=ResponseCache(enabled=False), breaker=breaker)
+        self._trip(breaker, calls=1)
+
+        with pytest.raises(CircuitOpenError):
+            client._make_raw_request("prompt")
+        mock_auth_post.assert_not_called()
+
+
+class TestHedging:
+    """Test hedged calls across two providers"""
+
+    @staticmethod
+    def _attempt(result, delay=0.0, log=None, name=None):
+        async def run():
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                if log is not None:
+                    log.append(f"{name} cancelled")
+                raise
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return run
+
+    def test_fast_primary_is_not_hedged(self):
+        """Test the secondary is never started when the primary answers in time"""
+        started = []
+
+        async def secondary():
+            started.append(True)
+            return "secondary"
+
+        result, winner = asyncio.run(hedged_call(self._attempt("primary"), secondary, delay=1.0))
+
+        assert (result, winner) == ("primary", "primary")
+        assert not started
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        """Test the secondary wins when the primary is slow and the primary is cancelled"""
+        log = []
+
+        async def scenario():
+            result = await hedged_call(
+                self._attempt("primary", delay=5, log=log, name="primary"),
+                self._attempt("secondary", delay=0.01), delay=0.02
+            )
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(scenario()) == ("secondary", "secondary")
+        assert log == ["primary cancelled"]
+
+    def test_failed_primary_hedges_immediately(self):
+        """Test a failing primary starts the secondary without waiting for the delay"""
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await hedged_call(self._attempt(APIError("down", 503)), self._attempt("secondary"), delay=5)
+            return result, loop.time() - started
+
+        (result, winner), elapsed = asyncio.run(scenario())
+        assert winner == "secondary"
+        assert elapsed < 1
+
+    def test_unacceptable_result_is_skipped(self):
+        """Test an invalid answer does not win the race"""
+        result, winner = asyncio.run(hedged_call(
+            self._attempt("not json"), self._attempt('{"summary": "ok"}', delay=0.01), delay=5,
+            accept=lambda text: text.startswith("{")
+        ))
+
+        assert winner == "secondary"
+
+    def test_all_attempts_failing_raises_last_error(self):
+        """Test the error surfaces when neither provider answers"""
+        with pytest.raises(APIError):
+            asyncio.run(hedged_call(self._attempt(APIError("a")), self._attempt(APIError("b")), delay=0.01))
+
+    def test_hedge_delay_follows_latency_percentile(self):
+        """Test the delay uses the default until enough latency samples exist"""
+        provider = "hedge-test"
+        assert hedge_delay(provider, min_samples=5, default_delay=7.0) == 7.0
+        for latency in (1.0, 2.0, 3.0, 4.0, 5.0):
+            metrics.observe("ai_upstream_seconds", latency, provider=provider)
+
+        assert hedge_delay(provider, percentile=50, min_samples=5) == 3.0
+        assert hedge_delay(provider, percentile=0, min_samples=5, min_delay=1.5) == 1.5
+
+
+class TestRateLimiter:
+    """Test the per-provider request and token rate limiter"""
+
+    def test_requests_are_spaced_at_the_configured_rate(self):
+        """Test requests beyond the burst wait for the bucket to refill"""
+        limiter = RateLimiter("rate-test", requests_per_minute=1200, burst_seconds=0.01)
+
+        async def scenario():
+            return [await limiter.acquire() for _ in range(3)]
+
+        waits = asyncio.run(scenario())
+        assert waits[0] < 0.01
+        assert sum(waits) >= 0.09
+
+    def test_higher_priority_overtakes_queued_bulk_call(self):
+        """Test an interactive call queued after a bulk call is served first"""
+        limiter = RateLimiter("priority-test", requests_per_minute=1200, burst_seconds=0.01)
+        order = []
+
+        async def call(name):
+            await limiter.acquire()
+            order.append(name)
+
+        async def scenario():
+            await limiter.acquire()
+            with request_priority(PRIORITY_BULK):
+                bulk = asyncio.ensure_future(call("bulk"))
+            await asyncio.sleep(0)
+            interactive = asyncio.ensure_future(call("interactive"))
+            await asyncio.gather(bulk, interactive)
+
+        asyncio.run(scenario())
+        assert order == ["interactive", "bulk"]
+        assert metrics.snapshot()["histograms"]["ai_rate_limit_wait_seconds{priority=bulk,provider=priority-test}"]["count"] == 1
+
+    def test_cancelled_caller_leaves_queue(self):
+        """Test a caller whose deadline passes does not hold up the queue"""
+        limiter = RateLimiter("rate-test", requests_per_minute=6, burst_seconds=0.01)
+
+        async def scenario():
+            await limiter.acquire()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(limiter.acquire(), 0.02)
+
+        asyncio.run(scenario())
+        assert limiter.stats()["queued"] == 0
+
+    def test_generated_tokens_delay_later_calls(self):
+        """Test charged output tokens are paid back before the next call"""
+        limiter = RateLimiter("rate-test", tokens_per_minute=60000, burst_seconds=0.1)
+        limiter.charge(150)
+
+        assert limiter.stats()["available_tokens"] < 0
+        assert limiter.acquire_blocking(tokens=10) >= 0.05
+
+    def test_unconfigured_limiter_never_waits(self):
+        """Test a limiter without quotas is disabled"""
+        limiter = RateLimiter("rate-test")
+
+        assert not limiter.enabled
+        assert asyncio.run(limiter.acquire(tokens=10 ** 6)) == 0.0
+
+
+class TestRetryPolicy:
+    """Test retries of transient provider failures"""
+
+    @staticmethod
+    def _flaky(*errors, result="ok"):
+        remaining = list(errors)
+        calls = []
+
+        async def attempt():
+            calls.append(time.monotonic())
+            if remaining:
+                raise remaining.pop(0)
+            return result
+        return attempt, calls
+
+    def test_parse_retry_after(self):
+        """Test delay-seconds, HTTP dates and malformed headers"""
+        assert parse_retry_after("2") == 2.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_retryable_errors(self):
+        """Test throttling and outages retry; client errors and open circuits do not"""
+        assert is_retryable(APIError("busy", 429))
+        assert is_retryable(APIError("reset"))
+        assert not is_retryable(APIError("bad request", 400))
+        assert not is_retryable(CircuitOpenError("gemini", 5))
+        assert not is_retryable(APIError("failed", 500), idempotent=False)
+        assert is_retryable(APIError("busy", 503), idempotent=False)
+
+    def test_transient_failures_are_retried(self):
+        """Test a call succeeds after transient failures within the attempt limit"""
+        attempt, calls = self._flaky(APIError("busy", 503), APIError("timeout", 408))
+        policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+
+        assert asyncio.run(policy.call_async(attempt, "retry-test")) == "ok"
+        assert len(calls) == 3
+        assert metrics.snapshot()["histograms"]["ai_call_attempts{provider=retry-test}"]["count"] >= 1
+
+    def test_retry_after_is_honoured(self):
+        """Test the provider's requested wait replaces the jittered backoff"""
+        attempt, calls = self._flaky(APIError("busy", 429, retry_after=0.05))
+
+        asyncio.run(RetryPolicy(base_delay=10).call_async(attempt, "retry-test"))
+
+        assert 0.05 <= calls[1] - calls[0] < 1
+
+    def test_no_retry_past_deadline(self):
+        """Test a retry that cannot finish before the deadline is not attempted"""
+        attempt, calls = self._flaky(APIError("busy", 429, retry_after=5))
+
+        with pytest.raises(APIError):
+            asyncio.run(RetryPolicy().call_async(attempt, "retry-test", deadline=time.monotonic() + 1))
+        assert len(calls) == 1
+
+    def test_attempts_are_bounded(self):
+        """Test the last error surfaces once the attempts are used up"""
+        calls = []
+
+        def failing():
+            calls.append(True)
+            raise APIError("down", 502)
+
+        with pytest.raises(APIError):
+            RetryPolicy(max_attempts=2, base_delay=0.01).call(failing, "retry-test")
+        assert len(calls) == 2
+
+    def test_stream_retried_only_before_first_fragment(self):
+        """Test a stream is retried until it yields, but not after"""
+        opened = []
+
+        def stream_factory():
+            async def stream():
+                opened.append(True)
+                if len(opened) == 1:
+                    raise APIError("busy", 503)
+                yield "first"
+                raise APIError("reset", 503)
+            return stream()
+
+        async def consume(received):
+            async for fragment in RetryPolicy(base_delay=0.01).stream_async(stream_factory, "retry-test"):
+                received.append(fragment)
+
+        received = []
+        with pytest.raises(APIError):
+            asyncio.run(consume(received))
+        assert received == ["first"]
+        assert len(opened) == 2
+
 
 class TestModelType:
     """Test model type enum"""
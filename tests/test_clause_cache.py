@@ -0,0 +1,334 @@
+"""
+Tests for the clause fingerprint cache and clause-by-clause analysis.
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+from backend.models.ContractAnalysisModel import ContractAnalysisRequest
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.clause_cache import ClauseCache, contract_clauses, make_clause_key
+from backend.utils.contract_document import ContractDocument
+from backend.utils.contract_sections import parse_sections
+from backend.utils.law_rules import LawRuleEngine
+
+from test_contract_analyzer import FakeGeminiClient, _long_contract
+
+CONTRACT = (
+    "Employment Agreement between Acme Sdn Bhd and the Employee.\n"
+    "1.1 Working Time\n"
+    "The Employee shall work 10 hours per day,  six days a week.\n"
+    "1.2 Leave Entitlement\n"
+    "The Employee is entitled to annual leave of 5 days in each year.\n"
+    "1.3 Remuneration\n"
+    "The Employer shall pay a salary of RM 1,200 per month.\n"
+    "1.4 Probation\n"
+    "The probation period is 9 months."
+)
+
+
+class QuotingGeminiClient(FakeGeminiClient):
+    """Flags the first obligation of each excerpt and names the contract in its summary and compliance issues."""
+
+    def __init__(self):
+        super().__init__()
+        self.reviewing = "contract A"
+
+    def _analysis(self, contract_text):
+        self.excerpts.append(contract_text)
+        quoted = re.search(r"Clause \d+ obligation \d+: the Provider shall perform the services diligently\.",
+                           contract_text)
+        return json.dumps({
+            "summary": f"Review of {self.reviewing}.",
+            "flagged_clauses": [{"clause_text": quoted.group(0), "issue": "Vague standard", "severity": "low"}],
+            "compliance_issues": [{
+                "law": "PDPA_MY",
+                "missing_requirements": [f"Requirement of {self.reviewing}"],
+                "recommendations": ["Add a data protection clause"]
+            }]
+        })
+
+
+def _clause_cached_service(client):
+    service = analyzer_module.ContractAnalyzerService()
+    service.chunk_max_chars = 2000
+    service.clause_cache = ClauseCache()
+    service.gemini_client = client
+    service.ai_provider = "gemini"
+    return service
+
+# The DOTALL anchor of the explicit consent rules ("personal ... data") spans clauses 1 and 2
+DATA_CONTRACT = (
+    "Services Agreement between Acme Pte Ltd and Beta Pte Ltd.\n"
+    "1. Customer Records\n"
+    "The Provider keeps the personal records of customers.\n"
+    "2. Storage\n"
+    "All data is stored in encrypted form and deleted on request."
+)
+
+# Annual leave and probation are stated twice, only the later statements outside the limits
+LEAVE_CONTRACT = (
+    "Employment Agreement between Acme Sdn Bhd and the Employee.\n"
+    "1. Leave\n"
+    "The Employee is entitled to annual leave of 8 days in each year.\n"
+    "2. Probation\n"
+    "The probation period is 3 months.\n"
+    "3. Managers\n"
+    "Managers take annual leave of 5 days.\n"
+    "Managers serve 9 months of probation."
+)
+
+
+def _clauses(text: str, max_chars: int = 4000):
+    document = ContractDocument(text)
+    return contract_clauses(document, parse_sections(document), max_chars)
+
+
+def _findings(evaluation):
+    return {law: [vars(finding) for finding in findings] for law, findings in evaluation.findings.items()}
+
+
+class TestClauses:
+    """Test contracts are cut into normalised clauses"""
+
+    def test_numbering_and_layout_do_not_change_the_fingerprint(self):
+        """Test the same clause numbered and spaced differently has one fingerprint"""
+        first = _clauses("Preamble of the agreement.\n7.2 Confidentiality\nEach party shall keep  the terms secret.")
+        second = _clauses("Another preamble.\n12.2 Confidentiality\nEach party shall keep the terms\tsecret.")
+
+        assert first[-1].text == "confidentiality\neach party shall keep the terms secret."
+        assert first[-1].fingerprint == second[-1].fingerprint
+        assert first[0].fingerprint != second[0].fingerprint
+
+    def test_offsets_map_back_into_the_contract(self):
+        """Test offsets into the normalised clause index the original contract"""
+        text = "Preamble of the agreement.\n7.2 Confidentiality\nEach   party shall keep the terms secret."
+        clause = _clauses(text)[-1]
+
+        start = clause.text.index("party shall")
+        document_start, document_end = clause.document_span(start, start + len("party shall"))
+
+        assert text[document_start:document_end] == "party shall"
+        assert text[clause.start:clause.end].startswith("7.2 Confidentiality")
+
+    def test_inserted_line_changes_only_nearby_clauses(self):
+        """Test text without headings is cut by content, so an insertion does not shift later clauses"""
+        lines = [f"Line {number} of an agreement without any headings in it at all." for number in range(200)]
+        before = _clauses("\n".join(lines), max_chars=600)
+        after = _clauses("\n".join(lines[:20] + ["An inserted obligation of the Provider."] + lines[20:]), max_chars=600)
+
+        assert len(before) > 5
+        unchanged = {clause.fingerprint for clause in before} & {clause.fingerprint for clause in after}
+        assert len(unchanged) >= len(before) - 2
+
+
+class TestClauseCache:
+    """Test the two-tier clause cache and its hit rates"""
+
+    def test_lru_eviction(self):
+        """Test the memory tier evicts the least recently used clause"""
+        cache = ClauseCache(max_entries=2)
+        cache.set_many({"a": {"n": 1}, "b": {"n": 2}})
+        assert cache.get_many(["a"], "MY", "rules") == [{"n": 1}]
+        cache.set_many({"c": {"n": 3}})
+
+        assert cache.get_many(["a", "b", "c"], "MY", "rules") == [{"n": 1}, None, {"n": 3}]
+
+    def test_persistent_tier_survives_restart(self, tmp_path):
+        """Test clauses stored on disk are served by a new cache instance"""
+        path = str(tmp_path / "clauses.db")
+        ClauseCache(path=path).set_many({"key": {"terms": ["overtime"], "rules": {}}})
+        cache = ClauseCache(path=path)
+
+        assert cache.get_many(["key", "other"], "MY", "rules") == [{"terms": ["overtime"], "rules": {}}, None]
+        assert cache.stats()["memory_entries"] == 1
+
+    def test_hit_rates_per_jurisdiction(self):
+        """Test hits and misses are counted per jurisdiction"""
+        cache = ClauseCache()
+        cache.set_many({make_clause_key("rules", "a"): {}})
+        cache.get_many([make_clause_key("rules", "a"), make_clause_key("rules", "b")], "MY", "rules")
+        cache.get_many([make_clause_key("rules", "a")] * 3, "SG", "rules")
+
+        assert cache.stats()["jurisdictions"] == {
+            "MY": {"hits": 1, "misses": 1, "hit_rate": 0.5},
+            "SG": {"hits": 3, "misses": 0, "hit_rate": 1.0}
+        }
+
+    def test_disabled_cache_never_hits(self):
+        """Test a disabled cache stores nothing"""
+        cache = ClauseCache(enabled=False)
+        cache.set_many({"key": {}})
+
+        assert cache.get_many(["key"], "MY", "rules") == [None]
+        assert cache.stats()["jurisdictions"] == {}
+
+
+class TestClauseEvaluation:
+    """Test law rules evaluated clause by clause report what whole-contract evaluation does"""
+
+    def test_clause_evaluation_matches_whole_contract(self):
+        """Test findings are the same uncached, on misses and on hits"""
+        engine = analyzer_module.ContractAnalyzerService().law_rules
+        cache = ClauseCache()
+        clauses = _clauses(CONTRACT)
+
+        whole = engine.evaluate(CONTRACT, "MY", "Employment")
+        cold = engine.evaluate(CONTRACT, "MY", "Employment", clauses=clauses, cache=cache)
+        warm = engine.evaluate(CONTRACT, "MY", "Employment", clauses=clauses, cache=cache)
+
+        assert len(clauses) == 5
+        assert whole.flagged_clauses()
+        assert _findings(cold) == _findings(whole)
+        assert _findings(warm) == _findings(whole)
+        assert cache.stats()["jurisdictions"]["MY"] == {"hits": 5, "misses": 5, "hit_rate": 0.5}
+
+    @pytest.mark.parametrize("jurisdiction, law", [
+        ("SG", "PDPA_SG"), ("MY", "PDPA_MY"), ("EU", "GDPR_EU"), ("US", "CCPA_US")
+    ])
+    def test_consent_anchor_spanning_clauses(self, jurisdiction, law):
+        """Test the explicit consent finding quotes the anchor across clauses, as on the whole contract"""
+        engine = analyzer_module.ContractAnalyzerService().law_rules
+        cache = ClauseCache()
+        clauses = _clauses(DATA_CONTRACT)
+        features = ["data_processing"]
+
+        whole = engine.evaluate(DATA_CONTRACT, jurisdiction, "Service", features)
+        cold = engine.evaluate(DATA_CONTRACT, jurisdiction, "Service", features, clauses=clauses, cache=cache)
+        warm = engine.evaluate(DATA_CONTRACT, jurisdiction, "Service", features, clauses=clauses, cache=cache)
+        consent = [finding for finding in whole.findings[law] if finding.rule == f"{law}.explicit_consent"]
+
+        assert len(clauses) == 3
+        assert consent and consent[0].clause_text.startswith("personal records")
+        assert _findings(cold) == _findings(whole)
+        assert _findings(warm) == _findings(whole)
+
+    def test_first_limit_is_the_first_in_the_contract(self):
+        """Test limits of scope "first" check the first value in the contract, not the first of each clause"""
+        engine = analyzer_module.ContractAnalyzerService().law_rules
+        cache = ClauseCache()
+        clauses = _clauses(LEAVE_CONTRACT)
+
+        whole = engine.evaluate(LEAVE_CONTRACT, "MY", "Employment")
+        cold = engine.evaluate(LEAVE_CONTRACT, "MY", "Employment", clauses=clauses, cache=cache)
+        warm = engine.evaluate(LEAVE_CONTRACT, "MY", "Employment", clauses=clauses, cache=cache)
+        rules = {finding.rule for finding in whole.findings["EMPLOYMENT_ACT_MY"]}
+
+        assert {"EMPLOYMENT_ACT_MY.leave_clause", "EMPLOYMENT_ACT_MY.probation_clause"} <= rules
+        assert "EMPLOYMENT_ACT_MY.annual_leave_days" not in rules
+        assert "EMPLOYMENT_ACT_MY.probation_months" not in rules
+        assert _findings(cold) == _findings(whole)
+        assert _findings(warm) == _findings(whole)
+
+    def test_disabling_the_cache_does_not_change_findings(self):
+        """Test the analyzer reports the same rule findings with the clause cache enabled or disabled"""
+        service = analyzer_module.ContractAnalyzerService()
+        metadata = service._analyze_contract_metadata(DATA_CONTRACT)
+        metadata["has_data_processing"] = True
+        evaluations = []
+        for enabled in (True, False):
+            service.clause_cache = ClauseCache(enabled=enabled)
+            evaluations.append(_findings(service._evaluate_law_rules(DATA_CONTRACT, metadata, "SG")))
+
+        whole = service.law_rules.evaluate(DATA_CONTRACT, "SG", metadata["type"], ["data_processing"])
+
+        assert evaluations[0] == evaluations[1] == _findings(whole)
+
+    def test_only_novel_clauses_are_searched(self):
+        """Test a contract sharing clauses with an earlier one only runs the rules on the new clause"""
+        engine = analyzer_module.ContractAnalyzerService().law_rules
+        cache = ClauseCache()
+        engine.evaluate(CONTRACT, "MY", "Employment", clauses=_clauses(CONTRACT), cache=cache)
+        renumbered = CONTRACT.replace("1.", "4.").replace("9 months", "3 months")
+        engine.patterns.reset_stats()
+
+        evaluation = engine.evaluate(renumbered, "MY", "Employment", clauses=_clauses(renumbered), cache=cache)
+
+        assert engine.patterns["EMPLOYMENT_ACT_MY.working_hours"].stats()["calls"] == 1
+        assert _findings(evaluation) == _findings(engine.evaluate(renumbered, "MY", "Employment"))
+        assert cache.stats()["jurisdictions"]["MY"]["hits"] == 4
+
+    def test_rule_changes_change_the_version(self):
+        """Test cached clause matches are keyed to the rules they were found with"""
+        def engine(pattern):
+            return LawRuleEngine.from_laws({"TEST_LAW": {"compliance_rules": {
+                "applies_to": {"jurisdictions": ["MY"]},
+                "rules": [{"id": "notice", "check": "required", "pattern": pattern, "requirement": "Notice"}]
+            }}})
+
+        assert engine(r"notice").version == engine(r"notice").version
+        assert engine(r"notice").version != engine(r"notice period").version
+
+
+class TestClauseCachedAIAnalysis:
+    """Test chunked AI analysis only sends clauses not analysed before"""
+
+    def test_repeated_clauses_are_not_sent_again(self):
+        """Test a second long contract sharing most clauses sends only its novel ones"""
+        fake_client = QuotingGeminiClient()
+        service = _clause_cached_service(fake_client)
+        contract = _long_contract()
+
+        first = asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=contract, jurisdiction="MY")))
+        sent = list(fake_client.excerpts)
+        fake_client.excerpts.clear()
+        changed = contract.replace("Clause 7 obligation 3", "Clause 7 revised obligation 3")
+        second = asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=changed, jurisdiction="MY")))
+        resent = "\n".join(fake_client.excerpts)
+
+        assert len(sent) > 1
+        assert "Clause 7 revised obligation 3" in resent
+        assert len(resent) < sum(map(len, sent)) / 3
+        assert "Clause 20 obligation" not in resent
+        assert sorted(clause.clause_text for clause in second.flagged_clauses) == \
+            sorted(clause.clause_text for clause in first.flagged_clauses)
+        assert service.clause_cache.stats()["jurisdictions"]["MY"]["hits"] > 0
+
+    def test_summary_and_compliance_issues_are_not_cached(self):
+        """Test a contract sharing clauses with another is not summarised from the other"""
+        fake_client = QuotingGeminiClient()
+        service = _clause_cached_service(fake_client)
+        contract = _long_contract()
+
+        asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=contract, jurisdiction="MY")))
+        fake_client.reviewing = "contract B"
+        changed = contract.replace("Clause 7 obligation 3", "Clause 7 revised obligation 3")
+        second = asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=changed, jurisdiction="MY")))
+        issues = json.dumps([issue.model_dump() for issue in second.compliance_issues])
+
+        assert "contract B" in second.summary
+        assert "contract A" not in second.summary
+        assert "Requirement of contract B" in issues
+        assert "contract A" not in issues
+        assert f"{len(fake_client.excerpts)} segments" not in second.summary
+
+    def test_unattributed_findings_are_not_cached(self):
+        """Test the clauses of an excerpt with a finding that quotes none of them are sent again"""
+        fake_client = FakeGeminiClient()
+        service = _clause_cached_service(fake_client)
+        contract = _long_contract()
+
+        asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=contract, jurisdiction="MY")))
+        fake_client.excerpts.clear()
+        changed = contract.replace("Clause 7 obligation 3", "Clause 7 revised obligation 3")
+        second = asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=changed, jurisdiction="MY")))
+
+        assert "Clause 20 obligation" in "\n".join(fake_client.excerpts)
+        assert second.flagged_clauses[0].clause_text == "The Provider may  terminate without notice."
+
+    def test_clauses_are_cached_per_model(self):
+        """Test clauses analysed by one model are sent again to another"""
+        fake_client = QuotingGeminiClient()
+        service = _clause_cached_service(fake_client)
+        contract = _long_contract()
+
+        asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=contract, jurisdiction="MY")))
+        fake_client.excerpts.clear()
+        fake_client.model_id = "gemini-ultra"
+        changed = contract.replace("Clause 7 obligation 3", "Clause 7 revised obligation 3")
+        asyncio.run(service.analyze_contract(ContractAnalysisRequest(text=changed, jurisdiction="MY")))
+
+        assert "Clause 20 obligation" in "\n".join(fake_client.excerpts)
@@ -0,0 +1,426 @@
+"""
+Tests for ContractAnalyzerService analysis helpers.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.service.ContractAnalyzerService import ContractAnalyzerService
+from backend.models.ContractAnalysisModel import ContractAnalysisRequest
+from backend.utils.ai_client.circuit_breaker import CircuitBreaker
+from backend.utils.ai_client.exceptions import APIError
+from backend.utils.ai_client.prompts import PromptFormatter
+from backend.utils.clause_cache import ClauseCache
+
+
+def _long_contract(sections: int = 30) -> str:
+    """Build a numbered contract long enough to need chunked analysis."""
+    parts = ["SERVICE AGREEMENT between Acme Sdn Bhd and Beta Sdn Bhd."]
+    for number in range(1, sections + 1):
+        body = " ".join(
+            f"Clause {number} obligation {line}: the Provider shall perform the services diligently."
+            for line in range(6)
+        )
+        parts.append(f"{number}. Section Heading Number {number}\n{body}")
+    return "\n\n".join(parts)
+
+
+class FakeGeminiClient:
+    """Stands in for GeminiClient and records the excerpts it was sent."""
+
+    def __init__(self, breaker=None):
+        self.excerpts = []
+        self.contract_types = []
+        self.batches = []
+        self.batch_response = None
+        self.breaker = breaker or CircuitBreaker("gemini")
+        self.plans = 0
+        self.model_id = "gemini-pro"
+
+    def plan_contract_analysis(self, contract_text, compliance_checklist, contract_type=None):
+        self.plans += 1
+        prompt, budget = PromptFormatter.build_budgeted_contract_analysis_prompt(
+            contract_text, compliance_checklist, model_id=self.model_id, max_output_tokens=8192,
+            contract_type=contract_type
+        )
+        return prompt, "", budget
+
+    def plan_batch_contract_analysis(self, documents, compliance_checklist, contract_type=None):
+        prompt, budget = PromptFormatter.build_batch_contract_analysis_prompt(
+            documents, compliance_checklist, model_id=self.model_id, max_output_tokens=8192,
+            contract_type=contract_type
+        )
+        return prompt, "", budget
+
+    async def analyze_contract_batch_async(self, documents, compliance_checklist, timeout=None, use_cache=True,
+                                           contract_type=None):
+        self.batches.append([contract_id for contract_id, _ in documents])
+        budget = self.plan_batch_contract_analysis(documents, compliance_checklist, contract_type)[2]
+        analyzer_module.record_budget(self.breaker.name, budget)
+        await asyncio.sleep(0)
+        if self.batch_response is not None:
+            return self.batch_response
+        analysis = json.loads(self._analysis(documents[0][1]))
+        self.excerpts.pop()
+        return json.dumps({"results": [
+            {"contract_id": contract_id, **analysis, "summary": f"Reviewed {contract_id}."}
+            for contract_id, _ in documents
+        ]})
+
+    async def analyze_contract_stream(self, contract_text, compliance_checklist, use_cache=True,
+                                      contract_type=None):
+        text = await self.analyze_contract_async(contract_text, compliance_checklist, use_cache, contract_type)
+        for start in range(0, len(text), 7):
+            await asyncio.sleep(0)
+            yield text[start:start + 7]
+
+    async def analyze_contract_async(self, contract_text, compliance_checklist, use_cache=True,
+                                     contract_type=None):
+        budget = self.plan_contract_analysis(contract_text, compliance_checklist, contract_type)[2]
+        analyzer_module.record_budget(self.breaker.name, budget)
+        self.contract_types.append(contract_type)
+        await asyncio.sleep(0)
+        return self._analysis(contract_text)
+
+    def _analysis(self, contract_text):
+        self.excerpts.append(contract_text)
+        return json.dumps({
+            "summary": "Provider obligations reviewed.",
+            "flagged_clauses": [{
+                "clause_text": "The Provider may  terminate without notice.",
+                "issue": "Unfair termination",
+                "severity": "high" if len(self.excerpts) == 2 else "medium"
+            }],
+            "compliance_issues": [{
+                "law": "PDPA_MY",
+                "missing_requirements": [f"Requirement {len(self.excerpts) % 2}"],
+                "recommendations": ["Add a data protection clause"]
+            }]
+        })
+
+
+class TestChunkedAnalysis:
+    """Test map-reduce analysis of long contracts"""
+
+    def setup_method(self):
+        self.service = ContractAnalyzerService()
+        self.service.chunk_max_chars = 2000
+        self.service.clause_cache = ClauseCache()
+
+    def test_chunks_respect_limit_and_keep_every_section(self):
+        """Test chunks stay under the size limit and no section is dropped"""
+        contract = _long_contract()
+        metadata = self.service._analyze_contract_metadata(contract)
+
+        chunks = self.service._split_into_analysis_chunks(contract, metadata["section_tree"])
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= self.service.chunk_max_chars for chunk in chunks)
+        combined = "\n".join(chunks)
+        for number in range(1, 31):
+            assert f"Clause {number} obligation 5" in combined
+
+    def test_oversized_section_is_split(self):
+        """Test a single section longer than a chunk is split rather than truncated"""
+        contract = "1. Giant Section Heading\n" + "\n".join(f"Line {i} of the giant clause text." for i in range(400))
+
+        chunks = self.service._split_into_analysis_chunks(contract)
+
+        assert all(len(chunk) <= self.service.chunk_max_chars for chunk in chunks)
+        assert "Line 399 of the giant clause text." in chunks[-1]
+
+    def test_merge_deduplicates_findings(self):
+        """Test the reduce step merges duplicate clauses and per-law issues"""
+        merged = self.service._merge_chunk_analyses([
+            {"summary": "A", "flagged_clauses": [{"clause_text": "Pay in  30 days", "issue": "x", "severity": "medium"}],
+             "compliance_issues": [{"law": "PDPA_MY", "missing_requirements": ["r1"], "recommendations": ["a"]}]},
+            {"summary": "B", "flagged_clauses": [{"clause_text": "pay in 30 days", "issue": "x", "severity": "high"}],
+             "compliance_issues": [{"law": "PDPA_MY", "missing_requirements": ["r1", "r2"], "recommendations": ["a"]}]}
+        ], total_chunks=2)
+
+        assert len(merged["flagged_clauses"]) == 1
+        assert merged["flagged_clauses"][0]["severity"] == "high"
+        assert merged["compliance_issues"] == [
+            {"law": "PDPA_MY", "missing_requirements": ["r1", "r2"], "recommendations": ["a"]}
+        ]
+
+    def test_long_contract_uses_chunked_ai_analysis(self):
+        """Test analyze_contract sends every chunk to the provider and merges the results"""
+        fake_client = FakeGeminiClient()
+        self.service.gemini_client = fake_client
+        self.service.ai_provider = "gemini"
+
+        response = asyncio.run(self.service.analyze_contract(
+            ContractAnalysisRequest(text=_long_contract(), jurisdiction="MY")
+        ))
+
+        assert len(fake_client.excerpts) > 1
+        assert all(excerpt.startswith("[Excerpt ") for excerpt in fake_client.excerpts)
+        assert response.jurisdiction == "MY"
+
+    def test_response_reports_token_budget(self):
+        """Test the analysis response carries the aggregated prompt token budget"""
+        fake_client = FakeGeminiClient()
+        self.service.gemini_client = fake_client
+        self.service.ai_provider = "gemini"
+
+        response = asyncio.run(self.service.analyze_contract(
+            ContractAnalysisRequest(text=_long_contract(), jurisdiction="MY")
+        ))
+
+        budget = response.metadata["token_budget"]
+        assert budget["chunks"] == len(fake_client.excerpts)
+        assert budget["model"] == "gemini-pro"
+        assert 0 < budget["max_chunk_prompt_tokens"] <= budget["prompt_tokens"]
+        assert set(fake_client.contract_types) == {"Service"}
+        # The budget is the one each prompt was built with, not a second planning pass
+        assert fake_client.plans == len(fake_client.excerpts)
+
+
+class TestCircuitBreakerFallback:
+    """Test analysis while the AI provider's circuit breaker is open"""
+
+    def test_open_breaker_routes_to_heuristics(self):
+        """Test no AI call is made and the response records the fallback"""
+        breaker = CircuitBreaker("gemini", min_calls=1, open_seconds=60)
+        breaker.record(0.1, failed=True)
+        fake_client = FakeGeminiClient(breaker)
+        service = ContractAnalyzerService()
+        service.gemini_client = fake_client
+        service.ai_provider = "gemini"
+
+        response = asyncio.run(service.analyze_contract(
+            ContractAnalysisRequest(text=_long_contract(sections=3), jurisdiction="MY")
+        ))
+
+        assert fake_client.excerpts == []
+        assert response.metadata["ai_fallback"] == "circuit_open"
+        assert "token_budget" not in response.metadata
+
+
+class TestHedgedAnalysis:
+    """Test hedging a slow Gemini analysis to WatsonX"""
+
+    def test_slow_primary_is_answered_by_secondary(self):
+        """Test the WatsonX answer is used when Gemini is slower than the hedge delay"""
+
+        class SlowClient(FakeGeminiClient):
+            async def analyze_contract_async(self, contract_text, compliance_checklist, use_cache=True,
+                                             contract_type=None):
+                analyzer_module.record_budget("gemini", self.plan_contract_analysis(contract_text, {})[2])
+                await asyncio.sleep(5)
+
+        service = ContractAnalyzerService()
+        service.gemini_client = SlowClient()
+        service.watsonx_client = FakeGeminiClient(CircuitBreaker("watsonx"))
+        service.ai_provider = "gemini"
+        service.hedging_enabled = True
+        service.hedge_default_delay = 0.01
+        service.hedge_min_samples = 10 ** 6
+
+        with analyzer_module.collect_budgets() as budgets:
+            response_text = asyncio.run(service._call_ai_provider("Contract text.", {}, "Service"))
+
+        assert json.loads(response_text)["summary"] == "Provider obligations reviewed."
+        assert service.watsonx_client.excerpts == ["Contract text."]
+        assert [provider for provider, _ in budgets] == ["watsonx"]
+
+
+class TestStreamedAnalysis:
+    """Test streaming findings while the provider generates"""
+
+    def setup_method(self):
+        self.service = ContractAnalyzerService()
+        self.fake_client = FakeGeminiClient()
+        self.service.gemini_client = self.fake_client
+        self.service.ai_provider = "gemini"
+        self.service.hedging_enabled = False
+
+    def _events(self, text):
+        async def collect():
+            return [event async for event in self.service.analyze_contract_stream(
+                ContractAnalysisRequest(text=text, jurisdiction="MY")
+            )]
+        return asyncio.run(collect())
+
+    def test_findings_precede_complete_event(self):
+        """Test findings are emitted from the stream before the final analysis"""
+        events = self._events(_long_contract(sections=3))
+        kinds = [event["event"] for event in events]
+
+        assert kinds[0] == "started" and events[0]["data"]["streaming"] is True
+        assert kinds[-1] == "complete"
+        assert "flagged_clause" in kinds and "compliance_issue" in kinds
+        assert events[-1]["data"].metadata["streamed"] is True
+        assert len(self.fake_client.excerpts) == 1
+
+    def test_long_contract_streams_every_chunk(self):
+        """Test chunked analyses stream findings from each excerpt and merge them at the end"""
+        self.service.chunk_max_chars = 2000
+
+        events = self._events(_long_contract())
+
+        assert len(self.fake_client.excerpts) > 1
+        assert sum(event["event"] == "flagged_clause" for event in events) == len(self.fake_client.excerpts)
+        assert "summary" not in [event["event"] for event in events]
+        assert len(events[-1]["data"].flagged_clauses) >= 1
+        assert events[-1]["data"].metadata["token_budget"]["chunks"] == len(self.fake_client.excerpts)
+        assert self.fake_client.plans == len(self.fake_client.excerpts)
+
+    def test_failed_stream_falls_back_to_heuristics(self):
+        """Test a provider error mid-stream still ends with a complete heuristic analysis"""
+        class FailingClient(FakeGeminiClient):
+            async def analyze_contract_stream(self, *args, **kwargs):
+                yield '{"summary": "partial'
+                raise APIError("upstream reset", 503)
+        self.service.gemini_client = FailingClient()
+
+        events = self._events(_long_contract(sections=3))
+
+        assert events[-1]["event"] == "complete"
+        assert events[-1]["data"].metadata["ai_fallback"] == "stream_failed"
+
+
+class TestSpeculativeHeuristics:
+    """Test the heuristic analysis running alongside the AI call"""
+
+    def setup_method(self):
+        self.service = ContractAnalyzerService()
+        self.service.gemini_client = FakeGeminiClient()
+        self.service.ai_provider = "gemini"
+        self.service.hedging_enabled = False
+        self.heuristic_threads = []
+        heuristic = self.service._get_intelligent_mock_analysis
+
+        def recording_heuristic(*args):
+            self.heuristic_threads.append(threading.get_ident())
+            return heuristic(*args)
+        self.service._get_intelligent_mock_analysis = recording_heuristic
+
+    def _analyse(self, **fields):
+        return asyncio.run(self.service.analyze_contract(
+            ContractAnalysisRequest(text=_long_contract(sections=3), jurisdiction="MY", **fields)
+        ))
+
+    def test_failed_call_uses_speculative_result(self):
+        """Test the heuristics ran in a worker thread during the call and are not repeated"""
+        heuristic_started = []
+
+        class FailingClient(FakeGeminiClient):
+            async def analyze_contract_async(inner, *args, **kwargs):
+                await asyncio.sleep(0.05)
+                heuristic_started.append(bool(self.heuristic_threads))
+                raise APIError("upstream unavailable", 503)
+        self.service.gemini_client = FailingClient()
+
+        response = self._analyse()
+
+        assert heuristic_started == [True]
+        assert len(self.heuristic_threads) == 1
+        assert self.heuristic_threads[0] != threading.get_ident()
+        assert response.summary.startswith("Comprehensive review")
+
+    def test_minimal_answer_is_enhanced_with_speculative_result(self):
+        """Test enhancing a minimal answer reuses the speculative analysis"""
+        class MinimalClient(FakeGeminiClient):
+            async def analyze_contract_async(self, *args, **kwargs):
+                return json.dumps({"summary": "", "flagged_clauses": [], "compliance_issues": []})
+        self.service.gemini_client = MinimalClient()
+
+        self._analyse()
+
+        assert len(self.heuristic_threads) == 1
+
+    def test_disabled_speculation_skips_heuristics_for_ai_answers(self):
+        """Test heuristics only run on demand when speculation is off"""
+        self.service.speculative_heuristics = False
+
+        response = self._analyse()
+
+        assert self.heuristic_threads == []
+        assert response.summary == "Provider obligations reviewed."
+
+    def test_preview_returns_heuristics_without_ai_call(self):
+        """Test a preview request answers from heuristics alone"""
+        response = self._analyse(preview=True)
+
+        assert self.service.gemini_client.excerpts == []
+        assert response.metadata["preview"] is True
+
+    def test_streamed_preview_precedes_complete_event(self):
+        """Test a streamed preview emits the heuristic analysis before the AI answer"""
+        async def collect():
+            return [event async for event in self.service.analyze_contract_stream(
+                ContractAnalysisRequest(text=_long_contract(sections=3), jurisdiction="MY", preview=True)
+            )]
+
+        events = asyncio.run(collect())
+        kinds = [event["event"] for event in events]
+
+        assert kinds.count("preview") == 1 and kinds[-1] == "complete"
+        assert events[kinds.index("preview")]["data"].metadata["preview"] is True
+        assert events[-1]["data"].summary == "Provider obligations reviewed."
+        assert len(self.heuristic_threads) == 1
+
+
+class TestBatchedAnalysis:
+    """Test packing short contracts into shared prompts for bulk analysis"""
+
+    SHORT = "SERVICE AGREEMENT {number}. The Provider shall perform the services and may terminate without notice."
+
+    def setup_method(self):
+        self.service = ContractAnalyzerService()
+        self.fake_client = FakeGeminiClient()
+        self.service.gemini_client = self.fake_client
+        self.service.ai_provider = "gemini"
+        self.service.hedging_enabled = False
+        self.service.batch_size = 3
+
+    def _analyse(self, texts):
+        requests = [ContractAnalysisRequest(text=text, jurisdiction="MY") for text in texts]
+        return asyncio.run(self.service.analyze_contract_batch(requests, concurrency=2))
+
+    def test_short_contracts_share_prompts(self):
+        """Test short contracts are batched and answers are split back in order"""
+        self.service.batch_max_chars = 500
+        texts = [self.SHORT.format(number=number) for number in range(4)] + [_long_contract(sections=3)]
+
+        results = self._analyse(texts)
+
+        assert self.fake_client.batches == [["C1", "C2", "C3"]]
+        # The leftover short contract and the long one are analysed on their own
+        assert len(self.fake_client.excerpts) == 2
+        assert [result.summary for result in results[:3]] == ["Reviewed C1.", "Reviewed C2.", "Reviewed C3."]
+        assert results[1].metadata["batch"] == {"contract_id": "C2", "size": 3}
+        assert "batch" not in (results[4].metadata or {})
+
+    def test_unusable_batch_answer_falls_back_to_individual_calls(self):
+        """Test contracts missing from the batched answer are analysed individually"""
+        self.fake_client.batch_response = json.dumps({"results": [
+            {"contract_id": "C2", "summary": "Only C2.", "flagged_clauses": [
+                {"clause_text": "The Provider may terminate without notice.", "issue": "Unfair", "severity": "high"}
+            ], "compliance_issues": [
+                {"law": "PDPA_MY", "missing_requirements": ["Consent"], "recommendations": ["Add consent"]}
+            ]},
+            {"contract_id": "C3", "summary": "Missing findings"}
+        ]})
+
+        results = self._analyse([self.SHORT.format(number=number) for number in range(3)])
+
+        assert len(self.fake_client.excerpts) == 2  # C1 and C3 retried on their own
+        assert results[1].summary == "Only C2."
+        assert "batch" not in (results[0].metadata or {})
+
+    def test_open_breaker_skips_batching(self):
+        """Test nothing is batched while the provider's circuit is open"""
+        self.fake_client.breaker = CircuitBreaker("batch-test", min_calls=1, open_seconds=60)
+        self.fake_client.breaker.record(0.1, failed=True)
+
+        results = self._analyse([self.SHORT.format(number=number) for number in range(3)])
+
+        assert self.fake_client.batches == []
+        assert len(results) == 3 and all(result.summary for result in results)
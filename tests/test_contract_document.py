@@ -0,0 +1,86 @@
+"""
+Tests for the tokenized contract document shared by the analyzers.
+"""
+
+import re
+
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.contract_document import ContractDocument
+
+CONTRACT = (
+    "1. Employment\n"
+    "The Employee shall work 40 hours per week. Overtime is paid at 1.5 times the rate!\n"
+    "  \n"
+    "2. Termination\n"
+    "Either party may terminate... with one month's notice? Yes.\n\n\n"
+    "Signed in Kuala Lumpur"
+)
+
+
+class TestContractDocument:
+    """Test the document views agree with the string operations they replace"""
+
+    def test_whole_text_views(self):
+        """Test counts, sentences and paragraphs match str.split and re"""
+        document = ContractDocument(CONTRACT)
+
+        assert document.lower == CONTRACT.lower()
+        assert document.word_count == len(CONTRACT.split())
+        assert document.long_word_count == len([word for word in CONTRACT.split() if len(word) > 2])
+        assert document.sentence_count == len(re.findall(r'[.!?]+', CONTRACT))
+        assert [CONTRACT[start:end] for start, end in document.sentence_spans()] == re.split(r'[.!?]+', CONTRACT)
+        assert [CONTRACT[start:end] for start, end in document.paragraph_spans()] == re.split(r'\n\s*\n\s*', CONTRACT)
+
+    def test_span_counts(self):
+        """Test counts over any span match counting its text"""
+        document = ContractDocument(CONTRACT)
+        spans = [document.strip_span(start, end) for start, end in document.paragraph_spans()]
+        spans += [(0, len(CONTRACT)), (3, 20), (17, 18), (111, 113), (5, 5)]
+
+        for start, end in spans:
+            content = CONTRACT[start:end]
+            assert document.words_in(start, end) == len(content.split())
+            assert document.sentences_in(start, end) == len(re.findall(r'[.!?]+', content))
+            assert document.lower_span(start, end) == content.lower()
+        assert document.strip_span(*spans[0]) == spans[0]
+
+    def test_lowercase_changing_length(self):
+        """Test spans stay aligned when lowercasing changes the text length"""
+        document = ContractDocument("İstanbul office. The parties agree.")
+
+        assert document.lower_span(17, 35) == "the parties agree."
+
+
+class TestAnalyzerDocument:
+    """Test the analyzer builds the document once and reuses it"""
+
+    def test_metadata_keeps_document_and_section_spans(self):
+        """Test the metadata analysis records the document and its sections"""
+        service = analyzer_module.ContractAnalyzerService()
+        document = analyzer_module.ContractDocument(CONTRACT * 3)
+
+        metadata = service._analyze_contract_metadata(document.text, document)
+
+        assert metadata["document"] is document
+        assert metadata["word_count"] == document.long_word_count
+        assert service._section_tree(document.text, metadata) is metadata["section_tree"]
+        assert service._contract_document(document.text, metadata) is document
+        assert service._contract_document("another contract", metadata) is not document
+    def test_sections_are_offsets_into_the_contract(self):
+        """Test extracted sections index the contract instead of copying it"""
+        service = analyzer_module.ContractAnalyzerService()
+        contract = "\n\n".join(
+            f"{number}. {title}\n"
+            f"The Employee shall comply with this agreement and the Employer shall pay the salary "
+            f"on time. Either party may terminate this contract with notice as set out in clause {number}."
+            for number, title in enumerate(["Employment", "Salary", "Termination"], start=1)
+        )
+        document = analyzer_module.ContractDocument(contract)
+
+        sections = service._extract_contract_sections_only(contract, document)
+
+        assert sections and all("content" not in section for section in sections)
+        for section in sections:
+            assert contract[section["heading_start"]:].startswith(f"{section['id']}. {section['title']}")
+            assert section["word_count"] == len(contract[section["start"]:section["end"]].split())
+        assert [section["start"] for section in sections] == sorted(section["start"] for section in sections)
@@ -0,0 +1,151 @@
+"""
+Tests for the one-pass hierarchical section parser.
+"""
+
+import json
+import time
+
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.contract_document import ContractDocument
+from backend.utils.contract_sections import parse_sections
+
+BODY = "The Employee shall comply with this agreement and the Employer shall pay the salary on time."
+
+CONTRACT = f"""Employment Agreement
+
+WHEREAS:
+{BODY}
+
+1. Definitions
+{BODY}
+
+2. Obligations of the Parties
+2.1 Duties of the Employee
+{BODY}
+A. Working Hours
+{BODY}
+B. Annual Leave
+{BODY}
+2.1.1 Overtime Work
+{BODY}
+2.2. Duties of the Employer
+{BODY}
+
+3. Termination
+{BODY}
+Either party may end this agreement
+with one month's written notice.
+"""
+
+
+def _tree(text: str = CONTRACT):
+    return parse_sections(ContractDocument(text))
+
+
+class TestSectionParser:
+    """Test headings are found in one pass and nested by level"""
+
+    def test_heading_kinds_and_levels(self):
+        """Test numbered, lettered, recital and title case headings get their levels"""
+        tree = _tree()
+
+        assert [(section.label, section.kind, section.level) for section in tree] == [
+            ("Employment Agreement", "titled", 1),
+            ("WHEREAS", "recital", 1),
+            ("1 Definitions", "numbered", 1),
+            ("2 Obligations of the Parties", "numbered", 1),
+            ("2.1 Duties of the Employee", "numbered", 2),
+            ("A Working Hours", "lettered", 3),
+            ("B Annual Leave", "lettered", 3),
+            ("2.1.1 Overtime Work", "numbered", 3),
+            ("2.2 Duties of the Employer", "numbered", 2),
+            ("3 Termination", "numbered", 1),
+        ]
+        assert tree.depth == 3
+
+    def test_parents_and_children(self):
+        """Test each section is nested under the closest enclosing heading"""
+        tree = _tree()
+        sections = {section.id: section for section in tree}
+
+        assert [section.id for section in tree.roots] == ["Section 1", "Section 2", "1", "2", "3"]
+        assert [child.id for child in sections["2"].children] == ["2.1", "2.2"]
+        assert [child.id for child in sections["2.1"].children] == ["A", "B", "2.1.1"]
+        assert [section.id for section in sections["B"].path()] == ["2", "2.1", "B"]
+
+    def test_offsets_index_the_contract(self):
+        """Test heading, own text and subtree offsets point into the contract"""
+        tree = _tree()
+        sections = {section.id: section for section in tree}
+
+        for section in tree:
+            assert section.heading_start == 0 or CONTRACT[section.heading_start - 1] == "\n"
+            assert section.heading_start < section.start <= section.end <= section.subtree_end
+        assert CONTRACT[sections["2.1"].heading_start:].startswith("2.1 Duties of the Employee\n")
+        assert CONTRACT[sections["2.1"].start:sections["2.1"].end] == BODY
+        assert sections["2.1"].subtree_end == sections["2.1.1"].subtree_end
+        assert CONTRACT[sections["2"].start:sections["2"].end] == ""
+        assert CONTRACT[sections["3"].start:sections["3"].end].endswith("written notice.")
+
+    def test_title_case_lines_inside_paragraphs_are_not_headings(self):
+        """Test a wrapped line of a paragraph is not taken for a title case heading"""
+        tree = _tree()
+
+        assert "Either party may end this agreement" not in [section.title for section in tree]
+
+    def test_section_at(self):
+        """Test offsets map to the innermost section containing them"""
+        tree = _tree()
+
+        assert tree.section_at(CONTRACT.index("Annual Leave")).label == "B Annual Leave"
+        assert tree.section_at(CONTRACT.index("written notice")).label == "3 Termination"
+        assert tree.section_at(0).label == "Employment Agreement"
+        assert _tree("no headings here").section_at(3) is None
+
+    def test_whitespace_runs_parse_in_linear_time(self):
+        """Test long runs of blank lines cost one step a line"""
+        text = "Terms of the Agreement\n" + " \n" * 50000 + BODY
+
+        started = time.perf_counter()
+        tree = _tree(text)
+
+        assert time.perf_counter() - started < 1.0
+        assert [section.title for section in tree] == ["Terms of the Agreement"]
+        assert text[tree.sections[0].start:tree.sections[0].end] == BODY
+
+
+class TestAnalyzerSectionTree:
+    """Test the analyzer feeds the section tree to chunking and clause findings"""
+
+    def test_oversized_sections_are_cut_at_subsections(self):
+        """Test a section longer than a chunk is split at its subsection headings"""
+        service = analyzer_module.ContractAnalyzerService()
+        service.chunk_max_chars = 600
+        subsections = "\n".join(f"1.{number} Subsection Heading {number}\n{BODY} {BODY}" for number in range(1, 7))
+        contract = f"1. Main Section\n{BODY}\n{subsections}\n\n2. Closing Section\n{BODY}"
+
+        chunks = service._split_into_analysis_chunks(contract)
+
+        assert all(len(chunk) <= service.chunk_max_chars for chunk in chunks)
+        assert all(chunk.startswith(("1. Main Section", "1.", "2. Closing Section")) for chunk in chunks)
+        assert sum(chunk.count("Subsection Heading") for chunk in chunks) == 6
+
+    def test_flagged_clauses_name_their_section(self):
+        """Test located findings of the heuristic analysis carry their section heading"""
+        service = analyzer_module.ContractAnalyzerService()
+        contract = (
+            "Employment Agreement\n\n"
+            "1.1 Working Time\n"
+            "The Employee shall work 10 hours per day and the Employer shall pay RM 1,200 per month.\n\n"
+            "1.2 Leave Entitlement\n"
+            "The Employee is entitled to annual leave of 5 days in each year of this agreement."
+        )
+        metadata = service._analyze_contract_metadata(contract)
+
+        result = json.loads(service._get_intelligent_mock_analysis(contract, metadata, {}, "MY"))
+
+        located = [clause for clause in result["flagged_clauses"] if clause.get("start") is not None]
+        assert located
+        for clause in located:
+            assert clause["section"] == metadata["section_tree"].section_at(clause["start"]).label
+        assert "1.1 Working Time" in {clause["section"] for clause in located}
@@ -0,0 +1,162 @@
+"""
+Tests for request deadlines: stage timeouts, the middleware and deadline-aware analysis.
+"""
+
+import asyncio
+import importlib
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.models.ContractAnalysisModel import ContractAnalysisRequest
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.deadline import (
+    DeadlineExceeded, DeadlineMiddleware, bounded_timeout, check_deadline, parse_request_timeout,
+    remaining_time, request_deadline, without_deadline
+)
+
+from test_contract_analyzer import FakeGeminiClient, _long_contract
+
+
+def _service_deadline(seconds):
+    """request_deadline of the deadline module imported by the analyzer service."""
+    return importlib.import_module(analyzer_module.remaining_time.__module__).request_deadline(seconds)
+
+
+class TestDeadline:
+    """Test stage timeouts derived from the request deadline"""
+
+    def test_timeouts_are_capped_by_remaining_time(self):
+        """Test a stage never gets more time than the request has left"""
+        assert bounded_timeout(30, "extraction") == 30
+        assert remaining_time() is None
+
+        with request_deadline(2):
+            assert 1.5 < bounded_timeout(30, "extraction") <= 2
+            assert bounded_timeout(0.5, "extraction") == 0.5
+
+    def test_expired_deadline_fails_fast(self):
+        """Test stages refuse to start once the deadline has passed"""
+        with request_deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceeded) as error:
+                check_deadline("text extraction")
+            with pytest.raises(DeadlineExceeded):
+                bounded_timeout(30, "gemini")
+        assert error.value.stage == "text extraction"
+        check_deadline("text extraction")
+
+    def test_deadline_is_inherited_by_tasks(self):
+        """Test tasks created under a deadline see it"""
+        async def run():
+            with request_deadline(5):
+                return await asyncio.ensure_future(asyncio.sleep(0, result=remaining_time()))
+
+        assert 4 < asyncio.run(run()) <= 5
+
+    def test_background_work_runs_without_deadline(self):
+        """Test a coroutine function marked without_deadline ignores the deadline of its caller"""
+        @without_deadline
+        async def background():
+            return remaining_time()
+
+        async def run():
+            with request_deadline(5):
+                return await background(), remaining_time()
+
+        unbounded, caller = asyncio.run(run())
+        assert unbounded is None
+        assert 4 < caller <= 5
+
+    @pytest.mark.parametrize("value, expected", [("12.5", 12.5), (" 3 ", 3.0), ("0", None), ("-1", None),
+                                                 ("soon", None), (None, None)])
+    def test_parse_request_timeout(self, value, expected):
+        """Test only positive numbers of seconds are accepted"""
+        assert parse_request_timeout(value) == expected
+
+
+class TestDeadlineMiddleware:
+    """Test per-request deadlines and disconnect cancellation"""
+
+    def _app(self, **settings):
+        app = FastAPI()
+
+        @app.post("/remaining")
+        async def remaining(payload: dict):
+            return {"remaining": remaining_time()}
+
+        app.add_middleware(DeadlineMiddleware, **settings)
+        return app
+
+    def _post(self, app, headers=None):
+        async def send():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.post("/remaining", json={}, headers=headers or {})
+        return asyncio.run(send()).json()["remaining"]
+
+    def test_header_sets_request_deadline(self):
+        """Test X-Request-Timeout is the request's budget, capped by the server maximum"""
+        app = self._app(default_timeout=0, max_timeout=20)
+
+        assert self._post(app) is None
+        assert 9 < self._post(app, {"X-Request-Timeout": "10"}) <= 10
+        assert 19 < self._post(app, {"X-Request-Timeout": "3600"}) <= 20
+
+    def test_server_default_applies_without_header(self):
+        """Test requests without the header get the default budget"""
+        assert 29 < self._post(self._app(default_timeout=30)) <= 30
+
+    def test_disconnect_cancels_request(self):
+        """Test work for a client that went away is cancelled"""
+        cancelled = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await receive()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def run():
+            messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                await asyncio.sleep(0.05)
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                raise AssertionError("No response expected")
+
+            middleware = DeadlineMiddleware(slow_app, default_timeout=0)
+            started = time.monotonic()
+            await middleware({"type": "http", "method": "POST", "path": "/", "headers": []}, receive, send)
+            return time.monotonic() - started
+
+        assert asyncio.run(run()) < 1
+        assert cancelled.is_set()
+
+
+class TestDeadlineAwareAnalysis:
+    """Test the analyzer's use of the remaining budget"""
+
+    def test_short_budget_uses_heuristics(self):
+        """Test no AI call is started when it could not finish in time"""
+        service = analyzer_module.ContractAnalyzerService()
+        service.gemini_client = FakeGeminiClient()
+        service.ai_provider = "gemini"
+
+        async def analyse():
+            with _service_deadline(1):
+                return await service.analyze_contract(
+                    ContractAnalysisRequest(text=_long_contract(sections=3), jurisdiction="MY")
+                )
+
+        response = asyncio.run(analyse())
+
+        assert service.gemini_client.excerpts == []
+        assert response.metadata["ai_fallback"] == "deadline"
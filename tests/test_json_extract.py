@@ -0,0 +1,116 @@
+"""
+Tests for JSON extraction from LLM output.
+"""
+
+import json
+
+from backend.utils.ai_client.json_extract import extract_analysis_json, extract_json_object, scan_json_objects
+
+
+ANALYSIS = {
+    "summary": "Two issues found {see below}.",
+    "flagged_clauses": [
+        {"clause_text": "Employer may terminate \"at will\".", "issue": "No notice", "severity": "high"}
+    ],
+    "compliance_issues": [
+        {"law": "EMPLOYMENT_ACT_MY", "missing_requirements": "Notice period", "recommendations": ["Add notice"]}
+    ]
+}
+
+
+class TestScanner:
+    """Test the single-pass object scanner"""
+
+    def test_outermost_object_is_found_first(self):
+        """Test nested objects are not returned before their container"""
+        text = "Here is the analysis:\n" + json.dumps(ANALYSIS) + "\nThanks!"
+
+        parsed, raw = extract_json_object(text)
+
+        assert parsed == ANALYSIS
+        assert raw == json.dumps(ANALYSIS)
+
+    def test_braces_inside_strings_are_ignored(self):
+        """Test braces and escaped quotes in strings do not end the object"""
+        text = '{"a": "}{\\"}", "b": 1} tail'
+
+        assert list(scan_json_objects(text)) == [(0, text.index(" tail"), None)]
+
+    def test_prose_braces_are_skipped(self):
+        """Test a non-JSON brace span before the answer is skipped"""
+        parsed, _ = extract_json_object('Use {placeholders} like so: {"summary": "ok"}')
+
+        assert parsed == {"summary": "ok"}
+
+    def test_object_nested_in_invalid_span(self):
+        """Test an object inside a rejected brace span is still found"""
+        parsed, _ = extract_json_object('{note: {"summary": "ok"}}')
+
+        assert parsed == {"summary": "ok"}
+
+    def test_code_fence(self):
+        """Test fenced JSON is extracted"""
+        parsed, _ = extract_json_object('```json\n{"summary": "ok", "n": [1, 2]}\n```')
+
+        assert parsed == {"summary": "ok", "n": [1, 2]}
+
+
+class TestTruncationRepair:
+    """Test closing objects cut off at the token limit"""
+
+    def test_truncated_in_array(self):
+        """Test open containers are closed in stack order"""
+        text = json.dumps(ANALYSIS)[:-3]
+
+        parsed, _ = extract_json_object(text)
+
+        assert parsed["summary"] == ANALYSIS["summary"]
+        assert parsed["flagged_clauses"] == ANALYSIS["flagged_clauses"]
+
+    def test_truncated_inside_string_value(self):
+        """Test a cut-off string value is closed and kept"""
+        parsed, _ = extract_json_object('{"summary": "The contract is mostly compli')
+
+        assert parsed == {"summary": "The contract is mostly compli"}
+
+    def test_truncated_mid_escape(self):
+        """Test a half-written escape sequence is dropped"""
+        parsed, _ = extract_json_object('{"summary": "caf\\u00')
+
+        assert parsed == {"summary": "caf"}
+
+    def test_truncated_after_comma_or_key(self):
+        """Test dangling commas, keys and colons are cut back to the last value"""
+        assert extract_json_object('{"a": [1, 2],')[0] == {"a": [1, 2]}
+        assert extract_json_object('{"a": 1, "b"')[0] == {"a": 1}
+        assert extract_json_object('{"a": 1, "b":')[0] == {"a": 1}
+
+    def test_truncated_literal_and_number(self):
+        """Test partial literals are dropped but complete numbers kept"""
+        assert extract_json_object('{"a": 1, "b": tru')[0] == {"a": 1}
+        assert extract_json_object('{"a": [1, 25')[0] == {"a": [1, 25]}
+        assert extract_json_object('{"a": [1, 2.')[0] == {"a": [1]}
+
+
+class TestAnalysisExtraction:
+    """Test the analysis-level wrapper used by both clients"""
+
+    def test_complete_analysis_is_normalized(self):
+        """Test string list fields are turned into lists"""
+        result = json.loads(extract_analysis_json("Result: " + json.dumps(ANALYSIS)))
+
+        assert result["compliance_issues"][0]["missing_requirements"] == ["Notice period"]
+        assert len(result["flagged_clauses"]) == 1
+
+    def test_partial_issue_is_wrapped(self):
+        """Test a lone compliance issue is wrapped in the analysis structure"""
+        result = json.loads(extract_analysis_json(json.dumps(ANALYSIS["compliance_issues"][0])))
+
+        assert result["flagged_clauses"] == []
+        assert result["compliance_issues"][0]["law"] == "EMPLOYMENT_ACT_MY"
+
+    def test_unparseable_response_falls_back(self):
+        """Test text without any JSON object yields the fallback analysis"""
+        result = json.loads(extract_analysis_json("I cannot help with that."))
+
+        assert result["summary"] == "Error: Could not parse AI response"
@@ -0,0 +1,78 @@
+"""
+Tests for the keyword automaton and the contract classification keywords.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.utils.contract_keywords import (
+    CONTRACT_JURISDICTIONS, CONTRACT_KEYWORDS, CONTRACT_TYPE_INDICATORS, DOCUMENT_KEYWORDS
+)
+from backend.utils.keyword_automaton import KeywordAutomaton
+from backend.utils.text_extractors import DocumentMetadataExtractor
+
+
+class TestKeywordAutomaton:
+    """Test single-pass keyword matching"""
+
+    def test_matches_like_substring_search(self):
+        """Test presence and counts agree with `in` and str.count"""
+        keywords = ["he", "she", "his", "hers", "aa", "a"]
+        automaton = KeywordAutomaton("test", {"first": keywords[:4], "second": keywords[4:]})
+        for text in ["ushers", "aaaa", "she sells his hershey", "", "xyz"]:
+            matches = automaton.scan(text)
+            for keyword in keywords:
+                assert (keyword in matches) == (keyword in text)
+                assert matches.counts.get(keyword, 0) == text.count(keyword)
+
+    def test_category_queries(self):
+        """Test keywords shared by categories are reported for each"""
+        automaton = KeywordAutomaton("test", {
+            "privacy": ["information", "data"],
+            "nda": ["information", "disclosure"]
+        })
+        matches = automaton.scan("the information and more information")
+
+        assert matches.has("privacy") and matches.has("nda")
+        assert matches.found("privacy") == ["information"]
+        assert matches.distinct("nda") == 1
+        assert matches.occurrences("nda") == 2
+        assert not matches.has("missing")
+
+    def test_keywords_added_after_a_scan_are_matched(self):
+        """Test the automaton is rebuilt when keywords are added"""
+        automaton = KeywordAutomaton("test", {"a": ["salary"]})
+        assert not automaton.scan("annual leave").has("b")
+
+        automaton.add("b", ["leave"])
+        assert automaton.scan("annual leave").has("b")
+        assert len(automaton) == 2
+        with pytest.raises(ValueError):
+            automaton.add("c", [""])
+
+
+class TestContractKeywords:
+    """Test the classification keyword sets"""
+
+    def test_contract_keywords_cover_every_indicator(self):
+        """Test type and jurisdiction indicators are all compiled in"""
+        text = "employee of a malaysian employer under the employment act 1955, paid in ringgit"
+        matches = CONTRACT_KEYWORDS.scan(text)
+
+        assert matches.found("type.Employment.strong") == ["employee", "employer", "employment"]
+        assert matches.has("jurisdiction.MY") and not matches.has("jurisdiction.SG")
+        assert set(CONTRACT_TYPE_INDICATORS) == {
+            category.split(".")[1] for category in CONTRACT_KEYWORDS.categories if category.startswith("type.")
+        }
+        assert all(CONTRACT_KEYWORDS.keywords(f"jurisdiction.{code}") for code in CONTRACT_JURISDICTIONS)
+
+    def test_document_metadata_uses_keyword_counts(self):
+        """Test the document metadata extractor scores types by occurrences"""
+        extractor = DocumentMetadataExtractor()
+        text = "Employee salary terms. The employee is employed in Kuala Lumpur. GDPR personal data applies."
+
+        assert DOCUMENT_KEYWORDS.scan(text.lower()).occurrences("type.employment") == 3
+        assert asyncio.run(extractor._detect_contract_type(text)) == "employment"
+        assert asyncio.run(extractor._detect_jurisdiction_hints(text)) == ["MY", "EU"]
+
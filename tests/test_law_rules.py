@@ -0,0 +1,126 @@
+"""
+Tests for the declarative compliance rules compiled from the law files.
+"""
+
+import pytest
+
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.law_rules import LawRuleEngine
+
+
+def _engine(rules, applies_to=None, provisions=None):
+    return LawRuleEngine.from_laws({
+        "TEST_LAW": {
+            "key_provisions": provisions or {},
+            "compliance_rules": {
+                "applies_to": applies_to or {"jurisdictions": ["MY"]},
+                "fallback_requirements": ["Fallback requirement"],
+                "rules": rules
+            }
+        }
+    })
+
+
+class TestLawRuleEngine:
+    """Test compiling and evaluating rule definitions"""
+
+    def test_limit_converts_units_and_formats_texts(self):
+        """Test limit rules measure captured values in a common unit"""
+        engine = _engine([{
+            "id": "notice", "check": "limit",
+            "pattern": r"notice of (\d+) (day|week|month)s?",
+            "value_group": 1, "unit_group": 2, "units": {"day": 1, "week": 7, "month": 30},
+            "min": 14, "scope": "all",
+            "requirement": "Notice of {value} {unit}{plural} is too short",
+            "issue": "Short notice", "severity": "high"
+        }])
+
+        evaluation = engine.evaluate("Notice of 1 week. Later, notice of 1 month.", "MY", "Employment")
+
+        assert evaluation.compliance_issues() == [{
+            "law": "TEST_LAW", "missing_requirements": ["Notice of 1 week is too short"], "recommendations": []
+        }]
+        assert [clause["severity"] for clause in evaluation.flagged_clauses()] == ["high"]
+
+    def test_forbidden_allows_excepted_context(self):
+        """Test unless_context terms near a match suppress the finding"""
+        engine = _engine([{
+            "id": "dismissal", "check": "forbidden", "pattern": "dismiss immediately",
+            "unless_context": ["misconduct"], "issue": "Dismissal without notice"
+        }])
+
+        assert not engine.evaluate("We may dismiss immediately for misconduct.", "MY", "Any").flagged_clauses()
+        assert engine.evaluate("We may dismiss immediately.", "MY", "Any").flagged_clauses()
+
+    def test_required_terms_and_detectors(self):
+        """Test required rules accept terms and defer to detectors when missing"""
+        engine = _engine([
+            {"id": "consent", "check": "required", "terms": ["consent"], "requirement": "Missing consent"},
+            {"id": "rights", "check": "terms", "terms": ["access", "correction", "erasure"], "max_missing": 1,
+             "requirement": "Missing rights: {missing}"},
+            {"id": "custom", "check": "detector", "detector": "custom"}
+        ], applies_to={"jurisdictions": ["MY"], "features": ["data_processing"]})
+        detectors = {"custom": lambda text, text_lower: [{"requirement": "Custom finding", "severity": "low"}]}
+
+        evaluation = engine.evaluate("Right of access.", "MY", "Privacy", {"data_processing"}, detectors)
+
+        assert evaluation.compliance_issues()[0]["missing_requirements"] == [
+            "Missing consent", "Missing rights: correction, erasure", "Custom finding"
+        ]
+        assert engine.applicable_laws("MY", "Privacy") == []
+        assert engine.applicable_laws("SG", "Privacy", {"data_processing"}) == []
+        assert engine.fallback_requirements("TEST_LAW") == ["Fallback requirement"]
+
+    def test_invalid_definitions_are_rejected(self):
+        """Test rules are validated when compiled"""
+        with pytest.raises(ValueError):
+            _engine([{"id": "no_check", "pattern": "x"}])
+        with pytest.raises(ValueError):
+            _engine([{"id": "limit", "check": "limit", "pattern": r"(\d+)"}])
+        with pytest.raises(ValueError):
+            _engine([{"id": "linked", "check": "required", "pattern": "x", "provision": "Unknown"}])
+
+
+class TestLawFileRules:
+    """Test the rules shipped in the law files"""
+
+    def test_employment_contract_findings(self):
+        """Test the Employment Act rules flag statutory violations"""
+        service = analyzer_module.ContractAnalyzerService()
+        contract = (
+            "EMPLOYMENT AGREEMENT. Either party may give 1 week notice of termination. "
+            "Salary of RM 1,200 per month."
+        )
+
+        evaluation = service.law_rules.evaluate(contract, "MY", "Employment")
+        flagged = " ".join(clause["issue"] for clause in evaluation.flagged_clauses())
+        probation = service.law_rules.evaluate("The probation period is 9 months.", "MY", "Employment")
+        requirements = probation.compliance_issues()[0]["missing_requirements"]
+
+        assert "Notice period of 1 week" in flagged
+        assert "RM1200" in flagged
+        assert any("Probation period of 9 months" in requirement for requirement in requirements)
+
+    def test_every_law_file_compiles(self):
+        """Test each law with compliance rules is indexed by its jurisdiction"""
+        engine = analyzer_module.ContractAnalyzerService().law_rules
+
+        assert set(engine.laws) == {"CCPA_US", "EMPLOYMENT_ACT_MY", "GDPR_EU", "PDPA_MY", "PDPA_SG"}
+        assert engine.applicable_laws("MY", "Employment") == ["EMPLOYMENT_ACT_MY"]
+        assert engine.applicable_laws("MY", "Employment", {"data_processing"}) == ["EMPLOYMENT_ACT_MY", "PDPA_MY"]
+
+    def test_flagged_clauses_carry_offsets(self):
+        """Test flagged clauses report where their text sits in the contract"""
+        service = analyzer_module.ContractAnalyzerService()
+        contract = (
+            "EMPLOYMENT AGREEMENT. Either party may give 1 week notice of termination. "
+            "Salary of RM 1,200 per month."
+        )
+
+        clauses = service.law_rules.evaluate(contract, "MY", "Employment").flagged_clauses()
+        located = [contract[clause["start"]:clause["end"]] for clause in clauses if "start" in clause]
+
+        assert "1 week notice" in located
+        assert "Salary of RM 1,200 per month." in located
+        # Clauses the rules describe rather than find carry no offsets
+        assert any("start" not in clause for clause in clauses)
@@ -0,0 +1,118 @@
+"""
+Tests for the precompiled pattern registry and the contract analysis rules.
+"""
+
+import re
+
+import pytest
+
+from backend.service import ContractAnalyzerService as analyzer_module
+from backend.utils.pattern_registry import ABORTABLE, PatternRegistry, flag_names
+
+
+class TestPatternRegistry:
+    """Test rule registration, lookup and statistics"""
+
+    def test_rules_are_compiled_once_and_named(self):
+        """Test registered rules keep their definition"""
+        registry = PatternRegistry("test")
+        rule = registry.register("notice", r"(\d+)\s*days?", re.IGNORECASE, law="EMPLOYMENT_ACT_MY")
+
+        assert registry["notice"] is rule
+        assert "notice" in registry and len(registry) == 1
+        assert rule.search("Notice of 30 DAYS").group(1) == "30"
+        assert rule.stats()["law"] == "EMPLOYMENT_ACT_MY"
+        assert rule.stats()["flags"] == ["IGNORECASE"]
+        assert flag_names(re.MULTILINE | re.DOTALL) == ["MULTILINE", "DOTALL"]
+
+    def test_duplicate_and_invalid_rules_are_rejected(self):
+        """Test names are unique and patterns must compile"""
+        registry = PatternRegistry("test")
+        registry.register("amount", r"\d+")
+
+        with pytest.raises(ValueError):
+            registry.register("amount", r"RM\s*\d+")
+        with pytest.raises(re.error):
+            registry.register("broken", r"(unclosed")
+        assert len(registry) == 1
+
+    def test_groups_keep_registration_order(self):
+        """Test alternative rules are tried in the order they were registered"""
+        registry = PatternRegistry("test")
+        registry.register("first", r"a", group="alternatives")
+        registry.register("other", r"c")
+        registry.register("second", r"b", group="alternatives")
+
+        assert [rule.name for rule in registry.group("alternatives")] == ["first", "second"]
+        with pytest.raises(KeyError):
+            registry.group("missing")
+
+    def test_usage_is_recorded(self):
+        """Test calls and matches are counted, including abandoned iterations"""
+        registry = PatternRegistry("test")
+        digit = registry.register("digit", r"\d")
+
+        assert digit.search("no digits") is None
+        assert [match.group() for match in digit.finditer("a1b2c3")] == ["1", "2", "3"]
+        for match in digit.finditer("456"):
+            break
+
+        stats = digit.stats()
+        assert stats["calls"] == 3
+        assert stats["matches"] == 4
+        assert stats["seconds"] >= 0
+
+        registry.reset_stats()
+        assert digit.stats()["calls"] == 0 and digit.stats()["matches"] == 0
+
+    def test_stats_are_sorted_by_time(self):
+        """Test the most expensive rules are reported first"""
+        registry = PatternRegistry("test")
+        cheap = registry.register("cheap", r"x")
+        costly = registry.register("costly", r"y")
+        cheap.seconds, costly.seconds = 0.001, 0.5
+
+        assert [entry["name"] for entry in registry.stats()] == ["costly", "cheap"]
+        assert [entry["name"] for entry in registry.stats(top=1)] == ["costly"]
+
+    def test_iteration_stops_over_budget(self):
+        """Test finditer stops once its budget is spent and records the timeout"""
+        registry = PatternRegistry("test")
+        digit = registry.register("digit", r"\d", budget=0.0)
+
+        assert len(list(digit.finditer("1" * 100))) <= 1
+        assert digit.stats()["timeouts"] == 1
+        assert [entry["name"] for entry in registry.timed_out()] == ["digit"]
+        assert len(list(digit.finditer("1" * 100, budget=10.0))) == 100
+        assert digit.stats()["timeouts"] == 1
+
+    @pytest.mark.skipif(not ABORTABLE, reason="re cannot abort a running match")
+    def test_runaway_search_is_aborted(self):
+        """Test a catastrophically backtracking search gives up at its budget"""
+        registry = PatternRegistry("test")
+        chained = registry.register("chained", r"opt.*out.*(?:may|will).*(?:extra|additional).*fee", re.DOTALL,
+                                    budget=0.05)
+
+        assert chained.search("opt out may extra " * 2000) is None
+        assert chained.stats()["timeouts"] == 1
+
+
+class TestContractPatterns:
+    """Test the analyzer's use of the contract rule registry"""
+
+    def test_heuristic_analysis_records_rule_usage(self):
+        """Test analysing a contract runs the registered rules"""
+        service = analyzer_module.ContractAnalyzerService()
+        patterns = service.law_rules.patterns
+        patterns.reset_stats()
+        contract = (
+            "EMPLOYMENT AGREEMENT. The Employee shall work 10 hours per day. "
+            "Salary of RM 1,200 per month. Annual leave of 5 days."
+        )
+
+        service._get_intelligent_mock_analysis(contract, service._analyze_contract_metadata(contract), {}, "MY")
+
+        used = {entry["name"]: entry for entry in patterns.stats() if entry["calls"]}
+        assert "EMPLOYMENT_ACT_MY.working_hours" in used
+        assert used["EMPLOYMENT_ACT_MY.working_hours"]["matches"] >= 1
+        assert all(entry["law"] == name.split(".")[0] for name, entry in used.items())
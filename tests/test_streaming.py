@@ -0,0 +1,153 @@
+"""
+Tests for incremental parsing of streamed analyses and the NDJSON analysis route.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.utils.ai_client.circuit_breaker import CircuitBreaker
+from backend.utils.ai_client.exceptions import APIError, CircuitOpenError
+from backend.utils.ai_client.streaming import AnalysisStreamParser, parse_sse_data, stream_with_deadline
+
+
+ANALYSIS = {
+    "summary": "Two {issues} found.",
+    "flagged_clauses": [
+        {"clause_text": "Employer may terminate \"at will\" {anytime}.", "issue": "No notice", "severity": "high"},
+        {"clause_text": "Wages paid quarterly.", "issue": "Late wages", "severity": "medium"}
+    ],
+    "compliance_issues": [
+        {"law": "EMPLOYMENT_ACT_MY", "missing_requirements": "Notice period", "recommendations": ["Add notice"]}
+    ]
+}
+
+
+def _feed(parser, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+class TestAnalysisStreamParser:
+    """Test findings are reported as soon as they close"""
+
+    @pytest.mark.parametrize("size", [1, 3, 17, 10000])
+    def test_events_are_independent_of_chunking(self, size):
+        """Test any split of the stream yields the same events"""
+        parser = AnalysisStreamParser()
+
+        events = _feed(parser, "Sure, here it is:\n```json\n" + json.dumps(ANALYSIS, indent=2) + "\n```", size)
+
+        assert events == [
+            ("summary", "Two {issues} found."),
+            ("flagged_clause", ANALYSIS["flagged_clauses"][0]),
+            ("flagged_clause", ANALYSIS["flagged_clauses"][1]),
+            ("compliance_issue", {**ANALYSIS["compliance_issues"][0], "missing_requirements": ["Notice period"]})
+        ]
+        assert parser.done
+
+    def test_finding_is_emitted_when_its_object_closes(self):
+        """Test a clause is reported before the rest of the answer arrives"""
+        parser = AnalysisStreamParser()
+        text = json.dumps(ANALYSIS)
+        first_clause_end = text.index('"high"}') + len('"high"}')
+
+        assert parser.feed(text[:first_clause_end - 1])[-1][0] == "summary"
+        assert parser.feed(text[first_clause_end - 1:first_clause_end]) == [
+            ("flagged_clause", ANALYSIS["flagged_clauses"][0])
+        ]
+
+    def test_prose_braces_before_answer_are_skipped(self):
+        """Test a brace span of prose does not derail the parser"""
+        parser = AnalysisStreamParser()
+
+        events = parser.feed('Replace {party} below. ' + json.dumps({"flagged_clauses": [{"clause_text": "x"}]}))
+
+        assert events == [("flagged_clause", {"clause_text": "x"})]
+
+    def test_finish_repairs_truncated_stream(self):
+        """Test the final analysis is recovered from a cut-off stream"""
+        parser = AnalysisStreamParser()
+        text = json.dumps(ANALYSIS)
+
+        parser.feed(text[:text.index("compliance_issues")])
+        result = json.loads(parser.finish())
+
+        assert not parser.done
+        assert result["flagged_clauses"] == ANALYSIS["flagged_clauses"]
+
+
+class TestStreamHelpers:
+    """Test event stream decoding, deadlines and breaker accounting"""
+
+    def test_parse_sse_data(self):
+        """Test only data lines with JSON payloads are decoded"""
+        assert parse_sse_data('data: {"a": 1}') == {"a": 1}
+        assert parse_sse_data("event: message") is None
+        assert parse_sse_data("data: [DONE]") is None
+
+    def test_stream_deadline(self):
+        """Test a stalled stream fails with a 408 APIError"""
+        async def stalled():
+            yield "first"
+            await asyncio.sleep(5)
+            yield "never"
+
+        async def consume():
+            return [chunk async for chunk in stream_with_deadline(stalled(), 0.05, "test")]
+
+        with pytest.raises(APIError) as error:
+            asyncio.run(consume())
+        assert error.value.status_code == 408
+
+    def test_breaker_counts_stream_failures(self):
+        """Test a failed stream is recorded and opens the breaker"""
+        breaker = CircuitBreaker("stream-test", min_calls=1, open_seconds=60)
+
+        async def failing():
+            yield "partial"
+            raise APIError("reset", 503)
+
+        async def consume():
+            return [chunk async for chunk in breaker.stream_async(failing)]
+
+        with pytest.raises(APIError):
+            asyncio.run(consume())
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(consume())
+
+
+class TestStreamRoute:
+    """Test the NDJSON analysis endpoint"""
+
+    def test_route_streams_ndjson_events(self):
+        """Test each analyzer event is one JSON line"""
+        from backend.models.ContractAnalysisResponseModel import ClauseFlag
+        from backend.routes.contract import get_contract_analyzer, router
+
+        class StubAnalyzer:
+            async def analyze_contract_stream(self, request):
+                yield {"event": "started", "data": {"jurisdiction": request.jurisdiction}}
+                yield {"event": "flagged_clause", "data": ClauseFlag(clause_text="Clause 1", severity="high")}
+                raise RuntimeError("boom")
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_contract_analyzer] = StubAnalyzer
+
+        async def send(text):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.post("/api/v1/contracts/analyze/stream", json={"text": text, "jurisdiction": "MY"})
+
+        response = asyncio.run(send("This employment agreement is made between the parties named below."))
+        events = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert [event["event"] for event in events] == ["started", "flagged_clause", "error"]
+        assert events[1]["data"]["clause_text"] == "Clause 1"
+        assert asyncio.run(send("too short")).status_code == 400
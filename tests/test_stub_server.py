@@ -0,0 +1,209 @@
+"""
+Tests for the local AI stub server and response recording.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from backend.utils.ai_client import GeminiClient, GeminiConfig, WatsonXClient, WatsonXConfig
+from backend.utils.ai_client.auth import reset_token_managers
+from backend.utils.ai_client.cache import ResponseCache
+from backend.utils.ai_client.circuit_breaker import CircuitBreaker
+from backend.utils.ai_client.exceptions import APIError, ConfigurationError
+from backend.utils.ai_client.recording import ResponseRecorder, get_recorder, load_recordings
+from backend.utils.ai_client.retry import RetryPolicy
+from backend.utils.ai_client.stub_server import StubBehavior, create_stub_app, parse_latency
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(behavior):
+    """Run the stub server on a free local port until the generator is closed."""
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(
+        create_stub_app(behavior), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest.fixture
+def stub_url():
+    """Run the stub server with a canned answer for the duration of a test."""
+    yield from _serve(StubBehavior(canned_responses=['{"summary": "from stub"}']))
+
+
+@pytest.fixture
+def throttled_stub():
+    """Run a stub that answers every request with 429 and a Retry-After header."""
+    behavior = StubBehavior(error_rate=1.0, error_status=429, retry_after=0.05)
+    for url in _serve(behavior):
+        yield url, behavior
+
+
+class TestStubBehavior:
+    """Test latency specs and response selection"""
+
+    def test_parse_latency(self):
+        """Test supported latency distributions and their parameters"""
+        assert parse_latency("fixed:0.5").params == [0.5]
+        assert parse_latency("uniform:0.1,0.2").kind == "uniform"
+        with pytest.raises(ConfigurationError):
+            parse_latency("gaussian:1")
+        with pytest.raises(ConfigurationError):
+            parse_latency("uniform:1")
+
+    def test_seeded_latency_is_reproducible(self):
+        """Test the same seed yields the same latency sequence"""
+        first = StubBehavior(latency=parse_latency("lognormal:1.0,0.5"), seed=7)
+        second = StubBehavior(latency=parse_latency("lognormal:1.0,0.5"), seed=7)
+
+        assert [first.plan("p")["delay"] for _ in range(5)] == [second.plan("p")["delay"] for _ in range(5)]
+
+    def test_replay_prefers_recorded_response(self, tmp_path):
+        """Test recorded responses answer matching prompts and others get canned bodies"""
+        path = str(tmp_path / "recordings.jsonl")
+        ResponseRecorder(path).record("watsonx", "granite", "known prompt", '{"summary": "recorded"}')
+        behavior = StubBehavior.from_files(replay_path=path)
+
+        assert behavior.plan("known prompt")["text"] == '{"summary": "recorded"}'
+        assert "Stub analysis" in behavior.plan("other prompt")["text"]
+        assert behavior.stats["replay_hits"] == 1
+        assert behavior.stats["replay_misses"] == 1
+
+
+def _call(app, method, url, **kwargs):
+    """Send one request to an ASGI app in-process."""
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stub") as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(send())
+
+
+class TestStubApp:
+    """Test the WatsonX and Gemini HTTP shapes"""
+
+    def test_watsonx_generation_shape(self):
+        """Test the WatsonX endpoint answers with results[0].generated_text"""
+        app = create_stub_app()
+
+        token = _call(app, "POST", "/identity/token").json()
+        response = _call(app, "POST", "/ml/v1/text/generation?version=2023-05-29", json={"input": "prompt"})
+
+        assert token["access_token"]
+        assert json.loads(response.json()["results"][0]["generated_text"])["summary"]
+
+    def test_gemini_generation_shape(self):
+        """Test the Gemini endpoint answers with candidates[0].content.parts"""
+        app = create_stub_app(StubBehavior(canned_responses=["hello"]))
+
+        response = _call(app, "POST", "/v1beta/models/gemini-pro:generateContent",
+                         json={"contents": [{"parts": [{"text": "prompt"}]}]})
+
+        assert response.json()["candidates"][0]["content"]["parts"][0]["text"] == "hello"
+
+    def test_injected_errors(self):
+        """Test the configured error rate and status are applied"""
+        app = create_stub_app(StubBehavior(error_rate=1.0, error_status=429))
+
+        response = _call(app, "POST", "/ml/v1/text/generation", json={"input": "prompt"})
+
+        assert response.status_code == 429
+        assert _call(app, "GET", "/stub/stats").json()["errors"] == 1
+
+
+class TestClientsAgainstStub:
+    """Test the real clients end to end against a running stub"""
+
+    def setup_method(self):
+        reset_token_managers()
+
+    def test_watsonx_client(self, stub_url):
+        """Test WatsonXClient authenticates and generates through the stub"""
+        client = WatsonXClient(
+            WatsonXConfig(api_key="stub", project_id="stub",
+                          base_url=f"{stub_url}/ml/v1/text/generation?version=2023-05-29",
+                          iam_url=f"{stub_url}/identity/token"),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("watsonx-stub")
+        )
+
+        assert client._make_raw_request("prompt") == '{"summary": "from stub"}'
+        assert asyncio.run(client._make_raw_request_async("prompt")) == '{"summary": "from stub"}'
+
+    def test_gemini_client_records_responses(self, stub_url, tmp_path, monkeypatch):
+        """Test GeminiClient uses the stub shim and records upstream responses"""
+        path = str(tmp_path / "recorded.jsonl")
+        monkeypatch.setenv("AI_RECORD_PATH", path)
+        client = GeminiClient(
+            GeminiConfig(api_key="stub", stub_url=stub_url),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("gemini-stub")
+        )
+
+        assert client._make_raw_request("prompt") == '{"summary": "from stub"}'
+        assert list(load_recordings(path).values()) == ['{"summary": "from stub"}']
+
+        monkeypatch.delenv("AI_RECORD_PATH")
+        assert get_recorder() is None
+
+    def test_clients_stream_through_stub(self, stub_url):
+        """Test both clients stream fragments from the stub's event-stream endpoints"""
+        watsonx = WatsonXClient(
+            WatsonXConfig(api_key="stub", project_id="stub",
+                          base_url=f"{stub_url}/ml/v1/text/generation?version=2023-05-29",
+                          iam_url=f"{stub_url}/identity/token"),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("watsonx-stream-stub")
+        )
+        gemini = GeminiClient(
+            GeminiConfig(api_key="stub", stub_url=stub_url),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("gemini-stream-stub")
+        )
+
+        async def collect(client):
+            return [fragment async for fragment in client._stream_raw_request_async("prompt")]
+
+        for client in (watsonx, gemini):
+            fragments = asyncio.run(collect(client))
+            assert len(fragments) > 1
+            assert "".join(fragments) == '{"summary": "from stub"}'
+
+    def test_clients_retry_throttled_requests(self, throttled_stub):
+        """Test both clients honour Retry-After and give up after the attempt limit"""
+        url, behavior = throttled_stub
+        policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+        watsonx = WatsonXClient(
+            WatsonXConfig(api_key="stub", project_id="stub",
+                          base_url=f"{url}/ml/v1/text/generation?version=2023-05-29",
+                          iam_url=f"{url}/identity/token"),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("watsonx-retry-stub"), retry_policy=policy
+        )
+        gemini = GeminiClient(
+            GeminiConfig(api_key="stub", stub_url=url),
+            cache=ResponseCache(enabled=False), breaker=CircuitBreaker("gemini-retry-stub"), retry_policy=policy
+        )
+
+        for client in (watsonx, gemini):
+            requests_before = behavior.stats["requests"]
+            started = time.monotonic()
+            with pytest.raises(APIError) as error:
+                asyncio.run(client._make_raw_request_async("prompt"))
+            assert error.value.status_code == 429
+            assert error.value.retry_after == 0.05
+            assert behavior.stats["requests"] - requests_before == 3
+            assert time.monotonic() - started >= 0.1